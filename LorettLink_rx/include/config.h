@@ -40,6 +40,7 @@
 #define FEC_PKT_SIZE            256
 #define FEC_SYNC_BYTE           0x55
 #define FEC_TYPE_BYTE           0x68
+#define RATELESS_TYPE_BYTE      0x69    /* fountain-code packet, same 256-byte frame */
 
 /* RSSI byte appended by E22 when RSSI_BYTE_ON (1 extra byte) */
 #define E22_RSSI_BYTE_ENABLED   1
@@ -245,9 +245,9 @@ int main(void)
     while (1) {
         /* Scan ring buffer for FEC sync pattern */
         while (ring_count() >= RX_FRAME_SIZE) {
-            /* Look for FEC sync byte 0x55 followed by type 0x68 */
+            /* Look for FEC sync byte 0x55 followed by type 0x68 (RS) or 0x69 (rateless) */
             if (ring_peek(0) == FEC_SYNC_BYTE &&
-                ring_peek(1) == FEC_TYPE_BYTE) {
+                (ring_peek(1) == FEC_TYPE_BYTE || ring_peek(1) == RATELESS_TYPE_BYTE)) {
                 process_packet();
             } else {
                 /* Discard one byte and re-scan */
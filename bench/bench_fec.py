@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""Скорость кодера и декодера FEC на test_images: задержка и пропускная способность.
+
+Для каждого файла, доли чётности и числа групп RS замеряется
+ErasureEncoder.encode_bytes и ErasureDecoder.decode при шаблонах потерь:
+  none    — все блоки приняты
+  random  — случайные M/2 блоков из N
+  burst   — M/2 блоков подряд в порядке block_id
+  worst   — в каждой группе ровно m_g блоков данных (максимум работы RS)
+--codec cauchy добавляет код Коши по всему файлу (cauchy_fec.py; группы для него не
+перебираются, worst — M блоков данных). Каждый замер повторяется --repeat раз, но
+не дольше --budget секунд (хотя бы один раз); в отчёт идут минимум и медиана.
+
+Результаты пишутся в JSON (--json); --save-baseline сохраняет их как эталон,
+--compare сверяет с эталоном: лучшее время, делённое на калибровочный цикл (поправка
+на скорость машины), выросло больше чем в --tolerance раз, или декодирование, которое
+в эталоне проходило, перестало проходить — регрессия, код возврата 1.
+
+    python bench/bench_fec.py --compare                     # сверка с bench/baseline_fec.json
+    python bench/bench_fec.py --save-baseline               # после осознанного изменения кодека
+    python bench/bench_fec.py test_images/PIA01034.jpg --fec 0.25,0.5 --groups 0,2,4 --repeat 5
+"""
+
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+from importlib import metadata
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "transmitter_debag"))
+
+import cauchy_fec                                                             # noqa: E402
+from cauchy_fec import CauchyDecoder, CauchyEncoder                           # noqa: E402
+from erasure_fec import ErasureDecoder, ErasureEncoder, make_interleaver      # noqa: E402
+from scheduler import group_members                                           # noqa: E402
+
+BASELINE = Path(__file__).resolve().parent / "baseline_fec.json"
+PATTERNS = ("none", "random", "burst", "worst")
+CODECS = ("rs", "cauchy")
+DEFAULT_TOLERANCE = 1.3
+DEFAULT_BUDGET_S = 2.0
+# Замеры короче этого шумят сильнее любого допуска — их время в сверке не участвует
+MIN_COMPARED_S = 0.02
+
+
+def calibrate(repeat: int = 5) -> float:
+    """Время фиксированного цикла на чистом Python: знаменатель для сравнения машин."""
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        acc = 0
+        for i in range(300_000):
+            acc ^= (i * 2654435761) & 0xFFFF
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def timed(fn, repeat: int, budget: float):
+    """(результат последнего вызова, [времена, с]); повторы прекращаются после budget секунд."""
+    times, result = [], None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - t0)
+        if sum(times) >= budget:
+            break
+    return result, times
+
+
+def lost_blocks(pattern: str, packets, rng: random.Random) -> set:
+    p0 = packets[0]
+    k, n = p0.k_data, p0.n_total
+    m = n - k
+    if pattern == "none":
+        return set()
+    if pattern == "random":
+        return set(rng.sample(range(n), m // 2))
+    if pattern == "burst":
+        start = rng.randrange(n - m // 2 + 1)
+        return set(range(start, start + m // 2))
+    if p0.code:   # worst для кода Коши: все M потерь — блоки данных
+        return set(range(min(m, k)))
+    lost = set()
+    for members in group_members(k, p0.m_per_group, p0.num_groups, p0.interleaver_obj):
+        data = [b for b in members if b < k]
+        lost.update(data[:p0.m_per_group])
+    return lost
+
+
+def case_key(row: dict) -> str:
+    return "|".join(str(row[f]) for f in ("file", "codec", "fec", "groups", "op", "pattern"))
+
+
+def summary(times: list[float], size: int) -> dict:
+    med = statistics.median(times)
+    return {"runs": len(times), "min_s": min(times), "median_s": med,
+            "mb_s": size / med / 1e6 if med else 0.0}
+
+
+def run(args) -> dict:
+    if "cauchy" in args.codecs:
+        CauchyEncoder().encode_bytes(b"\x00")   # таблицы поля строятся лениво — не в первом замере
+    rng = random.Random(args.seed)
+    rows = []
+    for path in args.files:
+        data = Path(path).read_bytes()
+        name = Path(path).name
+        for codec in args.codecs:
+            for fec in args.fec:
+                for groups in (args.groups if codec == "rs" else [0]):
+                    if codec == "rs":
+                        enc = ErasureEncoder("BENCH", 0, fec, make_interleaver(0), groups)
+                        new_decoder = ErasureDecoder
+                    else:
+                        enc = CauchyEncoder("BENCH", 0, fec)
+                        new_decoder = CauchyDecoder
+                    packets, times = timed(lambda: enc.encode_bytes(data), args.repeat, args.budget)
+                    p0 = packets[0]
+                    base = {"file": name, "size": len(data), "codec": codec, "fec": fec,
+                            "groups": groups, "k": p0.k_data, "n": p0.n_total,
+                            "m_per_group": p0.m_per_group, "num_groups": p0.num_groups}
+                    rows.append(dict(base, op="encode", pattern="-", **summary(times, len(data))))
+                    print(f"{name:<14s} {codec:<6s} fec={fec:<4g} g={groups:<2d} K={p0.k_data:<4d} "
+                          f"N={p0.n_total:<4d} encode          {rows[-1]['median_s'] * 1000:9.1f} мс "
+                          f"{rows[-1]['mb_s']:7.3f} МБ/с", flush=True)
+
+                    for pattern in args.patterns:
+                        lost = lost_blocks(pattern, packets, rng)
+                        kept = [p for p in packets if p.block_id not in lost]
+
+                        def decode():
+                            dec = new_decoder()
+                            for p in kept:
+                                dec.add_packet(p)
+                            return dec.decode()
+
+                        out, times = timed(decode, args.repeat, args.budget)
+                        rows.append(dict(base, op="decode", pattern=pattern, lost=len(lost),
+                                         ok=out == data, **summary(times, len(data))))
+                        r = rows[-1]
+                        print(f"{'':14s} {'':6s} {'':8s} {'':4s} {'':6s} {'':6s} decode {pattern:<8s} "
+                              f"{r['median_s'] * 1000:9.1f} мс {r['mb_s']:7.3f} МБ/с  "
+                              f"потеряно {len(lost):<4d}{'' if r['ok'] else '  НЕ ДЕКОДИРОВАН'}", flush=True)
+    return {
+        "meta": {
+            "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "python": platform.python_version(),
+            "machine": f"{platform.system()} {platform.machine()}",
+            "reedsolo": metadata.version("reedsolo"),
+            "numpy": cauchy_fec.HAS_NUMPY,
+            "calibration_s": calibrate(),
+            "repeat": args.repeat,
+            "budget_s": args.budget,
+            "seed": args.seed,
+        },
+        "results": rows,
+    }
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> int:
+    """Напечатать изменения относительно эталона; вернуть число регрессий."""
+    scale = current["meta"]["calibration_s"] / baseline["meta"]["calibration_s"]
+    base = {case_key(r): r for r in baseline["results"]}
+    regressions = 0
+    print(f"\nСверка с эталоном от {baseline['meta']['date']} "
+          f"(калибровка: машина в {scale:.2f} раза {'медленнее' if scale >= 1 else 'быстрее'}), "
+          f"допуск ×{tolerance:g}")
+    for r in current["results"]:
+        b = base.get(case_key(r))
+        if b is None:
+            continue
+        label = f"{r['file']} {r['codec']} fec={r['fec']:g} g={r['groups']} {r['op']} {r['pattern']}"
+        if b.get("ok") and not r.get("ok", True):
+            regressions += 1
+            print(f"  РЕГРЕССИЯ  {label}: перестал декодироваться")
+            continue
+        # Минимум, а не медиана: фоновая нагрузка только добавляет время, но не отнимает
+        if max(r["min_s"], b["min_s"]) < MIN_COMPARED_S:
+            continue
+        ratio = r["min_s"] / (b["min_s"] * scale)
+        if ratio > tolerance:
+            regressions += 1
+            print(f"  РЕГРЕССИЯ  {label}: ×{ratio:.2f} ({b['min_s'] * 1000:.1f} → {r['min_s'] * 1000:.1f} мс)")
+        elif ratio < 1 / tolerance:
+            print(f"  быстрее    {label}: ×{ratio:.2f} ({b['min_s'] * 1000:.1f} → {r['min_s'] * 1000:.1f} мс)")
+    missing = len(set(base) - {case_key(r) for r in current["results"]})
+    if missing:
+        print(f"  в текущем прогоне нет {missing} замеров эталона")
+    print(f"Регрессий: {regressions}")
+    return regressions
+
+
+def _floats(s: str) -> list[float]:
+    return [float(v) for v in s.split(",") if v]
+
+
+def _ints(s: str) -> list[int]:
+    return [int(v) for v in s.split(",") if v]
+
+
+def main(argv=None):
+    root = Path(__file__).resolve().parent.parent
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("files", nargs="*", default=sorted(map(str, (root / "test_images").glob("*.jpg"))))
+    ap.add_argument("--fec", type=_floats, default=[0.25, 0.5], help="доли чётности через запятую")
+    ap.add_argument("--groups", type=_ints, default=[0],
+                    help="число групп RS через запятую (0 — как можно меньше, как в прошивке)")
+    ap.add_argument("--patterns", default=",".join(PATTERNS), help="шаблоны потерь: " + ", ".join(PATTERNS))
+    ap.add_argument("--codec", default="rs", help="кодеки через запятую: " + ", ".join(CODECS))
+    ap.add_argument("--repeat", type=int, default=3, help="повторов каждого замера")
+    ap.add_argument("--budget", type=float, default=DEFAULT_BUDGET_S,
+                    help="секунд на повторы одного замера")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--json", help="записать результаты в файл JSON")
+    ap.add_argument("--save-baseline", nargs="?", const=str(BASELINE), metavar="FILE",
+                    help=f"сохранить результаты как эталон (по умолчанию {BASELINE.name})")
+    ap.add_argument("--compare", nargs="?", const=str(BASELINE), metavar="FILE",
+                    help="сверить с эталоном; регрессия — код возврата 1")
+    ap.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                    help="во сколько раз лучшее время может вырасти без регрессии")
+    args = ap.parse_args(argv)
+
+    args.patterns = [p for p in args.patterns.split(",") if p]
+    args.codecs = [c for c in args.codec.split(",") if c]
+    for p in args.patterns:
+        if p not in PATTERNS:
+            ap.error(f"неизвестный шаблон потерь: {p}")
+    for c in args.codecs:
+        if c not in CODECS:
+            ap.error(f"неизвестный кодек: {c}")
+    args.repeat = max(1, args.repeat)
+
+    current = run(args)
+    text = json.dumps(current, ensure_ascii=False, indent=1)
+    if args.json:
+        Path(args.json).write_text(text)
+    if args.save_baseline:
+        Path(args.save_baseline).write_text(text)
+        print(f"Эталон сохранён: {args.save_baseline}")
+    if args.compare:
+        return 1 if compare(current, json.loads(Path(args.compare).read_text()), args.tolerance) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
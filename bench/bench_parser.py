@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""Скорость и устойчивость StreamParser на враждебных потоках, сверка с эталонным разбором.
+
+Потоки строятся из настоящих кадров (FEC RS, rateless, TELEM) и помех между ними:
+  clean      кадры подряд, без помех
+  noise      случайные байты между кадрами
+  fec_sync   помехи из ложных 0x55 0x68 / 0x55 0x69 — каждая ждёт 256 Б и проверку CRC-32
+  telem_sync помехи из ложных 0x5A 0xA5
+  truncated  обрезанные кадры (заголовок есть, хвоста нет) перед целыми
+  garbage    длинные (до 64 КБ) прогоны мусора, богатого 0x55, между редкими кадрами
+  jpeg       байты JPEG из test_images как помехи (0x55 в них не редкость)
+Каждый поток подаётся в feed() целиком и порциями разного размера (--chunks, rand —
+случайные 1…4096 Б). Исключение — garbage «целиком»: на длинном мусоре время
+feed() растёт с размером порции быстрее линейного (поток около 1 МБ за один вызов —
+минуты), поэтому по умолчанию порция ограничена GARBAGE_WHOLE_MAX (строка «≤64К»);
+весь поток одним feed() — с --garbage-whole. Замеряется пропускная способность, p99 и максимум времени
+одного feed(). Разбор сверяется с reference_parse() — побайтовым разбором по
+спецификации, который не оптимизируется: расхождение в списке кадров при любом
+разбиении на порции — ошибка, код возврата 1. Отдельно считается, сколько вставленных
+кадров не найдено и эталоном — это свойство протокола, а не парсера: CRC-32 покрывает
+байты 1…219, так что кадр, обрезанный после 224-го байта, проходит проверку и
+забирает 256 Б вместе с началом следующего кадра (то же — ложный TELEM, чей CRC-16
+сошёлся случайно).
+
+--fuzz N добавляет N случайных потоков из всех видов помех, каждый со случайным
+разбиением, и короткий поток, разрезанный на две порции по каждому смещению.
+
+    python bench/bench_parser.py
+    python bench/bench_parser.py --scenarios fec_sync,garbage --chunks 1,256,rand --json parser.json
+    python bench/bench_parser.py --fuzz 200 --seed 7
+    python bench/bench_parser.py --scenarios garbage --chunks whole --garbage-whole
+"""
+
+import argparse
+import json
+import random
+import statistics
+import struct
+import sys
+import time
+from pathlib import Path
+
+_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(_ROOT / "receiver"))
+
+from erasure_fec import PKT_SIZE, SYNC_BYTE, TYPE_FEC, ErasureEncoder, FECPacket, make_interleaver  # noqa: E402
+from fountain import TYPE_RATELESS, RatelessEncoder, RatelessPacket                    # noqa: E402
+from protocol import (TELEM_LEN, TELEM_SYNC_BYTES, StreamParser, TelemInfo,           # noqa: E402
+                      build_telem, crc16_ccitt)
+
+SCENARIOS = ("clean", "noise", "fec_sync", "telem_sync", "truncated", "garbage", "jpeg")
+DEFAULT_CHUNKS = "whole,1,7,64,256,4096,rand"
+FRAMES_PER_STREAM = 400
+GARBAGE_WHOLE_MAX = 64 * 1024      # порция «whole» для garbage без --garbage-whole
+
+
+# ═══════════════════════════════════════════════════════════════
+#  Эталонный разбор
+# ═══════════════════════════════════════════════════════════════
+
+def reference_parse(stream: bytes) -> list:
+    """Разбор по спецификации, байт за байтом, по всему потоку сразу.
+
+    В позиции i: 0x55 + тип FEC/rateless и 256 Б с верным CRC-32 — пакет, i += 256;
+    0x5A 0xA5 и 10 Б с верным CRC-16 — TELEM, i += 10; иначе i += 1. Кадр, не
+    уместившийся до конца потока, останавливает разбор: потоковый парсер ждёт его
+    хвост и не может знать, что sync ложный. Медленно, но очевидно верно.
+    """
+    out = []
+    i, n = 0, len(stream)
+    while i < n - 1:
+        b0, b1 = stream[i], stream[i + 1]
+        if b0 == SYNC_BYTE and b1 in (TYPE_FEC, TYPE_RATELESS):
+            if i + PKT_SIZE > n:
+                break
+            cls = FECPacket if b1 == TYPE_FEC else RatelessPacket
+            pkt = cls.from_bytes(stream[i:i + PKT_SIZE])
+            if pkt is not None:
+                out.append(pkt)
+                i += PKT_SIZE
+                continue
+        if stream[i:i + 2] == TELEM_SYNC_BYTES:
+            if i + TELEM_LEN > n:
+                break
+            raw = stream[i:i + TELEM_LEN]
+            if crc16_ccitt(raw[2:-2]) == struct.unpack_from("<H", raw, TELEM_LEN - 2)[0]:
+                _, _, _, rssi, snr, txp, _ = struct.unpack("<HBBhbBH", raw)
+                out.append(TelemInfo(rssi, snr, txp))
+                i += TELEM_LEN
+                continue
+        i += 1
+    return out
+
+
+def _key(obj) -> tuple:
+    if isinstance(obj, TelemInfo):
+        return ("telem", obj.rssi, obj.snr, obj.tx_power)
+    return (type(obj).__name__, obj.to_bytes())
+
+
+# ═══════════════════════════════════════════════════════════════
+#  Генераторы потоков
+# ═══════════════════════════════════════════════════════════════
+
+class FramePool:
+    """Настоящие кадры для вставки: FEC (RS) и rateless одного файла, TELEM со случайными полями."""
+
+    def __init__(self, data: bytes, rng: random.Random):
+        self.rng = rng
+        enc = ErasureEncoder("FUZZ", 7, 0.25, make_interleaver(0))
+        self.fec = [p.to_bytes() for p in enc.encode_bytes(data)]
+        rl = RatelessEncoder(data[:64 * 1024], "FUZZ", 8)
+        self.rateless = [rl.packet(esi).to_bytes() for esi in range(rl.k_data, rl.k_data + 32)]
+
+    def frame(self) -> bytes:
+        r = self.rng.random()
+        if r < 0.6:
+            return self.rng.choice(self.fec)
+        if r < 0.7:
+            return self.rng.choice(self.rateless)
+        return build_telem(self.rng.randint(-140, -20), self.rng.randint(-80, 60), self.rng.randint(0, 22))
+
+
+def _false_syncs(rng: random.Random, n: int, pairs: tuple) -> bytes:
+    out = bytearray()
+    while len(out) < n:
+        out += rng.choice(pairs)
+        out += rng.randbytes(rng.randint(0, 6))
+    return bytes(out[:n])
+
+
+def gap(scenario: str, rng: random.Random, pool: FramePool, jpeg: bytes) -> bytes:
+    """Помеха перед очередным кадром."""
+    if scenario == "clean":
+        return b""
+    if scenario == "noise":
+        return rng.randbytes(rng.randint(0, 300))
+    if scenario == "fec_sync":
+        return _false_syncs(rng, rng.randint(0, 600), (b"\x55\x68", b"\x55\x69", b"\x55"))
+    if scenario == "telem_sync":
+        return _false_syncs(rng, rng.randint(0, 120), (b"\x5a\xa5", b"\x5a"))
+    if scenario == "truncated":
+        f = pool.frame()
+        return f[:rng.randint(1, len(f) - 1)]
+    if scenario == "garbage":
+        if rng.random() > 0.05:
+            return b""
+        n = rng.randint(4096, 65536)
+        run = bytearray(rng.randbytes(n))
+        for i in rng.sample(range(n - 1), n // 16):
+            run[i] = SYNC_BYTE
+            if i % 3 == 0:
+                run[i + 1] = TYPE_FEC
+        return bytes(run)
+    if scenario == "jpeg":
+        start = rng.randrange(max(1, len(jpeg) - 2048))
+        return jpeg[start:start + rng.randint(0, 2048)]
+    raise ValueError(scenario)
+
+
+def build_stream(scenarios: list[str], frames: int, rng: random.Random,
+                 pool: FramePool, jpeg: bytes) -> tuple[bytes, list]:
+    """(поток, вставленные кадры по порядку); у каждого кадра помеха — случайный вид из scenarios."""
+    out, inserted = bytearray(), []
+    for _ in range(frames):
+        out += gap(rng.choice(scenarios), rng, pool, jpeg)
+        f = pool.frame()
+        out += f
+        inserted.append(f)
+    out += gap(rng.choice(scenarios), rng, pool, jpeg)
+    return bytes(out), inserted
+
+
+def chunks_of(stream: bytes, mode: str, rng: random.Random) -> list[bytes]:
+    if mode == "whole":
+        return [stream]
+    if mode == "rand":
+        out, i = [], 0
+        while i < len(stream):
+            n = rng.randint(1, 4096)
+            out.append(stream[i:i + n]); i += n
+        return out
+    n = int(mode)
+    return [stream[i:i + n] for i in range(0, len(stream), n)]
+
+
+# ═══════════════════════════════════════════════════════════════
+#  Прогон
+# ═══════════════════════════════════════════════════════════════
+
+def run_parser(chunks: list[bytes]) -> tuple[list, list[float], StreamParser]:
+    parser = StreamParser()
+    out, times = [], []
+    for c in chunks:
+        t0 = time.perf_counter()
+        out.extend(parser.feed(c))
+        times.append(time.perf_counter() - t0)
+    return out, times, parser
+
+
+def count_missing(found: list, inserted: list[bytes]) -> int:
+    """Вставленные кадры, которых нет в разборе (по совпадению байт, с учётом повторов)."""
+    have: dict[bytes, int] = {}
+    for obj in found:
+        raw = obj.to_bytes() if not isinstance(obj, TelemInfo) else build_telem(obj.rssi, obj.snr, obj.tx_power)
+        have[raw] = have.get(raw, 0) + 1
+    missing = 0
+    for f in inserted:
+        if have.get(f, 0):
+            have[f] -= 1
+        else:
+            missing += 1
+    return missing
+
+
+def bench(args, pool: FramePool, jpeg: bytes, rng: random.Random) -> list[dict]:
+    rows = []
+    for scenario in args.scenarios:
+        stream, inserted = build_stream([scenario], args.frames, rng, pool, jpeg)
+        ref = reference_parse(stream)
+        ref_keys = [_key(o) for o in ref]
+        missing = count_missing(ref, inserted)
+        for mode in args.chunks:
+            if mode == "whole" and scenario == "garbage" and not args.garbage_whole:
+                chunks = chunks_of(stream, str(GARBAGE_WHOLE_MAX), rng)
+                mode = f"≤{GARBAGE_WHOLE_MAX // 1024}К"
+            else:
+                chunks = chunks_of(stream, mode, rng)
+            found, times, parser = run_parser(chunks)
+            total = sum(times)
+            ok = [_key(o) for o in found] == ref_keys
+            q = sorted(times)
+            row = {
+                "scenario": scenario, "chunks": mode, "bytes": len(stream), "feeds": len(chunks),
+                "frames_inserted": len(inserted), "frames_found": len(found),
+                "missing_by_protocol": missing, "match_reference": ok,
+                "mb_s": len(stream) / total / 1e6 if total else 0.0,
+                "feed_p99_ms": q[min(len(q) - 1, int(0.99 * len(q)))] * 1000,
+                "feed_max_ms": q[-1] * 1000,
+                "crc_errors": parser.stats.fec_crc_errors + parser.stats.telem_crc_errors,
+                "bytes_skipped": parser.stats.bytes_skipped,
+            }
+            rows.append(row)
+            print(f"{scenario:<11s} {mode:>6s} {len(stream) / 1024:8.0f} КБ  {row['mb_s']:7.2f} МБ/с  "
+                  f"feed p99 {row['feed_p99_ms']:8.3f} мс  max {row['feed_max_ms']:8.2f} мс  "
+                  f"кадров {len(found)}/{len(inserted)}"
+                  f"{'' if ok else '  РАСХОЖДЕНИЕ С ЭТАЛОНОМ'}", flush=True)
+    return rows
+
+
+def fuzz(args, pool: FramePool, jpeg: bytes, rng: random.Random) -> int:
+    """Случайные потоки и разбиения; вернуть число расхождений с эталоном."""
+    failures = 0
+    for it in range(args.fuzz):
+        stream, _ = build_stream(list(SCENARIOS), rng.randint(1, 40), rng, pool, jpeg)
+        ref = [_key(o) for o in reference_parse(stream)]
+        mode = rng.choice(("1", "7", "rand", str(rng.randint(1, 600))))
+        found, _, _ = run_parser(chunks_of(stream, mode, rng))
+        if [_key(o) for o in found] != ref:
+            failures += 1
+            print(f"  fuzz #{it}: расхождение (порции {mode}, {len(stream)} Б, seed {args.seed})")
+
+    # Короткий поток с ложными sync, обрезанным кадром, FEC и TELEM — разрез по каждому смещению
+    scenarios = ["fec_sync", "telem_sync", "truncated", "noise"]
+    stream, _ = build_stream(scenarios, 6, random.Random(args.seed), pool, jpeg)
+    ref = [_key(o) for o in reference_parse(stream)]
+    for cut in range(len(stream) + 1):
+        found, _, _ = run_parser([stream[:cut], stream[cut:]])
+        if [_key(o) for o in found] != ref:
+            failures += 1
+            print(f"  разрез на смещении {cut} из {len(stream)}: расхождение")
+    print(f"Fuzz: {args.fuzz} потоков + {len(stream) + 1} разрезов, расхождений {failures}")
+    return failures
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--scenarios", default=",".join(SCENARIOS), help="виды помех: " + ", ".join(SCENARIOS))
+    ap.add_argument("--chunks", default=DEFAULT_CHUNKS,
+                    help="размеры порций feed() через запятую: whole, число байт, rand")
+    ap.add_argument("--frames", type=int, default=FRAMES_PER_STREAM, help="кадров в потоке")
+    ap.add_argument("--garbage-whole", action="store_true",
+                    help=f"garbage целиком одним feed(), без ограничения {GARBAGE_WHOLE_MAX // 1024} КБ (минуты)")
+    ap.add_argument("--fuzz", type=int, default=0, metavar="N", help="случайных потоков для сверки")
+    ap.add_argument("--image", type=Path, default=_ROOT / "test_images" / "PIA05007.jpg",
+                    help="источник кадров и помех jpeg")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--json", help="записать результаты в файл JSON")
+    args = ap.parse_args(argv)
+    args.scenarios = [s for s in args.scenarios.split(",") if s]
+    args.chunks = [c for c in args.chunks.split(",") if c]
+    for s in args.scenarios:
+        if s not in SCENARIOS:
+            ap.error(f"неизвестный вид помех: {s}")
+    for c in args.chunks:
+        if c not in ("whole", "rand") and not (c.isdigit() and int(c) > 0):
+            ap.error(f"неверный размер порции: {c}")
+
+    rng = random.Random(args.seed)
+    jpeg = args.image.read_bytes()
+    pool = FramePool(jpeg, rng)
+    rows = bench(args, pool, jpeg, rng)
+    mismatches = sum(not r["match_reference"] for r in rows)
+    if args.fuzz:
+        mismatches += fuzz(args, pool, jpeg, rng)
+
+    worst = max(rows, key=lambda r: r["feed_max_ms"]) if rows else None
+    if worst:
+        print(f"\nМедленнее всего: {min(rows, key=lambda r: r['mb_s'])['scenario']} "
+              f"({min(r['mb_s'] for r in rows):.2f} МБ/с, медиана {statistics.median(r['mb_s'] for r in rows):.2f}); "
+              f"самый долгий feed() — {worst['feed_max_ms']:.1f} мс ({worst['scenario']}, порции {worst['chunks']})")
+    print(f"Расхождений с эталоном: {mismatches}")
+    if args.json:
+        Path(args.json).write_text(json.dumps({"seed": args.seed, "results": rows,
+                                               "mismatches": mismatches}, ensure_ascii=False, indent=1))
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""Сквозная задержка наземного ПО без Qt: кодер → TCP → StreamParser → декодер → файл на диске.
+
+В одном процессе: на каждую линию — поток передатчика (encode_wire, модель канала,
+темп эфира как у AirRatePacer, TELEM после каждого пакета, как у прошивки приёмника),
+по loopback TCP к приёмной стороне, которая в одном потоке (как GUI) разбирает поток
+StreamParser, кладёт пакеты в ErasureDecoder (или CauchyDecoder по коду пакета),
+декодирует и отдаёт файл ImageSpool — тот же фоновый писатель, что у приёмника.
+
+Этапы (перцентили по пакетам или изображениям):
+  encode       кодирование файла передатчиком
+  net          отправка пакета → recv() на приёмной стороне
+  parse        recv() → пакет разобран StreamParser
+  ingest       разобран → add_packet выполнен
+  decode       decode() изображения
+  save         decode() завершён → файл и строка индекса на диске
+  block→file   отправка пакета, которым набрано K, → файл на диске
+  image        первый пакет изображения → файл на диске
+
+Предельная скорость приёма — пакетов за секунду занятости приёмного потока (разбор,
+декодер, декодирование); она же, делённая на темп одной линии E22, даёт число линий,
+которые приёмник вытянет. --flat отправляет без темпа: приёмник — узкое место.
+
+    python bench/bench_pipeline.py                                       # 1 линия, 62,5 кбит/с
+    python bench/bench_pipeline.py --links 4 --speed 10 --channel "ge:loss=0.1,burst=8"
+    python bench/bench_pipeline.py --flat --links 2 --images 3 --json pipeline.json
+"""
+
+import argparse
+import json
+import selectors
+import socket
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+_ROOT = Path(__file__).resolve().parent.parent
+# Общие модули (erasure_fec, protocol, cauchy_fec) — одинаковые копии; берутся из receiver/
+sys.path.insert(0, str(_ROOT / "transmitter_debag"))
+sys.path.insert(0, str(_ROOT / "receiver"))
+
+from cauchy_fec import CauchyDecoder                                          # noqa: E402
+from channel import parse_channel                                             # noqa: E402
+from erasure_fec import CODE_CAUCHY16, CODE_RS, PKT_SIZE, FECPacket, ErasureDecoder, Interleaver  # noqa: E402
+from image_spool import ImageRecord, ImageSpool                               # noqa: E402
+from packet_cache import encode_wire                                          # noqa: E402
+from pacing import AirRatePacer, DEFAULT_GAP_MS, airtime_s                    # noqa: E402
+from protocol import TELEM_LEN, StreamParser, build_telem                     # noqa: E402
+
+LINK_AIR_RATE = 62500
+STAGES = ("encode", "net", "parse", "ingest", "decode", "save", "block→file", "image")
+RECV_SIZE = 65536
+
+
+def percentiles(values: list[float]) -> dict:
+    if not values:
+        return {"n": 0}
+    v = sorted(values)
+
+    def pick(q: float) -> float:
+        return v[min(len(v) - 1, int(q * len(v)))]
+
+    return {"n": len(v), "p50": pick(0.5), "p90": pick(0.9), "p99": pick(0.99),
+            "max": v[-1], "mean": statistics.fmean(v)}
+
+
+def link_rate(air_rate: int, gap_ms: float, telem: bool) -> float:
+    """Пакетов в секунду одной линии: эфир кадра (+ TELEM) и межпакетная пауза."""
+    per = airtime_s(PKT_SIZE + (TELEM_LEN if telem else 0), air_rate) + gap_ms / 1000.0
+    return 1.0 / per if per else float("inf")
+
+
+# ═══════════════════════════════════════════════════════════════
+#  Передатчик
+# ═══════════════════════════════════════════════════════════════
+
+class Sender(threading.Thread):
+    """Одна линия: файлы по очереди, каждый пакет — через модель канала и по расписанию эфира."""
+
+    def __init__(self, link: int, port: int, files: list[Path], args, sent: dict, samples: dict):
+        super().__init__(name=f"link{link}", daemon=True)
+        self.link = link
+        self.port = port
+        self.files = files
+        self.args = args
+        self.sent = sent          # (callsign, image_id, block_id) → время отправки
+        self.samples = samples
+        self.callsign = f"BNCH{link}"
+        self.frames = 0
+        self.dropped = 0
+
+    def run(self):
+        a = self.args
+        sock = socket.create_connection(("127.0.0.1", self.port))
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        ch = parse_channel(a.channel, a.seed + self.link) if a.channel else None
+        pacer = AirRatePacer(0 if a.flat else a.air_rate * a.speed,
+                             0 if a.flat else a.gap_ms / a.speed, clock=time.perf_counter)
+        telem = build_telem(-90, 20, 22) if a.telem else b""
+        try:
+            for n, path in enumerate(self.files):
+                data = path.read_bytes()
+                iid = (self.link * 16 + n) & 0xFF
+                t0 = time.perf_counter()
+                img = encode_wire(data, self.callsign, iid, a.fec, Interleaver(),
+                                  code=CODE_CAUCHY16 if a.codec == "cauchy" else CODE_RS)
+                self.samples["encode"].append(time.perf_counter() - t0)
+                for bid in range(img.n_total):
+                    pacer.wait(PKT_SIZE)
+                    frames = [bytes(img.frame(bid))]
+                    if ch is not None:
+                        frames = ch.process(frames[0], pacer.elapsed)
+                        self.dropped += ch.dropped_last
+                    if telem:
+                        pacer.charge(TELEM_LEN)
+                    for f in frames:
+                        self.sent.setdefault((self.callsign, iid, bid), time.perf_counter())
+                        sock.sendall(f + telem)
+                        self.frames += 1
+        finally:
+            sock.close()
+
+
+# ═══════════════════════════════════════════════════════════════
+#  Приёмная сторона
+# ═══════════════════════════════════════════════════════════════
+
+class Ingest:
+    """Приём одной линии: разбор потока, декодер текущего изображения, передача в spool."""
+
+    def __init__(self, bench: "Pipeline"):
+        self.bench = bench
+        self.parser = StreamParser()
+        self.decoder = ErasureDecoder()
+        self.done = False
+        self.tried = False   # decode() уже не удавался
+        self.first_send = 0.0
+
+    def feed(self, data: bytes, t_rx: float):
+        b = self.bench
+        objs = self.parser.feed(data)
+        t_parsed = time.perf_counter()
+        for obj in objs:
+            if not isinstance(obj, FECPacket):
+                continue
+            t_sent = b.sent.get((obj.callsign, obj.image_id, obj.block_id), t_rx)
+            b.samples["net"].append(t_rx - t_sent)
+            b.samples["parse"].append(t_parsed - t_rx)
+            cls = CauchyDecoder if obj.code == CODE_CAUCHY16 else ErasureDecoder
+            if type(self.decoder) is not cls or obj.image_id != self.decoder.image_id:
+                self._finish_image()
+                self.decoder = cls()
+                self.done = False
+                self.tried = False
+                self.first_send = t_sent
+            t0 = time.perf_counter()
+            self.decoder.add_packet(obj)
+            b.samples["ingest"].append(time.perf_counter() - t0)
+            b.packets += 1
+            # can_decode пропускает decode(), пока какой-то группе не хватает уравнений,
+            # и после неудачи — пока в ней не прибавилось: повтор дёшев, как в приёмнике
+            if self.decoder.can_decode and not self.done:
+                self._decode(t_sent)
+
+    def _decode(self, t_sent: float):
+        b = self.bench
+        d = self.decoder
+        t0 = time.perf_counter()
+        out = d.decode()
+        t1 = time.perf_counter()
+        b.samples["decode"].append(t1 - t0)
+        if out is None:
+            self.tried = True
+            return
+        self.done = True
+        b.pending[(d.callsign, d.image_id)] = (t1, t_sent, self.first_send)
+        b.spool.submit(ImageRecord(
+            callsign=d.callsign, image_id=d.image_id, file_size=d.file_size, file_type=d.file_type,
+            k_data=d.k_data, n_total=d.n_total, blocks_rx=d.received_count, complete=True,
+            decode_ms=(t1 - t0) * 1000), out)
+
+    def _finish_image(self):
+        if self.decoder.received_count and not self.done:
+            if self.tried:
+                self.bench.failed += 1
+            else:
+                self.bench.incomplete += 1
+
+
+class Pipeline:
+    def __init__(self, args):
+        self.args = args
+        self.samples: dict[str, list[float]] = {s: [] for s in STAGES}
+        self.sent: dict = {}
+        self.pending: dict = {}    # (callsign, image_id) → (decode завершён, отправка K-го, первая отправка)
+        self.packets = 0
+        self.failed = 0
+        self.incomplete = 0
+        self.saved = 0
+        self.busy_s = 0.0
+        self._tmp = tempfile.TemporaryDirectory(prefix="llbench_")
+        self.spool = ImageSpool(Path(self._tmp.name) / "spool", on_saved=self._on_saved)
+
+    def _on_saved(self, rec: ImageRecord):
+        """Поток ImageSpool: файл переименован и строка индекса вставлена."""
+        t = time.perf_counter()
+        t_dec, t_k, t_first = self.pending.pop((rec.callsign, rec.image_id), (t, t, t))
+        self.samples["save"].append(t - t_dec)
+        self.samples["block→file"].append(t - t_k)
+        self.samples["image"].append(t - t_first)
+        self.saved += 1
+
+    def run(self, files: list[Path]) -> dict:
+        a = self.args
+        srv = socket.socket()
+        srv.bind(("127.0.0.1", 0))
+        srv.listen(a.links)
+        port = srv.getsockname()[1]
+        self.spool.start()
+        senders = [Sender(i, port, files, a, self.sent, self.samples) for i in range(a.links)]
+        t_start = time.perf_counter()
+        for s in senders:
+            s.start()
+
+        sel = selectors.DefaultSelector()
+        for _ in senders:
+            conn, _ = srv.accept()
+            conn.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 20)
+            sel.register(conn, selectors.EVENT_READ, Ingest(self))
+        open_links = len(senders)
+        while open_links:
+            for key, _ in sel.select():
+                data = key.fileobj.recv(RECV_SIZE)
+                t_rx = time.perf_counter()
+                if not data:
+                    key.data._finish_image()
+                    sel.unregister(key.fileobj)
+                    key.fileobj.close()
+                    open_links -= 1
+                    continue
+                key.data.feed(data, t_rx)
+                self.busy_s += time.perf_counter() - t_rx
+        wall = time.perf_counter() - t_start
+        self.spool.stop()
+        srv.close()
+        self._tmp.cleanup()
+
+        sustainable = self.packets / self.busy_s if self.busy_s else float("inf")
+        per_link = link_rate(LINK_AIR_RATE, a.gap_ms, a.telem)
+        return {
+            "config": {"links": a.links, "files": [p.name for p in files], "codec": a.codec,
+                       "fec": a.fec, "channel": a.channel or "", "flat": a.flat,
+                       "air_rate": a.air_rate, "gap_ms": a.gap_ms, "speed": a.speed, "telem": a.telem},
+            "stages": {s: percentiles(v) for s, v in self.samples.items()},
+            "frames_sent": sum(s.frames for s in senders),
+            "frames_dropped": sum(s.dropped for s in senders),
+            "packets": self.packets,
+            "images_saved": self.saved,
+            "images_failed": self.failed,
+            "images_incomplete": self.incomplete,
+            "wall_s": wall,
+            "receiver_busy_s": self.busy_s,
+            "offered_pps": sum(s.frames for s in senders) / wall,
+            "sustainable_pps": sustainable,
+            "link_pps_62k5": per_link,
+            "links_supported_62k5": sustainable / per_link,
+        }
+
+
+def print_report(r: dict):
+    c = r["config"]
+    print(f"Линий {c['links']}, файлы {', '.join(c['files'])}, код {c['codec']}, FEC {c['fec']:g}"
+          + (f", канал {c['channel']}" if c["channel"] else "")
+          + (", без темпа" if c["flat"] else f", эфир {c['air_rate']} бит/с + {c['gap_ms']:g} мс × {c['speed']:g}"))
+    print(f"\n  {'этап':<12s} {'n':>6s} {'p50':>10s} {'p90':>10s} {'p99':>10s} {'max':>10s}   мс")
+    for name, p in r["stages"].items():
+        if not p["n"]:
+            continue
+        print(f"  {name:<12s} {p['n']:>6d} " + " ".join(f"{p[q] * 1000:>10.2f}" for q in ("p50", "p90", "p99", "max")))
+    print(f"\n  кадров отправлено {r['frames_sent']}, выбито каналом {r['frames_dropped']}, "
+          f"пакетов принято {r['packets']}")
+    print(f"  изображений: сохранено {r['images_saved']}, не декодировано {r['images_failed']}, "
+          f"не хватило блоков {r['images_incomplete']}")
+    print(f"  время {r['wall_s']:.1f} с, приёмный поток занят {r['receiver_busy_s']:.1f} с "
+          f"({r['receiver_busy_s'] / r['wall_s'] * 100:.0f}%)")
+    print(f"  поток {r['offered_pps']:.0f} пак/с, предельно {r['sustainable_pps']:.0f} пак/с; "
+          f"линия 62,5 кбит/с — {r['link_pps_62k5']:.1f} пак/с → "
+          f"вытянет линий: {r['links_supported_62k5']:.1f}")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("files", nargs="*", help="файлы изображений (по умолчанию --images самых малых из test_images)")
+    ap.add_argument("--images", type=int, default=2, help="сколько файлов test_images брать без явного списка")
+    ap.add_argument("--links", type=int, default=1, help="линий (передатчиков) одновременно")
+    ap.add_argument("--codec", choices=("rs", "cauchy"), default="rs")
+    ap.add_argument("--fec", type=float, default=0.25)
+    ap.add_argument("--channel", default="", help="модель канала (channel.py), seed — --seed + номер линии")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--air-rate", type=int, default=LINK_AIR_RATE, help="бит/с в эфире")
+    ap.add_argument("--gap-ms", type=float, default=DEFAULT_GAP_MS, help="пауза между пакетами, мс")
+    ap.add_argument("--speed", type=float, default=1.0, help="ускорение расписания эфира")
+    ap.add_argument("--flat", action="store_true", help="без темпа: предельная скорость приёма")
+    ap.add_argument("--no-telem", dest="telem", action="store_false", help="без TELEM после пакетов")
+    ap.add_argument("--json", help="записать результаты в файл JSON")
+    args = ap.parse_args(argv)
+    args.links = max(1, args.links)
+    args.speed = max(1e-3, args.speed)
+
+    if args.files:
+        files = [Path(f) for f in args.files]
+    else:
+        files = sorted((_ROOT / "test_images").glob("*.jpg"), key=lambda p: p.stat().st_size)[:args.images]
+
+    report = Pipeline(args).run(files)
+    print_report(report)
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, ensure_ascii=False, indent=1))
+    return 1 if report["images_failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""Превью по доле эфирного времени: базовый JPEG против прогрессивного.
+
+Каждый файл передаётся дважды: как есть в порядке --base-order (по умолчанию
+sequential, как прошивка) и перекодированным в прогрессивный JPEG
+(transmitter_debag/progressive.py) в порядке --order (progressive). Пакеты
+подаются в ErasureDecoder по одному (через --channel — с потерями); на каждой
+доле эфира из --fractions превью строится так же, как в приёмнике
+(receiver/preview.py), декодируется Qt и сравнивается с исходным изображением:
+PSNR по яркости, дБ. «Годно» — первая доля эфира, с которой PSNR не ниже
+--usable-db и больше не опускается ниже.
+
+    python bench/bench_progressive.py
+    python bench/bench_progressive.py test_images/PIA01034.jpg --channel "ge:loss=0.15,burst=20"
+    python bench/bench_progressive.py --usable-db 22 --json progressive.json
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+from pathlib import Path
+
+_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(_ROOT / "transmitter_debag"))
+sys.path.insert(0, str(_ROOT / "receiver"))
+
+import numpy as np                                                             # noqa: E402
+from PyQt5.QtGui import QImage                                                 # noqa: E402
+
+from channel import parse_channel                                             # noqa: E402
+from erasure_fec import PKT_SIZE, ErasureDecoder, ErasureEncoder, FECPacket   # noqa: E402
+from pacing import DEFAULT_AIR_RATE, DEFAULT_GAP_MS, airtime_s                # noqa: E402
+from preview import jpeg_prefix, preview_bytes                                # noqa: E402
+from progressive import coarse_end, to_progressive                            # noqa: E402
+from scheduler import SCHEDULERS, make_scheduler                              # noqa: E402
+
+DEFAULT_FRACTIONS = (0.05, 0.1, 0.15, 0.2, 0.3, 0.4, 0.5, 0.6, 0.8, 1.0)
+DEFAULT_USABLE_DB = 25.0
+
+
+def luma(data: bytes, size=None) -> "np.ndarray | None":
+    """Яркость декодированного изображения (float, 0…255); None — Qt не декодирует."""
+    img = QImage.fromData(data)
+    if img.isNull():
+        return None
+    if size is not None and (img.width(), img.height()) != size:
+        return None
+    img = img.convertToFormat(QImage.Format_Grayscale8)
+    w, h = img.width(), img.height()
+    ptr = img.constBits()
+    ptr.setsize(img.bytesPerLine() * h)
+    return np.frombuffer(ptr, np.uint8).reshape(h, img.bytesPerLine())[:, :w].astype(np.float32)
+
+
+def psnr(a, ref) -> float:
+    if a is None:
+        return 0.0
+    mse = float(np.mean((a - ref) ** 2))
+    return 99.0 if mse == 0 else 10 * math.log10(255.0 ** 2 / mse)
+
+
+def run(data: bytes, order: str, ref, fractions, args) -> dict:
+    """Передать data в порядке order; PSNR превью на каждой доле эфира."""
+    packets = make_scheduler(order, args.seed).schedule(ErasureEncoder("BENCH", 0, args.fec).encode_bytes(data))
+    frame_s = airtime_s(PKT_SIZE, args.air_rate) + args.gap_ms / 1000.0
+    ch = parse_channel(args.channel, args.seed) if args.channel else None
+    marks = sorted({max(1, round(f * len(packets))) for f in fractions})
+    size = (ref.shape[1], ref.shape[0])
+    dec = ErasureDecoder()
+    points = []
+    for i, p in enumerate(packets, 1):
+        frames = [p.to_bytes()] if ch is None else ch.process(p.to_bytes(), i * frame_s)
+        for f in frames:
+            pkt = FECPacket.from_bytes(f)
+            if pkt is not None:
+                dec.add_packet(pkt)
+        if i in marks:
+            if dec.can_decode:
+                dec.decode()
+            points.append({"fraction": i / len(packets), "air_s": i * frame_s,
+                           "prefix": jpeg_prefix(dec) is not None,
+                           "psnr": psnr(luma(preview_bytes(dec), size), ref)})
+    usable = next((p["fraction"] for j, p in enumerate(points)
+                   if all(q["psnr"] >= args.usable_db for q in points[j:])), None)
+    return {"order": order, "size": len(data), "n": len(packets), "usable": usable, "points": points}
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("files", nargs="*", default=sorted(map(str, (_ROOT / "test_images").glob("*.jpg"))))
+    ap.add_argument("--fec", type=float, default=0.25, help="доля чётности (как FEC overhead)")
+    ap.add_argument("--order", choices=list(SCHEDULERS), default="progressive",
+                    help="порядок для прогрессивного файла")
+    ap.add_argument("--base-order", choices=list(SCHEDULERS), default="sequential",
+                    help="порядок для исходного файла")
+    ap.add_argument("--fractions", default=",".join(map(str, DEFAULT_FRACTIONS)),
+                    help="доли эфирного времени через запятую")
+    ap.add_argument("--usable-db", type=float, default=DEFAULT_USABLE_DB, help="порог «годного» превью, дБ")
+    ap.add_argument("--channel", help="модель канала (channel.py); без неё — без потерь")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--air-rate", type=int, default=DEFAULT_AIR_RATE)
+    ap.add_argument("--gap-ms", type=float, default=DEFAULT_GAP_MS)
+    ap.add_argument("--json", help="записать результаты в файл JSON")
+    args = ap.parse_args(argv)
+    fractions = [float(f) for f in args.fractions.split(",") if f]
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtCore import qInstallMessageHandler
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication([])   # без приложения Qt не грузит плагин JPEG
+    app.setApplicationName("bench_progressive")
+    qInstallMessageHandler(lambda *_: None)   # «Premature end of JPEG file» на каждое превью
+
+    results = []
+    for path in args.files:
+        raw = Path(path).read_bytes()
+        ref = luma(raw)
+        if ref is None:
+            print(f"{Path(path).name}: не декодируется, пропуск")
+            continue
+        prog, tool = to_progressive(raw)
+        print(f"\n{Path(path).name}: {len(raw)} Б → прогрессивный {len(prog)} Б "
+              f"({tool or 'не перекодирован'}), грубые сканы {coarse_end(prog) / len(prog):.0%} файла")
+        print(f"  {'эфир':<16s}" + "".join(f"{f:>7.0%}" for f in fractions) + "   годно")
+        row = {"file": Path(path).name, "tool": tool, "channel": args.channel or ""}
+        for label, data, order in (("baseline", raw, args.base_order), ("progressive", prog, args.order)):
+            r = run(data, order, ref, fractions, args)
+            row[label] = r
+            usable = f"{r['usable']:>7.0%}" if r["usable"] is not None else "      —"
+            print(f"  {label + ', дБ':<16s}" + "".join(f"{p['psnr']:>7.1f}" for p in r["points"]) + usable)
+        results.append(row)
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, ensure_ascii=False, indent=1))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""Стратегии порядка отправки против пакетных потерь: доля декодируемых изображений.
+
+Для каждого файла и стратегии из transmitter_debag/scheduler.py пачка из L
+подряд отправленных блоков выбивается во всех положениях (или выборочно), и
+изображение считается восстановимым, если в каждой группе RS потеряно не больше
+m_g блоков — для RS-кода это точный критерий. --verify N дополнительно проверяет
+критерий настоящим декодером на случайных положениях. --channel прогоняет
+модель канала из channel.py (seed на прогон) вместо одиночных пачек.
+
+    python bench/bench_schedule.py test_images/*.jpg --fec 0.25
+    python bench/bench_schedule.py test_images/PIA01034.jpg --channel "ge:loss=0.15,burst=20" --trials 200
+"""
+
+import argparse
+import json
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "transmitter_debag"))
+
+from channel import parse_channel                                              # noqa: E402
+from erasure_fec import (BLOCK_PAYLOAD, PKT_SIZE, ErasureDecoder, ErasureEncoder,  # noqa: E402
+                         _rs_group_params)
+from pacing import DEFAULT_AIR_RATE, DEFAULT_GAP_MS, airtime_s                  # noqa: E402
+from scheduler import SCHEDULERS, group_members, make_scheduler, parse_interleaver  # noqa: E402
+
+DEFAULT_BURSTS = (1, 2, 4, 8, 16, 32, 48, 64, 96, 128, 192, 256)
+MAX_POSITIONS = 400   # положений пачки на (файл, стратегия, L) — больше уже не меняет долю
+
+
+def geometry(size: int, fec: float) -> tuple[int, int, int, int]:
+    k = max(1, -(-size // BLOCK_PAYLOAD))
+    _, m_g, ng = _rs_group_params(k, fec)
+    return k, k + m_g * ng, m_g, ng
+
+
+def group_table(k: int, n: int, m_g: int, ng: int, interleaver=None) -> list[int]:
+    grp = [0] * n
+    for g, members in enumerate(group_members(k, m_g, ng, interleaver)):
+        for b in members:
+            grp[b] = g
+    return grp
+
+
+def burst_success(order: list[int], grp: list[int], m_g: int, ng: int, burst: int) -> float:
+    """Доля положений пачки длины burst, после которых файл восстановим (скользящее окно)."""
+    n = len(order)
+    if burst >= n:
+        return 0.0
+    counts = [0] * ng
+    for b in order[:burst]:
+        counts[grp[b]] += 1
+    ok = total = 0
+    step = max(1, (n - burst + 1) // MAX_POSITIONS)
+    for start in range(n - burst + 1):
+        if start:
+            counts[grp[order[start - 1]]] -= 1
+            counts[grp[order[start + burst - 1]]] += 1
+        if start % step:
+            continue
+        total += 1
+        ok += max(counts) <= m_g
+    return ok / total
+
+
+def lost_ok(lost: set, grp: list[int], m_g: int, ng: int) -> bool:
+    counts = [0] * ng
+    for b in lost:
+        counts[grp[b]] += 1
+    return max(counts) <= m_g
+
+
+def verify(packets, order, grp, m_g, ng, bursts, rng, data, samples) -> int:
+    """Сверка критерия с настоящим декодером на samples случайных пачках; число расхождений."""
+    n = len(order)
+    bad = 0
+    for _ in range(samples):
+        burst = min(rng.choice(bursts), n - 1)
+        start = rng.randrange(n - burst + 1)
+        lost = set(order[start:start + burst])
+        dec = ErasureDecoder()
+        for p in packets:
+            if p.block_id not in lost:
+                dec.add_packet(p)
+        got = dec.decode()
+        if (got == data) != lost_ok(lost, grp, m_g, ng):
+            bad += 1
+    return bad
+
+
+def channel_success(order, grp, m_g, ng, spec, trials, seed, frame_s) -> float:
+    ok = 0
+    frame = bytes(PKT_SIZE)
+    for t in range(trials):
+        ch = parse_channel(spec, seed + t)
+        lost = set()
+        for i, b in enumerate(order):
+            ch.process(frame, i * frame_s)
+            if ch.dropped_last:
+                lost.add(b)
+        ok += lost_ok(lost, grp, m_g, ng)
+    return ok / trials
+
+
+def main(argv=None):
+    root = Path(__file__).resolve().parent.parent
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("files", nargs="*", default=sorted(map(str, (root / "test_images").glob("*.jpg"))))
+    ap.add_argument("--fec", type=float, default=0.25, help="доля чётности (как FEC overhead)")
+    ap.add_argument("--bursts", default=",".join(map(str, DEFAULT_BURSTS)),
+                    help="длины пачек в блоках через запятую")
+    ap.add_argument("--strategies", default=",".join(SCHEDULERS))
+    ap.add_argument("--interleaver", default="modulo",
+                    help="распределение по группам RS: modulo, block:ГЛУБИНА, random:SEED")
+    ap.add_argument("--channel", help="строка модели канала вместо одиночных пачек")
+    ap.add_argument("--trials", type=int, default=100)
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--air-rate", type=int, default=DEFAULT_AIR_RATE)
+    ap.add_argument("--gap-ms", type=float, default=DEFAULT_GAP_MS)
+    ap.add_argument("--verify", type=int, default=0, metavar="N",
+                    help="сверить критерий с RS-декодером на N пачках для каждой стратегии")
+    ap.add_argument("--json", help="записать результаты в файл JSON")
+    args = ap.parse_args(argv)
+
+    bursts = [int(b) for b in args.bursts.split(",") if b]
+    names = [s for s in args.strategies.split(",") if s]
+    try:
+        il = parse_interleaver(args.interleaver)
+    except ValueError as exc:
+        ap.error(str(exc))
+    frame_s = airtime_s(PKT_SIZE, args.air_rate) + args.gap_ms / 1000.0
+    rng = random.Random(args.seed)
+    results = []
+    mismatches = 0
+
+    for path in args.files:
+        data = Path(path).read_bytes()
+        k, n, m_g, ng = geometry(len(data), args.fec)
+        grp = group_table(k, n, m_g, ng, il)
+        packets = ErasureEncoder("BENCH", 0, args.fec, il).encode_bytes(data) if args.verify else None
+        print(f"\n{Path(path).name}: {len(data)} Б, K={k} N={n} групп={ng} m_g={m_g}, "
+              f"интерливер {il.describe()}")
+        if args.channel:
+            print(f"  канал {args.channel}, прогонов {args.trials}")
+        else:
+            print("  пачка, блоков:  " + " ".join(f"{b:>5d}" for b in bursts))
+            print("  пачка, с:       " + " ".join(f"{b * frame_s:>5.0f}" for b in bursts))
+        for name in names:
+            sch = make_scheduler(name, args.seed)
+            order = sch.order(k, n, m_g, ng, data, il)
+            row = {"file": Path(path).name, "size": len(data), "k": k, "n": n,
+                   "num_groups": ng, "m_per_group": m_g, "strategy": name,
+                   "interleaver": il.describe()}
+            if args.channel:
+                row["channel"] = args.channel
+                row["success"] = channel_success(order, grp, m_g, ng, args.channel,
+                                                 args.trials, args.seed, frame_s)
+                print(f"  {name:<14s} {row['success'] * 100:6.1f}%")
+            else:
+                row["bursts"] = {b: burst_success(order, grp, m_g, ng, b) for b in bursts}
+                print(f"  {name:<14s} " + " ".join(f"{v * 100:>4.0f}%" for v in row["bursts"].values()))
+                if packets is not None:
+                    mismatches += verify(packets, order, grp, m_g, ng, bursts, rng, data, args.verify)
+            results.append(row)
+
+    if args.verify:
+        print(f"\nСверка с декодером: расхождений {mismatches}")
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, ensure_ascii=False, indent=1))
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""Бюджет времени импорта модулей приёмника и старта окна.
+
+Каждый модуль импортируется в новом процессе (python -X importtime -c "import X",
+каталог receiver/), из отчёта интерпретатора берётся накопленное время импорта
+модуля со всеми зависимостями; по --repeat запусков — медиана, она и сравнивается
+с бюджетом. Заодно проверяется, что тяжёлые и необязательные модули (numpy,
+PyQt5.uic, pyserial, http.server, cProfile) не попадают в импорт: они должны
+грузиться при первом обращении, а не при старте.
+
+--gui — время от запуска процесса до показанного окна приёмника (QT_QPA_PLATFORM
+=offscreen, если не задана): импорт, конструктор MainWindow, show() и первый
+цикл событий. Бюджеты заданы с запасом для медленной машины; --scale умножает их
+все. Превышение бюджета или запрещённый импорт — код возврата 1.
+
+    python bench/import_budget.py
+    python bench/import_budget.py --gui --repeat 7
+    python bench/import_budget.py --scale 0.5 --json imports.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+_ROOT = Path(__file__).resolve().parent.parent
+RECEIVER = _ROOT / "receiver"
+
+# модуль → бюджет медианы, мс
+BUDGETS = {
+    "protocol": 150,
+    "erasure_fec": 150,
+    "cauchy_fec": 150,
+    "fountain": 150,
+    "metrics": 100,
+    "headless_receiver": 300,
+    "recover_archive": 300,
+    "lorettlink_receiver": 450,
+}
+GUI_BUDGET_MS = 800
+
+# Не должны импортироваться вместе с модулями выше
+FORBIDDEN = ("numpy", "PyQt5.uic", "serial", "http.server", "cProfile", "pstats")
+
+_GUI_SCRIPT = """
+import time
+t0 = time.perf_counter()
+from PyQt5.QtWidgets import QApplication
+import lorettlink_receiver
+app = QApplication([])
+w = lorettlink_receiver.MainWindow()
+w.show()
+app.processEvents()
+print((time.perf_counter() - t0) * 1000)
+"""
+
+
+def import_once(module: str) -> tuple[float, set]:
+    """Одно измерение: (накопленное время импорта module, мс; все импортированные модули)."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=RECEIVER, capture_output=True, text=True, timeout=120)
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module}: {proc.stderr.strip().splitlines()[-1]}")
+    total_us, loaded = None, set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        name = name.strip()
+        loaded.add(name)
+        if name == module:
+            total_us = int(cumulative)
+    if total_us is None:
+        raise RuntimeError(f"import {module}: нет строки модуля в отчёте -X importtime")
+    return total_us / 1000, loaded
+
+
+def gui_once() -> float:
+    env = dict(os.environ)
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    proc = subprocess.run([sys.executable, "-c", _GUI_SCRIPT], cwd=RECEIVER, env=env,
+                          capture_output=True, text=True, timeout=120)
+    if proc.returncode != 0:
+        raise RuntimeError(f"окно приёмника: {proc.stderr.strip().splitlines()[-1]}")
+    return float(proc.stdout.strip().splitlines()[-1])
+
+
+def measure(modules: list[str], repeat: int, scale: float, gui: bool) -> dict:
+    rows = []
+    for module in modules:
+        times, loaded = [], set()
+        for _ in range(repeat):
+            ms, names = import_once(module)
+            times.append(ms); loaded |= names
+        budget = BUDGETS[module] * scale
+        median = statistics.median(times)
+        bad = sorted(n for n in loaded if n in FORBIDDEN)
+        rows.append({"module": module, "median_ms": median, "min_ms": min(times),
+                     "budget_ms": budget, "modules": len(loaded), "forbidden": bad,
+                     "ok": median <= budget and not bad})
+    report = {"python": sys.version.split()[0], "repeat": repeat, "scale": scale, "imports": rows}
+    if gui:
+        times = [gui_once() for _ in range(repeat)]
+        budget = GUI_BUDGET_MS * scale
+        report["gui"] = {"median_ms": statistics.median(times), "min_ms": min(times),
+                         "budget_ms": budget, "ok": statistics.median(times) <= budget}
+    return report
+
+
+def print_report(report: dict):
+    print(f"Python {report['python']}, медиана {report['repeat']} запусков, бюджеты ×{report['scale']:g}\n")
+    print(f"{'модуль':<22}{'медиана':>10}{'мин.':>9}{'бюджет':>9}{'модулей':>9}")
+    for r in report["imports"]:
+        status = "OK" if r["ok"] else "ПРЕВЫШЕН"
+        if r["forbidden"]:
+            status = "импортирует " + ", ".join(r["forbidden"])
+        print(f"{r['module']:<22}{r['median_ms']:>8.1f}мс{r['min_ms']:>7.1f}мс{r['budget_ms']:>7.0f}мс"
+              f"{r['modules']:>9}  {status}")
+    g = report.get("gui")
+    if g:
+        print(f"\n{'окно приёмника':<22}{g['median_ms']:>8.1f}мс{g['min_ms']:>7.1f}мс{g['budget_ms']:>7.0f}мс"
+              f"{'':>9}  {'OK' if g['ok'] else 'ПРЕВЫШЕН'}")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("modules", nargs="*", help=f"модули (по умолчанию: {', '.join(BUDGETS)})")
+    ap.add_argument("--repeat", type=int, default=5, help="запусков на модуль, сравнивается медиана")
+    ap.add_argument("--scale", type=float, default=1.0, help="множитель всех бюджетов")
+    ap.add_argument("--gui", action="store_true", help="замерить и время до показа окна приёмника")
+    ap.add_argument("--json", help="записать результаты в файл JSON")
+    args = ap.parse_args(argv)
+    unknown = [m for m in args.modules if m not in BUDGETS]
+    if unknown:
+        ap.error(f"нет бюджета для {', '.join(unknown)}")
+
+    report = measure(args.modules or list(BUDGETS), max(1, args.repeat), args.scale, args.gui)
+    print_report(report)
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, ensure_ascii=False, indent=1))
+    ok = all(r["ok"] for r in report["imports"]) and report.get("gui", {}).get("ok", True)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
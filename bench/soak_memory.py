@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""Многочасовой приём в ускоренном времени: память приёмника должна выходить на плато.
+
+Поток, который за --hours часов передала бы одна линия E22 (кадр 256 Б + TELEM,
+эфир --air-rate, пауза --gap-ms), без ожидания подаётся в HeadlessReceiver —
+тот же код, что у headless_receiver.py: StreamParser, сеансы декодеров,
+отложенные до следующего круга изображения, учёт памяти и вытеснение на диск
+(memory_budget.py). Раз в секунду эфирного времени — tick(), как в цикле приёма.
+
+Передатчик по кругу шлёт --ids изображений (image_id 0…ids-1, файлы test_images
+по очереди) через модель канала. Приёмник откладывает до следующего круга только
+RS-изображения: с --codec rs и тяжёлым каналом они не набирают K за проход,
+дособираются на следующих кругах, а при ids > 8 вытесняются на диск. Каждые
+--sample-min минут эфира записывается RSS процесса (Linux; иначе — только
+учтённая память) и учёт по подсистемам; ход прогона — раз в час эфира в stderr.
+
+Плато: после прогрева (первые --warmup часов) наклон RSS по МНК, умноженный на
+оставшееся время, и размах RSS не должны превышать --max-growth-mb, иначе код
+возврата 1. 24 часа эфира — около миллиона пакетов.
+
+Приёмочный прогон — RS с откладыванием и вытеснением (третья строка): 24 ч эфира,
+около 1300 восстановленных изображений, на диске 16…21 сеанс, RSS на плато
+(+0,2 МБ); минуты, из них до минуты — кодирование RS на стороне передатчика.
+
+    python bench/soak_memory.py                                  # 24 ч эфира, код Коши
+    python bench/soak_memory.py --codec rs --ids 40 --channel "ge:loss=0.5,burst=16" --hours 2
+    python bench/soak_memory.py --codec rs --ids 40 --channel "ge:loss=0.5,burst=16" --mem-budget 0.1 --json soak.json
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+_ROOT = Path(__file__).resolve().parent.parent
+# Общие модули (erasure_fec, protocol, cauchy_fec) — одинаковые копии; берутся из receiver/
+sys.path.insert(0, str(_ROOT / "transmitter_debag"))
+sys.path.insert(0, str(_ROOT / "receiver"))
+
+from channel import parse_channel                                             # noqa: E402
+from erasure_fec import CODE_CAUCHY16, CODE_RS, PKT_SIZE, Interleaver         # noqa: E402
+from headless_receiver import HeadlessReceiver                                # noqa: E402
+from memory_budget import DEFAULT_BUDGET_MB, rss_bytes                        # noqa: E402
+from metrics import Metrics                                                   # noqa: E402
+from packet_cache import encode_wire                                          # noqa: E402
+from pacing import DEFAULT_GAP_MS, airtime_s                                  # noqa: E402
+from protocol import TELEM_LEN, build_telem                                   # noqa: E402
+
+LINK_AIR_RATE = 62500
+SOURCE = "tcp:soak"
+MB = 1 << 20
+
+
+def slope(xs: list[float], ys: list[float]) -> float:
+    """Наклон прямой МНК (ys на единицу xs)."""
+    mx, my = statistics.fmean(xs), statistics.fmean(ys)
+    den = sum((x - mx) ** 2 for x in xs)
+    return sum((x - mx) * (y - my) for x, y in zip(xs, ys)) / den if den else 0.0
+
+
+class Soak:
+    def __init__(self, args):
+        self.args = args
+        self.rx = HeadlessReceiver(None, False, Metrics(), args.mem_budget)
+        self.telem = build_telem(-90, 20, 22)
+        self.per_packet = airtime_s(PKT_SIZE + TELEM_LEN, args.air_rate) + args.gap_ms / 1000.0
+        files = sorted((_ROOT / "test_images").glob("*.jpg"), key=lambda p: p.stat().st_size)
+        files = files[:max(1, args.files)]
+        code = CODE_CAUCHY16 if args.codec == "cauchy" else CODE_RS
+        print(f"Кодирование {args.ids} изображений ({args.codec})…", file=sys.stderr, flush=True)
+        self.images = [encode_wire(files[i % len(files)].read_bytes(), "SOAK", i, args.fec,
+                                   Interleaver(), code=code) for i in range(args.ids)]
+        self.samples: list[dict] = []
+
+    def sample(self, t_air: float, packets: int):
+        rx = self.rx
+        parked = [s.parked for s in rx.sessions.values()]
+        self.samples.append({
+            "air_h": t_air / 3600,
+            "packets": packets,
+            "rss_mb": (rss_bytes() or 0) / MB,
+            "accounted_mb": rx.budget.total / MB,
+            "subsystems": dict(rx.budget.used),
+            "parked_hot": sum(p.hot for p in parked),
+            "parked_cold": sum(p.cold for p in parked),
+            "recovered": rx.metrics.total("images_recovered_total"),
+        })
+
+    def run(self) -> dict:
+        a = self.args
+        total_s = a.hours * 3600
+        ch = parse_channel(a.channel, a.seed) if a.channel else None
+        t_air, packets, next_tick, next_sample, next_report = 0.0, 0, 1.0, 0.0, 3600.0
+        t0 = time.perf_counter()
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):   # журнал сеансов
+            n = 0
+            while t_air < total_s:
+                img = self.images[n % len(self.images)]
+                n += 1
+                for bid in range(img.n_total):
+                    frames = [bytes(img.frame(bid))]
+                    if ch is not None:
+                        frames = ch.process(frames[0], t_air)
+                    for f in frames:
+                        self.rx.ingest(SOURCE, f + self.telem)
+                    packets += 1
+                    t_air += self.per_packet
+                    if t_air >= next_tick:
+                        next_tick = t_air + 1.0
+                        self.rx.tick()
+                    if t_air >= next_sample:
+                        next_sample += a.sample_min * 60
+                        self.sample(t_air, packets)
+                    if t_air >= next_report:   # stdout занят журналом сеансов — ход прогона в stderr
+                        next_report += 3600
+                        print(f"  {t_air / 3600:.0f} ч эфира из {a.hours:g}, восстановлено "
+                              f"{self.rx.metrics.total('images_recovered_total'):.0f}", file=sys.stderr, flush=True)
+                    if t_air >= total_s:
+                        break
+            self.rx.tick()
+            self.sample(t_air, packets)
+        wall = time.perf_counter() - t0
+        self.rx.close()
+        return self.verdict(wall)
+
+    def verdict(self, wall: float) -> dict:
+        a = self.args
+        steady = [s for s in self.samples if s["air_h"] >= a.warmup] or self.samples[-2:]
+        key = "rss_mb" if rss_bytes() is not None else "accounted_mb"
+        xs, ys = [s["air_h"] for s in steady], [s[key] for s in steady]
+        per_hour = slope(xs, ys) if len(steady) > 1 else 0.0
+        growth = per_hour * (xs[-1] - xs[0])
+        spread = max(ys) - min(ys)
+        last = self.samples[-1]
+        return {
+            "hours": a.hours, "packets": last["packets"], "wall_s": wall,
+            "speedup": a.hours * 3600 / max(wall, 1e-9),
+            "budget_mb": a.mem_budget, "measure": key,
+            "steady_from_h": xs[0], "slope_mb_per_h": per_hour,
+            "growth_mb": growth, "spread_mb": spread,
+            "max_growth_mb": a.max_growth_mb,
+            "ok": growth <= a.max_growth_mb and spread <= a.max_growth_mb,
+            "recovered": last["recovered"],
+            "samples": self.samples,
+        }
+
+
+def print_report(r: dict):
+    print(f"{r['hours']:g} ч эфира, {r['packets']} пакетов за {r['wall_s']:.0f} с "
+          f"(×{r['speedup']:.0f}), бюджет {r['budget_mb']:g} МБ, "
+          f"восстановлено изображений: {r['recovered']:.0f}\n")
+    print(f"{'эфир, ч':>8}{'RSS, МБ':>10}{'учтено, МБ':>12}{'отложено':>10}{'на диске':>10}")
+    shown = -1.0
+    for s in r["samples"]:
+        if s["air_h"] - shown >= 1.0 or s is r["samples"][-1]:
+            shown = s["air_h"]
+            print(f"{s['air_h']:>8.1f}{s['rss_mb']:>10.1f}{s['accounted_mb']:>12.2f}"
+                  f"{s['parked_hot']:>10}{s['parked_cold']:>10}")
+    name = "RSS" if r["measure"] == "rss_mb" else "учтённой памяти"
+    print(f"\nС {r['steady_from_h']:.1f} ч: наклон {name} {r['slope_mb_per_h']:+.3f} МБ/ч, "
+          f"рост {r['growth_mb']:+.2f} МБ, размах {r['spread_mb']:.2f} МБ "
+          f"(допуск {r['max_growth_mb']:g} МБ) — {'плато' if r['ok'] else 'РОСТ ПАМЯТИ'}")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--hours", type=float, default=24.0, help="часов эфирного времени")
+    ap.add_argument("--ids", type=int, default=24, help="изображений в круге (разных image_id)")
+    ap.add_argument("--files", type=int, default=3, help="сколько самых малых файлов test_images брать")
+    ap.add_argument("--codec", choices=("rs", "cauchy"), default="cauchy",
+                    help="rs — с откладыванием и вытеснением сеансов")
+    ap.add_argument("--fec", type=float, default=0.25)
+    ap.add_argument("--channel", default="ge:loss=0.25,burst=8", help="модель канала (channel.py); пусто — без потерь")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--air-rate", type=int, default=LINK_AIR_RATE, help="бит/с в эфире")
+    ap.add_argument("--gap-ms", type=float, default=DEFAULT_GAP_MS, help="пауза между пакетами, мс")
+    ap.add_argument("--mem-budget", type=float, default=DEFAULT_BUDGET_MB, metavar="MB",
+                    help="бюджет памяти приёмника (маленький — проверить вытеснение на диск)")
+    ap.add_argument("--sample-min", type=float, default=10.0, help="минут эфира между замерами")
+    ap.add_argument("--warmup", type=float, default=1.0, help="часов прогрева, не входящих в оценку плато")
+    ap.add_argument("--max-growth-mb", type=float, default=16.0, help="допустимый рост памяти на плато")
+    ap.add_argument("--json", help="записать результаты в файл JSON")
+    args = ap.parse_args(argv)
+    args.ids = max(1, args.ids)
+    args.warmup = min(args.warmup, args.hours / 2)
+
+    report = Soak(args).run()
+    print_report(report)
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, ensure_ascii=False, indent=1))
+    return 0 if report["ok"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
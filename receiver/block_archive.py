@@ -0,0 +1,182 @@
+"""Архив принятых FEC-блоков на диске — для восстановления по нескольким сеансам и станциям.
+
+Каждый сеанс приёма пишет свой файл *.lla только дозаписью:
+
+  Заголовок (64 Б):  magic "LLBLKAR1", версия, время создания, имя станции
+  Записи   (264 Б):  время приёма (double, unix) + FEC-пакет 256 Б как в эфире
+
+Записи фиксированного размера, поэтому файл читается через mmap без разбора:
+смещение i-й записи — HEADER + i × RECORD. Оборванная последняя запись
+(падение, отключение питания) и записи с неверным CRC при чтении пропускаются.
+Индекс строится по ImageKey → {block_id: смещение}: кроме (callsign, image_id,
+file_size, K, N) в ключ входят геометрия групп RS, интерливер и код — блоки,
+закодированные с другой таблицей групп или другим кодом, не смешиваются, даже
+если передатчик начал счёт image_id заново. Чётность нарастающих кругов
+(cycle > 0) хранится под ключом block_id | cycle << 16.
+"""
+
+import mmap
+import os
+import socket
+import struct
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterator, NamedTuple, Optional
+
+from erasure_fec import CODE_CAUCHY16, CODE_RS, IL_MODULO, ErasureDecoder, FECPacket, PKT_SIZE
+
+MAGIC = b"LLBLKAR1"
+VERSION = 1
+ARCHIVE_EXT = ".lla"
+
+_HDR = struct.Struct("<8sHd32s14x")   # magic, version, created, station
+_TS = struct.Struct("<d")
+HEADER_SIZE = _HDR.size               # 64
+RECORD_SIZE = _TS.size + PKT_SIZE     # 264
+
+# Сколько записей копить в буфере файла до flush (живой приём)
+FLUSH_EVERY = 32
+
+
+class ImageKey(NamedTuple):
+    """Идентификатор изображения: совпадение всех полей — один и тот же файл с той же разбивкой на блоки."""
+    callsign: str
+    image_id: int
+    file_size: int
+    k_data: int
+    n_total: int
+    m_per_group: int
+    num_groups: int
+    interleaver: int
+    il_param: int
+    il_seed: int
+    code: int
+
+
+def record_packet(buf, offset: int) -> Optional[FECPacket]:
+    """Пакет из записи по смещению offset (mmap или bytes); None при неверном CRC."""
+    return FECPacket.from_bytes(buf[offset + _TS.size: offset + RECORD_SIZE])
+
+
+def key_of(pkt: FECPacket) -> ImageKey:
+    return ImageKey(pkt.callsign, pkt.image_id, pkt.file_size, pkt.k_data, pkt.n_total,
+                    pkt.m_per_group, pkt.num_groups, pkt.interleaver, pkt.il_param, pkt.il_seed,
+                    pkt.code)
+
+
+def decoder_key(d) -> ImageKey:
+    """Ключ изображения, которое собирает декодер (RS или Коши; у Коши — одна группа без интерливера)."""
+    if isinstance(d, ErasureDecoder):
+        il = d.interleaver
+        return ImageKey(d.callsign, d.image_id, d.file_size, d.k_data, d.n_total,
+                        d.m_per_group, d.num_groups, il.id, il.param, il.seed, CODE_RS)
+    return ImageKey(d.callsign, d.image_id, d.file_size, d.k_data, d.n_total,
+                    0, 1, IL_MODULO, 0, 0, CODE_CAUCHY16)
+
+
+@dataclass
+class ArchiveEntry:
+    """Блоки одного изображения в одном файле архива."""
+    key: ImageKey
+    file_type: int
+    first_seen: float
+    offsets: dict[int, int] = field(default_factory=dict)   # block_id (| cycle << 16) → смещение записи
+
+
+class BlockArchiveWriter:
+    """Дозапись принятых пакетов в файл сеанса (живой приёмник)."""
+
+    def __init__(self, directory, station: str = ""):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.station = station or socket.gethostname()
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        self.path = self.directory / f"blocks-{stamp}-{os.getpid()}{ARCHIVE_EXT}"
+        self._f = None   # файл создаётся при первом пакете — пустые сеансы не оставляют следов
+        self._pending = 0
+        self.records = 0
+
+    def append(self, pkt: FECPacket, ts: Optional[float] = None):
+        if self._f is None:
+            self._f = open(self.path, "ab")
+            self._f.write(_HDR.pack(MAGIC, VERSION, time.time(),
+                                    self.station.encode("utf-8")[:32]))
+        self._f.write(_TS.pack(ts if ts is not None else time.time()))
+        self._f.write(pkt.to_bytes())
+        self.records += 1
+        self._pending += 1
+        if self._pending >= FLUSH_EVERY:
+            self.flush()
+
+    def flush(self):
+        if self._pending:
+            self._f.flush()
+            self._pending = 0
+
+    def close(self):
+        if self._f is not None and not self._f.closed:
+            self.flush()
+            self._f.close()
+
+
+class BlockArchive:
+    """Файл архива только для чтения, отображённый в память, с индексом по изображениям."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.station = ""
+        self.created = 0.0
+        self.entries: dict[ImageKey, ArchiveEntry] = {}
+        self.bad_records = 0
+        self._f = open(self.path, "rb")
+        size = os.fstat(self._f.fileno()).st_size
+        self._mm = mmap.mmap(self._f.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        self._scan(size)
+
+    def close(self):
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _scan(self, size: int):
+        if size < HEADER_SIZE:
+            raise ValueError(f"{self.path}: слишком короткий файл")
+        magic, ver, created, station = _HDR.unpack_from(self._mm, 0)
+        if magic != MAGIC or ver != VERSION:
+            raise ValueError(f"{self.path}: не архив блоков LorettLink")
+        self.created = created
+        self.station = station.rstrip(b"\x00").decode("utf-8", "replace")
+        count = (size - HEADER_SIZE) // RECORD_SIZE
+        for i in range(count):
+            off = HEADER_SIZE + i * RECORD_SIZE
+            pkt = record_packet(self._mm, off)
+            if pkt is None:
+                self.bad_records += 1
+                continue
+            key = key_of(pkt)
+            entry = self.entries.get(key)
+            if entry is None:
+                entry = self.entries[key] = ArchiveEntry(
+                    key, pkt.file_type,
+                    _TS.unpack_from(self._mm, off)[0])
+            entry.offsets.setdefault(pkt.block_id | pkt.cycle << 16, off)
+
+    def packet_at(self, offset: int) -> Optional[FECPacket]:
+        return record_packet(self._mm, offset)
+
+
+def find_archives(paths) -> Iterator[Path]:
+    """Развернуть список файлов/каталогов в пути к файлам *.lla (рекурсивно)."""
+    for p in map(Path, paths):
+        if p.is_dir():
+            yield from sorted(p.rglob(f"*{ARCHIVE_EXT}"))
+        elif p.suffix == ARCHIVE_EXT:
+            yield p
@@ -0,0 +1,337 @@
+"""Код Коши по всему файлу в GF(2^16) — FEC без лимита 255 символов на группу.
+
+RS в GF(2^8) (erasure_fec.py) ограничен 255 символами на кодовое слово, поэтому файл
+больше ~200 блоков режется на группы по m_g блоков чётности: пачка из m_g + 1 потерь
+в одной группе губит файл, хотя общая избыточность M много больше. Здесь один
+MDS-код на весь файл (K + M ≤ 65535): любые K пакетов из N восстанавливают файл при
+любой раскладке потерь.
+
+Символ — 16-битное слово, блок 200 Б — 100 слов (big-endian). Блок данных i — точка
+поля y_i = i, блок чётности j — x_j = K + j (то есть block_id):
+
+    p_j = Σ_i d_i / (x_j ⊕ y_i)
+
+Любая квадратная подматрица матрицы Коши невырождена: e потерянных блоков данных —
+решение e×e системы по любым e принятым блокам чётности, а обратная матрица Коши
+выписывается явно за O(e²).
+
+Поле — башня GF((2^8)^2): слово hi·t + lo, t² = t + λ, λ = 0x22; t — порождающий
+элемент. Умножение строки на константу тогда сводится к bytes.translate байтовых
+плоскостей hi/lo по таблицам gf256.MUL:
+
+    (a1·t + a0)(c1·t + c0) = (a1·(c1 ⊕ c0) ⊕ a0·c1)·t + (a1·λc1 ⊕ a0·c0)
+
+С numpy (необязательная зависимость) произведение матриц векторизовано по таблицам
+логарифмов; без него — плоскости и группировка строк с равным коэффициентом.
+
+Пакет — обычный FEC-пакет 0x68 с расширенным заголовком версии 3, code = CODE_CAUCHY16,
+m_per_group = 0, num_groups = 1. Приёмник-прошивка пересылает его как есть, декодеры
+без поддержки версии 3 пакет отбрасывают, а не путают с RS.
+"""
+
+import functools
+import importlib.util
+import math
+from typing import Optional
+
+from erasure_fec import (
+    BLOCK_PAYLOAD, CODE_CAUCHY16, FECPacket, detect_file_type,
+)
+from gf256 import MUL, gf_mul as gf8_mul
+
+# numpy импортируется при первом умножении матриц (_numpy()), а не при импорте модуля:
+# его импорт — десятые доли секунды, а FECPacket и код Коши нужны и скриптам без кодирования
+HAS_NUMPY = importlib.util.find_spec("numpy") is not None
+
+LAMBDA = 0x22
+ORDER = 65535                 # порядок мультипликативной группы GF(2^16)
+MAX_N = 65535                 # block_id и n_total — 16 бит
+WORDS = BLOCK_PAYLOAD // 2    # слов GF(2^16) в блоке
+_LAM = [gf8_mul(LAMBDA, c) for c in range(256)]
+
+
+def gf_mul(a: int, b: int) -> int:
+    a1, a0, b1, b0 = a >> 8, a & 0xFF, b >> 8, b & 0xFF
+    hh = gf8_mul(a1, b1)
+    return (hh ^ gf8_mul(a1, b0) ^ gf8_mul(a0, b1)) << 8 | (_LAM[hh] ^ gf8_mul(a0, b0))
+
+
+@functools.lru_cache(maxsize=None)
+def _tables() -> tuple[list[int], list[int], list[int]]:
+    """EXP (2·ORDER), LOG, INV. Строятся при первом кодировании (~65 тыс. шагов × t)."""
+    exp = [0] * (2 * ORDER)
+    log = [0] * 65536
+    a = 1
+    for i in range(ORDER):
+        exp[i] = exp[i + ORDER] = a
+        log[a] = i
+        a1 = a >> 8
+        a = (a1 ^ (a & 0xFF)) << 8 | _LAM[a1]   # a · t
+    inv = [0] * 65536
+    for v in range(1, 65536):
+        inv[v] = exp[ORDER - log[v]]
+    return exp, log, inv
+
+
+def gf_inv(a: int) -> int:
+    return _tables()[2][a]
+
+
+# ═══════════════════════════════════════════════════════════════
+#  Умножение матриц: без numpy — байтовые плоскости
+# ═══════════════════════════════════════════════════════════════
+
+def _planes(block: bytes) -> tuple[int, int]:
+    """Блок → (старшие байты слов, младшие) как int по 100 Б."""
+    return int.from_bytes(block[0::2], "big"), int.from_bytes(block[1::2], "big")
+
+
+def _unplanes(hi: int, lo: int) -> bytes:
+    out = bytearray(BLOCK_PAYLOAD)
+    out[0::2] = hi.to_bytes(WORDS, "big")
+    out[1::2] = lo.to_bytes(WORDS, "big")
+    return bytes(out)
+
+
+def _fold(buckets: list[int]) -> int:
+    """Σ_u u · bucket[u]: блоки с равным коэффициентом уже сложены, одно умножение на u."""
+    acc = 0
+    for u in range(1, 256):
+        v = buckets[u]
+        if v:
+            acc ^= int.from_bytes(v.to_bytes(WORDS, "big").translate(MUL[u]), "big")
+    return acc
+
+
+def _mul_py(coef_rows, planes: list[tuple[int, int]]) -> list[bytes]:
+    out = []
+    for crow in coef_rows:
+        hb = [0] * 256
+        lb = [0] * 256
+        for c, (h, l) in zip(crow, planes):
+            c1 = c >> 8
+            c0 = c & 0xFF
+            hb[c1 ^ c0] ^= h
+            hb[c1] ^= l
+            lb[_LAM[c1]] ^= h
+            lb[c0] ^= l
+        out.append(_unplanes(_fold(hb), _fold(lb)))
+    return out
+
+
+# ═══════════════════════════════════════════════════════════════
+#  Умножение матриц: numpy — таблицы логарифмов
+# ═══════════════════════════════════════════════════════════════
+
+# Элементов в промежуточном массиве (строки × блоки × слова) на один шаг
+_NP_CHUNK = 1 << 22
+
+
+@functools.lru_cache(maxsize=None)
+def _numpy():
+    import numpy
+    return numpy
+
+
+@functools.lru_cache(maxsize=None)
+def _np_tables():
+    """EXP с хвостом нулей и LOG[0] = 2·ORDER: log c + LOG[0] попадает в нули, без масок."""
+    np = _numpy()
+    exp, log, inv = _tables()
+    exp_np = np.zeros(3 * ORDER, dtype=np.uint16)
+    exp_np[:2 * ORDER] = exp
+    log_np = np.array(log, dtype=np.int32)
+    log_np[0] = 2 * ORDER
+    return exp_np, log_np, np.array(inv, dtype=np.uint16)
+
+
+def _words(blocks: list[bytes]):
+    np = _numpy()
+    return np.frombuffer(b"".join(blocks), dtype=">u2").reshape(len(blocks), WORDS).astype(np.uint16)
+
+
+def _mul_np(coefs, words) -> list[bytes]:
+    """coefs — uint16 (строки × блоки), ненулевые; words — uint16 (блоки × 100)."""
+    np = _numpy()
+    exp_np, log_np, _ = _np_tables()
+    logc = log_np[coefs]
+    logd = log_np[words]
+    out = np.empty((len(coefs), WORDS), dtype=np.uint16)
+    step = max(1, _NP_CHUNK // max(1, logd.size))
+    for a in range(0, len(coefs), step):
+        prod = exp_np[logc[a:a + step, :, None] + logd[None]]
+        out[a:a + step] = np.bitwise_xor.reduce(prod, axis=1)
+    return [row.tobytes() for row in out.astype(">u2")]
+
+
+# ═══════════════════════════════════════════════════════════════
+#  Строки Коши и решение системы
+# ═══════════════════════════════════════════════════════════════
+
+def cauchy_rows(xs: list[int], ys: list[int], blocks: list[bytes]) -> list[bytes]:
+    """Для каждого x из xs: Σ_i blocks[i] / (x ⊕ ys[i])."""
+    if not blocks:
+        return [bytes(BLOCK_PAYLOAD)] * len(xs)
+    if HAS_NUMPY:
+        np = _numpy()
+        inv_np = _np_tables()[2]
+        coefs = inv_np[np.array(xs, dtype=np.int32)[:, None] ^ np.array(ys, dtype=np.int32)[None]]
+        return _mul_np(coefs, _words(blocks))
+    inv = _tables()[2]
+    planes = [_planes(b) for b in blocks]
+    return _mul_py(([inv[x ^ y] for y in ys] for x in xs), planes)
+
+
+def cauchy_solve(xs: list[int], ys: list[int], rhs: list[bytes]) -> list[bytes]:
+    """Решить Σ_c u_c / (xs[r] ⊕ ys[c]) = rhs[r] (квадратная система) явной обратной матрицей Коши:
+
+        B[c][r] = Π_k (x_r ⊕ y_k) · Π_k (x_k ⊕ y_c)
+                  / ((x_r ⊕ y_c) · Π_{k≠r} (x_r ⊕ x_k) · Π_{k≠c} (y_c ⊕ y_k))
+    """
+    e = len(xs)
+    if HAS_NUMPY:
+        np = _numpy()
+        exp_np, log_np, _ = _np_tables()
+        x = np.array(xs, dtype=np.int32)
+        y = np.array(ys, dtype=np.int32)
+        lxy = log_np[x[:, None] ^ y[None]].astype(np.int64)
+        lxx = log_np[x[:, None] ^ x[None]].astype(np.int64)
+        lyy = log_np[y[:, None] ^ y[None]].astype(np.int64)
+        np.fill_diagonal(lxx, 0)
+        np.fill_diagonal(lyy, 0)
+        sr = lxy.sum(axis=1) - lxx.sum(axis=1)         # по строкам r
+        sc = lxy.sum(axis=0) - lyy.sum(axis=1)         # по столбцам c
+        logb = (sc[:, None] + sr[None] - lxy.T) % ORDER
+        return _mul_np(exp_np[logb], _words(rhs))
+    exp, log, _ = _tables()
+    lxy = [[log[xr ^ yc] for yc in ys] for xr in xs]
+    sr = [sum(lxy[r]) - sum(log[xs[r] ^ xk] for k, xk in enumerate(xs) if k != r) for r in range(e)]
+    sc = [sum(lxy[r][c] for r in range(e)) - sum(log[ys[c] ^ yk] for k, yk in enumerate(ys) if k != c)
+          for c in range(e)]
+    coefs = ([exp[(sc[c] + sr[r] - lxy[r][c]) % ORDER] for r in range(e)] for c in range(e))
+    return _mul_py(coefs, [_planes(b) for b in rhs])
+
+
+# ═══════════════════════════════════════════════════════════════
+#  Кодер
+# ═══════════════════════════════════════════════════════════════
+
+class CauchyEncoder:
+    """K блоков данных + M = ⌈K · fec_ratio⌉ блоков чётности одного кода на весь файл."""
+
+    def __init__(self, callsign: str = "LORETT", image_id: int = 0, fec_ratio: float = 0.25):
+        self.callsign = callsign
+        self.image_id = image_id & 0xFF
+        self.fec_ratio = max(0.01, min(fec_ratio, 2.0))
+
+    def encode_file(self, path: str) -> list[FECPacket]:
+        with open(path, "rb") as f:
+            return self.encode_bytes(f.read())
+
+    def encode_bytes(self, data: bytes) -> list[FECPacket]:
+        file_size = len(data)
+        k = max(1, math.ceil(file_size / BLOCK_PAYLOAD))
+        m = max(1, math.ceil(k * self.fec_ratio))
+        if k + m > MAX_N:
+            raise ValueError(f"файл {file_size} Б: K + M = {k + m} > {MAX_N}")
+        padded = data + b"\x00" * (k * BLOCK_PAYLOAD - file_size)
+        blocks = [padded[i * BLOCK_PAYLOAD:(i + 1) * BLOCK_PAYLOAD] for i in range(k)]
+        parity = cauchy_rows(list(range(k, k + m)), list(range(k)), blocks)
+
+        common = dict(callsign=self.callsign, image_id=self.image_id, k_data=k, n_total=k + m,
+                      file_size=file_size, file_type=detect_file_type(data),
+                      m_per_group=0, num_groups=1, code=CODE_CAUCHY16)
+        return [FECPacket(block_id=i, payload=blk, **common)
+                for i, blk in enumerate(blocks + parity)]
+
+
+# ═══════════════════════════════════════════════════════════════
+#  Декодер
+# ═══════════════════════════════════════════════════════════════
+
+class CauchyDecoder:
+    """Накопление блоков одного изображения; любые K из N → файл.
+
+    Атрибуты и методы — те же, что у ErasureDecoder (blocks — данные и чётность
+    по block_id), так что приёмник работает с обоими одинаково.
+    """
+
+    def __init__(self):
+        self.image_id: Optional[int] = None
+        self.callsign: str = ""
+        self.k_data: int = 0
+        self.n_total: int = 0
+        self.file_size: int = 0
+        self.file_type: int = 0
+        self.blocks: dict[int, bytes] = {}
+        self._decoded: Optional[bytes] = None
+
+    def reset(self):
+        self.image_id = None
+        self.callsign = ""
+        self.k_data = 0
+        self.n_total = 0
+        self.file_size = 0
+        self.file_type = 0
+        self.blocks.clear()
+        self._decoded = None
+
+    def add_packet(self, pkt: FECPacket) -> bool:
+        """Добавить блок; при смене image_id — сброс состояния. Возвращает True."""
+        if self.image_id is not None and pkt.image_id != self.image_id:
+            self.reset()
+        if self.image_id is None:
+            self.image_id = pkt.image_id
+            self.callsign = pkt.callsign
+            self.k_data = pkt.k_data
+            self.n_total = pkt.n_total
+            self.file_size = pkt.file_size
+            self.file_type = pkt.file_type
+        self.blocks[pkt.block_id] = (pkt.payload + b"\x00" * BLOCK_PAYLOAD)[:BLOCK_PAYLOAD]
+        return True
+
+    @property
+    def received_count(self) -> int:
+        return len(self.blocks)
+
+    @property
+    def can_decode(self) -> bool:
+        return self.k_data > 0 and self.received_count >= self.k_data
+
+    @property
+    def is_complete(self) -> bool:
+        return self._decoded is not None
+
+    @property
+    def progress(self) -> float:
+        if self.k_data == 0:
+            return 0.0
+        return min(self.received_count / self.k_data, 1.0)
+
+    def decode(self) -> Optional[bytes]:
+        """Восстановить файл: синдромы e блоков чётности за вычетом принятых данных, затем обратная матрица Коши."""
+        if not self.can_decode:
+            return None
+        if self._decoded is not None:
+            return self._decoded
+        k = self.k_data
+        missing = [i for i in range(k) if i not in self.blocks]
+        data = dict((i, b) for i, b in self.blocks.items() if i < k)
+        if missing:
+            xs = sorted(b for b in self.blocks if b >= k)[:len(missing)]
+            known = sorted(data)
+            acc = cauchy_rows(xs, known, [data[i] for i in known])
+            rhs = [(int.from_bytes(self.blocks[x], "big") ^ int.from_bytes(a, "big")).to_bytes(BLOCK_PAYLOAD, "big")
+                   for x, a in zip(xs, acc)]
+            data.update(zip(missing, cauchy_solve(xs, missing, rhs)))
+        self._decoded = b"".join(data[i] for i in range(k))[:self.file_size]
+        return self._decoded
+
+    def assemble_partial(self) -> bytes:
+        """Собрать файл из уже полученных блоков данных (недостающие — нули); после decode() — его результат."""
+        if self._decoded is not None:
+            return self._decoded
+        if self.k_data == 0:
+            return b""
+        pad = b"\x00" * BLOCK_PAYLOAD
+        return b"".join(self.blocks.get(i, pad) for i in range(self.k_data))[:self.file_size]
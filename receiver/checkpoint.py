@@ -0,0 +1,176 @@
+"""Контрольные точки декодера: накопленные блоки переживают падение программы и сон ноутбука.
+
+Открытая сессия декодера отражается в файл *.ckpt через mmap:
+
+  Заголовок (64 Б):   magic, параметры изображения (как в FEC-заголовке), время, интерливер
+  Битовая карта:      ceil(N / 8) байт — какие блоки уже есть
+  Слоты (N × 204 Б):  CRC-32 блока + 200 байт payload
+  Чётность проходов ≥ 1 (по 208 Б, дозаписью в конец): cycle, block_id, CRC-32, payload
+
+Блок пишется в свой слот сразу при приёме (копия 200 байт в страничный кэш), бит
+ставится после данных. При падении процесса данные уже в кэше ОС; flush() раз в
+секунду сбрасывает их на диск на случай отключения питания. При восстановлении
+слоты с неверным CRC пропускаются — повреждённый блок хуже, чем потерянный.
+Чётность нарастающих проходов (extra декодера) не помещается в N слотов и
+дописывается записями после них; оборванная последняя запись отбрасывается.
+"""
+
+import mmap
+import os
+import struct
+import time
+import zlib
+from pathlib import Path
+from typing import Optional
+
+from block_archive import decoder_key
+from erasure_fec import (ErasureDecoder, BLOCK_PAYLOAD, INTERLEAVERS, encode_callsign,
+                         decode_callsign, make_interleaver)
+
+MAGIC = b"LLCKPT01"
+CKPT_EXT = ".ckpt"
+
+# magic, callsign, image_id, k, n, file_size, file_type, m_per_group, num_groups, updated,
+# interleaver, il_param, il_seed (нули в старых файлах — i % num_groups)
+_HDR = struct.Struct("<8sIBHHIBBBdBHH")
+_UPDATED_OFF = struct.calcsize("<8sIBHHIBBB")
+HEADER_SIZE = 64
+_CRC = struct.Struct("<I")
+SLOT_SIZE = _CRC.size + BLOCK_PAYLOAD
+_IR = struct.Struct("<HHI")   # cycle, block_id, CRC-32 от (cycle, block_id, payload)
+IR_RECORD_SIZE = _IR.size + BLOCK_PAYLOAD
+
+
+def _bitmap_size(n: int) -> int:
+    return (n + 7) // 8
+
+
+def session_name(d: ErasureDecoder) -> str:
+    """Имя файла сеанса; хвост — crc ключа изображения (ImageKey), чтобы отложенные
+    сеансы одного image_id с другой разбивкой на группы не делили файл."""
+    tag = zlib.crc32(repr(tuple(decoder_key(d))).encode()) & 0xFFFF
+    return (f"{d.callsign or 'NOCALL'}_{d.image_id:03d}_{d.file_size}_"
+            f"{d.k_data}_{d.n_total}_{tag:04x}{CKPT_EXT}")
+
+
+class DecoderCheckpoint:
+    """Файл контрольной точки одной сессии декодера, отображённый в память."""
+
+    def __init__(self, path: Path, mm: mmap.mmap, f, n_total: int):
+        self.path = path
+        self._mm = mm
+        self._f = f
+        self._n = n_total
+        self._slots = HEADER_SIZE + _bitmap_size(n_total)
+        self._extra: set[tuple[int, int]] = set()   # уже дописанная чётность проходов ≥ 1
+        self._dirty = False
+
+    @classmethod
+    def create(cls, directory, d: ErasureDecoder) -> "DecoderCheckpoint":
+        """Новый файл под сессию d (параметры берутся из уже принятого первого пакета)."""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / session_name(d)
+        size = HEADER_SIZE + _bitmap_size(d.n_total) + d.n_total * SLOT_SIZE
+        f = open(path, "w+b")
+        f.truncate(size)
+        mm = mmap.mmap(f.fileno(), size)
+        _HDR.pack_into(mm, 0, MAGIC, encode_callsign(d.callsign), d.image_id & 0xFF,
+                       d.k_data, d.n_total, d.file_size, d.file_type,
+                       d.m_per_group, d.num_groups, time.time(),
+                       d.interleaver.id, d.interleaver.param, d.interleaver.seed)
+        ckpt = cls(path, mm, f, d.n_total)
+        for bid, payload in d.blocks.items():
+            ckpt.store(bid, payload)
+        for (cycle, bid), payload in d.extra.items():
+            ckpt.store_extra(cycle, bid, payload)
+        return ckpt
+
+    def store(self, block_id: int, payload: bytes):
+        if not 0 <= block_id < self._n:
+            return
+        off = self._slots + block_id * SLOT_SIZE
+        self._mm[off + _CRC.size: off + SLOT_SIZE] = payload
+        _CRC.pack_into(self._mm, off, zlib.crc32(payload) & 0xFFFFFFFF)
+        self._mm[HEADER_SIZE + block_id // 8] |= 1 << (block_id % 8)
+        self._dirty = True
+
+    def store_extra(self, cycle: int, block_id: int, payload: bytes):
+        """Чётность прохода cycle ≥ 1 — записью в конец файла (за отображённой частью)."""
+        if self._mm is None or (cycle, block_id) in self._extra:
+            return
+        self._extra.add((cycle, block_id))
+        crc = zlib.crc32(struct.pack("<HH", cycle, block_id) + payload) & 0xFFFFFFFF
+        self._f.seek(0, os.SEEK_END)
+        self._f.write(_IR.pack(cycle, block_id, crc) + payload)
+        self._dirty = True
+
+    def flush(self):
+        """Сбросить изменённые страницы на диск (msync); без изменений — ничего не делает."""
+        if self._dirty and self._mm is not None:
+            self._f.flush()
+            struct.pack_into("<d", self._mm, _UPDATED_OFF, time.time())
+            self._mm.flush()
+            self._dirty = False
+
+    def close(self):
+        if self._mm is not None:
+            self.flush()
+            self._mm.close()
+            self._mm = None
+            self._f.close()
+
+    def discard(self):
+        """Сессия завершена (восстановлена или вытеснена) — файл больше не нужен."""
+        self.close()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+def load(path) -> Optional[tuple[ErasureDecoder, float]]:
+    """Прочитать файл контрольной точки в новый ErasureDecoder; None, если файл не годится."""
+    try:
+        raw = Path(path).read_bytes()
+    except OSError:
+        return None
+    if len(raw) < HEADER_SIZE:
+        return None
+    magic, cs, iid, k, n, fsz, ft, mg, ng, updated, il, il_param, il_seed = _HDR.unpack_from(raw, 0)
+    slots = HEADER_SIZE + _bitmap_size(n)
+    if magic != MAGIC or k == 0 or len(raw) < slots + n * SLOT_SIZE or il not in INTERLEAVERS:
+        return None
+    d = ErasureDecoder()
+    d.image_id, d.callsign = iid, decode_callsign(cs)
+    d.k_data, d.n_total, d.file_size, d.file_type = k, n, fsz, ft
+    d.m_per_group, d.num_groups = mg, ng
+    d.interleaver = make_interleaver(il, il_param, il_seed)
+    for bid in range(n):
+        if not raw[HEADER_SIZE + bid // 8] & (1 << (bid % 8)):
+            continue
+        off = slots + bid * SLOT_SIZE
+        payload = raw[off + _CRC.size: off + SLOT_SIZE]
+        if zlib.crc32(payload) & 0xFFFFFFFF == _CRC.unpack_from(raw, off)[0]:
+            d.blocks[bid] = payload
+    for off in range(slots + n * SLOT_SIZE, len(raw) - IR_RECORD_SIZE + 1, IR_RECORD_SIZE):
+        cycle, bid, crc = _IR.unpack_from(raw, off)
+        payload = raw[off + _IR.size: off + IR_RECORD_SIZE]
+        if cycle and zlib.crc32(raw[off:off + 4] + payload) & 0xFFFFFFFF == crc:
+            d.extra[(cycle, bid)] = payload
+    return d, updated
+
+
+def restore_all(directory) -> list[tuple[Path, ErasureDecoder, float]]:
+    """Все сессии из каталога, от старых к новым: (путь, декодер, время последнего flush)."""
+    out = []
+    directory = Path(directory)
+    if not directory.is_dir():
+        return out
+    for path in directory.glob(f"*{CKPT_EXT}"):
+        res = load(path)
+        if res is None:
+            continue
+        out.append((path, res[0], res[1]))
+    out.sort(key=lambda t: t[2])
+    return out
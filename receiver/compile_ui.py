@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""mainwindow.ui → ui_mainwindow.py (pyuic5) для быстрого старта приёмника.
+
+Приёмник строит окно готовым классом Ui_MainWindow, не разбирая XML и не
+импортируя PyQt5.uic. В конец файла дописывается UI_SHA256 — хеш .ui, по которому
+приёмник видит, что форма правилась после генерации, и тогда загружает .ui как раньше.
+После правки mainwindow.ui в Qt Designer:
+
+    cd receiver && python compile_ui.py
+"""
+
+import hashlib
+import io
+import os
+import sys
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+UI_PATH = HERE / "mainwindow.ui"
+GENERATED = HERE / "ui_mainwindow.py"
+
+
+def ui_hash(path: Path = UI_PATH) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def main():
+    from PyQt5 import uic
+    buf = io.StringIO()
+    os.chdir(HERE)                       # в шапку ui_mainwindow.py попадает относительный путь
+    uic.compileUi(UI_PATH.name, buf)
+    GENERATED.write_text(buf.getvalue() + f'\n\nUI_SHA256 = "{ui_hash()}"\n', encoding="utf-8")
+    print(f"{GENERATED.name} ← {UI_PATH.name}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,18 +3,24 @@
 Файл разбивается на K блоков данных; кодер RS строит M блоков чётности по группам
 (лимит GF(2^8) — 255 символов). Блоки данных распределены по группам (интерливинг).
 Потеря до M_per_group блоков в группе восстанавливается декодером.
+Проходы cycle ≥ 1 несут новые строки проверочной матрицы (нарастающая чётность, ir_row).
 
 Формат пакета: 256 байт (sync 0x55, type 0x68, callsign, image_id, block_id,
-k_data, n_total, file_size, file_type, m_per_group, num_groups, payload 200 Б, crc32, reserved).
+k_data, n_total, file_size, file_type, m_per_group, num_groups, payload 200 Б, crc32,
+32 Б расширенного заголовка: интерливер групп RS, проход cycle и код (RS или Коши
+по всему файлу, cauchy_fec.py); нули — i % num_groups, проход 0 и RS, как в прошивке).
 """
 
+import functools
 import struct
 import zlib
 import math
 from dataclasses import dataclass
 from typing import Optional
 
-from reedsolo import RSCodec, ReedSolomonError
+from reedsolo import RSCodec
+
+from gf256 import MUL, GaussJordan, gf_pow2
 
 PKT_SIZE = 256
 BLOCK_PAYLOAD = 200
@@ -30,6 +36,25 @@ FTYPE_RAW = 0x00
 FTYPE_JPEG = 0x01
 FTYPE_WEBP = 0x02
 
+# Расширенный заголовок в резервных байтах 224..255. Все нули — значения по умолчанию
+# (так шлёт прошивка); иначе байт 224 — версия, 254..255 — CRC-16 байт 224..253
+# (младшие 16 бит CRC-32), поскольку CRC-32 пакета резерв не покрывает.
+EXT_OFFSET = HEADER_SIZE + BLOCK_PAYLOAD + CRC_SIZE   # 224
+EXT_VERSION = 1
+EXT_VERSION_IR = 2   # с проходом cycle > 0: старые декодеры отбрасывают такие пакеты, а не путают с RS
+EXT_VERSION_CODE = 3 # с кодом code ≠ 0 (не RS по группам) — так же
+_EXT = struct.Struct(">BBHHHB")    # версия, интерливер, параметр, seed, проход, код
+
+# Код блоков чётности (байт 232, версия 3)
+CODE_RS = 0          # RS по группам GF(2^8), как в прошивке
+CODE_CAUCHY16 = 1    # код Коши по всему файлу в GF(2^16), cauchy_fec.py
+_EXT_CRC = struct.Struct(">H")
+
+# Интерливеры групп RS (байт 225)
+IL_MODULO = 0
+IL_BLOCK = 1
+IL_RANDOM = 2
+
 _BASE40 = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ-_. "
 
 
@@ -57,11 +82,22 @@ def detect_file_type(data: bytes) -> int:
     return FTYPE_RAW
 
 
-def _rs_group_params(k: int, fec_ratio: float) -> tuple[int, int, int]:
+def _rs_group_params(k: int, fec_ratio: float, num_groups: int = 0) -> tuple[int, int, int]:
     """Compute (g_size, m_g, num_groups) that fit GF(2^8).
 
+    num_groups > 0 asks for at least that many groups; more are added until the
+    codeword fits RS_MAX.
     Returns the data blocks per group, parity per group, and group count.
     """
+    if num_groups > 0:
+        ng = min(num_groups, k)
+        while True:
+            m_g = max(1, min(math.ceil(k * fec_ratio / ng), 127))
+            if math.ceil(k / ng) + m_g <= RS_MAX:
+                break
+            ng += 1
+        return (k, m_g, 1) if ng == 1 else (RS_MAX - m_g, m_g, ng)
+
     m_desired = max(1, math.ceil(k * fec_ratio))
 
     if k + m_desired <= RS_MAX:
@@ -70,9 +106,93 @@ def _rs_group_params(k: int, fec_ratio: float) -> tuple[int, int, int]:
     m_g = max(1, min(round(fec_ratio * RS_MAX / (1 + fec_ratio)), 127))
     g_size = RS_MAX - m_g
     num_groups = math.ceil(k / g_size)
+    if num_groups == 1:
+        return k, m_g, 1  # одна группа всегда укорочена до K — так её восстанавливает декодер
     return g_size, m_g, num_groups
 
 
+# ═══════════════════════════════════════════════════════════════
+#  Interleavers
+# ═══════════════════════════════════════════════════════════════
+
+class Interleaver:
+    """Перестановка блоков данных π: группа g — блоки π[g], π[g+ng], π[g+2ng], …
+    в порядке позиций кодового слова RS. Размеры групп те же, что у i % num_groups.
+
+    Базовый класс — тождественная перестановка, т. е. прежнее i % num_groups (прошивка).
+    """
+
+    id = IL_MODULO
+    name = "modulo"
+
+    def __init__(self, param: int = 0, seed: int = 0):
+        self.param = param & 0xFFFF
+        self.seed = seed & 0xFFFF
+
+    def permutation(self, k: int) -> list[int]:
+        return list(range(k))
+
+    def groups(self, k: int, num_groups: int) -> tuple[tuple[int, ...], ...]:
+        """block_id данных по группам; таблица общая для кодера и декодера (кэш)."""
+        return _group_table(self.id, self.param, self.seed, k, max(1, num_groups))
+
+    def describe(self) -> str:
+        return self.name
+
+
+class BlockInterleaver(Interleaver):
+    """Блочный интерливер глубины depth (param): запись по строкам длины depth, чтение по столбцам."""
+
+    id = IL_BLOCK
+    name = "block"
+
+    def permutation(self, k):
+        d = max(1, self.param)
+        rows = -(-k // d)
+        return [r * d + c for c in range(d) for r in range(rows) if r * d + c < k]
+
+    def describe(self):
+        return f"{self.name}:{self.param}"
+
+
+class RandomInterleaver(Interleaver):
+    """Перестановка Фишера–Йетса на LCG x = 1103515245·x + 12345 (mod 2^32) от seed —
+    переносимо на прошивку, не зависит от версии Python."""
+
+    id = IL_RANDOM
+    name = "random"
+
+    def permutation(self, k):
+        perm = list(range(k))
+        x = self.seed
+        for i in range(k - 1, 0, -1):
+            x = (1103515245 * x + 12345) & 0xFFFFFFFF
+            j = (x >> 16) % (i + 1)
+            perm[i], perm[j] = perm[j], perm[i]
+        return perm
+
+    def describe(self):
+        return f"{self.name}:{self.seed}"
+
+
+INTERLEAVERS: dict[int, type[Interleaver]] = {
+    c.id: c for c in (Interleaver, BlockInterleaver, RandomInterleaver)
+}
+
+
+def make_interleaver(il_id: int = IL_MODULO, param: int = 0, seed: int = 0) -> Interleaver:
+    cls = INTERLEAVERS.get(il_id)
+    if cls is None:
+        raise ValueError(f"неизвестный интерливер {il_id}")
+    return cls(param, seed)
+
+
+@functools.lru_cache(maxsize=64)
+def _group_table(il_id: int, param: int, seed: int, k: int, ng: int) -> tuple[tuple[int, ...], ...]:
+    perm = make_interleaver(il_id, param, seed).permutation(k)
+    return tuple(tuple(perm[g::ng]) for g in range(ng))
+
+
 # ═══════════════════════════════════════════════════════════════
 #  FEC Packet
 # ═══════════════════════════════════════════════════════════════
@@ -89,6 +209,11 @@ class FECPacket:
     m_per_group: int = 0
     num_groups: int = 1
     payload: bytes = b""
+    interleaver: int = IL_MODULO   # расширенный заголовок (байты 224..255)
+    il_param: int = 0
+    il_seed: int = 0
+    cycle: int = 0                 # проход нарастающей чётности (0 — RS)
+    code: int = CODE_RS            # CODE_CAUCHY16 — один код на весь файл (cauchy_fec.py)
 
     @property
     def is_parity(self) -> bool:
@@ -114,8 +239,22 @@ class FECPacket:
         )
         body = hdr[1:] + pl  # skip sync for CRC scope
         crc = zlib.crc32(body) & 0xFFFFFFFF
-        pad = b"\x00" * RESERVED_SIZE
-        return hdr + pl + struct.pack(">I", crc) + pad
+        return hdr + pl + struct.pack(">I", crc) + self._ext_bytes()
+
+    def _ext_bytes(self) -> bytes:
+        """Резервные 32 байта: нули для параметров по умолчанию, иначе расширенный заголовок."""
+        if self.interleaver == IL_MODULO and not self.il_param and not self.il_seed \
+                and not self.cycle and not self.code:
+            return b"\x00" * RESERVED_SIZE
+        ver = EXT_VERSION_CODE if self.code else EXT_VERSION_IR if self.cycle else EXT_VERSION
+        ext = _EXT.pack(ver, self.interleaver & 0xFF, self.il_param & 0xFFFF,
+                        self.il_seed & 0xFFFF, self.cycle & 0xFFFF, self.code & 0xFF)
+        ext += b"\x00" * (RESERVED_SIZE - _EXT_CRC.size - len(ext))
+        return ext + _EXT_CRC.pack(zlib.crc32(ext) & 0xFFFF)
+
+    @property
+    def interleaver_obj(self) -> Interleaver:
+        return make_interleaver(self.interleaver, self.il_param, self.il_seed)
 
     @classmethod
     def from_bytes(cls, raw: bytes) -> Optional["FECPacket"]:
@@ -125,6 +264,20 @@ class FECPacket:
         expected = struct.unpack_from(">I", raw, HEADER_SIZE + BLOCK_PAYLOAD)[0]
         if (zlib.crc32(body) & 0xFFFFFFFF) != expected:
             return None
+        il_id, il_param, il_seed, cycle, code = IL_MODULO, 0, 0, 0, CODE_RS
+        ext = raw[EXT_OFFSET:PKT_SIZE]
+        if ext[0]:
+            # Повреждённый расширенный заголовок опаснее потерянного блока: группы RS разойдутся
+            if ext[0] not in (EXT_VERSION, EXT_VERSION_IR, EXT_VERSION_CODE) or \
+                    _EXT_CRC.unpack_from(ext, RESERVED_SIZE - _EXT_CRC.size)[0] != zlib.crc32(ext[:-_EXT_CRC.size]) & 0xFFFF:
+                return None
+            _, il_id, il_param, il_seed, cycle, code = _EXT.unpack_from(ext)
+            if ext[0] == EXT_VERSION:
+                cycle = 0
+            if ext[0] != EXT_VERSION_CODE:
+                code = CODE_RS
+            if il_id not in INTERLEAVERS or code not in (CODE_RS, CODE_CAUCHY16):
+                return None
         vals = struct.unpack_from(cls._HDR, raw)
         (_, _, cs, iid, bid, k, n, fsz, ft, mg, ng) = vals
         pl = raw[HEADER_SIZE : HEADER_SIZE + BLOCK_PAYLOAD]
@@ -134,19 +287,52 @@ class FECPacket:
             file_size=fsz, file_type=ft,
             m_per_group=mg, num_groups=ng,
             payload=bytes(pl),
+            interleaver=il_id, il_param=il_param, il_seed=il_seed, cycle=cycle, code=code,
         )
 
 
+# ═══════════════════════════════════════════════════════════════
+#  Нарастающая чётность: строки проверочной матрицы за первыми M
+# ═══════════════════════════════════════════════════════════════
+
+def ir_row(cycle: int, index: int, m_g: int) -> int:
+    """Строка r проверочной матрицы для блока чётности index (0..m_g-1) прохода cycle ≥ 1.
+
+    Строки 0..m_g-1 — сама RS (синдромы кодового слова нулевые); проходы ≥ 1 берут
+    строки m_g..254 по кругу, после (255 − m_g) / m_g проходов они повторяются.
+    """
+    return m_g + ((cycle - 1) * m_g + index) % (RS_MAX - m_g)
+
+
+def ir_coef(r: int, pos: int, n: int) -> int:
+    """Коэффициент позиции pos кодового слова длины n в строке r: α^(r·(n−1−pos)), как у reedsolo."""
+    return gf_pow2(r * (n - 1 - pos))
+
+
+def ir_parity(codeword: list[bytes], r: int) -> bytes:
+    """Блок строки r: Σ α^(r·(n−1−pos)) · codeword[pos] по столбцам (кодовое слово прохода 0)."""
+    n = len(codeword)
+    acc = 0
+    for pos, blk in enumerate(codeword):
+        if any(blk):
+            acc ^= int.from_bytes(blk.translate(MUL[ir_coef(r, pos, n)]), "big")
+    return acc.to_bytes(BLOCK_PAYLOAD, "big")
+
+
 # ═══════════════════════════════════════════════════════════════
 #  Encoder
 # ═══════════════════════════════════════════════════════════════
 
 class ErasureEncoder:
     def __init__(self, callsign: str = "LORETT", image_id: int = 0,
-                 fec_ratio: float = 0.25):
+                 fec_ratio: float = 0.25, interleaver: Optional[Interleaver] = None,
+                 num_groups: int = 0, cycle: int = 0):
         self.callsign = callsign
         self.image_id = image_id & 0xFF
         self.fec_ratio = max(0.01, min(fec_ratio, 2.0))
+        self.interleaver = interleaver or Interleaver()
+        self.cycle = max(0, cycle)             # проход: > 0 — чётность из строк ir_row
+        self.num_groups = max(0, num_groups)   # 0 = as few groups as fit
 
     def encode_file(self, path: str) -> list[FECPacket]:
         with open(path, "rb") as f:
@@ -157,7 +343,7 @@ class ErasureEncoder:
         ftype = detect_file_type(data)
         k = max(1, math.ceil(file_size / BLOCK_PAYLOAD))
 
-        g_size, m_g, num_groups = _rs_group_params(k, self.fec_ratio)
+        g_size, m_g, num_groups = _rs_group_params(k, self.fec_ratio, self.num_groups)
         m_total = num_groups * m_g
         n = k + m_total
 
@@ -171,8 +357,9 @@ class ErasureEncoder:
         # Parity computation — per RS-group, interleaved assignment
         # Block i belongs to group (i % num_groups)
         parity_matrix: list[list[int]] = []  # flat list of parity rows
+        groups = self.interleaver.groups(k, num_groups)
         for g in range(num_groups):
-            group_indices = [i for i in range(k) if i % num_groups == g]
+            group_indices = groups[g]
             gk = len(group_indices)
             pad_count = g_size - gk  # zero-padding rows to fill RS block
 
@@ -187,12 +374,19 @@ class ErasureEncoder:
                 for p in range(m_g):
                     group_parity[p][col] = par[p]
 
+            if self.cycle:
+                zero = bytes(BLOCK_PAYLOAD)
+                codeword = ([bytes(data_matrix[idx]) for idx in group_indices] + [zero] * pad_count
+                            + [bytes(row) for row in group_parity])
+                group_parity = [ir_parity(codeword, ir_row(self.cycle, p, m_g)) for p in range(m_g)]
             parity_matrix.extend(group_parity)
 
         # Assemble packets
         common = dict(callsign=self.callsign, image_id=self.image_id,
                       k_data=k, n_total=n, file_size=file_size, file_type=ftype,
-                      m_per_group=m_g, num_groups=num_groups)
+                      m_per_group=m_g, num_groups=num_groups,
+                      interleaver=self.interleaver.id, il_param=self.interleaver.param,
+                      il_seed=self.interleaver.seed)
 
         packets: list[FECPacket] = []
         for i in range(k):
@@ -205,6 +399,7 @@ class ErasureEncoder:
             packets.append(FECPacket(
                 block_id=k + p_idx,
                 payload=bytes(prow),
+                cycle=self.cycle,
                 **common,
             ))
         return packets
@@ -224,8 +419,11 @@ class ErasureDecoder:
         self.file_type: int = 0
         self.m_per_group: int = 0
         self.num_groups: int = 1
+        self.interleaver: Interleaver = Interleaver()
         self.blocks: dict[int, bytes] = {}
+        self.extra: dict[tuple[int, int], bytes] = {}   # (cycle, block_id) → чётность проходов ≥ 1
         self._decoded: Optional[bytes] = None
+        self._stall: Optional[tuple[int, int]] = None   # (группа, её запас) при неудачном decode()
 
     def reset(self):
         self.image_id = None
@@ -236,8 +434,11 @@ class ErasureDecoder:
         self.file_type = 0
         self.m_per_group = 0
         self.num_groups = 1
+        self.interleaver = Interleaver()
         self.blocks.clear()
+        self.extra.clear()
         self._decoded = None
+        self._stall = None
 
     def add_packet(self, pkt: FECPacket) -> bool:
         if self.image_id is not None and pkt.image_id != self.image_id:
@@ -251,16 +452,46 @@ class ErasureDecoder:
             self.file_type = pkt.file_type
             self.m_per_group = pkt.m_per_group
             self.num_groups = pkt.num_groups
-        self.blocks[pkt.block_id] = (pkt.payload + b"\x00" * BLOCK_PAYLOAD)[:BLOCK_PAYLOAD]
+            self.interleaver = pkt.interleaver_obj
+        payload = (pkt.payload + b"\x00" * BLOCK_PAYLOAD)[:BLOCK_PAYLOAD]
+        if pkt.cycle and pkt.is_parity:
+            self.extra[(pkt.cycle, pkt.block_id)] = payload
+        else:
+            self.blocks[pkt.block_id] = payload
         return True
 
     @property
     def received_count(self) -> int:
-        return len(self.blocks)
+        return len(self.blocks) + len(self.extra)
 
     @property
     def can_decode(self) -> bool:
-        return self.k_data > 0 and len(self.blocks) >= self.k_data
+        # decode() стоит секунды: пробовать, только когда каждой группе хватает уравнений,
+        # а после неудачи — когда прибавилось уравнений в группе, на которой он споткнулся
+        if self.k_data == 0 or self.received_count < self.k_data:
+            return False
+        slack = self.group_slack()
+        if self._stall is not None and slack[self._stall[0]] <= self._stall[1]:
+            return False
+        return min(slack) >= 0
+
+    def group_slack(self) -> list[int]:
+        """Запас по группам RS: уравнения (m_g синдромов и различные строки чётности
+        проходов ≥ 1) минус стёртые позиции кодового слова. Группа решаема, только если ≥ 0."""
+        k, m_g, ng = self.k_data, self.m_per_group, self.num_groups
+        ir_rows: list[set[int]] = [set() for _ in range(ng)]
+        if m_g:
+            for cycle, bid in self.extra:
+                g, i = divmod(bid - k, m_g)
+                if 0 <= g < ng:
+                    ir_rows[g].add(ir_row(cycle, i, m_g))
+        slack = []
+        for g, ids in enumerate(self.interleaver.groups(k, ng)):
+            p0 = k + g * m_g
+            lost = sum(d not in self.blocks for d in ids)
+            lost += sum(p not in self.blocks for p in range(p0, p0 + m_g))
+            slack.append(m_g + len(ir_rows[g]) - lost)
+        return slack
 
     @property
     def is_complete(self) -> bool:
@@ -270,7 +501,7 @@ class ErasureDecoder:
     def progress(self) -> float:
         if self.k_data == 0:
             return 0.0
-        return min(len(self.blocks) / self.k_data, 1.0)
+        return min(self.received_count / self.k_data, 1.0)
 
     def decode(self) -> Optional[bytes]:
         if not self.can_decode:
@@ -279,57 +510,63 @@ class ErasureDecoder:
         k = self.k_data
         m_g = self.m_per_group
         ng = self.num_groups
-        g_size = RS_MAX - m_g
-
-        recovered = [[0] * BLOCK_PAYLOAD for _ in range(k)]
-
-        try:
-            for g in range(ng):
-                group_data_ids = [i for i in range(k) if i % ng == g]
-                gk = len(group_data_ids)
-                pad_count = g_size - gk
-
-                parity_start = k + g * m_g
-                parity_ids = list(range(parity_start, parity_start + m_g))
-
-                # Build erase_pos: positions 0..g_size-1 are data/padding,
-                # positions g_size..g_size+m_g-1 are parity
-                erase_pos = []
-                for pos, did in enumerate(group_data_ids):
-                    if did not in self.blocks:
-                        erase_pos.append(pos)
-                # Padding positions — they are known zero, NOT erasures
-                for pos in range(m_g):
-                    pid = parity_ids[pos]
-                    if pid not in self.blocks:
-                        erase_pos.append(g_size + pos)
-
-                if len(erase_pos) > m_g:
-                    return None
-
-                rs = RSCodec(m_g)
-
-                for col in range(BLOCK_PAYLOAD):
-                    cw = bytearray(g_size + m_g)
-                    for pos, did in enumerate(group_data_ids):
-                        if did in self.blocks:
-                            cw[pos] = self.blocks[did][col]
-                    # padding positions stay zero (matching encoder)
-                    for pos in range(m_g):
-                        pid = parity_ids[pos]
-                        if pid in self.blocks:
-                            cw[g_size + pos] = self.blocks[pid][col]
-
-                    msg, _, _ = rs.decode(cw, erase_pos=erase_pos)
-                    for i, did in enumerate(group_data_ids):
-                        recovered[did][col] = msg[i]
-
-        except ReedSolomonError:
+        g_size = k if ng == 1 else RS_MAX - m_g
+
+        recovered: list[bytes] = [b""] * k
+        groups = self.interleaver.groups(k, ng)
+        for g in range(ng):
+            group_data_ids = groups[g]
+            if all(did in self.blocks for did in group_data_ids):
+                for did in group_data_ids:
+                    recovered[did] = self.blocks[did]
+                continue
+            solved = self._solve_group(group_data_ids, g_size, m_g, k + g * m_g)
+            if solved is None:
+                self._stall = (g, self.group_slack()[g])
+                return None
+            for pos, did in enumerate(group_data_ids):
+                recovered[did] = self.blocks.get(did) or solved[pos]
+
+        self._decoded = b"".join(recovered)[: self.file_size]
+        return self._decoded
+
+    def _solve_group(self, group_data_ids, g_size: int, m_g: int,
+                     parity_start: int) -> Optional[dict[int, bytes]]:
+        """Стёртые позиции группы: решить систему из RS-синдромов (строки 0..m_g-1,
+        правая часть 0) и блоков чётности проходов ≥ 1 (строки ir_row).
+
+        Без чётности проходов ≥ 1 это те же уравнения, что решает reedsolo со
+        стираниями, но все 200 столбцов сразу — в сотни раз быстрее, чем по столбцу.
+        Неизвестные — все стёртые позиции кодового слова, включая чётность прохода 0.
+        Возвращает {позиция: блок} стёртых позиций или None, если уравнений не хватило.
+        """
+        n = g_size + m_g
+        zero = bytes(BLOCK_PAYLOAD)
+        cw: list[Optional[bytes]] = [self.blocks.get(did) for did in group_data_ids]
+        cw += [zero] * (g_size - len(group_data_ids))
+        cw += [self.blocks.get(parity_start + i) for i in range(m_g)]
+        unknown = [pos for pos, blk in enumerate(cw) if blk is None]
+        known = [(pos, blk) for pos, blk in enumerate(cw) if blk is not None and blk != zero]
+
+        rows: dict[int, bytes] = {r: zero for r in range(m_g)}
+        for (cycle, bid), payload in self.extra.items():
+            if parity_start <= bid < parity_start + m_g:
+                rows.setdefault(ir_row(cycle, bid - parity_start, m_g), payload)
+        if len(rows) < len(unknown):
             return None
 
-        flat = b"".join(bytes(row) for row in recovered)
-        self._decoded = flat[: self.file_size]
-        return self._decoded
+        solver = GaussJordan(len(unknown))
+        for r, rhs in rows.items():
+            acc = int.from_bytes(rhs, "big")
+            for pos, blk in known:
+                acc ^= int.from_bytes(blk.translate(MUL[ir_coef(r, pos, n)]), "big")
+            coefs = bytes(ir_coef(r, pos, n) for pos in unknown)
+            if solver.insert(coefs + acc.to_bytes(BLOCK_PAYLOAD, "big")) and solver.solved:
+                break
+        sol = solver.solution()
+        if sol is None:
+            return None
+        return dict(zip(unknown, sol))
 
     def assemble_partial(self) -> bytes:
         if self._decoded is not None:
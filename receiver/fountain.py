@@ -0,0 +1,263 @@
+"""Безскоростной (rateless) FEC — случайный линейный фонтанный код по GF(2^8).
+
+В отличие от RS с фиксированным N, передатчик может выдавать сколько угодно
+новых символов одного файла: символ esi < K — блок данных как есть
+(систематический код), esi ≥ K — случайная линейная комбинация всех K блоков
+с коэффициентами, которые приёмник восстанавливает по (esi, K). Файл собирается
+из любых K линейно независимых пакетов любых проходов; для плотного кода над
+GF(2^8) это в среднем K + 0,004 пакета, т. е. практически любые K различных.
+
+Формат пакета (256 байт, тип 0x69; рамка и CRC — как у FEC-пакета):
+  Смещение  Размер  Поле
+  0         1       sync           0x55
+  1         1       type           0x69
+  2         4       callsign       base-40, big-endian
+  6         1       image_id       0-255
+  7         4       esi            номер символа, big-endian (0..K-1 — данные)
+  11        2       k_data         число блоков данных
+  13        4       file_size      размер файла
+  17        1       file_type      0x01=JPEG, 0x02=WebP, 0x00=raw
+  18        1       code_version   генератор коэффициентов (1)
+  19        1       —              0
+  20        200     payload        символ
+  220       4       crc32          CRC-32 байт [1..219]
+  224       32      —              нули
+
+Коэффициенты символа esi ≥ K (все операции по модулю 2^32): s = esi · 0x9E3779B1 + (K << 16);
+для блока j: s += 0x9E3779B9, x = s ⊕ (s >> 16), x ·= 0x7FEB352D, x ⊕= x >> 15,
+x ·= 0x846CA68B, коэффициент — младший байт x ⊕ (x >> 16). Поле GF(2^8) — gf256.py, как у RS.
+"""
+
+import struct
+import zlib
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+from erasure_fec import (
+    PKT_SIZE, BLOCK_PAYLOAD, HEADER_SIZE, RESERVED_SIZE, SYNC_BYTE,
+    encode_callsign, decode_callsign, detect_file_type,
+)
+from gf256 import MUL, GaussJordan
+
+TYPE_RATELESS = 0x69
+CODE_VERSION = 1
+# Решение плотной системы — O(K²) операций над строками длины K + 200: 64 КБ (K = 328)
+# собираются за доли секунды, при K = 1024 (200 КБ) — уже секунды в потоке GUI
+MAX_K = 1024
+
+
+def coefficients(esi: int, k: int) -> bytes:
+    """K коэффициентов символа esi; для esi < K — единичный вектор."""
+    if esi < k:
+        return bytes(esi) + b"\x01" + bytes(k - esi - 1)
+    # Нелинейное перемешивание обязательно: у линейного над GF(2) генератора
+    # (xorshift, CRC) все векторы лежат в пространстве размерности 32 и ранг не растёт
+    s = (esi * 0x9E3779B1 + (k << 16)) & 0xFFFFFFFF
+    out = bytearray(k)
+    for j in range(k):
+        s = (s + 0x9E3779B9) & 0xFFFFFFFF
+        x = ((s ^ (s >> 16)) * 0x7FEB352D) & 0xFFFFFFFF
+        x = ((x ^ (x >> 15)) * 0x846CA68B) & 0xFFFFFFFF
+        out[j] = (x ^ (x >> 16)) & 0xFF
+    return bytes(out)
+
+
+# ═══════════════════════════════════════════════════════════════
+#  Пакет
+# ═══════════════════════════════════════════════════════════════
+
+@dataclass
+class RatelessPacket:
+    callsign: str = ""
+    image_id: int = 0
+    esi: int = 0
+    k_data: int = 0
+    file_size: int = 0
+    file_type: int = 0
+    payload: bytes = b""
+
+    @property
+    def is_parity(self) -> bool:
+        """True для символа-комбинации (esi >= K)."""
+        return self.esi >= self.k_data
+
+    # sync, type, callsign(4), image_id, esi(4), k, file_size, file_type, code_version, 0
+    _HDR = ">BBIBIHIBBB"
+
+    def to_bytes(self) -> bytes:
+        hdr = struct.pack(
+            self._HDR,
+            SYNC_BYTE, TYPE_RATELESS, encode_callsign(self.callsign),
+            self.image_id & 0xFF,
+            self.esi & 0xFFFFFFFF,
+            self.k_data & 0xFFFF,
+            self.file_size & 0xFFFFFFFF,
+            self.file_type & 0xFF,
+            CODE_VERSION, 0,
+        )
+        pl = (self.payload + b"\x00" * BLOCK_PAYLOAD)[:BLOCK_PAYLOAD]
+        crc = zlib.crc32(hdr[1:] + pl) & 0xFFFFFFFF
+        return hdr + pl + struct.pack(">I", crc) + b"\x00" * RESERVED_SIZE
+
+    @classmethod
+    def from_bytes(cls, raw: bytes) -> Optional["RatelessPacket"]:
+        """Разбор 256 байт; неверный sync/type/CRC или неизвестный генератор → None."""
+        if len(raw) < PKT_SIZE or raw[0] != SYNC_BYTE or raw[1] != TYPE_RATELESS:
+            return None
+        expected = struct.unpack_from(">I", raw, HEADER_SIZE + BLOCK_PAYLOAD)[0]
+        if (zlib.crc32(raw[1:HEADER_SIZE + BLOCK_PAYLOAD]) & 0xFFFFFFFF) != expected:
+            return None
+        _, _, cs, iid, esi, k, fsz, ft, ver, _ = struct.unpack_from(cls._HDR, raw)
+        if ver != CODE_VERSION or not 0 < k <= MAX_K:
+            return None
+        return cls(decode_callsign(cs), iid, esi, k, fsz, ft,
+                   bytes(raw[HEADER_SIZE:HEADER_SIZE + BLOCK_PAYLOAD]))
+
+
+# ═══════════════════════════════════════════════════════════════
+#  Кодер
+# ═══════════════════════════════════════════════════════════════
+
+class RatelessEncoder:
+    """Бесконечный поток символов одного файла: symbol(esi) для любого esi ≥ 0."""
+
+    def __init__(self, data: bytes, callsign: str = "", image_id: int = 0):
+        if not data:
+            raise ValueError("пустой файл")
+        self.callsign = callsign
+        self.image_id = image_id & 0xFF
+        self.file_size = len(data)
+        self.file_type = detect_file_type(data)
+        self.k_data = -(-len(data) // BLOCK_PAYLOAD)
+        if self.k_data > MAX_K:
+            raise ValueError(f"файл {len(data)} Б: для rateless не больше {MAX_K * BLOCK_PAYLOAD} Б")
+        padded = data + b"\x00" * (self.k_data * BLOCK_PAYLOAD - len(data))
+        self.blocks = [padded[i:i + BLOCK_PAYLOAD] for i in range(0, len(padded), BLOCK_PAYLOAD)]
+        self._ints = [int.from_bytes(b, "big") for b in self.blocks]
+
+    def symbol(self, esi: int) -> bytes:
+        """Полезная нагрузка символа esi (200 Б)."""
+        if esi < self.k_data:
+            return self.blocks[esi]
+        # c·a ⊕ c·b = c·(a ⊕ b): сначала XOR блоков с равным коэффициентом,
+        # затем не больше 255 умножений вместо K
+        buckets: dict[int, int] = {}
+        for c, v in zip(coefficients(esi, self.k_data), self._ints):
+            if c:
+                buckets[c] = buckets.get(c, 0) ^ v
+        acc = 0
+        for c, v in buckets.items():
+            b = v.to_bytes(BLOCK_PAYLOAD, "big")
+            acc ^= int.from_bytes(b if c == 1 else b.translate(MUL[c]), "big")
+        return acc.to_bytes(BLOCK_PAYLOAD, "big")
+
+    def packet(self, esi: int) -> RatelessPacket:
+        return RatelessPacket(self.callsign, self.image_id, esi, self.k_data,
+                              self.file_size, self.file_type, self.symbol(esi))
+
+    def stream(self, start: int = 0) -> Iterator[RatelessPacket]:
+        """Пакеты esi = start, start+1, … без конца."""
+        esi = start
+        while True:
+            yield self.packet(esi)
+            esi += 1
+
+
+# ═══════════════════════════════════════════════════════════════
+#  Декодер: инкрементальный Гаусс–Жордан
+# ═══════════════════════════════════════════════════════════════
+
+class RatelessDecoder:
+    """Накопление символов одного изображения; решение системы по мере прихода.
+
+    Строка — K коэффициентов + 200 Б нагрузки, исключение Гаусса–Жордана
+    (gf256.GaussJordan) ведётся с каждым пакетом, так что к набору ранга K
+    работа уже сделана.
+
+    Атрибуты image_id … file_type, blocks, received_count, can_decode, decode()
+    и assemble_partial() — те же, что у ErasureDecoder, так что приёмник
+    работает с обоими одинаково; blocks — блоки данных, принятые как есть.
+    """
+
+    def __init__(self):
+        self.image_id: Optional[int] = None
+        self.callsign: str = ""
+        self.k_data: int = 0
+        self.file_size: int = 0
+        self.file_type: int = 0
+        self.blocks: dict[int, bytes] = {}
+        self._solver = GaussJordan(0)
+        self._seen: set[int] = set()
+        self._decoded: Optional[bytes] = None
+
+    def reset(self):
+        self.image_id = None
+        self.callsign = ""
+        self.k_data = 0
+        self.file_size = 0
+        self.file_type = 0
+        self.blocks.clear()
+        self._solver = GaussJordan(0)
+        self._seen.clear()
+        self._decoded = None
+
+    @property
+    def n_total(self) -> int:
+        return self.k_data
+
+    @property
+    def rank(self) -> int:
+        return self._solver.rank
+
+    @property
+    def received_count(self) -> int:
+        return len(self._seen)
+
+    @property
+    def can_decode(self) -> bool:
+        return self.k_data > 0 and self._solver.rank == self.k_data
+
+    @property
+    def is_complete(self) -> bool:
+        return self._decoded is not None
+
+    @property
+    def progress(self) -> float:
+        return self._solver.rank / self.k_data if self.k_data else 0.0
+
+    def add_packet(self, pkt: RatelessPacket) -> bool:
+        """Добавить символ; True — он увеличил ранг (новый, линейно независимый)."""
+        if self.image_id is not None and pkt.image_id != self.image_id:
+            self.reset()
+        if self.image_id is None:
+            self.image_id = pkt.image_id
+            self.callsign = pkt.callsign
+            self.k_data = pkt.k_data
+            self.file_size = pkt.file_size
+            self.file_type = pkt.file_type
+            self._solver = GaussJordan(pkt.k_data)
+        if pkt.esi in self._seen or pkt.k_data != self.k_data:
+            return False
+        self._seen.add(pkt.esi)
+        payload = (pkt.payload + b"\x00" * BLOCK_PAYLOAD)[:BLOCK_PAYLOAD]
+        if not pkt.is_parity:
+            self.blocks[pkt.esi] = payload
+        if self.can_decode:
+            return False
+        return self._solver.insert(coefficients(pkt.esi, self.k_data) + payload)
+
+    def decode(self) -> Optional[bytes]:
+        if not self.can_decode:
+            return None
+        if self._decoded is None:
+            self._decoded = b"".join(self._solver.solution())[:self.file_size]
+        return self._decoded
+
+    def assemble_partial(self) -> bytes:
+        """Файл из блоков данных, принятых как есть; недостающие — нули (до решения системы)."""
+        if self._decoded is not None:
+            return self._decoded
+        if self.k_data == 0:
+            return b""
+        pad = b"\x00" * BLOCK_PAYLOAD
+        return b"".join(self.blocks.get(i, pad) for i in range(self.k_data))[:self.file_size]
@@ -0,0 +1,102 @@
+"""Арифметика GF(2^8) над строками байт — для фонтанного кода и нарастающей чётности RS.
+
+Поле то же, что у reedsolo и прошивки (полином 0x11d, порождающий элемент 2).
+Строка умножается на константу одной bytes.translate по таблице MUL[c],
+сложение строк — XOR через int.from_bytes; обе операции идут в C, так что
+исключение Гаусса на сотнях строк по 200+ байт укладывается в доли секунды.
+"""
+
+from typing import Optional
+
+_GF_POLY = 0x11D
+EXP = [0] * 512
+LOG = [0] * 256
+_x = 1
+for _i in range(255):
+    EXP[_i] = _x
+    LOG[_x] = _i
+    _x <<= 1
+    if _x & 0x100:
+        _x ^= _GF_POLY
+for _i in range(255, 512):
+    EXP[_i] = EXP[_i - 255]
+
+
+def gf_mul(a: int, b: int) -> int:
+    if a == 0 or b == 0:
+        return 0
+    return EXP[LOG[a] + LOG[b]]
+
+
+def gf_inv(a: int) -> int:
+    return EXP[255 - LOG[a]]
+
+
+def gf_pow2(e: int) -> int:
+    """α^e, α = 2."""
+    return EXP[e % 255]
+
+
+# MUL[c] — таблица для bytes.translate: строка × c за один проход на C.
+# Строится тоже translate: c·v = EXP[log c + log v], так что строка c — это EXP со
+# сдвигом log c, переставленный по LOG[1..255] (256 вызовов вместо 65536 умножений)
+_LOGS = bytes(LOG[1:256])
+MUL = [bytes(256)] + [b"\x00" + _LOGS.translate(bytes(EXP[LOG[c]:LOG[c] + 256])) for c in range(1, 256)]
+
+
+def xor(a: bytes, b: bytes) -> bytes:
+    return (int.from_bytes(a, "big") ^ int.from_bytes(b, "big")).to_bytes(len(a), "big")
+
+
+def axpy(row: bytes, other: bytes, c: int) -> bytes:
+    """row + c · other."""
+    return xor(row, other if c == 1 else other.translate(MUL[c]))
+
+
+class GaussJordan:
+    """Инкрементальное исключение Гаусса–Жордана: n неизвестных, строка — n коэффициентов + правая часть.
+
+    Базис хранится в приведённом виде: у опорной строки столбца p единица в p
+    и нули во всех остальных опорных столбцах. Новая строка вычитается из
+    базиса (не больше n операций над строкой) и, если остаток ненулевой,
+    становится опорной. При ранге n правые части опорных строк — решение.
+    """
+
+    def __init__(self, n: int):
+        self.n = n
+        self.rows: dict[int, bytes] = {}   # опорный столбец → строка
+
+    @property
+    def rank(self) -> int:
+        return len(self.rows)
+
+    @property
+    def solved(self) -> bool:
+        return len(self.rows) == self.n
+
+    def insert(self, row: bytes) -> bool:
+        """Добавить уравнение; True — оно увеличило ранг."""
+        n = self.n
+        for p, prow in self.rows.items():
+            c = row[p]
+            if c:
+                row = axpy(row, prow, c)
+        tail = row[:n].lstrip(b"\x00")
+        if not tail:
+            return False
+        p = n - len(tail)
+        c = row[p]
+        if c != 1:
+            row = row.translate(MUL[gf_inv(c)])
+        for q, qrow in self.rows.items():
+            c = qrow[p]
+            if c:
+                self.rows[q] = axpy(qrow, row, c)
+        self.rows[p] = row
+        return True
+
+    def solution(self) -> Optional[list[bytes]]:
+        """Правые части для неизвестных 0..n-1 или None, пока ранг меньше n."""
+        if not self.solved:
+            return None
+        return [self.rows[i][self.n:] for i in range(self.n)]
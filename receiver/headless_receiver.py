@@ -0,0 +1,463 @@
+#!/usr/bin/env python3
+"""Приёмник LorettLink без GUI: TCP, UDP и COM → декодер → spool, метрики Prometheus.
+
+Для наземных станций на удалённых ноутбуках: то же, что вкладка «Приём», но без Qt.
+Каждый источник (TCP-клиент, отправитель UDP, COM-порт) получает свой StreamParser
+и свои декодеры (RS, Коши или rateless — по пакетам), по одному на изображение:
+несколько линий и чередующиеся в одной линии зонды не мешают друг другу. Потоки чтения только кладут порции в очередь; разбор,
+декодирование, архив блоков и метрики — в одном потоке приёма, как в GUI.
+Восстановленные и неполные изображения пишутся ImageSpool в тот же каталог и index.sqlite.
+Память учитывается по подсистемам (memory_budget.py): сверх --mem-budget отложенные
+до следующего круга сеансы вытесняются на диск, так что многочасовой приём не растёт.
+
+    python headless_receiver.py --tcp 12000 --metrics-port 9108
+    python headless_receiver.py --udp 12001 --udp-group 239.0.0.1 --spool /data/spool
+    python headless_receiver.py --serial /dev/ttyUSB0 --baud 921600 --flow rtscts --no-blocks
+"""
+
+import argparse
+import queue
+import signal
+import socket
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from block_archive import BlockArchiveWriter, ImageKey, decoder_key, key_of
+from cauchy_fec import CauchyDecoder
+from erasure_fec import CODE_CAUCHY16, ErasureDecoder, FECPacket
+from fountain import RatelessDecoder, RatelessPacket
+from image_spool import ImageRecord, ImageSpool
+from memory_budget import (DEFAULT_BUDGET_MB, MemoryBudget, ParkedSessions, decoder_bytes,
+                           enforce, rss_bytes)
+from metrics import DEFAULT_HOST, DEFAULT_PORT, Metrics, MetricsServer
+from protocol import ParserStats, StreamParser, TelemInfo
+from serial_reader import DEFAULT_BAUD, FLOW_NONE, FLOW_RTSCTS, FLOW_XONXOFF, SerialReader
+
+DEFAULT_SPOOL_DIR = Path.home() / "LorettLink" / "spool"
+# Живых декодеров на источник (чередующиеся зонды) и сколько изображение ждёт пакетов, с
+ACTIVE_MAX = 8
+ACTIVE_IDLE_S = 60.0
+_CODE_NAMES = {ErasureDecoder: "rs", CauchyDecoder: "cauchy", RatelessDecoder: "rateless"}
+
+
+def _log(msg: str):
+    print(f"{time.strftime('%H:%M:%S')}  {msg}", flush=True)
+
+
+# ═══════════════════════════════════════════════════════════════
+#  Сеанс одного источника
+# ═══════════════════════════════════════════════════════════════
+
+class Image:
+    """Одно собираемое изображение источника: декодер и что с ним уже сделано."""
+
+    def __init__(self, decoder):
+        self.decoder = decoder
+        self.recovered = False
+        self.spooled = False
+        self.decode_ms: Optional[float] = None
+        self.last_rx = time.monotonic()
+        self.rssi_sum = 0; self.snr_sum = 0; self.telem_n = 0
+
+    @property
+    def state(self) -> str:
+        d = self.decoder
+        if self.recovered:
+            return "recovered"
+        if d.received_count and d.can_decode:
+            return "decodable"
+        return "receiving" if d.received_count else ""
+
+
+class Session:
+    """Парсер и собираемые изображения одного источника.
+
+    В одном потоке могут чередоваться пакеты нескольких зондов (loadgen, общий
+    ретранслятор), поэтому живых декодеров несколько — по ключу изображения
+    (ImageKey: позывной, image_id, размер, K, разбивка, код). Изображение
+    покидает их, когда живых больше ACTIVE_MAX (самое давно не получавшее
+    пакетов) или пакетов нет ACTIVE_IDLE_S: тогда неполное пишется в spool, а
+    незавершённое RS откладывается до следующего круга (parked).
+    """
+
+    def __init__(self, source: str, rx: "HeadlessReceiver"):
+        self.source = source
+        # Метка для метрик без эфемерного порта клиента — иначе каждое переподключение новый ряд
+        self.label = source.rsplit(":", 1)[0] if source.startswith(("tcp:", "udp:")) else source
+        self.rx = rx
+        self.parser = StreamParser()
+        self.active: dict[tuple, Image] = {}   # ключ → изображение, от давно получавшего пакеты к недавнему
+        self.parked = ParkedSessions()   # незавершённые изображения до следующего круга
+        self._last: Optional[Image] = None   # изображение последнего пакета — ему засчитывается TELEM
+
+    def feed(self, data: bytes):
+        for obj in self.parser.feed(data):
+            if isinstance(obj, FECPacket):
+                self._handle_fec(obj)
+            elif isinstance(obj, RatelessPacket):
+                self._handle_rateless(obj)
+            elif isinstance(obj, TelemInfo):
+                if self._last is not None:
+                    img = self._last
+                    img.rssi_sum += obj.rssi; img.snr_sum += obj.snr; img.telem_n += 1
+                self.rx.metrics.set_telem(obj)
+
+    def _image(self, key: tuple, new) -> Image:
+        """Живое изображение по ключу; нет — продолжение отложенного или новый декодер new()."""
+        img = self.active.pop(key, None)
+        if img is None:
+            d = self.parked.pop(key) if isinstance(key, ImageKey) else None
+            if d is not None:
+                _log(f"{self.source}: продолжение {d.callsign}/{d.image_id}, "
+                     f"блоков {d.received_count} из {d.n_total}")
+            img = Image(d if d is not None else new())
+        img.last_rx = time.monotonic()
+        self.active[key] = img   # в конец: получил пакет последним
+        while len(self.active) > ACTIVE_MAX:
+            self._evict(next(iter(self.active)))
+        self._last = img
+        return img
+
+    def _evict(self, key: tuple, park: bool = True):
+        """Изображение больше не собирается: неполное — в spool, незавершённое RS — в отложенные."""
+        img = self.active.pop(key)
+        if img is self._last:
+            self._last = None
+        self.spool(img)
+        d = img.decoder
+        if park and isinstance(d, ErasureDecoder) and d.received_count and not d.is_complete:
+            self.parked.put(decoder_key(d), d)
+
+    def evict_idle(self, now: float):
+        for key in [k for k, img in self.active.items() if now - img.last_rx > ACTIVE_IDLE_S]:
+            self._evict(key)
+
+    def close(self):
+        """Источник закрыт: все живые изображения — в spool, отложенные забыть."""
+        for key in list(self.active):
+            self._evict(key, park=False)
+        self.parked.close()
+
+    def _handle_fec(self, pkt: FECPacket):
+        cls = CauchyDecoder if pkt.code == CODE_CAUCHY16 else ErasureDecoder
+        img = self._image(key_of(pkt), cls)
+        if img.decoder.received_count == 0:
+            _log(f"{self.source}: {'Коши' if pkt.code else 'FEC'} call={pkt.callsign} "
+                 f"image={pkt.image_id} K={pkt.k_data} M={pkt.n_total - pkt.k_data} file={pkt.file_size} Б")
+        img.decoder.add_packet(pkt)
+        if self.rx.block_archive is not None:
+            self.rx.block_archive.append(pkt)
+        if img.decoder.can_decode and not img.recovered:
+            self._try_recover(img)
+
+    def _handle_rateless(self, pkt: RatelessPacket):
+        img = self._image(("rateless", pkt.callsign, pkt.image_id, pkt.file_size, pkt.k_data),
+                          RatelessDecoder)
+        if img.decoder.received_count == 0:
+            _log(f"{self.source}: Rateless call={pkt.callsign} image={pkt.image_id} "
+                 f"K={pkt.k_data} file={pkt.file_size} Б")
+        if img.recovered:
+            return
+        img.decoder.add_packet(pkt)
+        if img.decoder.can_decode:
+            self._try_recover(img)
+
+    def _try_recover(self, img: Image):
+        code = _CODE_NAMES[type(img.decoder)]
+        t0 = time.perf_counter()
+        result = img.decoder.decode()
+        dt = time.perf_counter() - t0
+        if result is None:
+            self.rx.metrics.inc("decode_failures_total", code=code)
+            _log(f"{self.source}: декодирование не удалось")
+            return
+        img.recovered = True
+        img.decode_ms = dt * 1000
+        self.rx.metrics.inc("images_recovered_total", code=code)
+        self.rx.metrics.observe("decode_seconds", dt, code=code)
+        _log(f"{self.source}: файл восстановлен 1:1 ({len(result)} Б, {img.decode_ms:.0f} мс)")
+        self.spool(img)
+
+    def spool(self, img: Image):
+        """Поставить изображение (восстановленное или частичное) в очередь записи — один раз."""
+        d = img.decoder
+        if img.spooled or d.received_count == 0:
+            return
+        data = d.assemble_partial()
+        if not data:
+            return
+        img.spooled = True
+        if not d.is_complete:
+            self.rx.metrics.inc("images_partial_total")
+        if self.rx.spool is None:
+            return
+        n = img.telem_n
+        self.rx.spool.submit(ImageRecord(
+            callsign=d.callsign, image_id=d.image_id or 0, file_size=d.file_size,
+            file_type=d.file_type, k_data=d.k_data, n_total=d.n_total,
+            blocks_rx=d.received_count, complete=d.is_complete,
+            rssi=img.rssi_sum / n if n else None,
+            snr=img.snr_sum / n / 4 if n else None,
+            decode_ms=img.decode_ms,
+        ), data)
+
+
+# ═══════════════════════════════════════════════════════════════
+#  Потоки чтения: только порции в очередь приёма
+# ═══════════════════════════════════════════════════════════════
+
+def _tcp_client(q: queue.Queue, client: socket.socket, source: str, stop: threading.Event):
+    client.settimeout(0.2)
+    try:
+        while not stop.is_set():
+            try:
+                data = client.recv(65536)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            if not data:
+                break
+            q.put((source, data))
+    finally:
+        client.close()
+        q.put((source, None))
+
+
+def _tcp_server(q: queue.Queue, port: int, stop: threading.Event):
+    srv = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    srv.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    srv.settimeout(1.0)
+    try:
+        srv.bind(("0.0.0.0", port))
+        srv.listen(8)
+    except OSError as exc:
+        srv.close()
+        _log(f"TCP :{port}: {exc}")
+        return
+    _log(f"TCP :{port}")
+    try:
+        while not stop.is_set():
+            try:
+                client, addr = srv.accept()
+            except socket.timeout:
+                continue
+            threading.Thread(target=_tcp_client, args=(q, client, f"tcp:{addr[0]}:{addr[1]}", stop),
+                             daemon=True).start()
+    finally:
+        srv.close()
+
+
+def _udp(q: queue.Queue, port: int, group: str, stop: threading.Event):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.settimeout(0.2)
+    try:
+        sock.bind(("", port))
+        if group:
+            mreq = socket.inet_aton(group) + socket.inet_aton("0.0.0.0")
+            sock.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, mreq)
+    except OSError as exc:
+        sock.close()
+        _log(f"UDP :{port}: {exc}")
+        return
+    _log(f"UDP :{port}" + (f"  группа {group}" if group else ""))
+    try:
+        while not stop.is_set():
+            try:
+                data, addr = sock.recvfrom(2048)
+            except socket.timeout:
+                continue
+            q.put((f"udp:{addr[0]}:{addr[1]}", data))
+    finally:
+        sock.close()
+
+
+def _serial(q: queue.Queue, port: str, baud: int, flow: str, stop: threading.Event):
+    reader = SerialReader(port, baud, flow)
+    source = f"com:{port}"
+    try:
+        reader.open()
+        _log(f"COM {port} {baud}")
+        while not stop.is_set():
+            chunk, _ = reader.read_chunk()
+            if chunk:
+                q.put((source, chunk))
+    except Exception as exc:
+        _log(f"COM: {exc}")
+    finally:
+        reader.close()
+        q.put((source, None))
+
+
+# ═══════════════════════════════════════════════════════════════
+#  Поток приёма
+# ═══════════════════════════════════════════════════════════════
+
+class HeadlessReceiver:
+    def __init__(self, spool_dir: Optional[Path], blocks: bool, metrics: Metrics,
+                 budget_mb: float = DEFAULT_BUDGET_MB):
+        self.metrics = metrics
+        self.budget = MemoryBudget(budget_mb)
+        self.queue: "queue.Queue[tuple[str, Optional[bytes]]]" = queue.Queue()
+        self.stop_event = threading.Event()
+        self.sessions: dict[str, Session] = {}
+        self._closed_stats = ParserStats()   # счётчики парсеров закрытых источников
+        self._closed_spilled = 0
+        self.spool: Optional[ImageSpool] = None
+        self.block_archive: Optional[BlockArchiveWriter] = None
+        if spool_dir is not None:
+            self.spool = ImageSpool(spool_dir, on_saved=lambda r: _log(
+                f"{'Сохранено' if r.complete else 'Сохранено частично'}: {Path(r.path).name}"))
+            self.spool.start()
+            if blocks:
+                self.block_archive = BlockArchiveWriter(Path(spool_dir) / "blocks")
+
+    def start_reader(self, target, *args):
+        threading.Thread(target=target, args=(self.queue, *args, self.stop_event), daemon=True).start()
+
+    def run(self):
+        """Цикл приёма до stop_event; раз в секунду — tick()."""
+        next_tick = time.monotonic()
+        while not self.stop_event.is_set():
+            try:
+                source, data = self.queue.get(timeout=0.2)
+            except queue.Empty:
+                source = None
+            if source is not None:
+                self.ingest(source, data)
+            now = time.monotonic()
+            if now >= next_tick:
+                next_tick = now + 1.0
+                self.tick()
+        self.close()
+
+    def tick(self):
+        """Сброс архива блоков, уход замолчавших изображений, учёт памяти, снимок метрик."""
+        now = time.monotonic()
+        for s in self.sessions.values():
+            s.evict_idle(now)
+        if self.block_archive is not None:
+            self.block_archive.flush()
+        self.account_memory()
+        self.publish_metrics()
+
+    def ingest(self, source: str, data: Optional[bytes]):
+        """Порция байт источника; data=None — источник закрыт."""
+        if data is None:   # источник закрыт
+            s = self.sessions.pop(source, None)
+            if s is not None:
+                s.close()
+                self._closed_spilled += s.parked.spilled_total
+                for f, v in vars(s.parser.stats).items():
+                    setattr(self._closed_stats, f, getattr(self._closed_stats, f) + v)
+                _log(f"{source}: отключён")
+            return
+        s = self.sessions.get(source)
+        if s is None:
+            s = self.sessions[source] = Session(source, self)
+            _log(f"{source}: подключён")
+        self.metrics.inc("ingest_bytes_total", len(data), source=s.label)
+        s.feed(data)
+
+    def account_memory(self):
+        """Учёт памяти по подсистемам; сверх бюджета — давно отложенные сеансы на диск."""
+        b = self.budget
+        sessions = self.sessions.values()
+        b.set("blocks", sum(decoder_bytes(img.decoder) for s in sessions for img in s.active.values()))
+        b.set("parked", sum(s.parked.hot_bytes for s in sessions))
+        b.set("capture", sum(s.parser.buffered for s in sessions))
+        n = enforce(b, (s.parked for s in sessions))
+        if n:
+            _log(f"Память: на диск вытеснено отложенных сеансов: {n} ({b.summary()})")
+
+    def publish_metrics(self):
+        total = ParserStats(**vars(self._closed_stats))
+        states: dict[str, int] = {}
+        buffered = parked = spilled = 0
+        spilled_total = self._closed_spilled
+        for s in self.sessions.values():
+            for f, v in vars(s.parser.stats).items():
+                setattr(total, f, getattr(total, f) + v)
+            buffered += s.parser.buffered
+            parked += s.parked.hot
+            spilled += s.parked.cold
+            spilled_total += s.parked.spilled_total
+            for img in s.active.values():
+                st = img.state
+                if st:
+                    states[st] = states.get(st, 0) + 1
+        states["parked"] = parked
+        states["spilled"] = spilled
+        m = self.metrics
+        m.set_parser(total)
+        m.set_sessions(states)
+        m.set("parser_buffer_bytes", buffered)
+        m.set_memory(self.budget, rss_bytes())
+        m.set("sessions_spilled_total", spilled_total)
+        m.set("queue_depth", self.queue.qsize(), queue="ingest")
+        m.set("queue_depth", parked + spilled, queue="parked")
+        m.set("queue_depth", self.spool.pending if self.spool else 0, queue="spool")
+        m.publish()
+
+    def close(self):
+        """Неполные изображения — в spool, архив блоков закрыть, дождаться записи."""
+        for s in self.sessions.values():
+            s.close()
+        if self.block_archive is not None:
+            self.block_archive.close()
+        if self.spool is not None:
+            self.spool.stop()
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--tcp", type=int, metavar="PORT", help="слушать TCP (клиентов может быть несколько)")
+    ap.add_argument("--udp", type=int, metavar="PORT", help="принимать датаграммы UDP")
+    ap.add_argument("--udp-group", default="", help="адрес multicast-группы для --udp")
+    ap.add_argument("--serial", metavar="PORT", help="COM-порт радиомодуля")
+    ap.add_argument("--baud", type=int, default=DEFAULT_BAUD)
+    ap.add_argument("--flow", choices=(FLOW_NONE, FLOW_RTSCTS, FLOW_XONXOFF), default=FLOW_NONE)
+    ap.add_argument("--spool", type=Path, default=DEFAULT_SPOOL_DIR, help="каталог автосохранения")
+    ap.add_argument("--no-spool", action="store_true", help="не сохранять изображения")
+    ap.add_argument("--no-blocks", action="store_true", help="не вести архив блоков blocks/*.lla")
+    ap.add_argument("--metrics-port", type=int, default=DEFAULT_PORT, help="порт /metrics (0 — выключить)")
+    ap.add_argument("--metrics-host", default=DEFAULT_HOST, help="адрес /metrics (0.0.0.0 — для всей сети)")
+    ap.add_argument("--mem-budget", type=float, default=DEFAULT_BUDGET_MB, metavar="MB",
+                    help="бюджет памяти; сверх него отложенные сеансы вытесняются на диск")
+    args = ap.parse_args(argv)
+    if args.tcp is None and args.udp is None and args.serial is None:
+        ap.error("нужен хотя бы один источник: --tcp, --udp или --serial")
+
+    metrics = Metrics()
+    server = None
+    if args.metrics_port:
+        server = MetricsServer(metrics, args.metrics_port, args.metrics_host)
+        server.start()
+        _log(f"Метрики: http://{args.metrics_host}:{server.port}/metrics")
+
+    rx = HeadlessReceiver(None if args.no_spool else args.spool, not args.no_blocks, metrics,
+                          args.mem_budget)
+    if args.tcp is not None:
+        rx.start_reader(_tcp_server, args.tcp)
+    if args.udp is not None:
+        rx.start_reader(_udp, args.udp, args.udp_group)
+    if args.serial:
+        rx.start_reader(_serial, args.serial, args.baud, args.flow)
+
+    signal.signal(signal.SIGTERM, lambda *_: rx.stop_event.set())
+    try:
+        rx.run()
+    except KeyboardInterrupt:
+        rx.stop_event.set()
+        rx.close()
+    if server is not None:
+        server.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,207 @@
+"""Автосохранение принятых изображений в spool-каталог и индекс SQLite.
+
+Запись идёт в фоновом потоке: файл пишется во временный *.tmp рядом с целевым
+и переименовывается os.replace(), так что в каталоге не бывает недописанных
+изображений. Метаданные (позывной, image_id, K/N, потери, RSSI, время
+декодирования) попадают в index.sqlite — по нему ищутся снимки за всю ночь полётов.
+"""
+
+import hashlib
+import os
+import queue
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Callable, Optional
+
+INDEX_NAME = "index.sqlite"
+
+_EXT = {0x01: ".jpg", 0x02: ".webp"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS images (
+    id          INTEGER PRIMARY KEY,
+    path        TEXT NOT NULL,
+    received_at REAL NOT NULL,
+    callsign    TEXT NOT NULL,
+    image_id    INTEGER NOT NULL,
+    file_size   INTEGER NOT NULL,
+    file_type   INTEGER NOT NULL,
+    k_data      INTEGER NOT NULL,
+    n_total     INTEGER NOT NULL,
+    blocks_rx   INTEGER NOT NULL,
+    loss        REAL NOT NULL,
+    complete    INTEGER NOT NULL,
+    rssi        REAL,
+    snr         REAL,
+    decode_ms   REAL,
+    sha256      TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS images_callsign ON images (callsign, image_id);
+CREATE INDEX IF NOT EXISTS images_time ON images (received_at);
+"""
+
+
+@dataclass
+class ImageRecord:
+    """Метаданные одного сохранённого изображения (строка таблицы images)."""
+    callsign: str
+    image_id: int
+    file_size: int
+    file_type: int
+    k_data: int
+    n_total: int
+    blocks_rx: int
+    complete: bool
+    received_at: float = 0.0
+    rssi: Optional[float] = None
+    snr: Optional[float] = None
+    decode_ms: Optional[float] = None
+    path: str = ""
+    sha256: str = ""
+    id: Optional[int] = None
+
+    @property
+    def loss(self) -> float:
+        """Доля неполученных блоков из N."""
+        if self.n_total <= 0:
+            return 0.0
+        return max(0.0, 1.0 - self.blocks_rx / self.n_total)
+
+
+def spool_name(rec: ImageRecord) -> str:
+    """Имя файла: время_позывной_imageid[_partial].ext — сортируется по времени приёма."""
+    stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(rec.received_at))
+    tail = "" if rec.complete else "_partial"
+    call = rec.callsign or "NOCALL"
+    return f"{stamp}_{call}_{rec.image_id:03d}{tail}{_EXT.get(rec.file_type, '.bin')}"
+
+
+class ImageIndex:
+    """Индекс SQLite в spool-каталоге. Каждый поток открывает своё соединение."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._conn = sqlite3.connect(str(self.path), timeout=5.0)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self):
+        self._conn.close()
+
+    def insert(self, rec: ImageRecord) -> int:
+        row = asdict(rec)
+        row.pop("id")
+        row["loss"] = rec.loss
+        row["complete"] = int(rec.complete)
+        cols = ", ".join(row)
+        marks = ", ".join(f":{c}" for c in row)
+        with self._conn:
+            cur = self._conn.execute(f"INSERT INTO images ({cols}) VALUES ({marks})", row)
+        return cur.lastrowid
+
+    def search(self, callsign: str = "", since: Optional[float] = None,
+               until: Optional[float] = None, complete: Optional[bool] = None,
+               limit: int = 500) -> list[ImageRecord]:
+        """Поиск по префиксу позывного, интервалу времени и статусу; новые — первыми."""
+        where, args = [], []
+        if callsign:
+            where.append("callsign LIKE ?"); args.append(callsign.upper() + "%")
+        if since is not None:
+            where.append("received_at >= ?"); args.append(since)
+        if until is not None:
+            where.append("received_at < ?"); args.append(until)
+        if complete is not None:
+            where.append("complete = ?"); args.append(int(complete))
+        sql = ("SELECT id, path, received_at, callsign, image_id, file_size, file_type, "
+               "k_data, n_total, blocks_rx, complete, rssi, snr, decode_ms, sha256 FROM images")
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY received_at DESC LIMIT ?"
+        args.append(limit)
+        out = []
+        for (rid, path, ts, cs, iid, fsz, ft, k, n, rx, ok, rssi, snr, dms, sha) in \
+                self._conn.execute(sql, args):
+            out.append(ImageRecord(
+                callsign=cs, image_id=iid, file_size=fsz, file_type=ft, k_data=k,
+                n_total=n, blocks_rx=rx, complete=bool(ok), received_at=ts,
+                rssi=rssi, snr=snr, decode_ms=dms, path=path, sha256=sha, id=rid))
+        return out
+
+
+class ImageSpool:
+    """Фоновая запись изображений в spool-каталог с атомарным переименованием.
+
+    submit() только ставит задание в очередь и сразу возвращается; запись на
+    диск, fsync и вставка в индекс выполняются в отдельном потоке. on_saved
+    вызывается из этого потока — в GUI его нужно пробрасывать через сигнал.
+    """
+
+    def __init__(self, directory, on_saved: Optional[Callable[[ImageRecord], None]] = None):
+        self.directory = Path(directory)
+        self.on_saved = on_saved
+        self._queue: "queue.Queue[Optional[tuple[ImageRecord, bytes]]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self.errors = 0
+
+    def start(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name="ImageSpool", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Дописать очередь и остановить поток."""
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join(timeout)
+        self._thread = None
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def submit(self, rec: ImageRecord, data: bytes):
+        if not rec.received_at:
+            rec.received_at = time.time()
+        self._queue.put((rec, bytes(data)))
+
+    def open_index(self) -> ImageIndex:
+        """Отдельное соединение с индексом для чтения (например, из GUI-потока)."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        return ImageIndex(self.directory / INDEX_NAME)
+
+    def _run(self):
+        index = ImageIndex(self.directory / INDEX_NAME)
+        try:
+            while True:
+                item = self._queue.get()
+                if item is None:
+                    break
+                rec, data = item
+                try:
+                    self._write(index, rec, data)
+                except (OSError, sqlite3.Error):
+                    self.errors += 1
+                    continue
+                if self.on_saved:
+                    self.on_saved(rec)
+        finally:
+            index.close()
+
+    def _write(self, index: ImageIndex, rec: ImageRecord, data: bytes):
+        base = self.directory / spool_name(rec)
+        path, n = base, 1
+        while path.exists():
+            path = base.with_name(f"{base.stem}-{n}{base.suffix}"); n += 1
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+        rec.path = str(path)
+        rec.sha256 = hashlib.sha256(data).hexdigest()
+        rec.id = index.insert(rec)
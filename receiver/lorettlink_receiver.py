@@ -1,11 +1,15 @@
 #!/usr/bin/env python3
 """LorettLink — Приёмник с erasure-FEC (Reed-Solomon).
 
-Принимает FEC-блоки по COM (USB-UART от радиомодуля) или TCP.
+Принимает FEC-блоки по COM (USB-UART от радиомодуля), TCP или UDP (рассылка симулятора).
 Парсит поток: FEC-пакеты 256 байт + TELEM 10 байт.
 Когда получено >= K любых блоков из N, восстанавливает файл Reed-Solomon декодером 1:1.
+Пакеты rateless (тип 0x69, fountain.py) собираются, как только набран ранг K;
+FEC-пакеты с кодом Коши (cauchy_fec.py) — одним кодом на весь файл по любым K из N.
 """
 
+import hashlib
+import importlib.util
 import sys
 import time
 import socket
@@ -17,26 +21,41 @@ _SHARED = str(Path(__file__).resolve().parent.parent / "shared")
 if _SHARED not in sys.path:
     sys.path.insert(0, _SHARED)
 
-from PyQt5 import uic
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QFileDialog, QWidget, QVBoxLayout,
     QHBoxLayout, QLabel, QFrame, QComboBox, QSpinBox, QTabWidget,
+    QCheckBox, QLineEdit, QPushButton, QTableWidget, QTableWidgetItem,
+    QHeaderView, QAbstractItemView, QSplitter, QPlainTextEdit,
 )
-from PyQt5.QtCore import Qt, QThread, pyqtSignal, QTimer
-from PyQt5.QtGui import QPixmap
+from PyQt5.QtCore import Qt, QThread, pyqtSignal, QTimer, QSettings
+from PyQt5.QtGui import QPixmap, QFontDatabase
 
-from erasure_fec import FECPacket, ErasureDecoder
+from erasure_fec import FECPacket, ErasureDecoder, CODE_CAUCHY16
+from cauchy_fec import CauchyDecoder
+from fountain import RatelessPacket, RatelessDecoder
 from protocol import StreamParser, TelemInfo
+from image_spool import ImageSpool, ImageRecord
+from block_archive import BlockArchiveWriter, decoder_key, key_of
+import checkpoint
+from checkpoint import DecoderCheckpoint
+from memory_budget import (DEFAULT_BUDGET_MB, MemoryBudget, ParkedSessions, decoder_bytes,
+                           enforce, rss_bytes)
+from preview import preview_bytes
+from profiling import PROFILER, ProfileCapture
+from metrics import DEFAULT_PORT as METRICS_PORT, Metrics, MetricsServer
+from serial_reader import (
+    SerialReader, OverrunStats, BAUD_RATES, DEFAULT_BAUD,
+    FLOW_NONE, FLOW_RTSCTS, FLOW_XONXOFF,
+)
 from theme_manager import Theme, load_theme, save_theme, apply_theme
 
-try:
-    import serial
-    import serial.tools.list_ports
-    HAS_SERIAL = True
-except ImportError:
-    HAS_SERIAL = False
+# pyserial импортируется при первом обращении к портам, а не при старте окна
+HAS_SERIAL = importlib.util.find_spec("serial") is not None
 
 UI_PATH = Path(__file__).parent / "mainwindow.ui"
+DEFAULT_SPOOL_DIR = Path.home() / "LorettLink" / "spool"
+# Строк лога в окне: старые удаляются, чтобы многочасовой приём не копил документ
+LOG_MAX_LINES = 5000
 
 
 # ═══════════════════════════════════════════════════════════════
@@ -44,32 +63,46 @@ UI_PATH = Path(__file__).parent / "mainwindow.ui"
 # ═══════════════════════════════════════════════════════════════
 
 class SerialWorker(QThread):
-    data_received = pyqtSignal(bytes)
+    data_received = pyqtSignal(bytes, float)   # данные, time.monotonic() прихода
     error_occurred = pyqtSignal(str)
     connection_changed = pyqtSignal(bool)
+    overrun_detected = pyqtSignal(str)
 
-    def __init__(self, port: str, baud: int):
+    def __init__(self, port: str, baud: int, flow: str = FLOW_NONE):
         super().__init__()
         self.port = port
         self.baud = baud
+        self.flow = flow
         self._running = False
-        self._ser = None
+        self._reader: Optional[SerialReader] = None
 
     def run(self):
-        """Открытие порта, цикл чтения порциями по 1024 байт, при ошибке — сигнал и закрытие."""
+        """Открытие порта, чтение всего in_waiting за раз, раз в секунду — опрос счётчиков переполнений ОС."""
+        reader = SerialReader(self.port, self.baud, self.flow)
+        self._reader = reader
         try:
-            self._ser = serial.Serial(self.port, self.baud, timeout=0.1)
+            reader.open()
             self._running = True
             self.connection_changed.emit(True)
+            last = OverrunStats()
+            next_poll = time.monotonic() + 1.0
             while self._running:
-                chunk = self._ser.read(1024)
+                chunk, ts = reader.read_chunk()
                 if chunk:
-                    self.data_received.emit(chunk)
+                    self.data_received.emit(chunk, ts)
+                if ts >= next_poll:
+                    next_poll = ts + 1.0
+                    cur = reader.os_counters()
+                    d = cur.diff(last)
+                    if d.total():
+                        last = cur
+                        self.overrun_detected.emit(
+                            f"overrun={d.overrun} buf_overrun={d.buf_overrun} "
+                            f"frame={d.frame} parity={d.parity}")
         except Exception as exc:
             self.error_occurred.emit(str(exc))
         finally:
-            if self._ser and self._ser.is_open:
-                self._ser.close()
+            reader.close()
             self.connection_changed.emit(False)
 
     def stop(self):
@@ -82,7 +115,7 @@ class SerialWorker(QThread):
 # ═══════════════════════════════════════════════════════════════
 
 class TcpServerWorker(QThread):
-    data_received = pyqtSignal(bytes)
+    data_received = pyqtSignal(bytes, float)
     error_occurred = pyqtSignal(str)
     connection_changed = pyqtSignal(bool)
     client_info = pyqtSignal(str)
@@ -118,7 +151,7 @@ class TcpServerWorker(QThread):
                             continue
                         if not data:
                             break
-                        self.data_received.emit(data)
+                        self.data_received.emit(data, time.monotonic())
                 finally:
                     client.close()
                     self.client_info.emit("")
@@ -139,6 +172,53 @@ class TcpServerWorker(QThread):
                 pass
 
 
+# ═══════════════════════════════════════════════════════════════
+#  Воркер UDP (рассылка симулятора передатчика, в т.ч. multicast)
+# ═══════════════════════════════════════════════════════════════
+
+class UdpReceiverWorker(QThread):
+    """Датаграммы с порта port; group — адрес multicast-группы, к которой нужно присоединиться."""
+
+    data_received = pyqtSignal(bytes, float)
+    error_occurred = pyqtSignal(str)
+    connection_changed = pyqtSignal(bool)
+
+    def __init__(self, port: int, group: str = ""):
+        super().__init__()
+        self._port = port
+        self._group = group
+        self._running = False
+        self._sock = None
+
+    def run(self):
+        try:
+            self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            self._sock.settimeout(0.2)
+            self._sock.bind(("", self._port))
+            if self._group:
+                mreq = socket.inet_aton(self._group) + socket.inet_aton("0.0.0.0")
+                self._sock.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, mreq)
+            self._running = True
+            self.connection_changed.emit(True)
+            while self._running:
+                try:
+                    data = self._sock.recv(2048)
+                except socket.timeout:
+                    continue
+                if data:
+                    self.data_received.emit(data, time.monotonic())
+        except Exception as exc:
+            self.error_occurred.emit(str(exc))
+        finally:
+            if self._sock:
+                self._sock.close()
+            self.connection_changed.emit(False)
+
+    def stop(self):
+        self._running = False
+
+
 # ═══════════════════════════════════════════════════════════════
 #  Вспомогательные функции
 # ═══════════════════════════════════════════════════════════════
@@ -154,6 +234,17 @@ def _make_card(title, description=""):
     return card, lay
 
 
+def _pixmap_bytes(px) -> int:
+    return 0 if px is None or px.isNull() else px.width() * px.height() * px.depth() // 8
+
+
+def _unlink(path: Path):
+    try:
+        path.unlink()
+    except OSError:
+        pass
+
+
 # ═══════════════════════════════════════════════════════════════
 #  Главное окно приёмника
 # ═══════════════════════════════════════════════════════════════
@@ -161,40 +252,94 @@ def _make_card(title, description=""):
 class MainWindow(QMainWindow):
     """Окно: COM/TCP, телеметрия, матрица блоков, превью изображения, лог, сохранение файла."""
 
+    image_saved = pyqtSignal(object)   # ImageRecord из потока ImageSpool
+
     def __init__(self):
         super().__init__()
-        uic.loadUi(str(UI_PATH), self)
+        self._setup_ui()
 
         self.parser = StreamParser()   # разбор потока на FEC- и TELEM-пакеты
         self.decoder = ErasureDecoder()  # накопление блоков и RS-декодирование
         self.serial_worker: Optional[SerialWorker] = None
         self.tcp_worker: Optional[TcpServerWorker] = None
-        self._start_time: Optional[float] = None  # для расчёта скорости приёма
+        self.udp_worker: Optional[UdpReceiverWorker] = None
+        self._start_time: Optional[float] = None  # для расчёта скорости приёма (time.monotonic)
+        self._last_rx_ts: Optional[float] = None  # метка прихода последней порции
         self._bytes_rx = 0
+        self._crc_errors_seen = 0    # уже показанные в логе обрезанные кадры
+        self._spooled = False        # текущее изображение уже записано в spool
+        self._decode_ms: Optional[float] = None
+        self._rssi_sum = 0; self._snr_sum = 0; self._telem_n = 0
+        self.spool: Optional[ImageSpool] = None
+        self.block_archive: Optional[BlockArchiveWriter] = None
+        self.checkpoint: Optional[DecoderCheckpoint] = None
+        self._settings = QSettings("LorettLink", "LorettLink")
         self._last_preview_cnt = 0   # чтобы не перерисовывать превью без изменений
         self._recovery_done = False  # флаг: файл уже восстановлен RS-декодером
+        self._parked = ParkedSessions(on_drop=self._drop_parked_checkpoint)   # ImageKey → декодер до следующего круга
+        self._parked_ckpt: dict[tuple, Path] = {}   # ImageKey отложенного → его файл контрольной точки
+        self.budget = MemoryBudget(self._settings.value("rx/mem_budget_mb", DEFAULT_BUDGET_MB, type=int))
+        self._capture = ProfileCapture()   # cProfile по кнопке на вкладке «Настройки»
+        self.metrics = Metrics()
+        self.metrics_server: Optional[MetricsServer] = None
 
         self._setup_tabs()
         self._connect_signals()
+        self.image_saved.connect(self._on_image_saved)
+        self._apply_spool_settings()
+        self._restore_checkpoints()
 
         self._preview_timer = QTimer(self)
         self._preview_timer.timeout.connect(self._refresh_preview)
         self._preview_timer.start(500)
 
+        self._stats_timer = QTimer(self)
+        self._stats_timer.timeout.connect(self._check_stream_errors)
+        self._stats_timer.start(1000)
+
+        self._prof_timer = QTimer(self)
+        self._prof_timer.timeout.connect(self._refresh_profiling)
+        self._on_profiling_toggled(self.chk_prof.isChecked())
+        self._apply_metrics_settings()
+
         self.btn_connect.setEnabled(HAS_SERIAL)
         self.splitter.setSizes([420, 520])
+        self.log.document().setMaximumBlockCount(LOG_MAX_LINES)
         self.progress.setProperty("class", "rx")
         self.img_label.setStyleSheet("")
-        self._refresh_ports()
+        for b in BAUD_RATES:
+            self.cb_baud.addItem(str(b))
+        self.cb_baud.setEditable(True)
+        self.cb_baud.setCurrentText(str(DEFAULT_BAUD))
+        QTimer.singleShot(0, self._refresh_ports)   # опрос портов — после показа окна
+
+    def _setup_ui(self):
+        """Виджеты из ui_mainwindow.py (compile_ui.py); если .ui правили после генерации — uic.loadUi."""
+        try:
+            from ui_mainwindow import Ui_MainWindow, UI_SHA256
+        except ImportError:
+            UI_SHA256 = None
+        if UI_SHA256 is not None and UI_SHA256 == hashlib.sha256(UI_PATH.read_bytes()).hexdigest():
+            ui = Ui_MainWindow()
+            ui.setupUi(self)
+            self.__dict__.update(vars(ui))
+            return
+        from PyQt5 import uic
+        uic.loadUi(str(UI_PATH), self)
 
     # ── tabs ─────────────────────────────────────────────────
 
     def _setup_tabs(self):
         main_content = self.centralWidget()
-        settings_tab = self._build_settings()
+        settings_tab = self._build_settings()   # сразу: виджеты вкладки хранят настройки приёма
+        # «Архив» строится при первом открытии
+        self._archive_tab = QWidget(); self._archive_built = False
+        QVBoxLayout(self._archive_tab).setContentsMargins(0, 0, 0, 0)
         self._tabs = QTabWidget(); self._tabs.setObjectName("mainTabs")
         self._tabs.addTab(main_content, "  Приём  ")
+        self._tabs.addTab(self._archive_tab, "  Архив  ")
         self._tabs.addTab(settings_tab, "  Настройки  ")
+        self._tabs.currentChanged.connect(self._on_tab_changed)
         wrapper = QWidget()
         wl = QVBoxLayout(wrapper); wl.setContentsMargins(0, 0, 0, 0); wl.setSpacing(0)
         wl.addWidget(self._tabs)
@@ -216,9 +361,481 @@ class MainWindow(QMainWindow):
         ra.addWidget(self.cb_theme); ra.addStretch(); la.addLayout(ra)
         root.addWidget(card_a)
 
+        card_c, lc = _make_card(
+            "COM-порт",
+            "Порт читается целиком по мере поступления данных, без ожидания таймаута. "
+            "Для скоростей выше 115200 и USB CDC включите аппаратное управление потоком, "
+            "если мост его поддерживает. Переполнения драйвера и обрезанные кадры пишутся в лог.")
+        rc = QHBoxLayout(); rc.addWidget(QLabel("Управление потоком:"))
+        self.cb_flow = QComboBox()
+        self.cb_flow.addItem("Нет", FLOW_NONE)
+        self.cb_flow.addItem("RTS/CTS", FLOW_RTSCTS)
+        self.cb_flow.addItem("XON/XOFF", FLOW_XONXOFF)
+        rc.addWidget(self.cb_flow); rc.addStretch(); lc.addLayout(rc)
+        root.addWidget(card_c)
+
+        card_sp, lsp = _make_card(
+            "Автосохранение",
+            "Каждое восстановленное изображение, а также неполное при смене image_id "
+            "или закрытии программы, записывается в каталог в фоне. "
+            "Метаданные (позывной, K/N, потери, RSSI, время декодирования) — в index.sqlite, "
+            "поиск на вкладке «Архив».")
+        self.chk_spool = QCheckBox("Сохранять автоматически")
+        self.chk_spool.setChecked(self._settings.value("rx/spool_enabled", True, type=bool))
+        lsp.addWidget(self.chk_spool)
+        rsp = QHBoxLayout(); rsp.addWidget(QLabel("Каталог:"))
+        self.edit_spool = QLineEdit(self._settings.value("rx/spool_dir", str(DEFAULT_SPOOL_DIR)))
+        btn_spool = QPushButton("Обзор…")
+        btn_spool.clicked.connect(self._browse_spool)
+        rsp.addWidget(self.edit_spool, 1); rsp.addWidget(btn_spool); lsp.addLayout(rsp)
+        self.chk_blocks = QCheckBox("Архив блоков (blocks/*.lla) для офлайн-восстановления")
+        self.chk_blocks.setToolTip(
+            "Все принятые FEC-блоки дописываются в файл сеанса. Изображения, не набравшие K "
+            "за один сеанс, восстанавливаются по архивам нескольких сеансов и станций:\n"
+            "python recover_archive.py <каталоги blocks> -o recovered")
+        self.chk_blocks.setChecked(self._settings.value("rx/block_archive", True, type=bool))
+        lsp.addWidget(self.chk_blocks)
+        self.chk_ckpt = QCheckBox("Контрольные точки декодера (sessions/*.ckpt)")
+        self.chk_ckpt.setToolTip(
+            "Принятые блоки текущего изображения зеркалируются на диск. После падения "
+            "или перезапуска программы сессия восстанавливается автоматически.")
+        self.chk_ckpt.setChecked(self._settings.value("rx/checkpoints", True, type=bool))
+        self.chk_ckpt.toggled.connect(self._on_ckpt_toggled)
+        lsp.addWidget(self.chk_ckpt)
+        self.chk_spool.toggled.connect(self._apply_spool_settings)
+        self.chk_blocks.toggled.connect(self._apply_spool_settings)
+        self.edit_spool.editingFinished.connect(self._apply_spool_settings)
+        root.addWidget(card_sp)
+
+        card_u, lu = _make_card(
+            "UDP",
+            "Приём рассылки симулятора передатчика по UDP: каждая датаграмма — один кадр. "
+            "Для multicast укажите адрес группы (например 239.0.0.1), для обычного UDP оставьте пустым.")
+        ru = QHBoxLayout(); ru.setSpacing(12)
+        ru.addWidget(QLabel("Группа:"))
+        self.edit_udp_group = QLineEdit(self._settings.value("rx/udp_group", ""))
+        self.edit_udp_group.setPlaceholderText("без multicast")
+        ru.addWidget(self.edit_udp_group)
+        ru.addWidget(QLabel("Порт:"))
+        self.sb_udp_port = QSpinBox(); self.sb_udp_port.setRange(1024, 65535)
+        self.sb_udp_port.setValue(self._settings.value("rx/udp_port", 12001, type=int))
+        ru.addWidget(self.sb_udp_port)
+        self.btn_udp = QPushButton("Слушать")
+        self.btn_udp.clicked.connect(self._toggle_udp)
+        ru.addWidget(self.btn_udp)
+        ru.addStretch(); lu.addLayout(ru)
+        root.addWidget(card_u)
+
+        card_pr, lpr = _make_card(
+            "Профилирование",
+            "Таймеры разбора потока, add_packet и decode декодера, превью и отрисовки матрицы блоков. "
+            "Выключенные почти ничего не стоят. cProfile записывает всё, что делает поток интерфейса, "
+            "пока захват не остановлен; результат — файл .prof (python -m pstats, snakeviz) и сводка .txt.")
+        self.chk_prof = QCheckBox("Замерять горячие пути")
+        self.chk_prof.setChecked(self._settings.value("rx/profiling", False, type=bool))
+        self.chk_prof.toggled.connect(self._on_profiling_toggled)
+        lpr.addWidget(self.chk_prof)
+        self.tbl_prof = QTableWidget(0, 8)
+        self.tbl_prof.setHorizontalHeaderLabels(
+            ["Участок", "Вызовов", "Среднее, мс", "p50", "p90", "p99", "Макс.", "Доля"])
+        self.tbl_prof.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.tbl_prof.verticalHeader().setVisible(False)
+        self.tbl_prof.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.tbl_prof.setMinimumHeight(150)
+        lpr.addWidget(self.tbl_prof)
+        rpr = QHBoxLayout()
+        btn = QPushButton("Сбросить"); btn.clicked.connect(self._reset_profiling)
+        rpr.addWidget(btn)
+        btn = QPushButton("Экспорт JSON…"); btn.clicked.connect(self._export_profiling)
+        rpr.addWidget(btn)
+        self.btn_cprofile = QPushButton("Запустить cProfile")
+        self.btn_cprofile.clicked.connect(self._toggle_cprofile)
+        rpr.addWidget(self.btn_cprofile)
+        rpr.addStretch(); lpr.addLayout(rpr)
+        self.txt_cprofile = QPlainTextEdit(); self.txt_cprofile.setReadOnly(True)
+        self.txt_cprofile.setFont(QFontDatabase.systemFont(QFontDatabase.FixedFont))
+        self.txt_cprofile.setLineWrapMode(QPlainTextEdit.NoWrap)
+        self.txt_cprofile.setMinimumHeight(180); self.txt_cprofile.hide()
+        lpr.addWidget(self.txt_cprofile)
+        root.addWidget(card_pr)
+
+        card_m, lm = _make_card(
+            "Мониторинг",
+            "HTTP-метрики в формате Prometheus (GET /metrics): счётчики парсера, состояния декодера, "
+            "восстановленные изображения, гистограмма времени декодирования, байты по источникам, "
+            "RSSI/SNR и глубина очередей. Снимок обновляется раз в секунду, опрос не задерживает приём.")
+        rm = QHBoxLayout(); rm.setSpacing(12)
+        self.chk_metrics = QCheckBox("Отдавать метрики на 127.0.0.1, порт")
+        self.chk_metrics.setChecked(self._settings.value("rx/metrics", False, type=bool))
+        rm.addWidget(self.chk_metrics)
+        self.sb_metrics_port = QSpinBox(); self.sb_metrics_port.setRange(1024, 65535)
+        self.sb_metrics_port.setValue(self._settings.value("rx/metrics_port", METRICS_PORT, type=int))
+        rm.addWidget(self.sb_metrics_port)
+        rm.addStretch(); lm.addLayout(rm)
+        self.chk_metrics.toggled.connect(self._apply_metrics_settings)
+        self.sb_metrics_port.editingFinished.connect(self._apply_metrics_settings)
+        root.addWidget(card_m)
+
+        card_mem, lmem = _make_card(
+            "Память",
+            "Учёт по подсистемам: блоки текущего изображения, отложенные до следующего круга сеансы, "
+            "превью, лог, буферы приёма. Сверх бюджета давно отложенные сеансы вытесняются во временные "
+            f"файлы и поднимаются, когда изображение снова в эфире. Лог хранит последние {LOG_MAX_LINES} строк.")
+        rmem = QHBoxLayout(); rmem.addWidget(QLabel("Бюджет, МБ:"))
+        self.sb_mem_budget = QSpinBox(); self.sb_mem_budget.setRange(32, 16384)
+        self.sb_mem_budget.setValue(self.budget.limit >> 20)
+        self.sb_mem_budget.valueChanged.connect(self._on_mem_budget_changed)
+        rmem.addWidget(self.sb_mem_budget); rmem.addStretch(); lmem.addLayout(rmem)
+        self.lbl_mem = QLabel("—"); self.lbl_mem.setWordWrap(True)
+        lmem.addWidget(self.lbl_mem)
+        root.addWidget(card_mem)
+
         root.addStretch()
         return page
 
+    def _build_archive(self):
+        """Вкладка «Архив»: поиск по индексу spool-каталога и просмотр сохранённых снимков."""
+        page = QWidget()
+        root = QVBoxLayout(page); root.setContentsMargins(16, 16, 16, 16); root.setSpacing(8)
+        bar = QHBoxLayout(); bar.addWidget(QLabel("Позывной:"))
+        self.edit_arch_call = QLineEdit(); self.edit_arch_call.setMaximumWidth(120)
+        self.edit_arch_call.returnPressed.connect(self._refresh_archive)
+        bar.addWidget(self.edit_arch_call)
+        self.chk_arch_complete = QCheckBox("Только восстановленные")
+        self.chk_arch_complete.toggled.connect(self._refresh_archive)
+        bar.addWidget(self.chk_arch_complete)
+        btn = QPushButton("Обновить"); btn.clicked.connect(self._refresh_archive)
+        bar.addWidget(btn); bar.addStretch()
+        root.addLayout(bar)
+
+        split = QSplitter(Qt.Horizontal)
+        self.tbl_archive = QTableWidget(0, 8)
+        self.tbl_archive.setHorizontalHeaderLabels(
+            ["Время", "Позывной", "ID", "K / N", "Потери", "RSSI", "Декод., мс", "Статус"])
+        self.tbl_archive.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.tbl_archive.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.tbl_archive.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.tbl_archive.verticalHeader().setVisible(False)
+        self.tbl_archive.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.tbl_archive.currentCellChanged.connect(lambda *_: self._show_archive_image())
+        self.lbl_archive_img = QLabel(); self.lbl_archive_img.setAlignment(Qt.AlignCenter)
+        self.lbl_archive_img.setMinimumWidth(240)
+        split.addWidget(self.tbl_archive); split.addWidget(self.lbl_archive_img)
+        split.setSizes([560, 360])
+        root.addWidget(split, 1)
+        self._archive_rows: list[ImageRecord] = []
+        return page
+
+    def _on_tab_changed(self, idx):
+        if self._tabs.tabText(idx).strip() == "Архив":
+            if not self._archive_built:
+                self._archive_tab.layout().addWidget(self._build_archive())
+                self._archive_built = True
+            self._refresh_archive()
+
+    def _refresh_archive(self):
+        """Перечитать индекс с учётом фильтров."""
+        if self.spool is None:
+            self.tbl_archive.setRowCount(0); return
+        index = self.spool.open_index()
+        try:
+            rows = index.search(
+                callsign=self.edit_arch_call.text().strip(),
+                complete=True if self.chk_arch_complete.isChecked() else None)
+        finally:
+            index.close()
+        self._archive_rows = rows
+        self.tbl_archive.setRowCount(len(rows))
+        for r, rec in enumerate(rows):
+            cells = [
+                time.strftime("%d.%m %H:%M:%S", time.localtime(rec.received_at)),
+                rec.callsign, str(rec.image_id), f"{rec.blocks_rx} / {rec.k_data} / {rec.n_total}",
+                f"{rec.loss * 100:.0f}%",
+                "—" if rec.rssi is None else f"{rec.rssi:.0f}",
+                "—" if rec.decode_ms is None else f"{rec.decode_ms:.0f}",
+                "OK" if rec.complete else "частично",
+            ]
+            for c, text in enumerate(cells):
+                self.tbl_archive.setItem(r, c, QTableWidgetItem(text))
+
+    def _show_archive_image(self):
+        row = self.tbl_archive.currentRow()
+        if not 0 <= row < len(self._archive_rows):
+            self.lbl_archive_img.clear(); return
+        px = QPixmap(self._archive_rows[row].path)
+        if px.isNull():
+            self.lbl_archive_img.setText("Файл не найден"); return
+        self.lbl_archive_img.setPixmap(px.scaled(
+            self.lbl_archive_img.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation))
+
+    def _browse_spool(self):
+        path = QFileDialog.getExistingDirectory(self, "Каталог автосохранения", self.edit_spool.text())
+        if path:
+            self.edit_spool.setText(path); self._apply_spool_settings()
+
+    def _apply_spool_settings(self):
+        """Запустить/перезапустить фоновую запись и архив блоков по текущим настройкам."""
+        enabled = self.chk_spool.isChecked()
+        directory = self.edit_spool.text().strip() or str(DEFAULT_SPOOL_DIR)
+        self._settings.setValue("rx/spool_enabled", enabled)
+        self._settings.setValue("rx/spool_dir", directory)
+        self._settings.setValue("rx/block_archive", self.chk_blocks.isChecked())
+        self._apply_block_archive(Path(directory) / "blocks")
+        if self.spool is not None:
+            if enabled and Path(directory) == self.spool.directory:
+                return
+            self.spool.stop(); self.spool = None
+        if enabled:
+            self.spool = ImageSpool(directory, on_saved=self.image_saved.emit)
+            try:
+                self.spool.start()
+            except OSError as exc:
+                self.spool = None
+                self._append_log(f"<b style='color:#e57373'>Автосохранение:</b> {exc}")
+
+    def _data_dir(self) -> Path:
+        return Path(self.edit_spool.text().strip() or str(DEFAULT_SPOOL_DIR))
+
+    def _on_ckpt_toggled(self, on):
+        self._settings.setValue("rx/checkpoints", on)
+        if not on:
+            for key in list(self._parked_ckpt):
+                self._drop_parked_checkpoint(key)
+        if not on and self.checkpoint is not None:
+            self.checkpoint.discard(); self.checkpoint = None
+        elif on and self.checkpoint is None and self.decoder.received_count:
+            self._open_checkpoint()
+
+    def _open_checkpoint(self):
+        if not isinstance(self.decoder, ErasureDecoder):
+            return   # контрольные точки — только для RS
+        try:
+            self.checkpoint = DecoderCheckpoint.create(self._data_dir() / "sessions", self.decoder)
+        except OSError as exc:
+            self.checkpoint = None
+            self._append_log(f"<b style='color:#e57373'>Контрольная точка:</b> {exc}")
+
+    def _restore_checkpoints(self):
+        """При запуске: поднять незавершённые сессии декодера из sessions/*.ckpt — последнюю
+        текущей, более старые — в отложенные до следующего круга, как до перезапуска."""
+        if not self.chk_ckpt.isChecked():
+            return
+        sessions = checkpoint.restore_all(self._data_dir() / "sessions")
+        if not sessions:
+            return
+        path, dec, _ = sessions[-1]
+        for old_path, old, _ in sessions[:-1]:
+            key = decoder_key(old)
+            if key == decoder_key(dec):
+                _unlink(old_path)
+                continue
+            self._drop_parked_checkpoint(key)   # файл того же изображения постарше
+            self._parked.put(key, old)
+            self._parked_ckpt[key] = old_path
+        if self._parked_ckpt:
+            self._append_log(f"Отложенных сеансов с диска: {len(self._parked_ckpt)}")
+        self._show_decoder(dec, "Сессия восстановлена", "восстановлено с диска")
+        if self.checkpoint is not None and self.checkpoint.path != path:
+            _unlink(path)   # файл со старым именем переписан под новым
+        if dec.can_decode:
+            self._try_recover()
+
+    def _show_decoder(self, dec: ErasureDecoder, title: str, note: str):
+        """Сделать dec текущим декодером с уже принятыми блоками: матрица, прогресс, контрольная точка."""
+        self.decoder = dec
+        self.matrix.set_total(dec.n_total)
+        for bid in dec.blocks:
+            if bid >= dec.k_data:
+                self.matrix.mark_parity(bid)
+            else:
+                self.matrix.mark(bid)
+        for _, bid in dec.extra:
+            self.matrix.mark_parity(bid)
+        self.progress.setMaximum(dec.k_data)
+        self.progress.setValue(min(dec.received_count, dec.k_data))
+        self.lbl_chunks.setText(f"{dec.received_count} / {dec.n_total}  ({note})")
+        self._append_log(
+            f"<b style='color:#64B5F6'>{title}</b>  call=<b>{dec.callsign}</b>  "
+            f"image={dec.image_id}  блоков {dec.received_count} из {dec.n_total} (K={dec.k_data})")
+        if self.chk_ckpt.isChecked():
+            self._open_checkpoint()
+
+    def _park_decoder(self):
+        """Отложить незавершённое изображение: с нарастающей чётностью тот же image_id
+        вернётся на следующем круге с новыми блоками чётности."""
+        d = self.decoder
+        if isinstance(d, ErasureDecoder) and d.received_count and not d.is_complete:
+            key = decoder_key(d)
+            self._parked.put(key, d)
+            if self.checkpoint is not None:   # файл остаётся с отложенным: переживёт и перезапуск
+                self.checkpoint.close()
+                self._parked_ckpt[key] = self.checkpoint.path
+                self.checkpoint = None
+        self.decoder = type(d)()
+
+    def _drop_parked_checkpoint(self, key: tuple):
+        """Отложенный сеанс забыт или снова стал текущим — его файл больше не нужен."""
+        path = self._parked_ckpt.pop(key, None)
+        if path is not None:
+            _unlink(path)
+
+    def _apply_block_archive(self, directory: Path):
+        want = self.chk_blocks.isChecked()
+        if self.block_archive is not None:
+            if want and self.block_archive.directory == directory:
+                return
+            self.block_archive.close(); self.block_archive = None
+        if want:
+            try:
+                self.block_archive = BlockArchiveWriter(directory)
+            except OSError as exc:
+                self._append_log(f"<b style='color:#e57373'>Архив блоков:</b> {exc}")
+
+    def _spool_current(self):
+        """Поставить текущее изображение (восстановленное или частичное) в очередь записи."""
+        d = self.decoder
+        if self.spool is None or self._spooled or d.received_count == 0:
+            return
+        data = d.assemble_partial()
+        if not data:
+            return
+        self._spooled = True
+        if not d.is_complete:
+            self.metrics.inc("images_partial_total")
+        n = self._telem_n
+        self.spool.submit(ImageRecord(
+            callsign=d.callsign, image_id=d.image_id or 0, file_size=d.file_size,
+            file_type=d.file_type, k_data=d.k_data, n_total=d.n_total,
+            blocks_rx=d.received_count, complete=d.is_complete,
+            rssi=self._rssi_sum / n if n else None,
+            snr=self._snr_sum / n / 4 if n else None,
+            decode_ms=self._decode_ms,
+        ), data)
+
+    def _on_image_saved(self, rec: ImageRecord):
+        tag = "Сохранено" if rec.complete else "Сохранено частично"
+        self._append_log(f"{tag}: <b>{Path(rec.path).name}</b>")
+        if self._tabs.tabText(self._tabs.currentIndex()).strip() == "Архив":
+            self._refresh_archive()
+
+    # ── memory ───────────────────────────────────────────────
+
+    def _on_mem_budget_changed(self, mb):
+        self._settings.setValue("rx/mem_budget_mb", mb)
+        self.budget.limit = mb << 20
+
+    def _account_memory(self):
+        """Раз в секунду: учёт памяти по подсистемам; сверх бюджета — отложенные сеансы на диск."""
+        b = self.budget
+        b.set("blocks", decoder_bytes(self.decoder))
+        b.set("parked", self._parked.hot_bytes)
+        labels = (self.img_label, self.lbl_archive_img) if self._archive_built else (self.img_label,)
+        b.set("preview", sum(_pixmap_bytes(lbl.pixmap()) for lbl in labels))
+        b.set("log", self.log.document().characterCount() * 2)   # UTF-16, без разметки — оценка снизу
+        b.set("capture", self.parser.buffered)
+        n = enforce(b, [self._parked])
+        if n:
+            self._append_log(f"<b style='color:#FFB74D'>Память:</b> на диск вытеснено отложенных сеансов: {n}")
+        if self._tabs.tabText(self._tabs.currentIndex()).strip() == "Настройки":
+            self.lbl_mem.setText(b.summary())
+
+    # ── profiling ────────────────────────────────────────────
+
+    def _on_profiling_toggled(self, on):
+        """Включить/выключить таймеры горячих путей и живую таблицу."""
+        self._settings.setValue("rx/profiling", on)
+        PROFILER.enabled = on
+        self.matrix.on_paint = (lambda s: PROFILER.add("paint", s)) if on else None
+        if on:
+            self._prof_timer.start(1000)
+        else:
+            self._prof_timer.stop()
+
+    def _refresh_profiling(self):
+        """Раз в секунду: таблица таймеров (только когда открыта вкладка «Настройки»)."""
+        if self._tabs.tabText(self._tabs.currentIndex()).strip() != "Настройки":
+            return
+        rows = PROFILER.snapshot()
+        self.tbl_prof.setRowCount(len(rows))
+        for i, r in enumerate(rows):
+            cells = [r["name"], str(r["count"]), f"{r['mean_ms']:.3f}", f"{r['p50_ms']:.3f}",
+                     f"{r['p90_ms']:.3f}", f"{r['p99_ms']:.3f}", f"{r['max_ms']:.2f}",
+                     f"{r['share'] * 100:.1f}%"]
+            for j, text in enumerate(cells):
+                self.tbl_prof.setItem(i, j, QTableWidgetItem(text))
+
+    def _reset_profiling(self):
+        PROFILER.reset()
+        self.tbl_prof.setRowCount(0)
+
+    def _export_profiling(self):
+        default = self._data_dir() / time.strftime("profile-%Y%m%d-%H%M%S.json")
+        path, _ = QFileDialog.getSaveFileName(self, "Экспорт таймеров", str(default), "JSON (*.json)")
+        if not path: return
+        PROFILER.export_json(Path(path))
+        self._append_log(f"Таймеры профилирования: <b>{path}</b>")
+
+    def _toggle_cprofile(self):
+        """Старт/стоп захвата cProfile; после остановки — сводка в карточке и файлы .prof/.txt."""
+        if not self._capture.running:
+            self._capture.start()
+            self.btn_cprofile.setText("Остановить cProfile")
+            self._append_log("<b style='color:#FFB74D'>cProfile:</b> захват запущен")
+            return
+        self._capture.stop()
+        self.btn_cprofile.setText("Запустить cProfile")
+        self.txt_cprofile.setPlainText(self._capture.summary())
+        self.txt_cprofile.show()
+        directory = self._data_dir() / "profiles"
+        try:
+            directory.mkdir(parents=True, exist_ok=True)
+            path = self._capture.dump(directory / time.strftime("cprofile-%Y%m%d-%H%M%S.prof"))
+        except OSError as e:
+            self._append_log(f"<b style='color:#e57373'>cProfile: не удалось сохранить</b> {e}")
+            return
+        self._append_log(f"<b style='color:#FFB74D'>cProfile:</b> {self._capture.duration_s:.1f} с → <b>{path}</b>")
+
+    # ── metrics ──────────────────────────────────────────────
+
+    def _apply_metrics_settings(self):
+        """Запустить/остановить HTTP-сервер метрик по флажку и порту."""
+        want = self.chk_metrics.isChecked()
+        port = self.sb_metrics_port.value()
+        self._settings.setValue("rx/metrics", want)
+        self._settings.setValue("rx/metrics_port", port)
+        if self.metrics_server is not None:
+            if want and self.metrics_server.port == port:
+                return
+            self.metrics_server.stop(); self.metrics_server = None
+        if want:
+            server = MetricsServer(self.metrics, port)
+            try:
+                server.start()
+            except OSError as exc:
+                self._append_log(f"<b style='color:#e57373'>Метрики:</b> {exc}")
+                return
+            self.metrics_server = server
+            self._publish_metrics()
+            self._append_log(f"<b style='color:#81C784'>Метрики</b>  http://127.0.0.1:{port}/metrics")
+
+    def _publish_metrics(self):
+        """Раз в секунду: показатели состояния и новый снимок для HTTP-потока."""
+        d = self.decoder
+        state = ("recovered" if self._recovery_done else "decodable" if d.can_decode
+                 else "receiving" if d.received_count else "")
+        counts = {"parked": self._parked.hot, "spilled": self._parked.cold}
+        if state:
+            counts[state] = 1
+        m = self.metrics
+        m.set_parser(self.parser.stats)
+        m.set_sessions(counts)
+        m.set("parser_buffer_bytes", self.parser.buffered)
+        m.set_memory(self.budget, rss_bytes())
+        m.set("sessions_spilled_total", self._parked.spilled_total)
+        m.set("queue_depth", len(self._parked), queue="parked")
+        m.set("queue_depth", self.spool.pending if self.spool else 0, queue="spool")
+        m.publish()
+
     def _on_theme_changed(self):
         theme = Theme(self.cb_theme.currentData())
         save_theme(theme); apply_theme(QApplication.instance(), theme)
@@ -241,6 +858,7 @@ class MainWindow(QMainWindow):
     def _refresh_ports(self):
         self.cb_port.clear()
         if HAS_SERIAL:
+            import serial.tools.list_ports
             for p in serial.tools.list_ports.comports():
                 self.cb_port.addItem(p.device)
         if self.cb_port.count() == 0:
@@ -253,11 +871,17 @@ class MainWindow(QMainWindow):
             self.serial_worker.stop(); self.serial_worker.wait(2000); return
         port = self.cb_port.currentText()
         if not port or port.startswith("("): return
-        baud = int(self.cb_baud.currentText())
-        self.serial_worker = SerialWorker(port, baud)
-        self.serial_worker.data_received.connect(self._on_raw_data)
+        try:
+            baud = int(self.cb_baud.currentText())
+        except ValueError:
+            self._append_log("<b style='color:#e57373'>COM:</b> неверная скорость"); return
+        self.serial_worker = SerialWorker(port, baud, self.cb_flow.currentData())
+        self.serial_worker.data_received.connect(
+            lambda d, ts, src=f"com:{port}": self._on_raw_data(d, ts, src))
         self.serial_worker.error_occurred.connect(
             lambda e: self._append_log(f"<b style='color:#e57373'>COM:</b> {e}"))
+        self.serial_worker.overrun_detected.connect(
+            lambda e: self._append_log(f"<b style='color:#FFB74D'>COM переполнение:</b> {e}"))
         self.serial_worker.connection_changed.connect(self._on_serial_state)
         self.serial_worker.start()
 
@@ -272,7 +896,8 @@ class MainWindow(QMainWindow):
             self.tcp_worker.stop(); self.tcp_worker.wait(2000); return
         port = self.sb_tcp_port.value()
         self.tcp_worker = TcpServerWorker(port)
-        self.tcp_worker.data_received.connect(self._on_raw_data)
+        self.tcp_worker.data_received.connect(
+            lambda d, ts, src=f"tcp:{port}": self._on_raw_data(d, ts, src))
         self.tcp_worker.error_occurred.connect(
             lambda e: self._append_log(f"<b style='color:#e57373'>TCP:</b> {e}"))
         self.tcp_worker.connection_changed.connect(self._on_tcp_state)
@@ -295,6 +920,31 @@ class MainWindow(QMainWindow):
         else:
             self._append_log("Клиент отключился")
 
+    # ── UDP ──────────────────────────────────────────────────
+
+    def _toggle_udp(self):
+        if self.udp_worker and self.udp_worker.isRunning():
+            self.udp_worker.stop(); self.udp_worker.wait(2000); return
+        group = self.edit_udp_group.text().strip()
+        self._settings.setValue("rx/udp_group", group)
+        self._settings.setValue("rx/udp_port", self.sb_udp_port.value())
+        self.udp_worker = UdpReceiverWorker(self.sb_udp_port.value(), group)
+        self.udp_worker.data_received.connect(
+            lambda d, ts, src=f"udp:{self.sb_udp_port.value()}": self._on_raw_data(d, ts, src))
+        self.udp_worker.error_occurred.connect(
+            lambda e: self._append_log(f"<b style='color:#e57373'>UDP:</b> {e}"))
+        self.udp_worker.connection_changed.connect(self._on_udp_state)
+        self.udp_worker.start()
+
+    def _on_udp_state(self, listening):
+        self.btn_udp.setText("Стоп" if listening else "Слушать")
+        if listening:
+            group = self.edit_udp_group.text().strip()
+            self._append_log(f"<b style='color:#81C784'>UDP :{self.sb_udp_port.value()}</b>"
+                             + (f"  группа {group}" if group else ""))
+        else:
+            self._append_log("UDP остановлен")
+
     # ── packet processing ────────────────────────────────────
 
     def _reset_state(self):
@@ -303,39 +953,68 @@ class MainWindow(QMainWindow):
         self.decoder.reset()
         self.matrix.clear_all()
         self.progress.setValue(0); self.progress.setMaximum(1)
-        self._start_time = None; self._bytes_rx = 0
+        self._start_time = None; self._last_rx_ts = None; self._bytes_rx = 0
         self._last_preview_cnt = 0; self._recovery_done = False
+        self._spooled = False; self._decode_ms = None
+        if self.checkpoint is not None:
+            self.checkpoint.discard(); self.checkpoint = None
+        self._rssi_sum = 0; self._snr_sum = 0; self._telem_n = 0
         self.btn_save.setEnabled(False)
         self.img_label.clear()
         self.lbl_chunks.setText("Ожидание FEC...")
 
-    def _on_raw_data(self, raw: bytes):
-        """Сырые байты от COM/TCP: передаём в парсер, обрабатываем FEC и TELEM."""
+    def _on_raw_data(self, raw: bytes, ts: Optional[float] = None, source: str = ""):
+        """Сырые байты от COM/TCP/UDP (ts — момент прихода): передаём в парсер, обрабатываем FEC и TELEM."""
+        if ts is None:
+            ts = time.monotonic()
         self._bytes_rx += len(raw)
+        self.metrics.inc("ingest_bytes_total", len(raw), source=source or "local")
+        self._last_rx_ts = ts
         if self._start_time is None:
-            self._start_time = time.time()
-        for obj in self.parser.feed(raw):
+            self._start_time = ts
+        with PROFILER.timer("parse"):
+            objs = self.parser.feed(raw)
+        for obj in objs:
             if isinstance(obj, FECPacket):
                 self._handle_fec(obj)
+            elif isinstance(obj, RatelessPacket):
+                self._handle_rateless(obj)
             elif isinstance(obj, TelemInfo):
                 self._handle_telem(obj)
 
     def _handle_fec(self, pkt: FECPacket):
         """Добавить FEC-пакет в декодер, обновить матрицу/прогресс, при достаточном числе блоков — восстановить файл."""
-        new_image = (self.decoder.image_id is not None
-                     and pkt.image_id != self.decoder.image_id)
-        if new_image:
-            self._reset_state(); self._start_time = time.time()
+        cls = CauchyDecoder if pkt.code == CODE_CAUCHY16 else ErasureDecoder
+        if type(self.decoder) is not cls:
+            self._switch_decoder(cls())
+        elif self.decoder.image_id is not None and key_of(pkt) != decoder_key(self.decoder):
+            self._spool_current()
+            self._park_decoder()
+            self._reset_state(); self._start_time = self._last_rx_ts = time.monotonic()
+            parked = self._parked.pop(key_of(pkt))
+            self._drop_parked_checkpoint(key_of(pkt))   # _show_decoder пишет файл заново
+            if parked is not None:
+                self._show_decoder(parked, "Продолжение", "прошлый круг")
 
         first = self.decoder.received_count == 0
-        self.decoder.add_packet(pkt)
+        with PROFILER.timer("add_packet"):
+            self.decoder.add_packet(pkt)
+        if self.block_archive is not None:
+            self.block_archive.append(pkt)
+        if self.checkpoint is not None:
+            if pkt.cycle and pkt.is_parity:
+                self.checkpoint.store_extra(pkt.cycle, pkt.block_id, self.decoder.extra[(pkt.cycle, pkt.block_id)])
+            elif pkt.block_id in self.decoder.blocks:
+                self.checkpoint.store(pkt.block_id, self.decoder.blocks[pkt.block_id])
+        elif first and self.chk_ckpt.isChecked():
+            self._open_checkpoint()
 
         if first:
             self.matrix.set_total(pkt.n_total)
             self.progress.setMaximum(pkt.k_data)
             k, m = pkt.k_data, pkt.n_total - pkt.k_data
             self._append_log(
-                f"<b style='color:#64B5F6'>FEC</b>  "
+                f"<b style='color:#64B5F6'>{'Коши' if pkt.code else 'FEC'}</b>  "
                 f"call=<b>{pkt.callsign}</b>  image={pkt.image_id}  "
                 f"K={k}  M={m}  file={pkt.file_size} Б")
 
@@ -346,7 +1025,8 @@ class MainWindow(QMainWindow):
 
         cnt = self.decoder.received_count
         k = self.decoder.k_data
-        elapsed = time.time() - (self._start_time or time.time())
+        now = self._last_rx_ts or time.monotonic()
+        elapsed = now - (self._start_time or now)
         speed = self._bytes_rx / max(elapsed, 0.01)
 
         need = max(k - cnt, 0)
@@ -358,43 +1038,121 @@ class MainWindow(QMainWindow):
         if self.decoder.can_decode and not self._recovery_done:
             self._try_recover()
 
+    def _switch_decoder(self, decoder):
+        """Сменился движок FEC (RS ↔ Коши ↔ rateless): текущее изображение в spool, декодер другого типа."""
+        if self.decoder.received_count:
+            self._spool_current()
+            self._reset_state(); self._start_time = self._last_rx_ts = time.monotonic()
+        self.decoder = decoder
+
+    def _handle_rateless(self, pkt: RatelessPacket):
+        """Символ фонтанного кода: ранг системы растёт с каждым независимым пакетом любого прохода."""
+        if not isinstance(self.decoder, RatelessDecoder):
+            self._switch_decoder(RatelessDecoder())
+        elif self.decoder.image_id is not None and pkt.image_id != self.decoder.image_id:
+            self._spool_current()
+            self._reset_state(); self._start_time = self._last_rx_ts = time.monotonic()
+
+        dec = self.decoder
+        if dec.received_count == 0:
+            self.matrix.set_total(pkt.k_data)
+            self.progress.setMaximum(pkt.k_data)
+            self._append_log(
+                f"<b style='color:#64B5F6'>Rateless</b>  "
+                f"call=<b>{pkt.callsign}</b>  image={pkt.image_id}  "
+                f"K={pkt.k_data}  file={pkt.file_size} Б")
+        if self._recovery_done:
+            return
+        with PROFILER.timer("add_packet"):
+            dec.add_packet(pkt)
+        if not pkt.is_parity:
+            self.matrix.mark(pkt.esi)
+
+        rank, k = dec.rank, dec.k_data
+        now = self._last_rx_ts or time.monotonic()
+        speed = self._bytes_rx / max(now - (self._start_time or now), 0.01)
+        self.progress.setValue(rank)
+        self.lbl_chunks.setText(
+            f"ранг {rank} / {k}  (пакетов {dec.received_count}, "
+            f"ещё {k - rank} до восстановления)  —  {speed / 1024:.1f} КБ/с")
+
+        if dec.can_decode:
+            for i in range(k):
+                if i not in dec.blocks:
+                    self.matrix.mark_parity(i)   # блок получен решением системы
+            self._try_recover()
+
     def _try_recover(self):
         """Запуск Reed-Solomon декодирования: из любых K из N блоков восстанавливаем файл."""
-        self._append_log("Запуск RS-декодирования...")
-        result = self.decoder.decode()
+        self._append_log("Запуск RS-декодирования..." if isinstance(self.decoder, ErasureDecoder)
+                         else "Декодирование кода Коши..." if isinstance(self.decoder, CauchyDecoder)
+                         else "Сборка rateless...")
+        code = ("rs" if isinstance(self.decoder, ErasureDecoder)
+                else "cauchy" if isinstance(self.decoder, CauchyDecoder) else "rateless")
+        t0 = time.perf_counter()
+        with PROFILER.timer("decode"):
+            result = self.decoder.decode()
         if result is not None:
+            dt = time.perf_counter() - t0
+            self._decode_ms = dt * 1000
             self._recovery_done = True
+            self.metrics.inc("images_recovered_total", code=code)
+            self.metrics.observe("decode_seconds", dt, code=code)
             self._append_log(
                 f"<b style='color:#81C784'>Файл восстановлен 1:1</b>  "
                 f"({len(result)} Б)")
             self.btn_save.setEnabled(True)
             self.progress.setValue(self.decoder.k_data)
             self._refresh_preview()
+            self._spool_current()
+            if self.checkpoint is not None:
+                self.checkpoint.discard(); self.checkpoint = None
         else:
+            self.metrics.inc("decode_failures_total", code=code)
             self._append_log("<b style='color:#e57373'>RS decode failed</b>")
 
+    def _check_stream_errors(self):
+        """Раз в секунду: сообщить о кадрах с sync, но неверным CRC (вероятная потеря байт в UART)."""
+        if self.block_archive is not None:
+            self.block_archive.flush()
+        if self.checkpoint is not None:
+            self.checkpoint.flush()
+        self._account_memory()
+        if self.metrics_server is not None:
+            self._publish_metrics()
+        st = self.parser.stats
+        new = st.fec_crc_errors - self._crc_errors_seen
+        if new > 0:
+            self._crc_errors_seen = st.fec_crc_errors
+            self._append_log(
+                f"<b style='color:#FFB74D'>Обрезанные кадры:</b> +{new} "
+                f"(всего {st.fec_crc_errors}, отброшено {st.bytes_skipped} Б)")
+
     def _handle_telem(self, t: TelemInfo):
         """Обновление полей телеметрии (RSSI, SNR, мощность TX) и полоски RSSI."""
         self.lbl_rssi.setText(f"RSSI: {t.rssi} дБм")
         self.lbl_snr.setText(f"SNR: {t.snr / 4:.1f} дБ")
         self.lbl_txpower.setText(f"TX: {t.tx_power} дБм")
         self.bar_rssi.setValue(max(t.rssi, -140))
+        self._rssi_sum += t.rssi; self._snr_sum += t.snr; self._telem_n += 1
+        self.metrics.set_telem(t)
 
     # ── preview & save ───────────────────────────────────────
 
     def _refresh_preview(self):
-        """Периодически (по таймеру) обновлять превью: собрать данные из декодера и отобразить как изображение."""
+        """Периодически (по таймеру) обновлять превью: лучшее изображение из принятых блоков (preview.py)."""
         cnt = self.decoder.received_count
         if cnt == 0 or cnt == self._last_preview_cnt:
             return
         self._last_preview_cnt = cnt
-        data = self.decoder.assemble_partial()
-        if not data:
-            return
-        px = QPixmap()
-        if px.loadFromData(data):
-            self.img_label.setPixmap(px.scaled(
-                self.img_label.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation))
+        with PROFILER.timer("preview"):
+            data = preview_bytes(self.decoder)
+            if not data:
+                return
+            px = QPixmap()
+            if px.loadFromData(data):
+                self.img_label.setPixmap(px.scaled(
+                    self.img_label.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation))
 
     def _save_image(self):
         """Сохранить восстановленные данные в файл через диалог выбора имени."""
@@ -413,9 +1171,19 @@ class MainWindow(QMainWindow):
     # ── cleanup ──────────────────────────────────────────────
 
     def closeEvent(self, event):
-        for w in (self.serial_worker, self.tcp_worker):
+        for w in (self.serial_worker, self.tcp_worker, self.udp_worker):
             if w and w.isRunning():
                 w.stop(); w.wait(2000)
+        if self.spool is not None:
+            self._spool_current()
+            self.spool.stop()
+        if self.block_archive is not None:
+            self.block_archive.close()
+        if self.checkpoint is not None:
+            self.checkpoint.close()   # незавершённая сессия поднимется при следующем запуске
+        if self.metrics_server is not None:
+            self.metrics_server.stop()
+        self._parked.close()
         event.accept()
 
 
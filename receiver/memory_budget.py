@@ -0,0 +1,219 @@
+"""Бюджет памяти приёмника для многочасовых полётов: учёт по подсистемам и вытеснение на диск.
+
+MemoryBudget — сколько байт держит каждая подсистема (SUBSYSTEMS) и общий
+предел. Учёт обновляется раз в секунду там же, где снимок метрик: блоки
+текущих декодеров, отложенные сеансы, превью, лог, буферы приёма.
+
+ParkedSessions — отложенные до следующего круга незавершённые изображения.
+Горячие (последние PARKED_MAX) лежат в памяти; более старые, а также те,
+что не помещаются в бюджет (enforce()), пишутся во временный файл и
+поднимаются обратно, когда image_id возвращается в эфир. На диске — не
+больше SPILL_MAX сеансов: самые старые удаляются (их блоки остаются в
+архиве blocks/*.lla, если он включён, — для recover_archive.py).
+"""
+
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+from erasure_fec import ErasureDecoder
+
+DEFAULT_BUDGET_MB = 256
+# Отложенных сеансов в памяти и на диске (на один поток приёма)
+PARKED_MAX = 8
+SPILL_MAX = 64
+
+# подсистема → описание (для метрик и подписи в настройках)
+SUBSYSTEMS = {
+    "blocks": "блоки декодеров",
+    "parked": "отложенные сеансы",
+    "preview": "превью",
+    "log": "лог",
+    "capture": "буферы приёма",
+}
+
+
+def rss_bytes() -> Optional[int]:
+    """Резидентная память процесса (Linux: /proc/self/statm); None, где её так не узнать."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def decoder_bytes(d) -> int:
+    """Оценка памяти декодера любого типа: словари блоков, строки решателя, восстановленный файл."""
+    n = 0
+    solver = getattr(d, "_solver", None)
+    for store in (d.blocks, getattr(d, "extra", None), getattr(solver, "rows", None)):
+        if store:
+            n += sys.getsizeof(store) + sum(sys.getsizeof(v) for v in store.values())
+    decoded = getattr(d, "_decoded", None)
+    if decoded is not None:
+        n += sys.getsizeof(decoded)
+    return n
+
+
+def _mb(n: int) -> str:
+    return f"{n / (1 << 20):.1f} МБ"
+
+
+class MemoryBudget:
+    """Учтённые байты по подсистемам и предел; over > 0 — пора вытеснять."""
+
+    def __init__(self, limit_mb: float = DEFAULT_BUDGET_MB):
+        self.limit = int(limit_mb * (1 << 20))
+        self.used: dict[str, int] = dict.fromkeys(SUBSYSTEMS, 0)
+
+    def set(self, name: str, nbytes: int):
+        SUBSYSTEMS[name]   # KeyError для опечатки в имени
+        self.used[name] = max(0, nbytes)
+
+    def add(self, name: str, delta: int):
+        self.set(name, self.used[name] + delta)
+
+    @property
+    def total(self) -> int:
+        return sum(self.used.values())
+
+    @property
+    def over(self) -> int:
+        return self.total - self.limit
+
+    def summary(self) -> str:
+        parts = "  ·  ".join(f"{SUBSYSTEMS[k]} {_mb(v)}" for k, v in self.used.items())
+        return f"{_mb(self.total)} из {_mb(self.limit)}:  {parts}"
+
+
+# ═══════════════════════════════════════════════════════════════
+#  Отложенные сеансы
+# ═══════════════════════════════════════════════════════════════
+
+class ParkedSessions:
+    """Отложенные декодеры по ключу (ImageKey из block_archive.py): горячие в памяти, холодные в файлах."""
+
+    def __init__(self, max_hot: int = PARKED_MAX, max_cold: int = SPILL_MAX,
+                 on_drop: Optional[Callable[[tuple], None]] = None):
+        self.max_hot = max_hot
+        self.max_cold = max_cold
+        self.on_drop = on_drop   # сеанс забыт совсем (диск недоступен или холодных больше max_cold)
+        self._hot: dict[tuple, tuple[float, ErasureDecoder, int]] = {}   # → (время, декодер, байт)
+        self._cold: dict[tuple, Path] = {}
+        self._dir: Optional[Path] = None   # создаётся при первом вытеснении
+        self._seq = 0
+        self.hot_bytes = 0
+        self.spilled_total = 0
+        self.dropped_total = 0
+
+    def __len__(self) -> int:
+        return len(self._hot) + len(self._cold)
+
+    @property
+    def hot(self) -> int:
+        return len(self._hot)
+
+    @property
+    def cold(self) -> int:
+        return len(self._cold)
+
+    @property
+    def oldest(self) -> float:
+        """Время, когда отложен самый старый горячий сеанс (inf, если их нет)."""
+        return next(iter(self._hot.values()))[0] if self._hot else float("inf")
+
+    def put(self, key: tuple, d: ErasureDecoder):
+        self._forget(key)
+        size = decoder_bytes(d)
+        self._hot[key] = (time.monotonic(), d, size)
+        self.hot_bytes += size
+        while len(self._hot) > self.max_hot:
+            self.spill_oldest()
+
+    def pop(self, key: tuple) -> Optional[ErasureDecoder]:
+        """Забрать сеанс (из памяти или с диска); None — такого нет или файл не читается."""
+        item = self._hot.pop(key, None)
+        if item is not None:
+            self.hot_bytes -= item[2]
+            return item[1]
+        path = self._cold.pop(key, None)
+        if path is None:
+            return None
+        try:
+            with open(path, "rb") as f:
+                d = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            d = None
+        self._unlink(path)
+        return d
+
+    def spill_oldest(self) -> int:
+        """Самый давно отложенный горячий сеанс — в файл; вернуть освобождённые байты."""
+        if not self._hot:
+            return 0
+        key = next(iter(self._hot))
+        _, d, size = self._hot.pop(key)
+        self.hot_bytes -= size
+        try:
+            if self._dir is None:
+                self._dir = Path(tempfile.mkdtemp(prefix="lorettlink-spill-"))
+            self._seq += 1
+            path = self._dir / f"{self._seq}.spill"
+            with open(path, "wb") as f:
+                pickle.dump(d, f, pickle.HIGHEST_PROTOCOL)
+        except OSError:
+            self._dropped(key)   # диск недоступен — как раньше, сеанс просто забывается
+            return size
+        self._cold[key] = path
+        self.spilled_total += 1
+        while len(self._cold) > self.max_cold:
+            old = next(iter(self._cold))
+            self._unlink(self._cold.pop(old))
+            self._dropped(old)
+        return size
+
+    def close(self):
+        """Забыть все сеансы и удалить файлы вытеснения."""
+        self._hot.clear(); self._cold.clear()
+        self.hot_bytes = 0
+        if self._dir is not None:
+            shutil.rmtree(self._dir, ignore_errors=True)
+            self._dir = None
+
+    def _dropped(self, key: tuple):
+        self.dropped_total += 1
+        if self.on_drop is not None:
+            self.on_drop(key)
+
+    def _forget(self, key: tuple):
+        item = self._hot.pop(key, None)
+        if item is not None:
+            self.hot_bytes -= item[2]
+        path = self._cold.pop(key, None)
+        if path is not None:
+            self._unlink(path)
+
+    @staticmethod
+    def _unlink(path: Path):
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+
+def enforce(budget: MemoryBudget, stores: Iterable[ParkedSessions]) -> int:
+    """Пока учтённая память выше бюджета — вытеснять самый давно отложенный сеанс; вернуть их число."""
+    stores = list(stores)
+    spilled = 0
+    while budget.over > 0:
+        store = min((s for s in stores if s.hot), key=lambda s: s.oldest, default=None)
+        if store is None:
+            break
+        budget.add("parked", -store.spill_oldest())
+        spilled += 1
+    return spilled
@@ -0,0 +1,249 @@
+"""Метрики наземной станции в текстовом формате Prometheus: GET /metrics по HTTP.
+
+Поток приёма (GUI или headless_receiver.py) меняет счётчики в обычных словарях
+без блокировок и раз в секунду вызывает publish(): копии словарей собираются в
+неизменяемый снимок, и ссылка на него подменяется одним присваиванием.
+HTTP-сервер в своём потоке рендерит только последний снимок, так что опрос
+Prometheus не касается ни парсера, ни декодера и не ждёт их.
+
+    m = Metrics(); MetricsServer(m, port=9108).start()
+    m.inc("ingest_bytes_total", len(chunk), source="tcp:12000")
+    m.observe("decode_seconds", 0.8, code="rs")
+    m.publish()
+
+Имена пишутся без префикса; в выдаче у всех — lorettlink_. Набор метрик и их
+описания — METRICS ниже; неизвестное имя — KeyError сразу в месте вызова.
+"""
+
+import functools
+import threading
+import time
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:   # только для аннотаций: метрикам не нужен стек FEC при импорте
+    from memory_budget import MemoryBudget
+    from protocol import ParserStats, TelemInfo
+
+PREFIX = "lorettlink_"
+DEFAULT_PORT = 9108
+DEFAULT_HOST = "127.0.0.1"
+
+# Границы гистограммы времени декодирования, с: RS и Коши — миллисекунды, большие файлы на слабом ПК — секунды
+DECODE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Сеанс декодера: принимает блоки, набрал K (ждёт decode), восстановлен,
+# отложен до следующего круга (в памяти / вытеснен на диск)
+SESSION_STATES = ("receiving", "decodable", "recovered", "parked", "spilled")
+
+# имя → (тип, описание[, границы гистограммы])
+METRICS = {
+    "parser_frames_total": ("counter", "Кадры, разобранные StreamParser (kind=fec|telem)"),
+    "parser_crc_errors_total": ("counter", "Кадры с sync, но неверным CRC (kind=fec|telem)"),
+    "parser_bytes_skipped_total": ("counter", "Байты мусора между кадрами"),
+    "parser_overflows_total": ("counter", "Переполнения буфера парсера"),
+    "ingest_bytes_total": ("counter", "Принятые байты по источникам"),
+    "decoder_sessions": ("gauge", "Сеансы декодера по состояниям"),
+    "images_recovered_total": ("counter", "Изображения, восстановленные 1:1 (code=rs|cauchy|rateless)"),
+    "images_partial_total": ("counter", "Изображения, сохранённые без восстановления"),
+    "decode_failures_total": ("counter", "Набрано K блоков, но decode() не вернул файл"),
+    "decode_seconds": ("histogram", "Время decode() при восстановлении изображения", DECODE_BUCKETS),
+    "telem_rssi_dbm": ("gauge", "RSSI последнего TELEM, дБм"),
+    "telem_snr_db": ("gauge", "SNR последнего TELEM, дБ"),
+    "telem_tx_power_dbm": ("gauge", "Мощность передатчика из последнего TELEM, дБм"),
+    "telem_last_timestamp_seconds": ("gauge", "Время прихода последнего TELEM (unix)"),
+    "queue_depth": ("gauge", "Глубина очередей (queue=spool|parked|ingest)"),
+    "parser_buffer_bytes": ("gauge", "Неразобранные байты в буферах парсеров"),
+    "start_time_seconds": ("gauge", "Время запуска приёмника (unix)"),
+    "memory_bytes": ("gauge", "Учтённая память по подсистемам (subsystem=blocks|parked|preview|log|capture)"),
+    "memory_budget_bytes": ("gauge", "Бюджет памяти приёмника"),
+    "memory_rss_bytes": ("gauge", "Резидентная память процесса"),
+    "sessions_spilled_total": ("counter", "Отложенные сеансы, вытесненные на диск"),
+}
+
+
+def _labels(labels: dict) -> tuple:
+    return tuple(sorted(labels.items()))
+
+
+def _esc(v) -> str:
+    return str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _fmt_labels(pairs, extra: Optional[tuple] = None) -> str:
+    items = list(pairs) + ([extra] if extra else [])
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{_esc(v)}"' for k, v in items) + "}"
+
+
+def _fmt_value(v: float) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if isinstance(v, float) and not v.is_integer() else str(int(v))
+
+
+class Metrics:
+    """Счётчики, показатели и гистограммы одного приёмника.
+
+    inc/set/observe вызываются только из потока приёма; publish() — оттуда же.
+    render() безопасно вызывать из любого потока: он читает только снимок.
+    """
+
+    def __init__(self):
+        self._values: dict[tuple, float] = {}          # (имя, метки) → значение
+        self._hist: dict[tuple, list] = {}             # (имя, метки) → [счётчики корзин…, сумма, число]
+        self._snapshot: tuple = (0.0, {}, {})
+        self.set("start_time_seconds", time.time())
+
+    def inc(self, name: str, value: float = 1, **labels):
+        METRICS[name]   # KeyError для опечатки в имени — сразу, а не пустой ряд в Prometheus
+        key = (name, _labels(labels))
+        self._values[key] = self._values.get(key, 0) + value
+
+    def set(self, name: str, value: float, **labels):
+        METRICS[name]
+        self._values[(name, _labels(labels))] = value
+
+    def observe(self, name: str, value: float, **labels):
+        buckets = METRICS[name][2]
+        key = (name, _labels(labels))
+        h = self._hist.get(key)
+        if h is None:
+            h = self._hist[key] = [0] * len(buckets) + [0.0, 0]
+        for i, le in enumerate(buckets):
+            if value <= le:
+                h[i] += 1
+        h[-2] += value
+        h[-1] += 1
+
+    def total(self, name: str) -> float:
+        """Сумма ряда name по всем меткам (текущие значения, не снимок)."""
+        METRICS[name]
+        return sum(v for (n, _), v in self._values.items() if n == name)
+
+    # ── сводные обновления ───────────────────────────────────
+
+    def set_parser(self, stats: "ParserStats"):
+        """Счётчики парсера (накопленные самим ParserStats — выставляются, а не прибавляются)."""
+        self.set("parser_frames_total", stats.fec_ok, kind="fec")
+        self.set("parser_frames_total", stats.telem_ok, kind="telem")
+        self.set("parser_crc_errors_total", stats.fec_crc_errors, kind="fec")
+        self.set("parser_crc_errors_total", stats.telem_crc_errors, kind="telem")
+        self.set("parser_bytes_skipped_total", stats.bytes_skipped)
+        self.set("parser_overflows_total", stats.overflows)
+
+    def set_telem(self, t: "TelemInfo"):
+        self.set("telem_rssi_dbm", t.rssi)
+        self.set("telem_snr_db", t.snr / 4)
+        self.set("telem_tx_power_dbm", t.tx_power)
+        self.set("telem_last_timestamp_seconds", time.time())
+
+    def set_sessions(self, counts: dict[str, int]):
+        """Число сеансов по состояниям; отсутствующие в counts — 0, чтобы ряд не пропадал."""
+        for state in SESSION_STATES:
+            self.set("decoder_sessions", counts.get(state, 0), state=state)
+
+    def set_memory(self, budget: "MemoryBudget", rss: Optional[int]):
+        for name, used in budget.used.items():
+            self.set("memory_bytes", used, subsystem=name)
+        self.set("memory_budget_bytes", budget.limit)
+        if rss is not None:
+            self.set("memory_rss_bytes", rss)
+
+    # ── снимок и выдача ──────────────────────────────────────
+
+    def publish(self):
+        """Сделать текущие значения видимыми для HTTP-потока."""
+        self._snapshot = (time.time(), dict(self._values),
+                          {k: list(v) for k, v in self._hist.items()})
+
+    def render(self) -> str:
+        """Текст для /metrics (формат exposition 0.0.4) из последнего снимка."""
+        ts, values, hist = self._snapshot
+        by_name: dict[str, list] = {}
+        for (name, labels), v in values.items():
+            by_name.setdefault(name, []).append((labels, v))
+        for (name, labels), h in hist.items():
+            by_name.setdefault(name, []).append((labels, h))
+        out = []
+        for name, (kind, help_text, *rest) in METRICS.items():
+            series = by_name.get(name)
+            if not series:
+                continue
+            full = PREFIX + name
+            out.append(f"# HELP {full} {help_text}")
+            out.append(f"# TYPE {full} {kind}")
+            for labels, v in sorted(series):
+                if kind != "histogram":
+                    out.append(f"{full}{_fmt_labels(labels)} {_fmt_value(v)}")
+                    continue
+                for le, n in zip(rest[0] + (float("inf"),), v[:-2] + [v[-1]]):
+                    out.append(f"{full}_bucket{_fmt_labels(labels, ('le', _fmt_value(le)))} {n}")
+                out.append(f"{full}_sum{_fmt_labels(labels)} {_fmt_value(v[-2])}")
+                out.append(f"{full}_count{_fmt_labels(labels)} {v[-1]}")
+        out.append(f"# HELP {PREFIX}snapshot_timestamp_seconds Время последнего снимка (unix)")
+        out.append(f"# TYPE {PREFIX}snapshot_timestamp_seconds gauge")
+        out.append(f"{PREFIX}snapshot_timestamp_seconds {_fmt_value(ts)}")
+        return "\n".join(out) + "\n"
+
+
+# ═══════════════════════════════════════════════════════════════
+#  HTTP-сервер
+# ═══════════════════════════════════════════════════════════════
+
+@functools.lru_cache(maxsize=None)
+def _handler_class():
+    """Обработчик GET /metrics; http.server (~70 мс импорта) грузится, только когда сервер запускают."""
+    from http.server import BaseHTTPRequestHandler
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] not in ("/metrics", "/"):
+                self.send_error(404)
+                return
+            body = self.server.metrics.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *_args):
+            pass
+
+    return Handler
+
+
+class MetricsServer:
+    """GET /metrics в фоновом потоке; по умолчанию слушает только localhost."""
+
+    def __init__(self, metrics: Metrics, port: int = DEFAULT_PORT, host: str = DEFAULT_HOST):
+        self.metrics = metrics
+        self.host = host
+        self.port = port
+        self._httpd = None     # http.server.ThreadingHTTPServer
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._httpd is not None
+
+    def start(self):
+        """Открыть порт (OSError, если занят) и обслуживать запросы в потоке-демоне."""
+        from http.server import ThreadingHTTPServer
+        httpd = ThreadingHTTPServer((self.host, self.port), _handler_class())
+        httpd.daemon_threads = True
+        httpd.metrics = self.metrics
+        self.port = httpd.server_address[1]
+        self._httpd = httpd
+        self._thread = threading.Thread(target=httpd.serve_forever, name="MetricsServer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._httpd is None:
+            return
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        self._thread.join(2.0)
+        self._httpd = None
+        self._thread = None
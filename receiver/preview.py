@@ -0,0 +1,65 @@
+"""Превью незавершённого изображения: лучшее, что декодируется из принятых блоков.
+
+assemble_partial() ставит блоки данных по местам и заполняет дыры нулями —
+для базового JPEG это верхняя полоса до первой дыры, дальше мусор. Прогрессивный
+JPEG (передатчик: progressive.py, порядок progressive) устроен иначе: каждый
+скан уточняет всё изображение, поэтому его непрерывное начало, закрытое маркером
+EOI, — целая картинка, сначала грубая. Блоки после первой дыры в превью не
+идут: в энтропийных данных они без предыдущих бесполезны.
+"""
+
+from typing import Optional
+
+from erasure_fec import BLOCK_PAYLOAD, FTYPE_JPEG
+
+_SOI = b"\xff\xd8"
+_EOI = b"\xff\xd9"
+
+
+def prefix_len(d) -> int:
+    """Байт файла, принятых подряд с начала (блоки данных 0, 1, … без дыр)."""
+    i = 0
+    while i < d.k_data and i in d.blocks:
+        i += 1
+    return min(i * BLOCK_PAYLOAD, d.file_size)
+
+
+def first_scan(data: bytes) -> Optional[tuple[bool, int]]:
+    """(прогрессивный ли кадр, конец заголовка первого SOS) или None, если заголовок ещё не принят."""
+    if data[:2] != _SOI:
+        return None
+    pos, progressive = 2, False
+    while pos + 4 <= len(data):
+        if data[pos] != 0xFF:
+            return None
+        marker = data[pos + 1]
+        if marker == 0xFF:          # байт заполнения
+            pos += 1
+            continue
+        end = pos + 2 + int.from_bytes(data[pos + 2:pos + 4], "big")
+        if marker == 0xC2:
+            progressive = True
+        if marker == 0xDA:
+            return (progressive, end) if end <= len(data) else None
+        pos = end
+    return None
+
+
+def jpeg_prefix(d) -> Optional[bytes]:
+    """Непрерывное начало прогрессивного JPEG + EOI; None — не тот случай (файл не JPEG,
+    базовый, заголовок не принят или изображение уже целое)."""
+    if d.file_type != FTYPE_JPEG or getattr(d, "_decoded", None) is not None:
+        return None
+    n = prefix_len(d)
+    if n >= d.file_size:
+        return None
+    data = b"".join(d.blocks[i] for i in range(-(-n // BLOCK_PAYLOAD)))[:n]
+    scan = first_scan(data)
+    if scan is None or not scan[0] or scan[1] >= n:
+        return None
+    return data + _EOI
+
+
+def preview_bytes(d) -> bytes:
+    """Что показывать в превью: начало прогрессивного JPEG или, как раньше, assemble_partial()."""
+    return jpeg_prefix(d) or d.assemble_partial()
@@ -0,0 +1,183 @@
+"""Профилирование горячих путей приёмника: лёгкие таймеры и захват cProfile по запросу.
+
+PROFILER.timer("parse") — контекстный менеджер вокруг участка кода. Пока
+PROFILER.enabled выключен, timer() отдаёт общий пустой контекст: цена замера —
+проверка одного атрибута, так что обвязка остаётся в коде постоянно.
+Включённый таймер копит число вызовов, сумму, максимум и последние WINDOW
+длительностей (по ним — перцентили), всё это отдаёт snapshot() и export_json().
+
+ProfileCapture — cProfile по кнопке: профилируется только поток, вызвавший
+start() (в приёмнике это поток GUI, где идут разбор, декодер и отрисовка),
+результат — текстовая сводка pstats и файл .prof для snakeviz / python -m pstats.
+"""
+
+import contextlib
+import io
+import json
+import time
+from collections import deque
+from pathlib import Path
+
+# Последних замеров на участок для перцентилей
+WINDOW = 2048
+
+_NULL = contextlib.nullcontext()
+
+
+class _Stage:
+    """Накопленная статистика одного участка."""
+
+    __slots__ = ("count", "total", "max", "recent")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.recent: deque[float] = deque(maxlen=WINDOW)
+
+    def add(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        self.recent.append(seconds)
+
+
+class _Timer:
+    __slots__ = ("_stage", "_t0")
+
+    def __init__(self, stage: _Stage):
+        self._stage = stage
+
+    def __enter__(self):
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._stage.add(time.perf_counter() - self._t0)
+        return False
+
+
+def _pct(ordered: list[float], q: float) -> float:
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class HotPathTimers:
+    """Таймеры участков по имени; выключены по умолчанию."""
+
+    def __init__(self):
+        self.enabled = False
+        self._stages: dict[str, _Stage] = {}
+        self._since = time.monotonic()
+
+    def _stage(self, name: str) -> _Stage:
+        st = self._stages.get(name)
+        if st is None:
+            st = self._stages[name] = _Stage()
+        return st
+
+    def timer(self, name: str):
+        """Контекст замера участка name; при выключенных таймерах — пустой контекст."""
+        if not self.enabled:
+            return _NULL
+        return _Timer(self._stage(name))
+
+    def add(self, name: str, seconds: float):
+        """Учесть замер, сделанный снаружи (например, длительность paintEvent)."""
+        if self.enabled:
+            self._stage(name).add(seconds)
+
+    def reset(self):
+        self._stages.clear()
+        self._since = time.monotonic()
+
+    def snapshot(self) -> list[dict]:
+        """Строка на участок, времена в мс; share — доля времени участка от окна наблюдения."""
+        span = max(time.monotonic() - self._since, 1e-9)
+        rows = []
+        for name, st in list(self._stages.items()):
+            ordered = sorted(st.recent)
+            if not ordered:
+                continue
+            rows.append({
+                "name": name,
+                "count": st.count,
+                "total_ms": st.total * 1000,
+                "mean_ms": st.total / st.count * 1000,
+                "p50_ms": _pct(ordered, 0.50) * 1000,
+                "p90_ms": _pct(ordered, 0.90) * 1000,
+                "p99_ms": _pct(ordered, 0.99) * 1000,
+                "max_ms": st.max * 1000,
+                "share": st.total / span,
+            })
+        rows.sort(key=lambda r: r["total_ms"], reverse=True)
+        return rows
+
+    def export_json(self, path: Path) -> Path:
+        """Снимок таймеров в JSON для офлайн-анализа."""
+        doc = {
+            "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "window_s": time.monotonic() - self._since,
+            "percentile_window": WINDOW,
+            "stages": self.snapshot(),
+        }
+        path = Path(path)
+        path.write_text(json.dumps(doc, ensure_ascii=False, indent=1))
+        return path
+
+
+PROFILER = HotPathTimers()
+
+
+# ═══════════════════════════════════════════════════════════════
+#  cProfile по запросу
+# ═══════════════════════════════════════════════════════════════
+
+class ProfileCapture:
+    """Запуск и остановка cProfile; после stop() — stats, summary() и dump()."""
+
+    def __init__(self):
+        self._prof = None      # cProfile.Profile; cProfile и pstats импортируются при первом захвате
+        self._started = 0.0
+        self.duration_s = 0.0
+        self.stats = None      # pstats.Stats после stop()
+
+    @property
+    def running(self) -> bool:
+        return self._prof is not None
+
+    def start(self):
+        if self._prof is not None:
+            return
+        import cProfile
+        self.stats = None
+        self._prof = cProfile.Profile()
+        self._started = time.monotonic()
+        self._prof.enable()
+
+    def stop(self):
+        """Остановить захват; вернуть pstats.Stats."""
+        if self._prof is None:
+            return self.stats
+        import pstats
+        self._prof.disable()
+        self.duration_s = time.monotonic() - self._started
+        self.stats = pstats.Stats(self._prof)
+        self._prof = None
+        return self.stats
+
+    def summary(self, limit: int = 25, sort: str = "cumulative") -> str:
+        """Верхние limit функций по sort (как python -m pstats)."""
+        if self.stats is None:
+            return ""
+        buf = io.StringIO()
+        self.stats.stream = buf
+        self.stats.sort_stats(sort).print_stats(limit)
+        return f"Захват {self.duration_s:.1f} с\n" + buf.getvalue()
+
+    def dump(self, path: Path) -> Path:
+        """Файл .prof и рядом .txt со сводкой."""
+        path = Path(path)
+        self.stats.dump_stats(str(path))
+        path.with_suffix(".txt").write_text(self.summary(limit=60))
+        return path
@@ -1,9 +1,10 @@
-"""Транспорт LorettLink — разбор потока на FEC-пакеты (256 Б) и TELEM (10 Б, sync 0xA55A)."""
+"""Транспорт LorettLink — разбор потока на FEC-пакеты (256 Б, RS 0x68 или rateless 0x69) и TELEM (10 Б, sync 0xA55A)."""
 
 import struct
 from dataclasses import dataclass
 
 from erasure_fec import FECPacket, PKT_SIZE, SYNC_BYTE as FEC_SYNC, TYPE_FEC
+from fountain import RatelessPacket, TYPE_RATELESS
 
 # ═══════════════════════════════════════════════════════════════
 #  TELEM (sync 0xA55A)
@@ -26,6 +27,17 @@ def crc16_ccitt(data: bytes, init: int = 0xFFFF) -> int:
     return crc
 
 
+@dataclass
+class ParserStats:
+    """Счётчики парсера: принятые кадры, ошибки CRC, отброшенные байты."""
+    fec_ok: int = 0
+    telem_ok: int = 0
+    fec_crc_errors: int = 0    # sync+type найдены, CRC не сошёлся — кадр обрезан или искажён
+    telem_crc_errors: int = 0
+    bytes_skipped: int = 0     # мусор между кадрами
+    overflows: int = 0         # буфер обрезан из-за переполнения
+
+
 @dataclass
 class TelemInfo:
     rssi: int = 0
@@ -46,10 +58,16 @@ def build_telem(rssi: int, snr: int, tx_power: int) -> bytes:
 class StreamParser:
     def __init__(self):
         self._buf = bytearray()
+        self.stats = ParserStats()
 
     def reset(self):
         self._buf.clear()
 
+    @property
+    def buffered(self) -> int:
+        """Байт в буфере, ещё не разобранных в кадры."""
+        return len(self._buf)
+
     def feed(self, data: bytes) -> list:
         self._buf.extend(data)
         results: list = []
@@ -64,23 +82,30 @@ class StreamParser:
             if telem_idx >= 0:
                 candidates.append(telem_idx)
             if not candidates:
-                self._buf.clear()
+                # 0x5A в конце — возможно, первая половина TELEM-sync, вторая придёт следующей порцией
+                keep = 1 if self._buf[-1] == TELEM_SYNC_BYTES[0] else 0
+                self.stats.bytes_skipped += len(self._buf) - keep
+                del self._buf[:len(self._buf) - keep]
                 break
 
             first = min(candidates)
             if first > 0:
+                self.stats.bytes_skipped += first
                 self._buf = self._buf[first:]
                 continue
 
-            if self._buf[0] == FEC_SYNC and self._buf[1] == TYPE_FEC:
+            if self._buf[0] == FEC_SYNC and self._buf[1] in (TYPE_FEC, TYPE_RATELESS):
                 if len(self._buf) < PKT_SIZE:
                     break
                 raw = bytes(self._buf[:PKT_SIZE])
-                pkt = FECPacket.from_bytes(raw)
+                cls = FECPacket if raw[1] == TYPE_FEC else RatelessPacket
+                pkt = cls.from_bytes(raw)
                 if pkt is not None:
                     results.append(pkt)
+                    self.stats.fec_ok += 1
                     self._buf = self._buf[PKT_SIZE:]
                 else:
+                    self.stats.fec_crc_errors += 1
                     self._buf = self._buf[1:]
                 continue
 
@@ -94,13 +119,18 @@ class StreamParser:
                 if crc16_ccitt(body) == expected:
                     _, _, _, rssi, snr, txp, _ = struct.unpack("<HBBhbBH", raw)
                     results.append(TelemInfo(rssi, snr, txp))
+                    self.stats.telem_ok += 1
                     self._buf = self._buf[TELEM_LEN:]
                 else:
+                    self.stats.telem_crc_errors += 1
                     self._buf = self._buf[2:]
                 continue
 
+            self.stats.bytes_skipped += 1
             self._buf = self._buf[1:]
 
         if len(self._buf) > 0x10000:
+            self.stats.overflows += 1
+            self.stats.bytes_skipped += len(self._buf) - 4096
             self._buf = self._buf[-4096:]
         return results
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""LorettLink — офлайн-восстановление изображений из архивов блоков.
+
+Сканирует файлы *.lla (каталоги обходятся рекурсивно) от любого числа сеансов
+и станций, объединяет блоки каждого изображения и декодирует те, у которых
+в сумме набралось ≥ K блоков. Сканирование и RS-декодирование идут в пуле процессов.
+Одно изображение, переданное с другой разбивкой (группы RS, интерливер, код), —
+отдельный ключ: его файл получает суффикс с хешем ключа.
+
+    python recover_archive.py ~/LorettLink/spool/blocks /mnt/station2 -o recovered
+"""
+
+import argparse
+import mmap
+import os
+import sys
+import zlib
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from block_archive import BlockArchive, ImageKey, find_archives, record_packet
+from cauchy_fec import CauchyDecoder
+from erasure_fec import CODE_CAUCHY16, ErasureDecoder, FTYPE_JPEG, FTYPE_WEBP
+
+_EXT = {FTYPE_JPEG: ".jpg", FTYPE_WEBP: ".webp"}
+
+
+def _scan(path: str):
+    """Процесс пула: индекс одного файла архива в виде простых структур для передачи в main."""
+    with BlockArchive(path) as arch:
+        entries = {key: (e.file_type, e.offsets) for key, e in arch.entries.items()}
+        return path, arch.station, arch.bad_records, entries
+
+
+_mmaps: dict[str, mmap.mmap] = {}
+
+
+def _read_packet(path: str, offset: int):
+    mm = _mmaps.get(path)
+    if mm is None:
+        with open(path, "rb") as f:
+            mm = _mmaps[path] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return record_packet(mm, offset)
+
+
+def output_name(key: ImageKey, file_type: int) -> str:
+    return f"{key.callsign or 'NOCALL'}_{key.image_id:03d}_{key.file_size}{_EXT.get(file_type, '.bin')}"
+
+
+def output_names(keys, ftypes: dict) -> dict[ImageKey, str]:
+    """Имена файлов ключей; совпавшие (тот же позывной, image_id и размер) различаются хешем ключа."""
+    names = {key: output_name(key, ftypes[key]) for key in keys}
+    clash = Counter(names.values())
+    for key, name in names.items():
+        if clash[name] > 1:
+            p = Path(name)
+            names[key] = f"{p.stem}_{zlib.crc32(repr(tuple(key)).encode()) & 0xFFFF:04x}{p.suffix}"
+    return names
+
+
+def _recover(key: ImageKey, blocks: dict, out_dir: str, name: str):
+    """Процесс пула: собрать блоки из всех файлов и декодировать (RS или Коши); вернуть (key, путь или None)."""
+    dec = None
+    for bid, (path, off) in blocks.items():
+        pkt = _read_packet(path, off)
+        if pkt is not None:
+            if dec is None:
+                dec = CauchyDecoder() if pkt.code == CODE_CAUCHY16 else ErasureDecoder()
+            dec.add_packet(pkt)
+    if dec is None:
+        return key, None
+    data = dec.decode()
+    if data is None:
+        return key, None
+    dst = Path(out_dir) / name
+    tmp = dst.with_name(dst.name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, dst)
+    return key, str(dst)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("paths", nargs="+", help="файлы *.lla или каталоги с ними")
+    ap.add_argument("-o", "--out", default="recovered", help="каталог для восстановленных файлов")
+    ap.add_argument("-j", "--jobs", type=int, default=os.cpu_count(), help="число процессов")
+    ap.add_argument("--force", action="store_true", help="перезаписывать уже восстановленные")
+    args = ap.parse_args(argv)
+
+    files = [str(p) for p in find_archives(args.paths)]
+    if not files:
+        print("Архивы *.lla не найдены", file=sys.stderr)
+        return 1
+    out_dir = Path(args.out); out_dir.mkdir(parents=True, exist_ok=True)
+
+    # key → block_id → (файл, смещение)
+    union: dict[ImageKey, dict[int, tuple[str, int]]] = {}
+    ftypes: dict[ImageKey, int] = {}
+    sources: dict[ImageKey, set[str]] = {}
+    with ProcessPoolExecutor(args.jobs) as pool:
+        for fut in as_completed([pool.submit(_scan, f) for f in files]):
+            try:
+                path, station, bad, entries = fut.result()
+            except (OSError, ValueError) as exc:
+                print(f"  пропуск: {exc}", file=sys.stderr)
+                continue
+            print(f"{path}: станция {station or '?'}, изображений {len(entries)}"
+                  + (f", битых записей {bad}" if bad else ""))
+            for key, (ft, offsets) in entries.items():
+                ftypes.setdefault(key, ft)
+                sources.setdefault(key, set()).add(station or path)
+                dst = union.setdefault(key, {})
+                for bid, off in offsets.items():
+                    dst.setdefault(bid, (path, off))
+
+        names = output_names(union, ftypes)
+        todo, short = [], []
+        for key, blocks in union.items():
+            if len(blocks) < key.k_data:
+                short.append(key)
+            elif args.force or not (out_dir / names[key]).exists():
+                todo.append(key)
+
+        ok = failed = 0
+        futures = [pool.submit(_recover, key, union[key], str(out_dir), names[key]) for key in todo]
+        for fut in as_completed(futures):
+            key, path = fut.result()
+            line = (f"{key.callsign:6s} image={key.image_id:3d} {len(union[key])}/{key.k_data}/{key.n_total} "
+                    f"станций={len(sources[key])}")
+            if path:
+                ok += 1; print(f"  OK    {line}  → {path}")
+            else:
+                failed += 1; print(f"  FAIL  {line}")
+
+    for key in sorted(short):
+        print(f"  мало  {key.callsign:6s} image={key.image_id:3d} "
+              f"{len(union[key])}/{key.k_data}/{key.n_total}")
+    print(f"Восстановлено {ok}, ошибок {failed}, недостаточно блоков {len(short)}, "
+          f"уже было {len(union) - len(todo) - len(short)}")
+    return 0 if failed == 0 else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
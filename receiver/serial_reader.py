@@ -0,0 +1,138 @@
+"""Чтение COM-порта порциями по in_waiting, с метками времени и учётом переполнений UART."""
+
+import importlib.util
+import struct
+import sys
+import time
+from dataclasses import dataclass, fields
+from typing import Optional
+
+# pyserial импортируется в open(): скриптам без COM-порта он не нужен при старте
+HAS_SERIAL = importlib.util.find_spec("serial") is not None
+
+try:
+    import fcntl
+    import termios
+    _TIOCGICOUNT = getattr(termios, "TIOCGICOUNT", 0x545D)
+except ImportError:  # Windows
+    fcntl = None
+    _TIOCGICOUNT = None
+
+# Скорости для выпадающего списка; USB CDC и мосты CP2102/CH340 держат до 3 Мбит/с
+BAUD_RATES = (9600, 19200, 38400, 57600, 115200, 230400, 460800,
+              921600, 1000000, 2000000, 3000000)
+DEFAULT_BAUD = 115200
+
+FLOW_NONE = "none"
+FLOW_RTSCTS = "rtscts"
+FLOW_XONXOFF = "xonxoff"
+
+# Размер приёмного буфера драйвера (действует только на Windows)
+RX_BUFFER_SIZE = 1 << 16
+
+# struct serial_icounter_struct (linux/serial.h): cts dsr rng dcd rx tx frame overrun parity brk buf_overrun + 9 reserved
+_ICOUNT_FMT = "20i"
+
+
+@dataclass
+class OverrunStats:
+    """Счётчики ошибок приёма от драйвера ОС (TIOCGICOUNT); обрезанные кадры считает StreamParser."""
+    overrun: int = 0        # аппаратное переполнение FIFO UART
+    buf_overrun: int = 0    # переполнение буфера tty в ядре
+    frame: int = 0          # ошибки кадра (неверная скорость, помехи)
+    parity: int = 0
+
+    def total(self) -> int:
+        return self.overrun + self.buf_overrun + self.frame + self.parity
+
+    def diff(self, prev: "OverrunStats") -> "OverrunStats":
+        return OverrunStats(**{f.name: getattr(self, f.name) - getattr(prev, f.name)
+                               for f in fields(self)})
+
+
+class SerialReader:
+    """Открытый COM-порт: блокирующее чтение всего, что накопилось в драйвере.
+
+    read_chunk() ждёт первый байт не дольше timeout, затем забирает весь
+    in_waiting одним вызовом — частичная порция не задерживается на таймауте,
+    а при высокой скорости порции растут и не теряются между вызовами.
+    """
+
+    def __init__(self, port: str, baud: int = DEFAULT_BAUD, flow: str = FLOW_NONE,
+                 timeout: float = 0.05):
+        self.port = port
+        self.baud = baud
+        self.flow = flow
+        self.timeout = timeout
+        self._ser = None
+        self._icount_base: Optional[tuple] = None
+        self.bytes_read = 0
+        self.max_chunk = 0
+
+    @property
+    def is_open(self) -> bool:
+        return self._ser is not None and self._ser.is_open
+
+    def open(self):
+        """Открыть порт с заданной скоростью и управлением потоком."""
+        import serial
+        self._ser = serial.Serial(
+            self.port, self.baud, timeout=self.timeout,
+            rtscts=self.flow == FLOW_RTSCTS,
+            xonxoff=self.flow == FLOW_XONXOFF,
+        )
+        if hasattr(self._ser, "set_buffer_size"):
+            try:
+                self._ser.set_buffer_size(rx_size=RX_BUFFER_SIZE)
+            except (OSError, ValueError):
+                pass
+        self._ser.reset_input_buffer()
+        self._icount_base = self._read_icount()
+
+    def close(self):
+        if self._ser and self._ser.is_open:
+            self._ser.close()
+        self._ser = None
+
+    def read_chunk(self) -> tuple[bytes, float]:
+        """Вернуть (данные, метка времени time.monotonic() прихода); b"" по таймауту."""
+        ser = self._ser
+        n = ser.in_waiting
+        if n:
+            data = ser.read(n)
+        else:
+            data = ser.read(1)
+            if not data:
+                return b"", time.monotonic()
+            n = ser.in_waiting
+            if n:
+                data += ser.read(n)
+        ts = time.monotonic()
+        self.bytes_read += len(data)
+        if len(data) > self.max_chunk:
+            self.max_chunk = len(data)
+        return data, ts
+
+    # ── overruns ─────────────────────────────────────────────
+
+    def _read_icount(self) -> Optional[tuple]:
+        if fcntl is None or not sys.platform.startswith("linux") or self._ser is None:
+            return None
+        try:
+            buf = fcntl.ioctl(self._ser.fileno(), _TIOCGICOUNT, b"\x00" * struct.calcsize(_ICOUNT_FMT))
+        except (OSError, AttributeError, ValueError):
+            return None  # драйвер не поддерживает (pty, часть USB CDC)
+        return struct.unpack(_ICOUNT_FMT, buf)
+
+    def os_counters(self) -> OverrunStats:
+        """Счётчики ошибок драйвера с момента open(); нули, если ОС их не отдаёт."""
+        cur = self._read_icount()
+        base = self._icount_base
+        if cur is None or base is None:
+            return OverrunStats()
+        return OverrunStats(
+            frame=cur[6] - base[6],
+            overrun=cur[7] - base[7],
+            parity=cur[8] - base[8],
+            buf_overrun=cur[10] - base[10],
+        )
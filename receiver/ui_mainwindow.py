@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+
+# Form implementation generated from reading ui file 'mainwindow.ui'
+#
+# Created by: PyQt5 UI code generator 5.15.11
+#
+# WARNING: Any manual changes made to this file will be lost when pyuic5 is
+# run again.  Do not edit this file unless you know what you are doing.
+
+
+from PyQt5 import QtCore, QtGui, QtWidgets
+
+
+class Ui_MainWindow(object):
+    def setupUi(self, MainWindow):
+        MainWindow.setObjectName("MainWindow")
+        MainWindow.setMinimumSize(QtCore.QSize(900, 640))
+        self.centralwidget = QtWidgets.QWidget(MainWindow)
+        self.centralwidget.setObjectName("centralwidget")
+        self.rootLayout = QtWidgets.QVBoxLayout(self.centralwidget)
+        self.rootLayout.setContentsMargins(6, 6, 6, 6)
+        self.rootLayout.setSpacing(6)
+        self.rootLayout.setObjectName("rootLayout")
+        self.frameConnection = QtWidgets.QFrame(self.centralwidget)
+        self.frameConnection.setFrameShape(QtWidgets.QFrame.StyledPanel)
+        self.frameConnection.setObjectName("frameConnection")
+        self.connLayout = QtWidgets.QHBoxLayout(self.frameConnection)
+        self.connLayout.setContentsMargins(12, 8, 12, 8)
+        self.connLayout.setSpacing(12)
+        self.connLayout.setObjectName("connLayout")
+        self.label = QtWidgets.QLabel(self.frameConnection)
+        self.label.setObjectName("label")
+        self.connLayout.addWidget(self.label)
+        self.cb_port = QtWidgets.QComboBox(self.frameConnection)
+        self.cb_port.setMinimumSize(QtCore.QSize(100, 0))
+        self.cb_port.setObjectName("cb_port")
+        self.connLayout.addWidget(self.cb_port)
+        self.cb_baud = QtWidgets.QComboBox(self.frameConnection)
+        self.cb_baud.setObjectName("cb_baud")
+        self.connLayout.addWidget(self.cb_baud)
+        self.btn_refresh = QtWidgets.QPushButton(self.frameConnection)
+        self.btn_refresh.setObjectName("btn_refresh")
+        self.connLayout.addWidget(self.btn_refresh)
+        self.btn_connect = QtWidgets.QPushButton(self.frameConnection)
+        self.btn_connect.setObjectName("btn_connect")
+        self.connLayout.addWidget(self.btn_connect)
+        self.label1 = QtWidgets.QLabel(self.frameConnection)
+        self.label1.setObjectName("label1")
+        self.connLayout.addWidget(self.label1)
+        self.sb_tcp_port = QtWidgets.QSpinBox(self.frameConnection)
+        self.sb_tcp_port.setMinimum(1024)
+        self.sb_tcp_port.setMaximum(65535)
+        self.sb_tcp_port.setProperty("value", 12000)
+        self.sb_tcp_port.setObjectName("sb_tcp_port")
+        self.connLayout.addWidget(self.sb_tcp_port)
+        self.btn_tcp = QtWidgets.QPushButton(self.frameConnection)
+        self.btn_tcp.setObjectName("btn_tcp")
+        self.connLayout.addWidget(self.btn_tcp)
+        self.btn_save = QtWidgets.QPushButton(self.frameConnection)
+        self.btn_save.setEnabled(False)
+        self.btn_save.setObjectName("btn_save")
+        self.connLayout.addWidget(self.btn_save)
+        spacerItem = QtWidgets.QSpacerItem(20, 20, QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Minimum)
+        self.connLayout.addItem(spacerItem)
+        self.rootLayout.addWidget(self.frameConnection)
+        self.frameTelem = QtWidgets.QFrame(self.centralwidget)
+        self.frameTelem.setFrameShape(QtWidgets.QFrame.StyledPanel)
+        self.frameTelem.setObjectName("frameTelem")
+        self.telemLayout = QtWidgets.QHBoxLayout(self.frameTelem)
+        self.telemLayout.setContentsMargins(12, 4, 12, 4)
+        self.telemLayout.setSpacing(12)
+        self.telemLayout.setObjectName("telemLayout")
+        self.lbl_rssi = QtWidgets.QLabel(self.frameTelem)
+        self.lbl_rssi.setObjectName("lbl_rssi")
+        self.telemLayout.addWidget(self.lbl_rssi)
+        self.bar_rssi = QtWidgets.QProgressBar(self.frameTelem)
+        self.bar_rssi.setMinimum(-140)
+        self.bar_rssi.setMaximum(-50)
+        self.bar_rssi.setProperty("value", -100)
+        self.bar_rssi.setTextVisible(False)
+        self.bar_rssi.setMaximumSize(QtCore.QSize(120, 20))
+        self.bar_rssi.setObjectName("bar_rssi")
+        self.telemLayout.addWidget(self.bar_rssi)
+        self.lbl_snr = QtWidgets.QLabel(self.frameTelem)
+        self.lbl_snr.setObjectName("lbl_snr")
+        self.telemLayout.addWidget(self.lbl_snr)
+        self.lbl_txpower = QtWidgets.QLabel(self.frameTelem)
+        self.lbl_txpower.setObjectName("lbl_txpower")
+        self.telemLayout.addWidget(self.lbl_txpower)
+        spacerItem1 = QtWidgets.QSpacerItem(20, 20, QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Minimum)
+        self.telemLayout.addItem(spacerItem1)
+        self.rootLayout.addWidget(self.frameTelem)
+        self.splitter = QtWidgets.QSplitter(self.centralwidget)
+        self.splitter.setOrientation(QtCore.Qt.Horizontal)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Expanding)
+        sizePolicy.setHorizontalStretch(1)
+        sizePolicy.setVerticalStretch(1)
+        sizePolicy.setHeightForWidth(self.splitter.sizePolicy().hasHeightForWidth())
+        self.splitter.setSizePolicy(sizePolicy)
+        self.splitter.setObjectName("splitter")
+        self.leftPanel = QtWidgets.QWidget(self.splitter)
+        self.leftPanel.setObjectName("leftPanel")
+        self.leftLayout = QtWidgets.QVBoxLayout(self.leftPanel)
+        self.leftLayout.setContentsMargins(0, 0, 0, 0)
+        self.leftLayout.setObjectName("leftLayout")
+        self.label2 = QtWidgets.QLabel(self.leftPanel)
+        self.label2.setAlignment(QtCore.Qt.AlignCenter)
+        font = QtGui.QFont()
+        font.setFamily("Segoe UI")
+        font.setPointSize(10)
+        font.setBold(True)
+        self.label2.setFont(font)
+        self.label2.setObjectName("label2")
+        self.leftLayout.addWidget(self.label2)
+        self.matrix = ChunkMatrixWidget(self.leftPanel)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Expanding)
+        sizePolicy.setHorizontalStretch(1)
+        sizePolicy.setVerticalStretch(1)
+        sizePolicy.setHeightForWidth(self.matrix.sizePolicy().hasHeightForWidth())
+        self.matrix.setSizePolicy(sizePolicy)
+        self.matrix.setMinimumSize(QtCore.QSize(200, 140))
+        self.matrix.setObjectName("matrix")
+        self.leftLayout.addWidget(self.matrix)
+        self.lbl_chunks = QtWidgets.QLabel(self.leftPanel)
+        self.lbl_chunks.setAlignment(QtCore.Qt.AlignCenter)
+        self.lbl_chunks.setObjectName("lbl_chunks")
+        self.leftLayout.addWidget(self.lbl_chunks)
+        self.rightPanel = QtWidgets.QWidget(self.splitter)
+        self.rightPanel.setObjectName("rightPanel")
+        self.rightLayout = QtWidgets.QVBoxLayout(self.rightPanel)
+        self.rightLayout.setContentsMargins(0, 0, 0, 0)
+        self.rightLayout.setObjectName("rightLayout")
+        self.label3 = QtWidgets.QLabel(self.rightPanel)
+        self.label3.setAlignment(QtCore.Qt.AlignCenter)
+        font = QtGui.QFont()
+        font.setFamily("Segoe UI")
+        font.setPointSize(10)
+        font.setBold(True)
+        self.label3.setFont(font)
+        self.label3.setObjectName("label3")
+        self.rightLayout.addWidget(self.label3)
+        self.img_label = QtWidgets.QLabel(self.rightPanel)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Expanding)
+        sizePolicy.setHorizontalStretch(1)
+        sizePolicy.setVerticalStretch(1)
+        sizePolicy.setHeightForWidth(self.img_label.sizePolicy().hasHeightForWidth())
+        self.img_label.setSizePolicy(sizePolicy)
+        self.img_label.setMinimumSize(QtCore.QSize(200, 200))
+        self.img_label.setAlignment(QtCore.Qt.AlignCenter)
+        self.img_label.setStyleSheet("background:#1a1a1a; border:1px solid #444; border-radius:4px;")
+        self.img_label.setObjectName("img_label")
+        self.rightLayout.addWidget(self.img_label)
+        self.rootLayout.addWidget(self.splitter)
+        self.progress = QtWidgets.QProgressBar(self.centralwidget)
+        self.progress.setMinimum(0)
+        self.progress.setMaximum(1)
+        self.progress.setProperty("value", 0)
+        self.progress.setTextVisible(True)
+        self.progress.setObjectName("progress")
+        self.rootLayout.addWidget(self.progress)
+        self.log = QtWidgets.QTextEdit(self.centralwidget)
+        self.log.setReadOnly(True)
+        self.log.setMaximumSize(QtCore.QSize(16777215, 140))
+        font = QtGui.QFont()
+        font.setFamily("Consolas")
+        font.setPointSize(9)
+        self.log.setFont(font)
+        self.log.setObjectName("log")
+        self.rootLayout.addWidget(self.log)
+        MainWindow.setCentralWidget(self.centralwidget)
+        self.statusbar = QtWidgets.QStatusBar(MainWindow)
+        self.statusbar.setObjectName("statusbar")
+        MainWindow.setStatusBar(self.statusbar)
+
+        self.retranslateUi(MainWindow)
+        QtCore.QMetaObject.connectSlotsByName(MainWindow)
+
+    def retranslateUi(self, MainWindow):
+        _translate = QtCore.QCoreApplication.translate
+        MainWindow.setWindowTitle(_translate("MainWindow", "LorettLink — Приёмник"))
+        self.label.setText(_translate("MainWindow", "COM:"))
+        self.cb_baud.setCurrentText(_translate("MainWindow", "115200"))
+        self.btn_refresh.setText(_translate("MainWindow", "Обновить"))
+        self.btn_connect.setText(_translate("MainWindow", "Подключить"))
+        self.label1.setText(_translate("MainWindow", "TCP:"))
+        self.btn_tcp.setText(_translate("MainWindow", "Слушать"))
+        self.btn_save.setText(_translate("MainWindow", "Сохранить"))
+        self.lbl_rssi.setText(_translate("MainWindow", "RSSI: — дБм"))
+        self.lbl_snr.setText(_translate("MainWindow", "SNR: — дБ"))
+        self.lbl_txpower.setText(_translate("MainWindow", "TX: — дБм"))
+        self.label2.setText(_translate("MainWindow", "Матрица блоков"))
+        self.lbl_chunks.setText(_translate("MainWindow", "Ожидание FEC..."))
+        self.label3.setText(_translate("MainWindow", "Изображение"))
+        self.progress.setFormat(_translate("MainWindow", "  %p%  —  %v / %m блоков"))
+from widgets import ChunkMatrixWidget
+
+
+UI_SHA256 = "40445bb7baefb570cf32db90c2aaa103e101b5a7d2856274f19852b73873b135"
@@ -1,6 +1,8 @@
 """Пользовательские виджеты: матрица блоков ChunkMatrixWidget для приёмника и передатчика."""
 
 import math
+import time
+from typing import Callable, Optional
 
 from PyQt5.QtWidgets import QWidget
 from PyQt5.QtCore import Qt
@@ -23,6 +25,9 @@ class ChunkMatrixWidget(QWidget):
     Adapts colors to current theme via QPalette.
     """
 
+    # Профилирование: вызывается с длительностью paintEvent, с (None — без замера)
+    on_paint: Optional[Callable[[float], None]] = None
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self._total = 0
@@ -49,6 +54,14 @@ class ChunkMatrixWidget(QWidget):
             self._states[idx] = STATE_SENT
             self.update()
 
+    def mark_range(self, start: int, stop: int, state: int = STATE_OK):
+        if state == STATE_SENT:
+            for i in range(start, stop):
+                self._states.setdefault(i, STATE_SENT)
+        else:
+            self._states.update(dict.fromkeys(range(start, stop), state))
+        self.update()
+
     def clear_all(self):
         self._total = 0
         self._k_data = 0
@@ -59,6 +72,14 @@ class ChunkMatrixWidget(QWidget):
         return self.palette().color(QPalette.Window).lightness() < 128
 
     def paintEvent(self, _event):
+        if self.on_paint is None:
+            self._paint()
+            return
+        t0 = time.perf_counter()
+        self._paint()
+        self.on_paint(time.perf_counter() - t0)
+
+    def _paint(self):
         p = QPainter(self)
         p.setRenderHint(QPainter.Antialiasing)
 
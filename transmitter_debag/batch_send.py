@@ -0,0 +1,78 @@
+"""Пакетная запись кадров в сокет: scatter/gather через sendmsg вместо sendall на каждый пакет.
+
+Кадры копятся в списке буферов и уходят одним системным вызовом sendmsg
+(где его нет — одним sendall склеенного буфера). Соседние кадры одного
+образа пакетов (WireImage, подряд по block_id) сливаются в один срез, так что
+последовательная отправка файла — это запись больших кусков mmap без копий.
+"""
+
+import os
+import socket
+from typing import Optional
+
+try:
+    IOV_MAX = os.sysconf("SC_IOV_MAX")
+except (AttributeError, ValueError, OSError):
+    IOV_MAX = 1024
+if IOV_MAX <= 0:
+    IOV_MAX = 1024
+
+
+def configure_socket(sock: socket.socket, nodelay: bool = False, sndbuf: int = 0):
+    """TCP_NODELAY и размер буфера отправки (0 — оставить системный)."""
+    if nodelay:
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    if sndbuf > 0:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, sndbuf)
+
+
+class FrameBatcher:
+    """Накопитель исходящих кадров; max_frames=1 — запись каждого кадра сразу (как раньше)."""
+
+    def __init__(self, sock: socket.socket, max_frames: int = 1):
+        self.sock = sock
+        self.max_frames = max(1, max_frames)
+        self._parts: list[list] = []   # [буфер, начало, конец]
+        self._frames = 0
+        self._sendmsg = getattr(sock, "sendmsg", None)
+        self.writes = 0      # системных вызовов записи
+        self.bytes = 0
+
+    @property
+    def pending(self) -> int:
+        return self._frames
+
+    def add(self, buf, start: int = 0, end: Optional[int] = None):
+        """Поставить в очередь buf[start:end]; срез, продолжающий предыдущий, сливается с ним."""
+        if end is None:
+            end = len(buf)
+        last = self._parts[-1] if self._parts else None
+        if last is not None and last[0] is buf and last[2] == start:
+            last[2] = end
+        else:
+            self._parts.append([buf, start, end])
+        self._frames += 1
+        if self._frames >= self.max_frames:
+            self.flush()
+
+    def flush(self):
+        if not self._parts:
+            return
+        bufs = [memoryview(b)[s:e] if (s or e != len(b)) else b for b, s, e in self._parts]
+        self._parts.clear()
+        self._frames = 0
+        self.bytes += sum(len(b) for b in bufs)
+        if self._sendmsg is None:
+            self.sock.sendall(b"".join(bufs))
+            self.writes += 1
+            return
+        i = 0
+        while i < len(bufs):
+            sent = self._sendmsg(bufs[i:i + IOV_MAX])
+            self.writes += 1
+            # Частичная запись: отбросить отправленные буферы, остаток первого — срезом
+            while i < len(bufs) and sent >= len(bufs[i]):
+                sent -= len(bufs[i])
+                i += 1
+            if sent:
+                bufs[i] = memoryview(bufs[i])[sent:]
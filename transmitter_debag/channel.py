@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+"""Модели радиоканала для симулятора: потери пачками, замирания, битовые ошибки, сбои UART.
+
+Модель обрабатывает исходящий поток по кадрам (FEC 256 Б или TELEM 10 Б):
+process(frame, t) возвращает список кадров, которые реально уйдут в сокет —
+пустой при потере, два при дублировании, искажённый кадр при битовой ошибке.
+t — время начала кадра в эфире от старта передачи (AirRatePacer.last_start).
+Каждая модель имеет свой random.Random(seed), прогоны воспроизводимы.
+
+Модели задаются строкой, звенья цепочки разделяются «;»:
+
+    ge:loss=0.1,burst=8; ber:1e-5; dup:0.01; reorder:p=0.02,depth=4
+
+    python channel.py "ge:loss=0.1,burst=8" --frames 100000   # статистика пачек
+"""
+
+import argparse
+import math
+import random
+from collections import Counter
+from typing import Optional
+
+# ═══════════════════════════════════════════════════════════════
+#  Модели
+# ═══════════════════════════════════════════════════════════════
+
+
+class ChannelModel:
+    """Базовая модель: пропускает кадр без изменений."""
+
+    name = "pass"
+    params: tuple[str, ...] = ()
+
+    def __init__(self, seed: Optional[int] = None):
+        self.rng = random.Random(seed)
+        self.frames = 0
+        self.dropped = 0
+        self.dropped_last = False   # последний кадр потерян этой моделью
+
+    def process(self, frame: bytes, t: float = 0.0) -> list[bytes]:
+        self.frames += 1
+        self.dropped_last = False
+        return [frame]
+
+    def flush(self) -> list[bytes]:
+        """Выдать удерживаемые кадры (в конце передачи)."""
+        return []
+
+    def _drop(self) -> list[bytes]:
+        self.dropped += 1
+        self.dropped_last = True
+        return []
+
+    def stats(self) -> dict:
+        return {"frames": self.frames, "dropped": self.dropped}
+
+    def describe(self) -> str:
+        args = ",".join(f"{p}={getattr(self, p):g}" for p in self.params)
+        return f"{self.name}:{args}" if args else self.name
+
+
+class UniformLoss(ChannelModel):
+    """Независимые потери с вероятностью p (прежняя модель «Пропуск блоков»)."""
+
+    name = "uniform"
+    params = ("p",)
+
+    def __init__(self, p: float = 0.1, seed: Optional[int] = None):
+        super().__init__(seed)
+        self.p = p
+
+    def process(self, frame, t=0.0):
+        self.frames += 1
+        self.dropped_last = False
+        if self.rng.random() < self.p:
+            return self._drop()
+        return [frame]
+
+
+class GilbertElliott(ChannelModel):
+    """Двухсостояний канал: «хорошее» и «плохое» (замирание) с марковскими переходами.
+
+    Задаётся средней долей потерь loss и средней длиной пачки burst (в кадрах):
+    в плохом состоянии теряется кадр с вероятностью loss_bad, в хорошем — loss_good.
+    """
+
+    name = "ge"
+    params = ("loss", "burst", "loss_bad", "loss_good")
+
+    def __init__(self, loss: float = 0.1, burst: float = 8.0, loss_bad: float = 1.0,
+                 loss_good: float = 0.0, seed: Optional[int] = None):
+        super().__init__(seed)
+        self.loss, self.burst = loss, max(1.0, burst)
+        self.loss_bad, self.loss_good = loss_bad, loss_good
+        # Доля времени в плохом состоянии, дающая нужную среднюю потерю
+        span = max(loss_bad - loss_good, 1e-9)
+        pi_bad = min(max((loss - loss_good) / span, 0.0), 1.0)
+        self.p_bg = 1.0 / self.burst                        # выход из замирания
+        self.p_gb = self.p_bg * pi_bad / max(1.0 - pi_bad, 1e-9) if pi_bad < 1 else 1.0
+        self.bad = self.rng.random() < pi_bad
+
+    def process(self, frame, t=0.0):
+        self.frames += 1
+        self.dropped_last = False
+        if self.bad:
+            if self.rng.random() < self.p_bg:
+                self.bad = False
+        elif self.rng.random() < self.p_gb:
+            self.bad = True
+        if self.rng.random() < (self.loss_bad if self.bad else self.loss_good):
+            return self._drop()
+        return [frame]
+
+
+class PeriodicFade(ChannelModel):
+    """Периодическое замирание (вращение зонда, нуль диаграммы антенны).
+
+    Кадры, начинающиеся в окне [phase, phase + fade) каждого периода period (с),
+    теряются; jitter — случайный сдвиг окна в каждом периоде, с.
+    """
+
+    name = "fade"
+    params = ("period", "fade", "phase", "jitter")
+
+    def __init__(self, period: float = 10.0, fade: float = 1.5, phase: float = 0.0,
+                 jitter: float = 0.0, seed: Optional[int] = None):
+        super().__init__(seed)
+        self.period, self.fade, self.phase, self.jitter = max(period, 1e-3), fade, phase, jitter
+        self._cycle = -1
+        self._shift = 0.0
+
+    def process(self, frame, t=0.0):
+        self.frames += 1
+        self.dropped_last = False
+        cycle = int(t // self.period)
+        if cycle != self._cycle:
+            self._cycle = cycle
+            self._shift = self.rng.uniform(-self.jitter, self.jitter) if self.jitter else 0.0
+        pos = (t - self.phase - self._shift) % self.period
+        if pos < self.fade:
+            return self._drop()
+        return [frame]
+
+
+class BitErrors(ChannelModel):
+    """Инверсия битов с вероятностью ber на бит — кадры доходят с неверным CRC.
+
+    Позиции ошибок выбираются геометрическими промежутками, поэтому стоимость
+    не зависит от длины кадра при малом ber.
+    """
+
+    name = "ber"
+    params = ("ber",)
+
+    def __init__(self, ber: float = 1e-5, seed: Optional[int] = None):
+        super().__init__(seed)
+        self.ber = min(max(ber, 0.0), 0.5)
+        self._log_q = math.log1p(-self.ber) if self.ber > 0 else 0.0
+        self._skip = self._gap()
+        self.corrupted = 0
+        self.bits = 0
+
+    def _gap(self) -> int:
+        if self.ber <= 0:
+            return 1 << 62
+        return int(math.log(1.0 - self.rng.random()) / self._log_q)
+
+    def process(self, frame, t=0.0):
+        self.frames += 1
+        self.dropped_last = False
+        nbits = len(frame) * 8
+        if self._skip >= nbits:
+            self._skip -= nbits
+            return [frame]
+        buf = bytearray(frame)
+        pos = self._skip
+        while pos < nbits:
+            buf[pos >> 3] ^= 0x80 >> (pos & 7)
+            self.bits += 1
+            pos += 1 + self._gap()
+        self._skip = pos - nbits
+        self.corrupted += 1
+        return [bytes(buf)]
+
+    def stats(self):
+        return {**super().stats(), "corrupted": self.corrupted, "bits": self.bits}
+
+
+class Duplicate(ChannelModel):
+    """Повтор кадра с вероятностью p (ретрансляция, эхо в мосте)."""
+
+    name = "dup"
+    params = ("p",)
+
+    def __init__(self, p: float = 0.01, seed: Optional[int] = None):
+        super().__init__(seed)
+        self.p = p
+        self.duplicated = 0
+
+    def process(self, frame, t=0.0):
+        self.frames += 1
+        self.dropped_last = False
+        if self.rng.random() < self.p:
+            self.duplicated += 1
+            return [frame, frame]
+        return [frame]
+
+    def stats(self):
+        return {**super().stats(), "duplicated": self.duplicated}
+
+
+class Reorder(ChannelModel):
+    """Перестановка: с вероятностью p кадр задерживается на depth последующих кадров."""
+
+    name = "reorder"
+    params = ("p", "depth")
+
+    def __init__(self, p: float = 0.02, depth: int = 4, seed: Optional[int] = None):
+        super().__init__(seed)
+        self.p, self.depth = p, max(1, int(depth))
+        self._held: list[list] = []   # [осталось кадров, кадр]
+        self.reordered = 0
+
+    def process(self, frame, t=0.0):
+        self.frames += 1
+        self.dropped_last = False
+        out = []
+        if self.rng.random() < self.p:
+            self._held.append([self.depth, frame])
+            self.reordered += 1
+        else:
+            out.append(frame)
+        for h in self._held:
+            h[0] -= 1
+        while self._held and self._held[0][0] <= 0:
+            out.append(self._held.pop(0)[1])
+        return out
+
+    def flush(self):
+        out = [h[1] for h in self._held]
+        self._held.clear()
+        return out
+
+    def stats(self):
+        return {**super().stats(), "reordered": self.reordered}
+
+
+class ByteSlip(ChannelModel):
+    """Сбой UART: с вероятностью p из кадра выпадают или в него вставляются 1..max_bytes байт."""
+
+    name = "slip"
+    params = ("p", "max_bytes")
+
+    def __init__(self, p: float = 0.001, max_bytes: int = 3, seed: Optional[int] = None):
+        super().__init__(seed)
+        self.p, self.max_bytes = p, max(1, int(max_bytes))
+        self.slipped = 0
+
+    def process(self, frame, t=0.0):
+        self.frames += 1
+        self.dropped_last = False
+        if self.rng.random() >= self.p or not frame:
+            return [frame]
+        self.slipped += 1
+        frame = bytes(frame)   # кадр может быть memoryview из кэша пакетов
+        n = self.rng.randint(1, self.max_bytes)
+        pos = self.rng.randrange(len(frame))
+        if self.rng.random() < 0.5:
+            return [frame[:pos] + frame[pos + n:]]
+        return [frame[:pos] + self.rng.randbytes(n) + frame[pos:]]
+
+    def stats(self):
+        return {**super().stats(), "slipped": self.slipped}
+
+
+MODELS: dict[str, type[ChannelModel]] = {
+    m.name: m for m in (UniformLoss, GilbertElliott, PeriodicFade, BitErrors,
+                        Duplicate, Reorder, ByteSlip)
+}
+
+
+# ═══════════════════════════════════════════════════════════════
+#  Цепочка моделей
+# ═══════════════════════════════════════════════════════════════
+
+
+class Channel:
+    """Последовательность моделей: выход каждой подаётся на вход следующей."""
+
+    def __init__(self, models: list[ChannelModel]):
+        self.models = models
+        self.dropped_last = False
+
+    def process(self, frame: bytes, t: float = 0.0) -> list[bytes]:
+        frames = [frame]
+        self.dropped_last = False
+        for m in self.models:
+            nxt = []
+            for f in frames:
+                nxt.extend(m.process(f, t))
+                self.dropped_last |= m.dropped_last
+            frames = nxt
+        return frames
+
+    def flush(self) -> list[bytes]:
+        out: list[bytes] = []
+        for i, m in enumerate(self.models):
+            pending = m.flush()
+            for later in self.models[i + 1:]:
+                pending = [g for f in pending for g in later.process(f)]
+            out.extend(pending)
+        return out
+
+    def stats(self) -> dict[str, dict]:
+        return {m.describe(): m.stats() for m in self.models}
+
+    def describe(self) -> str:
+        return "; ".join(m.describe() for m in self.models) or "идеальный"
+
+
+def parse_channel(spec: str, seed: Optional[int] = None) -> Channel:
+    """Строка вида "ge:loss=0.1,burst=8; ber:1e-5" → Channel.
+
+    Параметры звена — через запятую, имя=значение или позиционно в порядке
+    ModelClass.params. Звенья получают разные seed, производные от общего.
+    """
+    models: list[ChannelModel] = []
+    base = random.Random(seed)
+    for i, part in enumerate(p.strip() for p in spec.split(";")):
+        if not part:
+            continue
+        name, _, argstr = part.partition(":")
+        cls = MODELS.get(name.strip().lower())
+        if cls is None:
+            raise ValueError(f"неизвестная модель канала: {name!r} (есть: {', '.join(MODELS)})")
+        kwargs = {}
+        for j, arg in enumerate(a.strip() for a in argstr.split(",")):
+            if not arg:
+                continue
+            key, eq, val = arg.partition("=")
+            if not eq:
+                if j >= len(cls.params):
+                    raise ValueError(f"{name}: лишний параметр {arg!r}")
+                key, val = cls.params[j], arg
+            key = key.strip()
+            if key not in cls.params:
+                raise ValueError(f"{name}: неизвестный параметр {key!r} (есть: {', '.join(cls.params)})")
+            kwargs[key] = float(val)
+        sub_seed = None if seed is None else base.getrandbits(32) + i
+        models.append(cls(**kwargs, seed=sub_seed))
+    return Channel(models)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Статистика модели канала на синтетическом потоке кадров")
+    ap.add_argument("spec", help='например "ge:loss=0.1,burst=8; ber:1e-5"')
+    ap.add_argument("--frames", type=int, default=100000)
+    ap.add_argument("--frame-time", type=float, default=0.263,
+                    help="длительность кадра в эфире, с (по умолчанию 256 Б на 9.6 кбит/с + 50 мс)")
+    ap.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args(argv)
+
+    ch = parse_channel(args.spec, args.seed)
+    frame = bytes(256)
+    lost = 0
+    run = 0
+    bursts: Counter = Counter()
+    for i in range(args.frames):
+        ch.process(frame, i * args.frame_time)
+        if ch.dropped_last:
+            lost += 1; run += 1
+        elif run:
+            bursts[run] += 1; run = 0
+    if run:
+        bursts[run] += 1
+    print(f"Канал: {ch.describe()}")
+    print(f"Потеряно {lost} из {args.frames} ({lost / args.frames * 100:.2f}%), "
+          f"пачек {sum(bursts.values())}, "
+          f"средняя длина {lost / max(sum(bursts.values()), 1):.2f}, "
+          f"максимальная {max(bursts) if bursts else 0}")
+    for name, st in ch.stats().items():
+        print(f"  {name}: {st}")
+
+
+if __name__ == "__main__":
+    main()
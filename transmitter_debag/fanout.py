@@ -0,0 +1,166 @@
+"""Рассылка одного закодированного потока нескольким приёмникам: TCP и UDP (в т.ч. multicast).
+
+Как в настоящем эфире, файл кодируется один раз и кадры уходят по общему
+расписанию AirRatePacer, но у каждого получателя своя модель канала (свой
+seed), поэтому наземные станции теряют разные блоки — так проверяется
+разнесённый приём и сборка по нескольким архивам (recover_archive.py).
+
+Получатель задаётся строкой, после «@» — своя модель канала вместо общей:
+
+    192.168.1.10:12000
+    udp://192.168.1.20:12001
+    udp://239.0.0.1:12002@ge:loss=0.2,burst=10
+
+По UDP каждый кадр (FEC 256 Б или TELEM 10 Б) — отдельная датаграмма.
+Multicast-группа — один получатель: все станции в группе видят одни и те же
+потери, для независимых каналов нужны отдельные адреса.
+"""
+
+import ipaddress
+import socket
+from typing import Optional
+
+from batch_send import FrameBatcher, configure_socket
+from channel import Channel
+
+MULTICAST_TTL = 1   # multicast не выходит за пределы локальной сети
+
+
+def parse_target(spec: str) -> tuple[str, str, int, Optional[str]]:
+    """"udp://host:port@канал" → ("udp", host, port, канал или None)."""
+    spec = spec.strip()
+    addr, sep, chan = spec.partition("@")
+    kind = "tcp"
+    for prefix in ("udp://", "tcp://"):
+        if addr.startswith(prefix):
+            kind, addr = prefix[:3], addr[len(prefix):]
+    host, _, port = addr.rpartition(":")
+    try:
+        port_n = int(port)
+    except ValueError:
+        raise ValueError(f"получатель {spec!r}: нужен адрес вида host:port") from None
+    if not host or not 0 < port_n < 65536:
+        raise ValueError(f"получатель {spec!r}: нужен адрес вида host:port")
+    return kind, host, port_n, (chan.strip() if sep else None)
+
+
+def is_multicast(host: str) -> bool:
+    try:
+        return ipaddress.ip_address(host).is_multicast
+    except ValueError:
+        return False
+
+
+class DatagramSender:
+    """Интерфейс FrameBatcher для UDP: каждый кадр — одна датаграмма, без накопления."""
+
+    pending = 0
+
+    def __init__(self, sock: socket.socket, addr: tuple[str, int]):
+        self.sock = sock
+        self.addr = addr
+        self.writes = 0
+        self.bytes = 0
+
+    def add(self, buf, start: int = 0, end: Optional[int] = None):
+        frame = memoryview(buf)[start:end] if (start or end is not None) else buf
+        self.bytes += self.sock.sendto(frame, self.addr)
+        self.writes += 1
+
+    def flush(self):
+        pass
+
+
+class Target:
+    """Один получатель: сокет, накопитель записи и своя модель канала."""
+
+    def __init__(self, spec: str, channel: Channel, batch: int = 1, nodelay: bool = False,
+                 sndbuf: int = 0, timeout: float = 5.0):
+        self.kind, self.host, self.port, _ = parse_target(spec)
+        self.name = f"{'udp://' if self.kind == 'udp' else ''}{self.host}:{self.port}"
+        self.channel = channel
+        self.error: Optional[str] = None
+        if self.kind == "udp":
+            self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            if is_multicast(self.host):
+                self.sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, MULTICAST_TTL)
+                self.sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_LOOP, 1)
+            configure_socket(self.sock, sndbuf=sndbuf)
+            self.out = DatagramSender(self.sock, (self.host, self.port))
+        else:
+            self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.sock.settimeout(timeout)
+            configure_socket(self.sock, nodelay, sndbuf)
+            try:
+                self.sock.connect((self.host, self.port))
+            except OSError:
+                self.sock.close()
+                raise
+            self.out = FrameBatcher(self.sock, batch)
+
+    def close(self):
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+
+
+class FanOut:
+    """Все получатели передачи. Отвалившийся TCP-получатель выбывает, остальные продолжают."""
+
+    def __init__(self, targets: list[Target]):
+        self.targets = targets
+        self.dropped: list[Target] = []   # выбывшие по ошибке записи
+
+    @property
+    def pending(self) -> bool:
+        return any(t.out.pending for t in self.targets)
+
+    def send(self, frame, t: float, buf=None, start: int = 0) -> bool:
+        """Кадр через канал каждого получателя; True — хотя бы один его получил.
+
+        buf/start — тот же кадр как срез общего буфера (образ пакетов): неизменённые
+        каналом кадры добавляются срезом и сливаются с соседними в одну запись.
+        """
+        delivered = False
+        for tgt in list(self.targets):
+            try:
+                for f in tgt.channel.process(frame, t):
+                    if f is frame and buf is not None:
+                        tgt.out.add(buf, start, start + len(frame))
+                    else:
+                        tgt.out.add(f)
+            except OSError as exc:
+                self._drop(tgt, exc)
+                continue
+            delivered |= not tgt.channel.dropped_last
+        return delivered
+
+    def flush(self):
+        for tgt in list(self.targets):
+            try:
+                tgt.out.flush()
+            except OSError as exc:
+                self._drop(tgt, exc)
+
+    def flush_channels(self):
+        """Выпустить кадры, задержанные моделями каналов (перестановка), и дописать буферы."""
+        for tgt in list(self.targets):
+            try:
+                for f in tgt.channel.flush():
+                    tgt.out.add(f)
+            except OSError as exc:
+                self._drop(tgt, exc)
+        self.flush()
+
+    def _drop(self, tgt: Target, exc: OSError):
+        tgt.error = str(exc)
+        tgt.close()
+        self.targets.remove(tgt)
+        self.dropped.append(tgt)
+        if not self.targets:
+            raise OSError(f"все получатели отключились (последний {tgt.name}: {exc})")
+
+    def close(self):
+        for tgt in self.targets + self.dropped:
+            tgt.close()
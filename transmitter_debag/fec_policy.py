@@ -0,0 +1,453 @@
+#!/usr/bin/env python3
+"""Политика FEC: доля чётности и геометрия групп RS на каждое изображение.
+
+Обратного канала нет, поэтому адаптация разомкнутая: политика решает по
+известному заранее — номеру файла, времени полёта, высоте по профилю подъёма
+или записанному тренду RSSI прошлого полёта. Передатчик спрашивает политику
+перед кодированием каждого файла (FECTransmitWorker._encode), приёмнику ничего
+менять не нужно — K, N, m_per_group и num_groups приходят в заголовке пакета.
+
+Политики задаются строкой как модели канала:
+
+  fixed:0.25                         как DEFAULT_FEC_RATIO_NUM в прошивке
+  fixed:fec=0.4,groups=6             с дроблением на короткие группы
+  schedule:by=alt,0=0.2,15000=0.35,25000=0.6    по высоте (м) или by=t — по времени (с)
+  loss:p=0.1,target=0.95             минимальная доля, при которой файл собирается
+                                     с вероятностью target при независимых потерях p
+  rssi:profile=flight1.csv,target=0.95           то же по прогнозу потерь из RSSI
+
+Профиль RSSI — CSV «время_с, rssi_дБм» или index.sqlite spool-каталога
+приёмника (RSSI каждого принятого снимка).
+
+Режим оценки — принятые снимки в час для каждой политики на смоделированном
+(channel.py, профиль RSSI) или записанном (трасса потерь 0/1) канале:
+
+    python fec_policy.py fixed:0.25 fixed:0.5 "loss:p=0.15" --channel "ge:loss=0.15,burst=6"
+    python fec_policy.py fixed:0.25 "rssi:profile=flight1.csv" --rssi-channel flight2.csv --hours 3
+"""
+
+import argparse
+import csv
+import math
+import sqlite3
+from bisect import bisect_right
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from channel import ChannelModel, parse_channel
+from erasure_fec import BLOCK_PAYLOAD, PKT_SIZE, _rs_group_params
+from pacing import DEFAULT_AIR_RATE, DEFAULT_GAP_MS, airtime_s
+from playlist import CYCLE_PAUSE_S, FILE_PAUSE_S, scan_playlist
+from protocol import TELEM_LEN
+
+FEC_MIN = 0.05
+FEC_MAX = 2.0          # предел ErasureEncoder
+FEC_STEP = 0.05        # шаг подбора доли для loss/rssi
+
+# Профиль полёта по умолчанию для политик по высоте: подъём, разрыв, спуск на парашюте
+ASCENT_MS = 5.0
+BURST_M = 30000.0
+DESCENT_MS = 8.0
+
+
+def altitude_at(t: float, ascent: float = ASCENT_MS, burst: float = BURST_M,
+                descent: float = DESCENT_MS) -> float:
+    """Высота по номинальному профилю через t секунд после старта, м."""
+    t_burst = burst / ascent
+    if t <= t_burst:
+        return max(0.0, t * ascent)
+    return max(0.0, burst - (t - t_burst) * descent)
+
+
+@dataclass
+class ImageContext:
+    """Что известно передатчику о файле перед кодированием."""
+    index: int               # номер файла с начала передачи
+    t: float                 # время полёта, с
+    size: int                # размер файла, Б
+    altitude: float = 0.0    # высота по профилю, м
+
+
+@dataclass
+class FECChoice:
+    fec_ratio: float
+    num_groups: int = 0      # 0 — столько групп, сколько нужно для GF(2^8)
+
+    def describe(self) -> str:
+        return f"FEC {self.fec_ratio * 100:.0f}%" + (f", групп ≥{self.num_groups}" if self.num_groups else "")
+
+
+def geometry(size: int, choice: FECChoice) -> tuple[int, int, int, int]:
+    """(K, N, m_g, num_groups) файла size байт при выборе choice — как у ErasureEncoder."""
+    k = max(1, math.ceil(size / BLOCK_PAYLOAD))
+    _, m_g, ng = _rs_group_params(k, min(max(choice.fec_ratio, 0.01), FEC_MAX), choice.num_groups)
+    return k, k + m_g * ng, m_g, ng
+
+
+def success_probability(size: int, choice: FECChoice, p: float) -> float:
+    """Вероятность собрать файл при независимых потерях блоков с вероятностью p."""
+    k, _, m_g, ng = geometry(size, choice)
+    base, extra = divmod(k, ng)
+    prob = 1.0
+    for g_len, count in ((base + 1, extra), (base, ng - extra)):
+        if count:
+            n = g_len + m_g
+            ok = sum(math.comb(n, j) * p ** j * (1 - p) ** (n - j) for j in range(m_g + 1))
+            prob *= ok ** count
+    return prob
+
+
+def required_fec(size: int, p: float, target: float, num_groups: int = 0) -> float:
+    """Наименьшая доля чётности (с шагом FEC_STEP), при которой файл собирается с вероятностью target."""
+    ratio = FEC_MIN
+    while ratio < FEC_MAX:
+        if success_probability(size, FECChoice(ratio, num_groups), p) >= target:
+            return ratio
+        ratio = round(ratio + FEC_STEP, 6)
+    return FEC_MAX
+
+
+def loss_from_rssi(rssi: float, sensitivity: float = -117.0, width: float = 2.0) -> float:
+    """Доля потерянных кадров при уровне rssi: логистическая ступень вокруг чувствительности."""
+    return 1.0 / (1.0 + math.exp((rssi - sensitivity) / width))
+
+
+class RSSIProfile:
+    """RSSI от времени полёта: линейная интерполяция по точкам, за краями — крайние значения."""
+
+    def __init__(self, points: list[tuple[float, float]]):
+        if not points:
+            raise ValueError("профиль RSSI пуст")
+        points = sorted(points)
+        self.times = [p[0] for p in points]
+        self.values = [p[1] for p in points]
+
+    @classmethod
+    def load(cls, path) -> "RSSIProfile":
+        """CSV «время_с, rssi» (строки с # пропускаются) или index.sqlite spool-каталога."""
+        path = Path(path)
+        if path.suffix == ".sqlite":
+            conn = sqlite3.connect(str(path))
+            try:
+                rows = conn.execute("SELECT received_at, rssi FROM images "
+                                    "WHERE rssi IS NOT NULL ORDER BY received_at").fetchall()
+            finally:
+                conn.close()
+            t0 = rows[0][0] if rows else 0.0
+            return cls([(ts - t0, rssi) for ts, rssi in rows])
+        points = []
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.reader(f):
+                if not row or row[0].lstrip().startswith("#"):
+                    continue
+                try:
+                    points.append((float(row[0]), float(row[1])))
+                except (ValueError, IndexError):
+                    continue   # заголовок CSV
+        return cls(points)
+
+    def at(self, t: float) -> float:
+        i = bisect_right(self.times, t)
+        if i == 0:
+            return self.values[0]
+        if i == len(self.times):
+            return self.values[-1]
+        t0, t1 = self.times[i - 1], self.times[i]
+        v0, v1 = self.values[i - 1], self.values[i]
+        return v0 + (v1 - v0) * (t - t0) / (t1 - t0) if t1 > t0 else v1
+
+
+# ═══════════════════════════════════════════════════════════════
+#  Политики
+# ═══════════════════════════════════════════════════════════════
+
+
+class FECPolicy:
+    """Постоянная доля чётности (как в прошивке)."""
+
+    name = "fixed"
+
+    def __init__(self, fec: float = 0.25, groups: int = 0):
+        self.fec = fec
+        self.groups = int(groups)
+
+    def choose(self, ctx: ImageContext) -> FECChoice:
+        return FECChoice(self.fec, self.groups)
+
+    def describe(self) -> str:
+        return f"{self.name}:{self.fec:g}" + (f",groups={self.groups}" if self.groups else "")
+
+
+class SchedulePolicy(FECPolicy):
+    """Ступенчатый график: доля последней точки, не превышающей высоту (by=alt) или время (by=t)."""
+
+    name = "schedule"
+
+    def __init__(self, points: list[tuple[float, float]], by: str = "alt", groups: int = 0):
+        if by not in ("alt", "t"):
+            raise ValueError(f"schedule: by={by!r}, нужно alt или t")
+        if not points:
+            raise ValueError("schedule: нужна хотя бы одна точка порог=доля")
+        super().__init__(sorted(points)[0][1], groups)
+        self.points = sorted(points)
+        self.by = by
+
+    def choose(self, ctx):
+        x = ctx.altitude if self.by == "alt" else ctx.t
+        fec = self.points[0][1]
+        for threshold, value in self.points:
+            if x >= threshold:
+                fec = value
+        return FECChoice(fec, self.groups)
+
+    def describe(self):
+        pts = ",".join(f"{x:g}={v:g}" for x, v in self.points)
+        return f"{self.name}:by={self.by},{pts}" + (f",groups={self.groups}" if self.groups else "")
+
+
+class LossTargetPolicy(FECPolicy):
+    """Наименьшая доля, при которой файл собирается с вероятностью target при потерях p."""
+
+    name = "loss"
+
+    def __init__(self, p: float = 0.1, target: float = 0.95, groups: int = 0):
+        if not 0.0 <= p < 1.0 or not 0.0 < target < 1.0:
+            raise ValueError("loss: нужно 0 ≤ p < 1 и 0 < target < 1")
+        super().__init__(0.0, groups)
+        self.p = p
+        self.target = target
+
+    def predicted_loss(self, ctx: ImageContext) -> float:
+        return self.p
+
+    def choose(self, ctx):
+        p = self.predicted_loss(ctx)
+        return FECChoice(required_fec(ctx.size, p, self.target, self.groups), self.groups)
+
+    def describe(self):
+        return f"{self.name}:p={self.p:g},target={self.target:g}" + (f",groups={self.groups}" if self.groups else "")
+
+
+class RSSIPolicy(LossTargetPolicy):
+    """Потери прогнозируются по записанному тренду RSSI (прошлый полёт по той же трассе)."""
+
+    name = "rssi"
+
+    def __init__(self, profile: str, target: float = 0.95, sens: float = -117.0,
+                 width: float = 2.0, margin: float = 0.0, groups: int = 0):
+        super().__init__(0.0, target, groups)
+        self.profile_path = profile
+        self.profile = RSSIProfile.load(profile)
+        self.sens = sens
+        self.width = width
+        self.margin = margin    # запас, дБ: прогноз RSSI занижается на margin
+
+    def predicted_loss(self, ctx):
+        return min(loss_from_rssi(self.profile.at(ctx.t) - self.margin, self.sens, self.width), 0.99)
+
+    def describe(self):
+        return (f"{self.name}:profile={Path(self.profile_path).name},target={self.target:g}"
+                + (f",margin={self.margin:g}" if self.margin else ""))
+
+
+POLICIES: dict[str, type[FECPolicy]] = {
+    p.name: p for p in (FECPolicy, SchedulePolicy, LossTargetPolicy, RSSIPolicy)
+}
+
+
+def parse_policy(spec: str) -> FECPolicy:
+    """"schedule:by=alt,0=0.2,15000=0.4" → объект политики; ValueError при ошибке."""
+    name, _, args = spec.strip().partition(":")
+    cls = POLICIES.get(name.strip())
+    if cls is None:
+        raise ValueError(f"неизвестная политика {name!r} (есть: {', '.join(POLICIES)})")
+    kwargs: dict = {}
+    points: list[tuple[float, float]] = []
+    positional: list[float] = []
+    for item in filter(None, (a.strip() for a in args.split(","))):
+        key, eq, value = item.partition("=")
+        key = key.strip()
+        try:
+            if not eq:
+                positional.append(float(key))
+            elif key in ("by", "profile"):
+                kwargs[key] = value.strip()
+            elif cls is SchedulePolicy and key.replace(".", "", 1).isdigit():
+                points.append((float(key), float(value)))
+            else:
+                kwargs[key] = float(value)
+        except ValueError:
+            raise ValueError(f"{name}: неверное значение {item!r}") from None
+    if cls is SchedulePolicy:
+        kwargs["points"] = points
+    elif positional:
+        first = {"fixed": "fec", "loss": "p", "rssi": "target"}[cls.name]
+        kwargs.setdefault(first, positional[0])
+    if "groups" in kwargs:
+        kwargs["groups"] = int(kwargs["groups"])
+    try:
+        return cls(**kwargs)
+    except TypeError as exc:
+        raise ValueError(f"{name}: {exc}") from None
+
+
+# ═══════════════════════════════════════════════════════════════
+#  Оценка: принятые снимки в час
+# ═══════════════════════════════════════════════════════════════
+
+
+class ProfileLoss(ChannelModel):
+    """Потеря кадра с вероятностью loss_from_rssi(RSSI профиля в момент t)."""
+
+    name = "rssi"
+
+    def __init__(self, profile: RSSIProfile, sens: float = -117.0, width: float = 2.0,
+                 seed: Optional[int] = None):
+        super().__init__(seed)
+        self.profile = profile
+        self.sens = sens
+        self.width = width
+
+    def process(self, frame, t=0.0):
+        self.frames += 1
+        self.dropped_last = False
+        if self.rng.random() < loss_from_rssi(self.profile.at(t), self.sens, self.width):
+            return self._drop()
+        return [frame]
+
+    def describe(self):
+        return "rssi-профиль"
+
+
+class TraceLoss(ChannelModel):
+    """Записанная трасса потерь: i-й кадр потерян, если i-й символ трассы «1» (по кругу)."""
+
+    name = "trace"
+
+    def __init__(self, trace: list[bool], seed: Optional[int] = None):
+        super().__init__(seed)
+        if not trace:
+            raise ValueError("трасса потерь пуста")
+        self.trace = trace
+        self._pos = self.rng.randrange(len(trace))   # seed выбирает место старта в трассе
+
+    @classmethod
+    def load(cls, path, seed: Optional[int] = None) -> "TraceLoss":
+        text = Path(path).read_text(encoding="utf-8")
+        return cls([c == "1" for c in text if c in "01"], seed)
+
+    def process(self, frame, t=0.0):
+        self.frames += 1
+        self.dropped_last = False
+        lost = self.trace[self._pos]
+        self._pos = (self._pos + 1) % len(self.trace)
+        if lost:
+            return self._drop()
+        return [frame]
+
+    def describe(self):
+        return f"трасса {len(self.trace)} кадров"
+
+
+def evaluate(policy: FECPolicy, sizes: list[int], make_channel, hours: float,
+             air_rate: int = DEFAULT_AIR_RATE, gap_ms: float = DEFAULT_GAP_MS,
+             file_pause_s: float = FILE_PAUSE_S, cycle_pause_s: float = CYCLE_PAUSE_S,
+             telem_overhead: bool = True) -> dict:
+    """Полёт длительностью hours: файлы sizes по кругу, блоки по порядку block_id (как прошивка).
+
+    Снимок засчитывается, если в каждой группе RS потеряно не больше m_g блоков;
+    файл, не успевший уйти до конца полёта, не считается.
+    """
+    ch = make_channel()
+    frame = bytes(PKT_SIZE)
+    frame_s = airtime_s(PKT_SIZE, air_rate) + gap_ms / 1000.0
+    telem_s = airtime_s(TELEM_LEN, air_rate) if telem_overhead else 0.0
+    end = hours * 3600.0
+    t = 0.0
+    index = sent = ok = blocks = parity = 0
+    tables: dict = {}
+    while t < end:
+        for size in sizes:
+            ctx = ImageContext(index, t, size, altitude_at(t))
+            choice = policy.choose(ctx)
+            k, n, m_g, ng = geometry(size, choice)
+            grp = tables.get((k, ng))
+            if grp is None:
+                grp = tables[(k, ng)] = [i % ng for i in range(k)]
+            lost = [0] * ng
+            for b in range(n):
+                if b % 64 == 0:
+                    t += telem_s
+                out = ch.process(frame, t)
+                if ch.dropped_last or frame not in out:
+                    lost[grp[b] if b < k else (b - k) // m_g] += 1
+                t += frame_s
+            if t > end:
+                break
+            index += 1
+            sent += 1
+            blocks += n
+            parity += n - k
+            ok += max(lost) <= m_g
+            t += file_pause_s
+        else:
+            t += cycle_pause_s
+            continue
+        break
+    return {"policy": policy.describe(), "sent": sent, "delivered": ok,
+            "per_hour": ok / hours if hours else 0.0,
+            "success": ok / sent if sent else 0.0,
+            "overhead": parity / max(blocks - parity, 1)}
+
+
+def main(argv=None):
+    root = Path(__file__).resolve().parent.parent
+    ap = argparse.ArgumentParser(description="Принятые снимки в час для политик FEC")
+    ap.add_argument("policies", nargs="+", help='например fixed:0.25 "loss:p=0.1,target=0.95"')
+    ap.add_argument("--images", default=str(root / "test_images"), help="каталог плейлиста")
+    ap.add_argument("--hours", type=float, default=2.0, help="длительность полёта, ч")
+    ap.add_argument("--channel", default="", help="модель канала channel.py")
+    ap.add_argument("--rssi-channel", help="профиль RSSI (CSV или index.sqlite) как канал")
+    ap.add_argument("--trace", help="трасса потерь: файл из 0/1 по кадрам")
+    ap.add_argument("--trials", type=int, default=5)
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--air-rate", type=int, default=DEFAULT_AIR_RATE)
+    ap.add_argument("--gap-ms", type=float, default=DEFAULT_GAP_MS)
+    args = ap.parse_args(argv)
+
+    try:
+        policies = [parse_policy(p) for p in args.policies]
+        parse_channel(args.channel)
+        profile = RSSIProfile.load(args.rssi_channel) if args.rssi_channel else None
+        trace = TraceLoss.load(args.trace).trace if args.trace else None
+    except (OSError, ValueError) as exc:
+        ap.error(str(exc))
+    files, _ = scan_playlist(args.images)
+    if not files:
+        ap.error(f"нет JPEG в {args.images}")
+    sizes = [p.stat().st_size for p in files]
+
+    def channel_for(trial):
+        seed = args.seed + trial
+        ch = parse_channel(args.channel, seed)
+        if profile is not None:
+            ch.models.insert(0, ProfileLoss(profile, seed=seed ^ 0x3C3C))
+        if trace is not None:
+            ch.models.insert(0, TraceLoss(trace, seed=seed))
+        return ch
+
+    desc = channel_for(0).describe()
+    print(f"Плейлист {len(files)} файлов, полёт {args.hours:g} ч, эфир {args.air_rate} бит/с + "
+          f"{args.gap_ms:g} мс, канал: {desc}, прогонов {args.trials}")
+    print(f"  {'политика':<46s} {'снимков/ч':>9s} {'успех':>7s} {'передано':>9s} {'избыт.':>7s}")
+    for pol in policies:
+        runs = [evaluate(pol, sizes, lambda: channel_for(tr), args.hours, args.air_rate, args.gap_ms)
+                for tr in range(args.trials)]
+        mean = lambda key: sum(r[key] for r in runs) / len(runs)
+        print(f"  {pol.describe():<46s} {mean('per_hour'):9.1f} {mean('success') * 100:6.1f}% "
+              f"{mean('sent'):9.1f} {mean('overhead') * 100:6.0f}%")
+
+
+if __name__ == "__main__":
+    main()
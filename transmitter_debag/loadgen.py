@@ -0,0 +1,532 @@
+#!/usr/bin/env python3
+"""Нагрузочный генератор без GUI: несколько зондов одновременно против наземной станции.
+
+Каждый зонд — независимый передатчик со своим позывным, набором снимков, FEC,
+темпом эфира, порядком отправки и моделью канала (channel.py). Кадры зондов
+сводятся по времени эфира и пишутся в одно или несколько TCP-соединений с
+приёмником (зонд i — в соединение i mod L) либо в псевдотерминал, который
+приёмник открывает как COM-порт. Время эфира виртуальное: --speed 10 прогоняет
+полёт в 10 раз быстрее, --speed 0 — без пауз.
+
+Приёмник ведёт по декодеру на изображение с ключом ImageKey (позывной, image_id,
+размер, K/N, разбивка RS, интерливер, код — block_archive.py), поэтому зонды с
+разными позывными на одной линии не смешиваются и при общих image_id. Смешать
+блоки могут только зонды с одним позывным и общими image_id — такие пересечения
+на одной линии выводятся предупреждением. Без явного "image_id" зонд начинает
+следом за предыдущими (зонд с 5 файлами — 0…4, следующий — с 5), так что в
+прогоне снимок узнаётся и по одному image_id.
+
+По ходу прогона записывается «истина» (JSON): какие файлы ушли, с каким
+sha256, сколько блоков прошло канал и хватает ли их для декодирования (в каждой
+группе RS доставлено не меньше блоков данных группы). Подкоманда score
+сверяет её с индексом spool-каталога приёмника.
+
+    python loadgen.py run -n 4 --images ../test_images --tcp 127.0.0.1:12000 --speed 10 --truth truth.json
+    python loadgen.py run --config balloons.json --pty --truth truth.json
+    python loadgen.py score truth.json --spool ~/LorettLink/spool
+
+Формат --config: {"balloons": [{"callsign": "RS01", "images": "../test_images",
+"fec": 0.5, "air_rate": 9600, "gap_ms": 50, "channel": "ge:loss=0.1,burst=8",
+"order": "roundrobin", "interleaver": "block:8", "files": 5, "start_s": 0, "image_id": 0}, …]};
+пропущенные поля берутся из аргументов командной строки.
+"""
+
+import argparse
+import hashlib
+import heapq
+import json
+import os
+import random
+import socket
+import sqlite3
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass, field, fields
+from pathlib import Path
+from typing import Iterator, Optional
+
+from batch_send import FrameBatcher, configure_socket
+from channel import Channel, parse_channel
+from erasure_fec import PKT_SIZE, FECPacket
+from packet_cache import DEFAULT_CACHE_DIR, PacketCache, WireImage, encode_wire
+from pacing import DEFAULT_AIR_RATE, DEFAULT_GAP_MS, airtime_s
+from playlist import FILE_PAUSE_S, scan_playlist
+from protocol import TELEM_LEN, build_telem
+from scheduler import SCHEDULERS, group_members, make_scheduler, parse_interleaver
+
+DEFAULT_IMAGES = Path(__file__).resolve().parent.parent / "test_images"
+DEFAULT_SPOOL = Path.home() / "LorettLink" / "spool"
+INDEX_NAME = "index.sqlite"     # image_spool.INDEX_NAME приёмника
+TELEM_EVERY = 64                # TELEM перед каждым 64-м блоком, как в симуляторе
+
+# ═══════════════════════════════════════════════════════════════
+#  Зонд
+# ═══════════════════════════════════════════════════════════════
+
+
+@dataclass
+class BalloonConfig:
+    """Параметры одного зонда (элемент "balloons" в --config)."""
+    callsign: str
+    images: list = field(default_factory=list)   # пути к файлам (каталог разворачивается в список)
+    fec: float = 0.25
+    air_rate: int = DEFAULT_AIR_RATE
+    gap_ms: float = DEFAULT_GAP_MS
+    channel: str = ""
+    order: str = "sequential"
+    interleaver: str = "modulo"
+    files: int = 0               # сколько файлов передать; 0 — один круг по images
+    start_s: float = 0.0         # начало передачи от старта прогона (время эфира), с
+    file_pause_s: float = FILE_PAUSE_S
+    image_id: Optional[int] = None   # первый image_id; None — следом за предыдущими зондами
+    tx_power: int = 33
+    telem_overhead: bool = True
+    seed: int = 1
+
+
+class Balloon:
+    """Зонд: заранее закодированные файлы и поток кадров (время эфира, кадры) через модель канала."""
+
+    def __init__(self, cfg: BalloonConfig, cache: Optional[PacketCache] = None):
+        self.cfg = cfg
+        self.callsign = cfg.callsign.upper()[:6]
+        self.channel: Channel = parse_channel(cfg.channel, cfg.seed)
+        self.scheduler = make_scheduler(cfg.order, cfg.seed)
+        self.interleaver = parse_interleaver(cfg.interleaver)
+        self.images: list[WireImage] = []
+        self.truth: list[dict] = []
+        self.frames = 0
+        self.bytes = 0
+        self.airtime = 0.0       # конец последнего кадра в эфире, с от start_s
+        self._current: dict[int, dict] = {}   # image_id → запись истины передаваемого файла
+        self._delivered: dict[int, set] = {}
+        count = cfg.files or len(cfg.images)
+        for i in range(count):
+            path = Path(cfg.images[i % len(cfg.images)])
+            data = path.read_bytes()
+            iid = (cfg.image_id + i) & 0xFF
+            img = encode_wire(data, self.callsign, iid, cfg.fec, self.interleaver, cache)
+            info = img.info
+            self.images.append(img)
+            self.truth.append({
+                "callsign": self.callsign, "image_id": iid, "file": str(path),
+                "size": len(data), "sha256": hashlib.sha256(data).hexdigest(),
+                "k": info.k_data, "n": info.n_total, "m_per_group": info.m_per_group,
+                "num_groups": info.num_groups, "blocks_sent": 0, "blocks_delivered": 0,
+                "decodable": False, "t_first": None, "t_last": None,
+            })
+
+    def events(self) -> Iterator[tuple[float, list]]:
+        """Кадры по времени эфира: (t от старта прогона, [кадры после канала])."""
+        cfg = self.cfg
+        rng = random.Random(cfg.seed)
+        frame_s = airtime_s(PKT_SIZE, cfg.air_rate) + cfg.gap_ms / 1000.0
+        t = cfg.start_s
+        for img, entry in zip(self.images, self.truth):
+            info = img.info
+            self._current[entry["image_id"]] = entry
+            self._delivered[id(entry)] = set()
+            order = self.scheduler.order(info.k_data, info.n_total, info.m_per_group, info.num_groups,
+                                         img.data() if self.scheduler.needs_data else b"",
+                                         info.interleaver_obj)
+            entry["t_first"] = time.time()
+            for i, bid in enumerate(order):
+                if i % TELEM_EVERY == 0:
+                    telem = build_telem(rng.randint(-110, -60), rng.randint(20, 40), cfg.tx_power)
+                    yield t, self._through(telem, t)
+                    if cfg.telem_overhead:
+                        t += airtime_s(TELEM_LEN, cfg.air_rate)
+                yield t, self._through(img.frame(bid), t)
+                entry["blocks_sent"] += 1
+                t += frame_s
+            entry["t_last"] = time.time()
+            self.airtime = t - cfg.start_s
+            t += cfg.file_pause_s
+        yield t, self._through_flush()
+
+    def _through(self, frame, t: float) -> list:
+        out = self.channel.process(frame, t - self.cfg.start_s)
+        for f in out:
+            self._account(f)
+        return out
+
+    def _through_flush(self) -> list:
+        out = self.channel.flush()
+        for f in out:
+            self._account(f)
+        return out
+
+    def _account(self, frame):
+        """Учёт кадра, ушедшего в линию: блок доставлен, если кадр проходит CRC приёмника."""
+        self.frames += 1
+        self.bytes += len(frame)
+        if len(frame) != PKT_SIZE:
+            return
+        pkt = FECPacket.from_bytes(bytes(frame))
+        if pkt is None or pkt.callsign != self.callsign:
+            return
+        entry = self._current.get(pkt.image_id)
+        if entry is not None:
+            self._delivered[id(entry)].add(pkt.block_id)
+
+    def finish(self):
+        """Досчитать доставку и декодируемость по группам RS."""
+        for img, entry in zip(self.images, self.truth):
+            got = self._delivered.get(id(entry), set())
+            entry["blocks_delivered"] = len(got)
+            info = img.info
+            groups = group_members(info.k_data, info.m_per_group, info.num_groups, info.interleaver_obj)
+            entry["decodable"] = bool(entry["blocks_sent"]) and all(
+                sum(b in got for b in g) >= len(g) - info.m_per_group for g in groups)
+
+
+# ═══════════════════════════════════════════════════════════════
+#  Линии к приёмнику
+# ═══════════════════════════════════════════════════════════════
+
+
+class _FdWriter:
+    """sendall() поверх файлового дескриптора (ведущая сторона pty) для FrameBatcher."""
+
+    def __init__(self, fd: int):
+        self.fd = fd
+
+    def sendall(self, data):
+        view = memoryview(data)
+        while view:
+            view = view[os.write(self.fd, view):]
+
+
+def open_tcp(host: str, port: int, sndbuf: int = 0) -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    configure_socket(sock, nodelay=False, sndbuf=sndbuf)
+    sock.connect((host, port))
+    return sock
+
+
+def open_pty() -> tuple[int, int, str]:
+    """Псевдотерминал в «сыром» режиме: (ведущий fd, ведомый fd, путь для приёмника)."""
+    try:
+        import tty
+    except ImportError:
+        raise OSError("pty доступен только в POSIX") from None
+    master, slave = os.openpty()
+    tty.setraw(slave)
+    return master, slave, os.ttyname(slave)
+
+
+class Link:
+    """Одна линия к приёмнику: кадры своих зондов в порядке времени эфира."""
+
+    def __init__(self, name: str, writer, balloons: list[Balloon], batch: int = 16):
+        self.name = name
+        self.balloons = balloons
+        self.out = FrameBatcher(writer, batch)
+        self.error: Optional[str] = None
+        self.wall = 0.0
+
+    def run(self, t0: float, speed: float, stop: threading.Event):
+        heap = []
+        for i, b in enumerate(self.balloons):
+            gen = b.events()
+            first = next(gen, None)
+            if first is not None:
+                heapq.heappush(heap, (first[0], i, first[1], gen))
+        try:
+            while heap and not stop.is_set():
+                t, i, frames, gen = heapq.heappop(heap)
+                if speed > 0:
+                    due = t0 + t / speed
+                    if self.out.pending and due > time.monotonic():
+                        self.out.flush()
+                    while not stop.is_set():
+                        left = due - time.monotonic()
+                        if left <= 0:
+                            break
+                        time.sleep(min(left, 0.1))
+                for f in frames:
+                    self.out.add(f)
+                nxt = next(gen, None)
+                if nxt is not None:
+                    heapq.heappush(heap, (nxt[0], i, nxt[1], gen))
+            self.out.flush()
+        except OSError as exc:
+            self.error = str(exc)
+            stop.set()
+        self.wall = time.monotonic() - t0
+
+
+# ═══════════════════════════════════════════════════════════════
+#  Прогон
+# ═══════════════════════════════════════════════════════════════
+
+
+def load_configs(args) -> list[BalloonConfig]:
+    """Зонды из --config или -n одинаковых (позывные LL01…, снимки со сдвигом, свой seed)."""
+    defaults = dict(fec=args.fec, air_rate=args.air_rate, gap_ms=args.gap_ms, channel=args.channel,
+                    order=args.order, interleaver=args.interleaver, files=args.files,
+                    file_pause_s=args.file_pause)
+    if args.config:
+        raw = json.loads(Path(args.config).read_text(encoding="utf-8"))
+        items = raw.get("balloons", raw) if isinstance(raw, dict) else raw
+    else:
+        items = [{"callsign": f"{args.prefix}{i + 1:02d}", "start_s": i * args.stagger}
+                 for i in range(args.balloons)]
+    known = {f.name for f in fields(BalloonConfig)}
+    configs = []
+    next_id = 0
+    for i, item in enumerate(items):
+        unknown = set(item) - known
+        if unknown:
+            raise ValueError(f"зонд {i + 1}: неизвестные поля {', '.join(sorted(unknown))}")
+        cfg = BalloonConfig(**{**defaults, "seed": args.seed + i, **item})
+        images = cfg.images or str(args.images)
+        if isinstance(images, str):
+            files, skipped = scan_playlist(images)
+            if not files:
+                raise ValueError(f"зонд {cfg.callsign}: нет JPEG в {images}")
+            # Без явного списка зонды начинают с разных снимков
+            shift = 0 if item.get("images") else i % len(files)
+            cfg.images = [str(p) for p in files[shift:] + files[:shift]]
+        if cfg.order not in SCHEDULERS:
+            raise ValueError(f"зонд {cfg.callsign}: неизвестная стратегия {cfg.order!r}")
+        if cfg.image_id is None:
+            cfg.image_id = next_id & 0xFF
+        next_id = cfg.image_id + (cfg.files or len(cfg.images))
+        configs.append(cfg)
+    return configs
+
+
+def id_clashes(balloons: list[Balloon]) -> list[str]:
+    """Зонды одной линии с одним позывным и общими image_id: при той же разбивке файла
+    приёмник смешает их блоки в одном декодере."""
+    owner: dict[tuple[str, int], int] = {}
+    shared: dict[tuple[int, int], set[int]] = {}
+    for i, b in enumerate(balloons):
+        for e in b.truth:
+            j = owner.setdefault((b.callsign, e["image_id"]), i)
+            if j != i:
+                shared.setdefault((j, i), set()).add(e["image_id"])
+    return [f"два зонда {balloons[i].callsign}: общие image_id {', '.join(map(str, sorted(ids)))}"
+            for (_, i), ids in shared.items()]
+
+
+def cmd_run(args) -> int:
+    try:
+        configs = load_configs(args)
+        cache = None if args.no_cache else PacketCache(args.cache)
+        print(f"Кодирование файлов, зондов: {len(configs)}…", flush=True)
+        balloons = [Balloon(cfg, cache) for cfg in configs]
+    except (OSError, ValueError) as exc:
+        print(f"Ошибка: {exc}", file=sys.stderr)
+        return 2
+
+    writers, closers, names = [], [], []
+    try:
+        if args.pty:
+            master, slave, path = open_pty()
+            writers.append(_FdWriter(master)); names.append(path)
+            closers += [lambda: os.close(master), lambda: os.close(slave)]
+            print(f"Псевдотерминал: {path} — откройте его в приёмнике; старт через {args.wait:g} с",
+                  flush=True)
+            time.sleep(args.wait)
+        else:
+            for spec in args.tcp or ["127.0.0.1:12000"]:
+                host, _, port = spec.rpartition(":")
+                for _ in range(args.connections):
+                    sock = open_tcp(host or "127.0.0.1", int(port), args.sndbuf)
+                    writers.append(sock); names.append(f"{host}:{port}")
+                    closers.append(sock.close)
+    except (OSError, ValueError) as exc:
+        print(f"Ошибка линии: {exc}", file=sys.stderr)
+        for close in closers:
+            close()
+        return 2
+
+    links = [Link(name, w, balloons[i::len(writers)], args.batch)
+             for i, (name, w) in enumerate(zip(names, writers))]
+    for link in links:
+        for warning in id_clashes(link.balloons):
+            print(f"Предупреждение: {link.name}: {warning}", file=sys.stderr)
+    stop = threading.Event()
+    started_at = time.time()
+    t0 = time.monotonic()
+    threads = [threading.Thread(target=link.run, args=(t0, args.speed, stop), daemon=True)
+               for link in links]
+    for th in threads:
+        th.start()
+    try:
+        while any(th.is_alive() for th in threads):
+            for th in threads:
+                th.join(0.5)
+    except KeyboardInterrupt:
+        print("\nОстановка…", file=sys.stderr)
+        stop.set()
+        for th in threads:
+            th.join(5.0)
+    finished_at = time.time()
+    for close in closers:
+        close()
+
+    for b in balloons:
+        b.finish()
+    report = {
+        "started_at": started_at, "finished_at": finished_at, "speed": args.speed,
+        "aborted": stop.is_set(),
+        "links": [{"name": l.name, "balloons": [b.callsign for b in l.balloons],
+                   "bytes": l.out.bytes, "writes": l.out.writes, "wall_s": round(l.wall, 3),
+                   "error": l.error} for l in links],
+        "balloons": [{**asdict(b.cfg), "callsign": b.callsign, "frames": b.frames, "bytes": b.bytes,
+                      "airtime_s": round(b.airtime, 3),
+                      "air_bps": round(b.bytes * 8 / b.airtime) if b.airtime else 0,
+                      "channel_stats": b.channel.stats()} for b in balloons],
+        "images": [e for b in balloons for e in b.truth if e["blocks_sent"]],
+    }
+    print_offered(report)
+    if args.truth:
+        Path(args.truth).write_text(json.dumps(report, ensure_ascii=False, indent=1), encoding="utf-8")
+        print(f"Истина: {args.truth}")
+    return 1 if any(l.error for l in links) else 0
+
+
+def print_offered(report: dict):
+    wall = max(report["finished_at"] - report["started_at"], 1e-6)
+    total = sum(l["bytes"] for l in report["links"])
+    print(f"\nПредложенная нагрузка: {total / 1e6:.2f} МБ за {wall:.1f} с, "
+          f"{total * 8 / wall / 1000:.1f} кбит/с" + ("  (прервано)" if report["aborted"] else ""))
+    for l in report["links"]:
+        print(f"  {l['name']:<22s} {', '.join(l['balloons']):<24s} {l['bytes'] / 1e6:7.2f} МБ  "
+              f"{l['writes']:6d} записей" + (f"  ОШИБКА: {l['error']}" if l["error"] else ""))
+    for b in report["balloons"]:
+        imgs = [e for e in report["images"] if e["callsign"] == b["callsign"]]
+        ok = sum(e["decodable"] for e in imgs)
+        print(f"  {b['callsign']:<6s} файлов {len(imgs):3d}, декодируемых {ok:3d}, "
+              f"кадров {b['frames']:6d}, эфир {b['airtime_s']:8.1f} с, {b['air_bps'] / 1000:6.2f} кбит/с"
+              + (f", канал {b['channel']}" if b["channel"] else ""))
+
+
+# ═══════════════════════════════════════════════════════════════
+#  Оценка по индексу приёмника
+# ═══════════════════════════════════════════════════════════════
+
+
+def score(truth: dict, rows: list[tuple]) -> dict:
+    """Сопоставить файлы истины со строками индекса (callsign, image_id, complete, sha256, received_at).
+
+    Каждая строка засчитывается один раз; image_id повторяются после 255, поэтому
+    берётся самая ранняя подходящая. Статус файла: ok (полный, sha256 совпал),
+    corrupt (полный, sha256 другой), partial (сохранён неполным), missing.
+    """
+    pool: dict[tuple, list] = {}
+    for cs, iid, complete, sha, ts in sorted(rows, key=lambda r: r[4]):
+        pool.setdefault((cs, iid), []).append([bool(complete), sha, ts, False])
+    results = []
+    for e in sorted(truth["images"], key=lambda e: e["t_first"] or 0):
+        cands = [r for r in pool.get((e["callsign"], e["image_id"]), []) if not r[3]]
+        pick = (next((r for r in cands if r[0] and r[1] == e["sha256"]), None)
+                or next((r for r in cands if r[0]), None)
+                or next(iter(cands), None))
+        if pick is None:
+            status = "missing"
+        else:
+            pick[3] = True
+            status = "partial" if not pick[0] else ("ok" if pick[1] == e["sha256"] else "corrupt")
+        results.append({"callsign": e["callsign"], "image_id": e["image_id"], "file": e["file"],
+                        "decodable": e["decodable"], "status": status})
+    extra = sum(1 for lst in pool.values() for r in lst if not r[3])
+    decodable = sum(r["decodable"] for r in results)
+    ok = sum(r["status"] == "ok" for r in results)
+    ok_decodable = sum(r["status"] == "ok" and r["decodable"] for r in results)
+    return {
+        "images": len(results), "decodable": decodable, "ok": ok,
+        "partial": sum(r["status"] == "partial" for r in results),
+        "corrupt": sum(r["status"] == "corrupt" for r in results),
+        "missing": sum(r["status"] == "missing" for r in results),
+        "extra": extra,
+        "decode_rate": ok / len(results) if results else 0.0,
+        "decodable_rate": ok_decodable / decodable if decodable else 0.0,
+        "results": results,
+    }
+
+
+def cmd_score(args) -> int:
+    truth = json.loads(Path(args.truth).read_text(encoding="utf-8"))
+    index = Path(args.spool) / INDEX_NAME
+    if not index.is_file():
+        print(f"Нет индекса {index}", file=sys.stderr)
+        return 2
+    conn = sqlite3.connect(str(index), timeout=5.0)
+    try:
+        # Частичные снимки приёмник сохраняет с приходом следующего — отсюда запас по времени
+        rows = conn.execute(
+            "SELECT callsign, image_id, complete, sha256, received_at FROM images "
+            "WHERE received_at >= ? AND received_at < ?",
+            (truth["started_at"] - 1.0, truth["finished_at"] + args.grace)).fetchall()
+    finally:
+        conn.close()
+    res = score(truth, rows)
+    print(f"Файлов {res['images']}, декодируемых по каналу {res['decodable']}: "
+          f"принято {res['ok']} ({res['decode_rate'] * 100:.1f}%), "
+          f"из декодируемых {res['decodable_rate'] * 100:.1f}%")
+    print(f"  неполных {res['partial']}, искажённых {res['corrupt']}, "
+          f"пропущено {res['missing']}, лишних записей {res['extra']}")
+    by_call: dict[str, list] = {}
+    for r in res["results"]:
+        by_call.setdefault(r["callsign"], []).append(r)
+    for cs, lst in sorted(by_call.items()):
+        print(f"  {cs:<6s} {sum(r['status'] == 'ok' for r in lst):3d} / {len(lst):3d}"
+              f"  (декодируемых {sum(r['decodable'] for r in lst)})")
+    if args.json:
+        Path(args.json).write_text(json.dumps(res, ensure_ascii=False, indent=1), encoding="utf-8")
+    return 0 if res["decodable_rate"] >= args.min_rate else 1
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    run = sub.add_parser("run", help="передать нагрузку и записать истину")
+    run.add_argument("--config", help="JSON с описанием зондов (у зондов одной линии с одним позывным image_id не пересекаются)")
+    run.add_argument("-n", "--balloons", type=int, default=2,
+                     help="число зондов без --config; image_id идут подряд через всех зондов")
+    run.add_argument("--prefix", default="LL", help="начало позывных без --config")
+    run.add_argument("--images", default=str(DEFAULT_IMAGES), help="каталог снимков по умолчанию")
+    run.add_argument("--files", type=int, default=0, help="файлов на зонд (0 — один круг)")
+    run.add_argument("--fec", type=float, default=0.25)
+    run.add_argument("--air-rate", type=int, default=DEFAULT_AIR_RATE)
+    run.add_argument("--gap-ms", type=float, default=DEFAULT_GAP_MS)
+    run.add_argument("--file-pause", type=float, default=FILE_PAUSE_S, help="пауза после файла, с")
+    run.add_argument("--channel", default="", help="модель канала (seed у каждого зонда свой)")
+    run.add_argument("--order", default="sequential", choices=list(SCHEDULERS))
+    run.add_argument("--interleaver", default="modulo", help="modulo, block:ГЛУБИНА, random:SEED")
+    run.add_argument("--stagger", type=float, default=0.0, help="сдвиг старта зондов, с эфира")
+    run.add_argument("--seed", type=int, default=1)
+    run.add_argument("--speed", type=float, default=1.0,
+                     help="ускорение времени эфира (0 — писать без пауз)")
+    run.add_argument("--tcp", action="append", metavar="HOST:PORT",
+                     help="приёмник по TCP (можно несколько; по умолчанию 127.0.0.1:12000)")
+    run.add_argument("--connections", type=int, default=1, help="соединений на каждый --tcp")
+    run.add_argument("--pty", action="store_true", help="писать в псевдотерминал вместо TCP")
+    run.add_argument("--wait", type=float, default=5.0, help="пауза перед стартом с --pty, с")
+    run.add_argument("--batch", type=int, default=16, help="кадров на один системный вызов записи")
+    run.add_argument("--sndbuf", type=int, default=0, help="SO_SNDBUF, байт (0 — системный)")
+    run.add_argument("--cache", default=str(DEFAULT_CACHE_DIR), help="кэш закодированных файлов")
+    run.add_argument("--no-cache", action="store_true")
+    run.add_argument("--truth", help="записать истину и нагрузку в JSON")
+
+    sc = sub.add_parser("score", help="сверить истину с индексом spool-каталога приёмника")
+    sc.add_argument("truth")
+    sc.add_argument("--spool", default=str(DEFAULT_SPOOL))
+    sc.add_argument("--grace", type=float, default=60.0,
+                    help="сколько секунд после конца прогона учитывать записи индекса")
+    sc.add_argument("--min-rate", type=float, default=0.0,
+                    help="код выхода 1, если доля принятых из декодируемых ниже")
+    sc.add_argument("--json", help="записать результат сверки в JSON")
+
+    args = ap.parse_args(argv)
+    return cmd_run(args) if args.cmd == "run" else cmd_score(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,10 +8,12 @@
 import sys
 import time
 import os
+import math
 import random
-import socket
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Sequence
 
 # Подключаем общую папку shared (erasure_fec, protocol, theme_manager)
 _SHARED = str(Path(__file__).resolve().parent.parent / "shared")
@@ -22,16 +24,46 @@ from PyQt5 import uic
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QFileDialog, QWidget, QVBoxLayout,
     QHBoxLayout, QLabel, QFrame, QComboBox, QSpinBox, QTabWidget, QLineEdit,
+    QCheckBox, QPushButton, QPlainTextEdit,
 )
 from PyQt5.QtCore import Qt, QThread, pyqtSignal
 from PyQt5.QtGui import QPixmap
 
-from erasure_fec import ErasureEncoder
-from protocol import build_telem
+from erasure_fec import (PKT_SIZE, IL_MODULO, IL_BLOCK, IL_RANDOM, CODE_RS, CODE_CAUCHY16,
+                         Interleaver, INTERLEAVERS, make_interleaver)
+from protocol import build_telem, TELEM_LEN
+from channel import Channel, MODELS, UniformLoss, parse_channel
+from playlist import scan_playlist, FILE_BUF_MAX, FILE_PAUSE_S, CYCLE_PAUSE_S, EMPTY_CYCLE_PAUSE_S
+from progressive import to_progressive
+from fanout import FanOut, Target, parse_target
+from fountain import RatelessEncoder
+from fec_policy import FECChoice, FECPolicy, ImageContext, altitude_at, parse_policy
+from packet_cache import PacketCache, DEFAULT_CACHE_DIR, DEFAULT_MAX_BYTES, encode_wire
+from scheduler import SCHEDULERS, make_scheduler
+from pacing import AirRatePacer, E22_AIR_RATES, DEFAULT_AIR_RATE, estimate_duration
+from widgets import STATE_PARITY, STATE_SENT
 from theme_manager import Theme, load_theme, save_theme, apply_theme
 
 UI_PATH = Path(__file__).parent / "transmitter.ui"
 
+# Как часто воркер сообщает UI об отправленных блоках (диапазонами), с
+PROGRESS_INTERVAL = 0.05
+
+# Движки FEC: RS с фиксированным N (erasure_fec.py), код Коши на весь файл (cauchy_fec.py)
+# или фонтанный код (fountain.py)
+ENGINE_RS = "rs"
+ENGINE_CAUCHY = "cauchy"
+ENGINE_RATELESS = "rateless"
+ENGINES = {ENGINE_RS: "Reed–Solomon", ENGINE_CAUCHY: "Коши GF(2¹⁶), весь файл",
+           ENGINE_RATELESS: "Rateless (фонтанный)"}
+
+
+@dataclass
+class RatelessImage:
+    """Файл для фонтанного кода: кодер и число символов за проход K(1 + overhead)."""
+    encoder: RatelessEncoder
+    per_pass: int
+
 
 # ═══════════════════════════════════════════════════════════════
 #  Воркер передачи FEC-пакетов по TCP
@@ -43,13 +75,21 @@ class FECTransmitWorker(QThread):
     disconnected = pyqtSignal()
     error_occurred = pyqtSignal(str)
     encoding_done = pyqtSignal(int, int, int)   # image_id, k_data, n_total
-    packet_sent = pyqtSignal(int, bool)         # block_id, is_parity
+    blocks_sent = pyqtSignal(object)            # [(начало, конец)] block_id, отправленные с прошлого сигнала
     transfer_done = pyqtSignal(bool, float)     # успех, время в секундах
     log_message = pyqtSignal(str)
 
     def __init__(self, host: str, port: int, file_path: str,
                  callsign: str, image_id: int, delay_ms: int,
-                 fec_ratio: float, drop_percent: float = 0.0, tx_power: int = 33):
+                 fec_ratio: float, drop_percent: float = 0.0, tx_power: int = 33,
+                 air_rate: int = 0, telem_overhead: bool = True,
+                 channel_spec: str = "", channel_seed: Optional[int] = None,
+                 order: str = "sequential", interleaver: Optional[Interleaver] = None,
+                 cache: Optional[PacketCache] = None, batch: int = 1,
+                 nodelay: bool = False, sndbuf: int = 0, targets: Sequence[str] = (),
+                 fec_policy: Optional[FECPolicy] = None, flight_offset_s: float = 0.0,
+                 engine: str = ENGINE_RS, passes: int = 1, incremental: bool = False,
+                 progressive: bool = False):
         super().__init__()
         self.host = host
         self.port = port
@@ -60,64 +100,397 @@ class FECTransmitWorker(QThread):
         self.fec_ratio = fec_ratio
         self.drop_percent = max(0.0, min(100.0, drop_percent))  # симуляция потерь, %
         self.tx_power = tx_power
+        self.air_rate = air_rate              # бит/с в эфире E22; 0 — только пауза delay_ms
+        self.telem_overhead = telem_overhead  # учитывать эфирное время TELEM
+        self.channel_spec = channel_spec      # модель канала, см. channel.py
+        self.channel_seed = channel_seed
+        self.scheduler = make_scheduler(order, channel_seed)   # порядок отправки блоков
+        self.interleaver = interleaver or Interleaver()        # распределение по группам RS
+        self.cache = cache                                     # готовые образы пакетов на диске
+        self.batch = max(1, batch)            # кадров на один sendmsg
+        self.nodelay = nodelay                # TCP_NODELAY
+        self.sndbuf = sndbuf                  # SO_SNDBUF, байт; 0 — системный
+        self.targets = list(targets)          # дополнительные получатели, см. fanout.py
+        self.fec_policy = fec_policy          # FEC на каждый файл; None — fec_ratio для всех
+        self.flight_offset_s = flight_offset_s   # время полёта в момент старта передачи, с
+        self.engine = engine                  # ENGINE_RS, ENGINE_CAUCHY или ENGINE_RATELESS
+        self.passes = max(0, passes)          # проходов по файлу, 0 — до остановки
+        self.incremental = incremental        # RS: новая чётность на каждом проходе (ir_row)
+        self.progressive = progressive        # JPEG → прогрессивный перед кодированием, см. progressive.py
+        self._transcoded: dict[str, bytes] = {}    # прогрессивный файл: на всех проходах одни и те же байты
+        self._choices: dict[str, FECChoice] = {}   # FEC файла с прохода 0 — геометрия RS не меняется
+        self._t_start = time.monotonic()
+        self._encoded = 0                     # файлов закодировано (номер для политики)
         self._running = False
 
+    def _build_channel(self, spec: Optional[str] = None, seed: Optional[int] = None) -> Channel:
+        """Цепочка моделей канала: равномерный пропуск «Пропуск блоков» + заданная строкой."""
+        ch = parse_channel(self.channel_spec if spec is None else spec, seed)
+        if self.drop_percent > 0:
+            ch.models.insert(0, UniformLoss(self.drop_percent / 100.0,
+                                            seed=None if seed is None else seed ^ 0x5A5A))
+        return ch
+
+    def _connect(self) -> FanOut:
+        """Основной получатель host:port и дополнительные; у каждого свой канал (seed + номер)."""
+        specs = [f"{self.host}:{self.port}"] + self.targets
+        targets = []
+        try:
+            for i, spec in enumerate(specs):
+                seed = None if self.channel_seed is None else self.channel_seed + i
+                channel = self._build_channel(parse_target(spec)[3], seed)
+                targets.append(Target(spec, channel, self.batch, self.nodelay, self.sndbuf))
+        except Exception:
+            for tgt in targets:
+                tgt.close()
+            raise
+        return FanOut(targets)
+
     def run(self):
-        """Подключение по TCP, FEC-кодирование файла, отправка пакетов."""
+        """Подключение к получателям, FEC-кодирование файла, отправка пакетов."""
         self._running = True
-        sock = None
+        self._t_start = time.monotonic()
+        fan = None
         t0 = time.time()
         try:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(5.0)
-            sock.connect((self.host, self.port))
+            fan = self._connect()
             self.connected.emit()
-
-            # Кодируем файл в K data + M parity блоков (Reed-Solomon)
-            enc = ErasureEncoder(self.callsign, self.image_id, self.fec_ratio)
-            packets = enc.encode_file(self.file_path)
-            k = packets[0].k_data
-            n = packets[0].n_total
-            m = n - k
-            self.encoding_done.emit(self.image_id, k, n)
+            for i, tgt in enumerate(fan.targets):
+                if tgt.channel.models:
+                    self.log_message.emit(
+                        f"Канал{' ' + tgt.name if len(fan.targets) > 1 else ''}: {tgt.channel.describe()}"
+                        + (f"  (seed {self.channel_seed + i})" if self.channel_seed is not None else ""))
+
+            # Абсолютное расписание кадров: потерянный блок тоже занимает эфир
+            pacer = AirRatePacer(self.air_rate, self.delay_ms)
+            pacer.start()
+            if not self._transmit_all(fan, pacer):
+                return
+            fan.flush_channels()
+
+            pacer.wait(0, lambda: not self._running)   # дождаться конца последнего кадра в эфире
             self.log_message.emit(
-                f"FEC: K={k} data + M={m} parity = {n} блоков  "
-                f"({os.path.getsize(self.file_path)} Б, "
-                f"overhead {m / k * 100:.0f}%)")
-            if self.drop_percent > 0:
-                self.log_message.emit(
-                    f"Пропуск блоков: {self.drop_percent:.0f}% (случайный порядок)")
-
-            for pkt in packets:
-                if not self._running:
-                    return
-                # Случайный пропуск блока (симуляция потерь в эфире)
-                if self.drop_percent > 0 and random.random() * 100.0 < self.drop_percent:
-                    continue
-                # Каждые 64 блока вставляем телеметрию (RSSI/SNR) для совместимости с парсером приёмника
-                if pkt.block_id % 64 == 0:
-                    rssi = random.randint(-110, -60)
-                    snr = random.randint(20, 40)
-                    sock.sendall(build_telem(rssi, snr, self.tx_power))
-                sock.sendall(pkt.to_bytes())
-                self.packet_sent.emit(pkt.block_id, pkt.is_parity)
-                if self.delay_ms > 0:
-                    time.sleep(self.delay_ms / 1000.0)
-
+                f"Эфир: {pacer.elapsed:.2f} с (по расписанию {pacer.scheduled:.2f} с), "
+                f"макс. опоздание {pacer.max_late * 1000:.1f} мс"
+                + (f", сдвигов расписания {pacer.slips}" if pacer.slips else ""))
+            multi = len(fan.targets) + len(fan.dropped) > 1
+            for tgt in fan.targets + fan.dropped:
+                prefix = f"{tgt.name}: " if multi else ""
+                for name, st in tgt.channel.stats().items():
+                    self.log_message.emit(
+                        f"{prefix}Канал {name}: " + ", ".join(f"{k}={v}" for k, v in st.items()))
+                if self.batch > 1 or multi:
+                    self.log_message.emit(
+                        f"{prefix}Запись: {tgt.out.bytes / 1e6:.2f} МБ за {tgt.out.writes} вызовов, "
+                        f"{tgt.out.bytes / 1e6 / max(pacer.elapsed, 1e-6):.1f} МБ/с")
+                if tgt.error:
+                    self.log_message.emit(
+                        f"<span style='color:#e57373'>{tgt.name} отключён: {tgt.error}</span>")
             self.transfer_done.emit(True, time.time() - t0)
         except Exception as exc:
             self.error_occurred.emit(str(exc))
             self.transfer_done.emit(False, time.time() - t0)
         finally:
-            if sock:
-                sock.close()
+            if fan:
+                fan.close()
             self.disconnected.emit()
 
+    def _encode(self, path, image_id: int, cycle: int = 0):
+        """Кодируем файл в K data + M parity блоков (Reed-Solomon) или берём готовый образ из кэша.
+
+        cycle > 0 — проход нарастающей чётности с той же геометрией RS, что и проход 0.
+        Код Коши — один код на весь файл (cauchy_fec.py); в режиме rateless — кодер
+        фонтанного кода (символы считаются при отправке).
+        """
+        with open(path, "rb") as f:
+            data = f.read()
+        if self.progressive:
+            data = self._to_progressive(path, data)
+        if cycle and str(path) in self._choices:
+            return encode_wire(data, self.callsign, image_id, self._choices[str(path)].fec_ratio,
+                               self.interleaver, self.cache, self._choices[str(path)].num_groups, cycle)
+        choice = FECChoice(self.fec_ratio)
+        if self.fec_policy is not None:
+            t = self.flight_offset_s + time.monotonic() - self._t_start
+            choice = self.fec_policy.choose(ImageContext(self._encoded, t, len(data), altitude_at(t)))
+            self.log_message.emit(
+                f"Политика FEC ({t / 60:.0f} мин, {altitude_at(t) / 1000:.1f} км): {choice.describe()}")
+        self._encoded += 1
+        self._choices[str(path)] = choice
+        if self.engine == ENGINE_RATELESS:
+            enc = RatelessEncoder(data, self.callsign, image_id)
+            return RatelessImage(enc, enc.k_data + max(1, math.ceil(enc.k_data * choice.fec_ratio)))
+        if self.engine == ENGINE_CAUCHY:
+            return encode_wire(data, self.callsign, image_id, choice.fec_ratio, Interleaver(),
+                               self.cache, code=CODE_CAUCHY16)
+        return encode_wire(data, self.callsign, image_id, choice.fec_ratio, self.interleaver,
+                           self.cache, choice.num_groups, cycle)
+
+    def _to_progressive(self, path, data: bytes) -> bytes:
+        """Прогрессивный JPEG для передачи; перекодируется один раз на файл."""
+        out = self._transcoded.get(str(path))
+        if out is None:
+            out, tool = to_progressive(data)
+            if tool:
+                how = "без потерь (jpegtran)" if tool == "jpegtran" else "с пересжатием (Qt)"
+                self.log_message.emit(f"Прогрессивный JPEG {how}: {len(data)} → {len(out)} Б")
+            self._transcoded[str(path)] = out
+        return out
+
+    def _transmit_all(self, fan: FanOut, pacer: AirRatePacer) -> bool:
+        """Передать выбранный файл passes раз (0 — до остановки); False — остановлено пользователем.
+
+        RS без нарастающей чётности повторяет те же N пакетов, как прошивка; с ней
+        проход c несёт чётность строк ir_row(c, …). Проходы rateless — в _transmit_rateless.
+        """
+        img = self._encode(self.file_path, self.image_id)
+        if isinstance(img, RatelessImage):
+            return self._transmit(fan, img, pacer)
+        cycle = 0
+        while True:
+            if not self._transmit(fan, img, pacer):
+                return False
+            cycle += 1
+            if self.passes and cycle >= self.passes:
+                return True
+            if not pacer.pause(FILE_PAUSE_S, lambda: not self._running):
+                return False
+            if self.incremental:
+                img = self._encode(self.file_path, self.image_id, cycle)
+            self.log_message.emit(f"<b style='color:#64B5F6'>Проход {cycle + 1}</b>"
+                                  + (f": чётность прохода {cycle}" if self.incremental else ""))
+
+    def _transmit(self, fan: FanOut, img, pacer: AirRatePacer) -> bool:
+        """Отправить пакеты одного файла по расписанию pacer через каналы получателей."""
+        if isinstance(img, RatelessImage):
+            return self._transmit_rateless(fan, img, pacer)
+        info = img.info
+        k = info.k_data
+        n = info.n_total
+        m = n - k
+        self.encoding_done.emit(info.image_id, k, n)
+        self.log_message.emit(
+            f"FEC: K={k} data + M={m} parity = {n} блоков  "
+            f"({info.file_size} Б, "
+            f"overhead {m / k * 100:.0f}%)" + ("  [кэш]" if img.cached else ""))
+        telem_bytes = TELEM_LEN * ((n + 63) // 64) if self.telem_overhead else 0
+        if self.air_rate > 0:
+            est = estimate_duration(n, PKT_SIZE, self.air_rate, self.delay_ms, telem_bytes)
+            self.log_message.emit(
+                f"Эфир {self.air_rate / 1000:g} кбит/с + пауза {self.delay_ms} мс: "
+                f"оценка {est:.1f} с")
+
+        if info.code != CODE_RS:
+            self.log_message.emit("Код Коши GF(2¹⁶) по всему файлу: любые K из N")
+        elif self.interleaver.id != IL_MODULO:
+            self.log_message.emit(f"Интерливер групп RS: {self.interleaver.describe()}")
+        if self.scheduler.name != "sequential":
+            self.log_message.emit(f"Порядок отправки: {self.scheduler.name}")
+        order = self.scheduler.order(k, n, info.m_per_group, info.num_groups,
+                                     img.data() if self.scheduler.needs_data else b"",
+                                     info.interleaver_obj)
+        view = img.view
+        return self._send_frames(fan, pacer, ((bid, img.frame(bid), view, bid * PKT_SIZE) for bid in order))
+
+    def _transmit_rateless(self, fan: FanOut, img: RatelessImage, pacer: AirRatePacer) -> bool:
+        """Поток символов фонтанного кода: за проход per_pass новых esi, следующий проход продолжает счёт.
+
+        Символы следующих проходов — новые комбинации, а не повтор первого: приёмнику,
+        пропустившему часть прохода, годится любой пакет любого прохода.
+        """
+        enc = img.encoder
+        k, n = enc.k_data, img.per_pass
+        self.encoding_done.emit(enc.image_id, k, n)
+        self.log_message.emit(
+            f"Rateless: K={k}, за проход {n} символов ({enc.file_size} Б, "
+            f"overhead {(n - k) / k * 100:.0f}%), проходов {self.passes or '∞'}")
+        if self.air_rate > 0:
+            telem_bytes = TELEM_LEN * ((n + 63) // 64) if self.telem_overhead else 0
+            est = estimate_duration(n, PKT_SIZE, self.air_rate, self.delay_ms, telem_bytes)
+            self.log_message.emit(f"Эфир на проход: оценка {est:.1f} с")
+
+        def frames():
+            esi, done = 0, 0
+            while not self.passes or done < self.passes:
+                if done:
+                    self.log_message.emit(f"Проход {done + 1}: esi с {esi}")
+                for _ in range(n):
+                    # Ячейка матрицы: данные как есть, чётность — по кругу в n − k ячейках
+                    cell = esi if esi < k else k + (esi - k) % (n - k)
+                    yield cell, enc.packet(esi).to_bytes(), None, 0
+                    esi += 1
+                done += 1
+
+        return self._send_frames(fan, pacer, frames())
+
+    def _send_frames(self, fan: FanOut, pacer: AirRatePacer, frames) -> bool:
+        """Кадры (ячейка матрицы, кадр, общий буфер, смещение) по расписанию pacer с TELEM каждые 64."""
+        progress = _RangeBatch()
+        for i, (bid, frame, view, offset) in enumerate(frames):
+            # Накопленное уходит в сокет, как только расписание требует паузы
+            if fan.pending and pacer.until_next() > 0:
+                fan.flush()
+            if not pacer.wait(PKT_SIZE, lambda: not self._running) or not self._running:
+                return False
+            # Каждые 64 блока вставляем телеметрию (RSSI/SNR) для совместимости с парсером приёмника
+            if i % 64 == 0:
+                rssi = random.randint(-110, -60)
+                snr = random.randint(20, 40)
+                fan.send(build_telem(rssi, snr, self.tx_power), pacer.last_start)
+                if self.telem_overhead:
+                    pacer.charge(TELEM_LEN)
+            # Потерянный в канале блок тоже занимает эфир — решение после wait();
+            # в матрице отмечается блок, дошедший хотя бы до одного получателя
+            if fan.send(frame, pacer.last_start, view, offset):
+                progress.add(bid)
+                if progress.due():
+                    self.blocks_sent.emit(progress.take())
+        fan.flush()
+        if progress.ranges:
+            self.blocks_sent.emit(progress.take())
+        return True
+
     def stop(self):
         """Остановка цикла передачи по запросу пользователя."""
         self._running = False
 
 
+class _RangeBatch:
+    """Отправленные block_id, свёрнутые в диапазоны [начало, конец) — сигнал UI не чаще PROGRESS_INTERVAL."""
+
+    def __init__(self):
+        self.ranges: list[list[int]] = []
+        self._last = time.monotonic()
+
+    def add(self, bid: int):
+        if self.ranges and self.ranges[-1][1] == bid:
+            self.ranges[-1][1] += 1
+        else:
+            self.ranges.append([bid, bid + 1])
+
+    def due(self) -> bool:
+        return time.monotonic() - self._last >= PROGRESS_INTERVAL
+
+    def take(self) -> list[list[int]]:
+        out, self.ranges = self.ranges, []
+        self._last = time.monotonic()
+        return out
+
+
+class PlaylistTransmitWorker(FECTransmitWorker):
+    """Передача каталога по кругу, как в прошивке (playlist.py).
+
+    Следующий файл кодируется в фоновом потоке, пока передаётся текущий, так что
+    между изображениями в эфире только паузы прошивки. image_id назначается при
+    постановке файла в очередь кодирования и растёт на каждый файл.
+    """
+    file_started = pyqtSignal(str, int)    # путь, image_id
+    image_id_changed = pyqtSignal(int)     # следующий свободный image_id
+    cycle_done = pyqtSignal(int, int)      # номер круга, передано файлов
+
+    def __init__(self, host: str, port: int, directory: str, callsign: str,
+                 image_id: int, delay_ms: int, fec_ratio: float, drop_percent: float = 0.0,
+                 tx_power: int = 33, air_rate: int = 0, telem_overhead: bool = True,
+                 channel_spec: str = "", channel_seed: Optional[int] = None,
+                 order: str = "sequential", interleaver: Optional[Interleaver] = None,
+                 cache: Optional[PacketCache] = None, batch: int = 1, nodelay: bool = False,
+                 sndbuf: int = 0, targets: Sequence[str] = (), fec_policy: Optional[FECPolicy] = None,
+                 flight_offset_s: float = 0.0, engine: str = ENGINE_RS, passes: int = 1,
+                 incremental: bool = False, progressive: bool = False, loop: bool = True,
+                 file_pause_s: float = FILE_PAUSE_S, cycle_pause_s: float = CYCLE_PAUSE_S):
+        super().__init__(host, port, directory, callsign, image_id, delay_ms, fec_ratio,
+                         drop_percent, tx_power, air_rate, telem_overhead,
+                         channel_spec, channel_seed, order, interleaver, cache,
+                         batch, nodelay, sndbuf, targets, fec_policy, flight_offset_s,
+                         engine, passes, incremental, progressive)
+        self.directory = directory
+        self.loop = loop                  # False — один круг
+        self.file_pause_s = file_pause_s
+        self.cycle_pause_s = cycle_pause_s
+        self._pass = 0                            # круг плейлиста, который кодируется сейчас
+        self._ids: dict[str, int] = {}            # нарастающая чётность: image_id файла на всех кругах
+        self._skipped: set[tuple[str, int]] = set()   # (путь, размер) — о пропуске уже сообщено
+
+    def _playlist(self):
+        """Пути файлов по кругам; None отмечает конец круга."""
+        while True:
+            files, skipped = scan_playlist(self.directory)
+            for path, size in skipped:
+                if (str(path), size) in self._skipped:
+                    continue
+                self._skipped.add((str(path), size))
+                self.log_message.emit(
+                    f"<span style='color:#FFB74D'>{path.name}: {size} Б &gt; {FILE_BUF_MAX}, пропуск</span>")
+            yield from files
+            yield None
+            if not self.loop:
+                return
+
+    def _prefetch(self, pool: ThreadPoolExecutor, paths):
+        """Следующий элемент плейлиста: (путь, image_id, future с образом), (None, 0, None) — конец круга.
+
+        С нарастающей чётностью файл сохраняет image_id на всех кругах, а круг c несёт
+        чётность прохода c — приёмник объединяет её с прежними кругами.
+        """
+        path = next(paths, False)
+        if path is False:
+            return None
+        if path is None:
+            self._pass += 1
+            return None, 0, None
+        iid = self._ids.get(str(path)) if self.incremental else None
+        if iid is None:
+            iid = self.image_id
+            self.image_id = (iid + 1) & 0xFF
+            if self.incremental:
+                self._ids[str(path)] = iid
+        cycle = self._pass if self.incremental and self.engine == ENGINE_RS else 0
+        return path, iid, pool.submit(self._encode, path, iid, cycle)
+
+    def _transmit_all(self, fan: FanOut, pacer: AirRatePacer) -> bool:
+        cancelled = lambda: not self._running
+        paths = self._playlist()
+        cycle, sent = 1, 0
+        idle = False                      # прошлый круг ничего не передал — не повторять сообщение
+        with ThreadPoolExecutor(1, thread_name_prefix="fec-encode") as pool:
+            ahead = self._prefetch(pool, paths)
+            try:
+                while ahead is not None:
+                    path, iid, fut = ahead
+                    ahead = self._prefetch(pool, paths)   # кодируется, пока идёт передача
+                    if path is None:
+                        self.cycle_done.emit(cycle, sent)
+                        if sent or not idle:
+                            self.log_message.emit(
+                                f"<b style='color:#64B5F6'>Круг {cycle}</b>: передано файлов {sent}"
+                                + ("" if sent else " — JPEG в каталоге нет"))
+                        if ahead is None:
+                            break
+                        # Пустой круг при нулевой паузе — не перечитывать каталог без остановки
+                        pause = self.cycle_pause_s if sent else max(self.cycle_pause_s, EMPTY_CYCLE_PAUSE_S)
+                        cycle, sent, idle = cycle + 1, 0, not sent
+                        if not pacer.pause(pause, cancelled):
+                            return False
+                        continue
+                    try:
+                        img = fut.result()
+                    except (OSError, ValueError) as exc:
+                        self.log_message.emit(f"<span style='color:#e57373'>{path.name}: {exc}</span>")
+                        continue
+                    self.image_id_changed.emit(self.image_id if self.incremental else (iid + 1) & 0xFF)
+                    self.file_started.emit(str(path), iid)
+                    self.log_message.emit(f"<b>{path.name}</b>  image={iid}")
+                    if not self._transmit(fan, img, pacer):
+                        return False
+                    sent += 1
+                    if not pacer.pause(self.file_pause_s, cancelled):
+                        return False
+            finally:
+                if ahead is not None and ahead[2] is not None:
+                    ahead[2].cancel()   # остановка — следующий файл не нужен
+        return True
+
+
 # ═══════════════════════════════════════════════════════════════
 #  Вспомогательные функции
 # ═══════════════════════════════════════════════════════════════
@@ -149,12 +522,16 @@ class TransmitterWindow(QMainWindow):
 
         self._worker: Optional[FECTransmitWorker] = None
         self._n_total = 0      # всего блоков (K + M)
+        self._k_data = 0       # блоков данных K
         self._sent = 0        # отправлено пакетов
         self._image_counter = 0  # счётчик image_id для нескольких файлов подряд
+        self._busy = False       # воркер передачи запущен и ещё не отключился
+        self._cache: Optional[PacketCache] = None
 
         self._setup_tabs()
         self._connect_signals()
         self.splitter.setSizes([380, 480])
+        self.log.document().setMaximumBlockCount(5000)   # плейлист может идти часами
         self.progress.setProperty("class", "tx")
         self.img_label.setStyleSheet("")
 
@@ -192,7 +569,14 @@ class TransmitterWindow(QMainWindow):
             "Callsign — позывной (до 6 символов). "
             "FEC overhead — доля parity-блоков. "
             "Пропуск блоков — доля пакетов, случайно не отправляемых (симуляция потерь). "
-            "Задержка — пауза между пакетами.")
+            "Air rate — скорость E22 в эфире: пакет занимает 256 Б × 8 / air rate, "
+            "затем идёт пауза «Задержка» (в прошивке 50 мс); кадры отправляются по "
+            "абсолютному расписанию, время передачи совпадает с полётным. "
+            "Канал — модели потерь пачками, замираний, битовых ошибок, дублей, "
+            "перестановок и сбоев UART (channel.py); seed делает прогон воспроизводимым. "
+            "Порядок — очерёдность отправки блоков (scheduler.py), приёмнику он безразличен. "
+            "Прогрессивный JPEG с порядком progressive — приёмник показывает изображение "
+            "целиком уже по грубым сканам.")
         r1 = QHBoxLayout(); r1.setSpacing(12)
         r1.addWidget(QLabel("Callsign:"))
         self.edit_callsign = QLineEdit("LORETT")
@@ -211,11 +595,246 @@ class TransmitterWindow(QMainWindow):
         r2.addWidget(QLabel("Задержка:"))
         self.sb_delay.show(); r2.addWidget(self.sb_delay)
         r2.addStretch(); ls.addLayout(r2)
+
+        r3 = QHBoxLayout(); r3.setSpacing(12)
+        r3.addWidget(QLabel("Air rate:"))
+        self.cb_airrate = QComboBox()
+        self.cb_airrate.addItem("Без модели эфира", 0)
+        for rate in E22_AIR_RATES:
+            self.cb_airrate.addItem(f"{rate / 1000:g} кбит/с", rate)
+        self.cb_airrate.setCurrentIndex(self.cb_airrate.findData(DEFAULT_AIR_RATE))
+        r3.addWidget(self.cb_airrate)
+        self.chk_telem_air = QCheckBox("Учитывать TELEM")
+        self.chk_telem_air.setChecked(True)
+        r3.addWidget(self.chk_telem_air)
+        r3.addWidget(QLabel("Порядок:"))
+        self.cb_order = QComboBox()
+        for name in SCHEDULERS:
+            self.cb_order.addItem(name, name)
+        self.cb_order.setToolTip(
+            "sequential — как в прошивке; roundrobin — по кругу по группам RS; "
+            "interleave — чётность вперемешку с данными; random — перестановка по seed; "
+            "importance — заголовок JPEG первым; progressive — грубые сканы "
+            "прогрессивного JPEG первыми, затем данные по порядку")
+        r3.addWidget(self.cb_order)
+        self.chk_progressive = QCheckBox("Прогрессивный JPEG")
+        self.chk_progressive.setToolTip(
+            "Перекодировать JPEG в прогрессивный перед отправкой (progressive.py): "
+            "по части блоков приёмник показывает всё изображение, сначала грубо. "
+            "jpegtran — без потерь и с маркерами RST; без него — пересжатие Qt")
+        self.chk_progressive.toggled.connect(
+            lambda on: on and self.cb_order.setCurrentIndex(self.cb_order.findData("progressive")))
+        r3.addWidget(self.chk_progressive)
+        r3.addWidget(QLabel("Интерливер:"))
+        self.cb_interleaver = QComboBox()
+        for il_id, cls in INTERLEAVERS.items():
+            self.cb_interleaver.addItem(cls.name, il_id)
+        self.cb_interleaver.setToolTip(
+            "Распределение блоков по группам RS, передаётся приёмнику в резервных байтах. "
+            "modulo — i % групп, как в прошивке; block — глубина; random — seed")
+        r3.addWidget(self.cb_interleaver)
+        self.sb_il_param = QSpinBox()
+        self.sb_il_param.setRange(1, 65535); self.sb_il_param.setValue(8)
+        self.sb_il_param.setToolTip("Глубина (block) или seed (random)")
+        self.cb_interleaver.currentIndexChanged.connect(
+            lambda: self.sb_il_param.setEnabled(self.cb_interleaver.currentData() != IL_MODULO))
+        self.sb_il_param.setEnabled(False)
+        r3.addWidget(self.sb_il_param)
+        r3.addStretch(); ls.addLayout(r3)
+
+        r4 = QHBoxLayout(); r4.setSpacing(12)
+        r4.addWidget(QLabel("Канал:"))
+        self.edit_channel = QLineEdit()
+        self.edit_channel.setPlaceholderText("ge:loss=0.1,burst=8; ber:1e-5; dup:0.01")
+        self.edit_channel.setToolTip(
+            "Модели через «;»: " + ", ".join(
+                f"{name}:{','.join(cls.params)}" for name, cls in MODELS.items()))
+        r4.addWidget(self.edit_channel, 1)
+        r4.addWidget(QLabel("Seed:"))
+        self.sb_seed = QSpinBox()
+        self.sb_seed.setRange(-1, 999999); self.sb_seed.setValue(-1)
+        self.sb_seed.setSpecialValueText("случайный")
+        r4.addWidget(self.sb_seed)
+        ls.addLayout(r4)
         root.addWidget(card_s)
 
+        card_p, lp = _make_card(
+            "Плейлист",
+            "Как в прошивке: все JPEG каталога по кругу, файлы больше 64 КБ пропускаются, "
+            "пауза после файла и перед новым кругом, image_id растёт с каждым файлом. "
+            "Следующий файл кодируется во время передачи текущего — для длительных прогонов.")
+        self.chk_playlist = QCheckBox("Передавать каталог вместо одного файла")
+        self.chk_playlist.toggled.connect(self._update_send_enabled)
+        lp.addWidget(self.chk_playlist)
+        rp1 = QHBoxLayout(); rp1.setSpacing(12)
+        rp1.addWidget(QLabel("Каталог:"))
+        default_dir = Path(__file__).resolve().parent.parent / "test_images"
+        self.edit_playlist = QLineEdit(str(default_dir) if default_dir.is_dir() else "")
+        self.edit_playlist.textChanged.connect(self._update_send_enabled)
+        rp1.addWidget(self.edit_playlist, 1)
+        btn_pl = QPushButton("Обзор…"); btn_pl.clicked.connect(self._browse_playlist)
+        rp1.addWidget(btn_pl); lp.addLayout(rp1)
+        rp2 = QHBoxLayout(); rp2.setSpacing(12)
+        rp2.addWidget(QLabel("Пауза после файла:"))
+        self.sb_file_pause = QSpinBox()
+        self.sb_file_pause.setRange(0, 60000); self.sb_file_pause.setSingleStep(100)
+        self.sb_file_pause.setValue(int(FILE_PAUSE_S * 1000)); self.sb_file_pause.setSuffix(" мс")
+        rp2.addWidget(self.sb_file_pause)
+        rp2.addWidget(QLabel("Перед кругом:"))
+        self.sb_cycle_pause = QSpinBox()
+        self.sb_cycle_pause.setRange(0, 3600); self.sb_cycle_pause.setValue(int(CYCLE_PAUSE_S))
+        self.sb_cycle_pause.setSuffix(" с")
+        rp2.addWidget(self.sb_cycle_pause)
+        self.chk_loop = QCheckBox("Повторять круги"); self.chk_loop.setChecked(True)
+        rp2.addWidget(self.chk_loop)
+        rp2.addStretch(); lp.addLayout(rp2)
+        root.addWidget(card_p)
+
+        card_c, lc = _make_card(
+            "Кэш пакетов",
+            f"Закодированные файлы сохраняются в {DEFAULT_CACHE_DIR} как готовые пакеты "
+            "(ключ — содержимое файла, callsign, image_id, FEC и интерливер); "
+            "повторная передача не кодирует файл заново. Старые записи удаляются по лимиту.")
+        rc = QHBoxLayout(); rc.setSpacing(12)
+        self.chk_cache = QCheckBox("Использовать кэш"); self.chk_cache.setChecked(True)
+        rc.addWidget(self.chk_cache)
+        rc.addWidget(QLabel("Лимит:"))
+        self.sb_cache_mb = QSpinBox()
+        self.sb_cache_mb.setRange(16, 65536); self.sb_cache_mb.setSingleStep(64)
+        self.sb_cache_mb.setValue(DEFAULT_MAX_BYTES // (1024 * 1024)); self.sb_cache_mb.setSuffix(" МБ")
+        rc.addWidget(self.sb_cache_mb)
+        btn_clear = QPushButton("Очистить"); btn_clear.clicked.connect(self._clear_cache)
+        rc.addWidget(btn_clear)
+        rc.addStretch(); lc.addLayout(rc)
+        root.addWidget(card_c)
+
+        card_w, lw = _make_card(
+            "Сокет",
+            "Кадры, которые расписание эфира разрешает отправить сразу (задержка 0, "
+            "догоняющий темп), копятся и уходят одним вызовом sendmsg. "
+            "1 кадр — запись каждого пакета отдельно, как раньше.")
+        rw = QHBoxLayout(); rw.setSpacing(12)
+        rw.addWidget(QLabel("Пакет записи:"))
+        self.sb_batch = QSpinBox()
+        self.sb_batch.setRange(1, 1024); self.sb_batch.setValue(1); self.sb_batch.setSuffix(" кадр.")
+        rw.addWidget(self.sb_batch)
+        rw.addWidget(QLabel("SO_SNDBUF:"))
+        self.sb_sndbuf = QSpinBox()
+        self.sb_sndbuf.setRange(0, 65536); self.sb_sndbuf.setSingleStep(64); self.sb_sndbuf.setSuffix(" КБ")
+        self.sb_sndbuf.setSpecialValueText("системный")
+        rw.addWidget(self.sb_sndbuf)
+        self.chk_nodelay = QCheckBox("TCP_NODELAY")
+        rw.addWidget(self.chk_nodelay)
+        rw.addStretch(); lw.addLayout(rw)
+        root.addWidget(card_w)
+
+        card_f, lf = _make_card(
+            "Дополнительные получатели",
+            "Тот же закодированный поток рассылается ещё по этим адресам, по одному на строку: "
+            "host:port (TCP), udp://host:port, udp://239.x.x.x:port (multicast). "
+            "У каждого получателя своя модель канала (seed + номер строки); "
+            "после «@» можно задать другую, например udp://239.0.0.1:12001@ge:loss=0.2,burst=10.")
+        self.edit_targets = QPlainTextEdit()
+        self.edit_targets.setPlaceholderText("127.0.0.1:12001\nudp://239.0.0.1:12002")
+        self.edit_targets.setFixedHeight(80)
+        lf.addWidget(self.edit_targets)
+        root.addWidget(card_f)
+
+        card_fe, lfe = _make_card(
+            "Код FEC",
+            "Reed–Solomon — как в прошивке: N = K + чётность, повтор файла шлёт те же блоки; "
+            "с нарастающей чётностью каждый проход (круг плейлиста) несёт новые строки "
+            "проверочной матрицы, а файл сохраняет image_id, и приёмник объединяет чётность всех проходов. "
+            "Коши — один MDS-код по GF(2¹⁶) на весь файл (cauchy_fec.py): без деления на группы по 255 "
+            "блоков, любые K из N пакетов при любой раскладке потерь; файлы больше 64 КБ. "
+            "Rateless — фонтанный код (fountain.py, тип пакета 0x69): каждый проход даёт новые "
+            "символы, приёмник собирает файл из любых ~K пакетов любых проходов; "
+            "за проход уходит K × (1 + FEC overhead) символов. 0 проходов — до остановки.")
+        rfe = QHBoxLayout(); rfe.setSpacing(12)
+        rfe.addWidget(QLabel("Код:"))
+        self.cb_engine = QComboBox()
+        for name, title in ENGINES.items():
+            self.cb_engine.addItem(title, name)
+        rfe.addWidget(self.cb_engine)
+        rfe.addWidget(QLabel("Проходов:"))
+        self.sb_passes = QSpinBox()
+        self.sb_passes.setRange(0, 1000); self.sb_passes.setValue(1)
+        self.sb_passes.setSpecialValueText("∞")
+        self.sb_passes.setToolTip("Один файл: повторов передачи; плейлист — проходов rateless по каждому файлу")
+        rfe.addWidget(self.sb_passes)
+        self.chk_ir = QCheckBox("Нарастающая чётность")
+        self.chk_ir.setToolTip("RS: новая чётность на каждом проходе (версия 2 расширенного заголовка)")
+        self.cb_engine.currentIndexChanged.connect(
+            lambda: self.chk_ir.setEnabled(self.cb_engine.currentData() == ENGINE_RS))
+        rfe.addWidget(self.chk_ir)
+        rfe.addStretch(); lfe.addLayout(rfe)
+        root.addWidget(card_fe)
+
+        card_fp, lfp = _make_card(
+            "Адаптивный FEC",
+            "Политика выбирает долю чётности и число групп RS для каждого файла по времени "
+            "полёта, высоте (номинальный профиль подъёма) или тренду RSSI прошлого полёта. "
+            "Пусто — доля «FEC overhead» для всех файлов. Примеры: schedule:by=alt,0=0.25,15000=0.5; "
+            "loss:p=0.1,target=0.95; rssi:profile=flight.csv. Сравнение политик: python fec_policy.py.")
+        rfp = QHBoxLayout(); rfp.setSpacing(12)
+        rfp.addWidget(QLabel("Политика:"))
+        self.edit_fec_policy = QLineEdit()
+        self.edit_fec_policy.setPlaceholderText("fixed")
+        rfp.addWidget(self.edit_fec_policy, 1)
+        rfp.addWidget(QLabel("Время полёта на старте:"))
+        self.sb_flight_min = QSpinBox()
+        self.sb_flight_min.setRange(0, 24 * 60); self.sb_flight_min.setSuffix(" мин")
+        rfp.addWidget(self.sb_flight_min)
+        lfp.addLayout(rfp)
+        root.addWidget(card_fp)
+
         root.addStretch()
         return page
 
+    def _interleaver(self) -> Interleaver:
+        il_id = self.cb_interleaver.currentData()
+        value = self.sb_il_param.value()
+        return make_interleaver(il_id, param=value if il_id == IL_BLOCK else 0,
+                                seed=value if il_id == IL_RANDOM else 0)
+
+    def _packet_cache(self) -> Optional[PacketCache]:
+        if not self.chk_cache.isChecked():
+            return None
+        try:
+            if self._cache is None:
+                self._cache = PacketCache(DEFAULT_CACHE_DIR)
+        except OSError as exc:
+            self._log(f"<b style='color:#FFB74D'>Кэш недоступен: {exc}</b>")
+            return None
+        self._cache.max_bytes = self.sb_cache_mb.value() * 1024 * 1024
+        return self._cache
+
+    def _clear_cache(self):
+        cache = self._cache or (PacketCache(DEFAULT_CACHE_DIR) if DEFAULT_CACHE_DIR.is_dir() else None)
+        if cache is None:
+            return
+        before = cache.size()
+        limit, cache.max_bytes = cache.max_bytes, 0
+        cache.evict()
+        cache.max_bytes = limit
+        self._log(f"Кэш пакетов очищен: {(before - cache.size()) / 1e6:.1f} МБ")
+
+    def _browse_playlist(self):
+        path = QFileDialog.getExistingDirectory(self, "Каталог с JPEG", self.edit_playlist.text())
+        if path:
+            self.edit_playlist.setText(path)
+
+    def _playlist_mode(self) -> bool:
+        return self.chk_playlist.isChecked()
+
+    def _update_send_enabled(self):
+        if self._busy:
+            return
+        if self._playlist_mode():
+            self.btn_send.setEnabled(os.path.isdir(self.edit_playlist.text()))
+        else:
+            self.btn_send.setEnabled(bool(self.edit_file.text()))
+
     def _on_theme_changed(self):
         theme = Theme(self.cb_theme.currentData())
         save_theme(theme); apply_theme(QApplication.instance(), theme)
@@ -246,7 +865,7 @@ class TransmitterWindow(QMainWindow):
         if not px.isNull():
             self.img_label.setPixmap(px.scaled(
                 self.img_label.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation))
-        self.btn_send.setEnabled(True)
+        self._update_send_enabled()
 
     def _toggle(self):
         """Кнопка «Подключить»/«Остановить»: запуск или остановка передачи."""
@@ -256,50 +875,120 @@ class TransmitterWindow(QMainWindow):
 
     def _start_transfer(self):
         """Проверка файла, создание воркера, подключение сигналов и старт потока."""
-        fp = self.edit_file.text()
-        if not fp or not os.path.isfile(fp):
+        playlist = self._playlist_mode()
+        fp = self.edit_playlist.text() if playlist else self.edit_file.text()
+        if playlist and not os.path.isdir(fp):
+            self._log("<b style='color:#FFB74D'>Выберите каталог плейлиста</b>"); return
+        if not playlist and (not fp or not os.path.isfile(fp)):
             self._log("<b style='color:#FFB74D'>Выберите файл</b>"); return
-        self.matrix.clear_all(); self.progress.setValue(0); self._sent = 0
 
         cs = self.edit_callsign.text() if hasattr(self, "edit_callsign") else "LORETT"
         fec = self.sb_fec.value() / 100.0 if hasattr(self, "sb_fec") else 0.25
         drop = self.sb_drop.value() if hasattr(self, "sb_drop") else 0
+        spec = self.edit_channel.text().strip()
+        seed = self.sb_seed.value() if self.sb_seed.value() >= 0 else None
+        try:
+            parse_channel(spec)
+        except ValueError as exc:
+            self._log(f"<b style='color:#e57373'>Канал: {exc}</b>"); return
+        policy = None
+        if self.edit_fec_policy.text().strip():
+            try:
+                policy = parse_policy(self.edit_fec_policy.text())
+            except (OSError, ValueError) as exc:
+                self._log(f"<b style='color:#e57373'>Политика FEC: {exc}</b>"); return
+        targets = [ln.strip() for ln in self.edit_targets.toPlainText().splitlines() if ln.strip()]
+        try:
+            for t in targets:
+                parse_channel(parse_target(t)[3] or "")
+        except ValueError as exc:
+            self._log(f"<b style='color:#e57373'>Получатели: {exc}</b>"); return
+        engine = self.cb_engine.currentData()
+        passes = self.sb_passes.value()
+        if playlist and engine == ENGINE_RATELESS and passes == 0:
+            self._log("<b style='color:#FFB74D'>Плейлист: число проходов rateless должно быть конечным</b>")
+            return
+        self.matrix.clear_all(); self.progress.setValue(0); self._sent = 0
 
-        self._worker = FECTransmitWorker(
-            self.edit_ip.text(), self.sb_port.value(), fp,
-            cs, self._image_counter, self.sb_delay.value(), fec, drop)
-        self._image_counter = (self._image_counter + 1) & 0xFF
+        opts = dict(air_rate=self.cb_airrate.currentData(),
+                    telem_overhead=self.chk_telem_air.isChecked(),
+                    channel_spec=spec, channel_seed=seed,
+                    order=self.cb_order.currentData(),
+                    interleaver=self._interleaver(),
+                    cache=self._packet_cache(),
+                    batch=self.sb_batch.value(),
+                    nodelay=self.chk_nodelay.isChecked(),
+                    sndbuf=self.sb_sndbuf.value() * 1024,
+                    targets=targets,
+                    fec_policy=policy,
+                    flight_offset_s=self.sb_flight_min.value() * 60.0,
+                    engine=engine, passes=passes,
+                    incremental=engine == ENGINE_RS and self.chk_ir.isChecked(),
+                    progressive=self.chk_progressive.isChecked())
+        if playlist:
+            self._worker = PlaylistTransmitWorker(
+                self.edit_ip.text(), self.sb_port.value(), fp,
+                cs, self._image_counter, self.sb_delay.value(), fec, drop,
+                loop=self.chk_loop.isChecked(),
+                file_pause_s=self.sb_file_pause.value() / 1000.0,
+                cycle_pause_s=float(self.sb_cycle_pause.value()), **opts)
+            self._worker.image_id_changed.connect(self._on_image_id_changed)
+            self._worker.file_started.connect(self._on_file_started)
+        else:
+            self._worker = FECTransmitWorker(
+                self.edit_ip.text(), self.sb_port.value(), fp,
+                cs, self._image_counter, self.sb_delay.value(), fec, drop, **opts)
+            self._image_counter = (self._image_counter + 1) & 0xFF
 
         self._worker.connected.connect(lambda: self._log("<b style='color:#81C784'>TCP OK</b>"))
         self._worker.disconnected.connect(self._on_disconnected)
         self._worker.error_occurred.connect(lambda e: self._log(f"<b style='color:#e57373'>{e}</b>"))
         self._worker.encoding_done.connect(self._on_encoding_done)
-        self._worker.packet_sent.connect(self._on_packet_sent)
+        self._worker.blocks_sent.connect(self._on_blocks_sent)
         self._worker.transfer_done.connect(self._on_done)
         self._worker.log_message.connect(self._log)
         self._worker.start()
+        self._busy = True
         self.btn_send.setEnabled(False); self.btn_connect.setText("Остановить")
-        self._log(f"Подключение к {self.edit_ip.text()}:{self.sb_port.value()}...")
+        self._log(f"Подключение к {self.edit_ip.text()}:{self.sb_port.value()}"
+                  + (f" и ещё {len(targets)} получателям" if targets else "") + "...")
 
     def _on_disconnected(self):
+        self._busy = False
         self.btn_connect.setText("Подключить")
-        self.btn_send.setEnabled(bool(self.edit_file.text()))
+        self._update_send_enabled()
         self.statusbar.showMessage("Отключено")
 
+    def _on_image_id_changed(self, next_id):
+        self._image_counter = next_id
+
+    def _on_file_started(self, path, iid):
+        """Плейлист перешёл к следующему файлу: предпросмотр и строка состояния."""
+        self.edit_file.setText(path)
+        px = QPixmap(path)
+        if not px.isNull():
+            self.img_label.setPixmap(px.scaled(
+                self.img_label.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation))
+        self.statusbar.showMessage(f"Плейлист: {Path(path).name}, image={iid}")
+
     def _on_encoding_done(self, iid, k, n):
         """После FEC-кодирования: задаём размер матрицы и прогресс-бара."""
+        self.matrix.clear_all(); self.progress.setValue(0); self._sent = 0
         self._n_total = n
+        self._k_data = k
         self.matrix.set_total(n)
         self.progress.setMaximum(n)
         self._log(f"<b style='color:#64B5F6'>FEC</b> image={iid}  K={k}  N={n}")
 
-    def _on_packet_sent(self, bid, is_parity):
-        """Обновление ячейки матрицы (отправлен data или parity) и счётчика."""
-        if is_parity:
-            self.matrix.mark_parity(bid)
-        else:
-            self.matrix.mark_sent(bid)
-        self._sent += 1
+    def _on_blocks_sent(self, ranges):
+        """Пачка отправленных диапазонов block_id: ячейки матрицы (data или parity) и счётчик."""
+        k = self._k_data
+        for start, stop in ranges:
+            if start < k:
+                self.matrix.mark_range(start, min(stop, k), STATE_SENT)
+            if stop > k:
+                self.matrix.mark_range(max(start, k), stop, STATE_PARITY)
+            self._sent += stop - start
         self.progress.setValue(self._sent)
         if self._n_total:
             self.lbl_chunks.setText(
@@ -312,9 +1001,8 @@ class TransmitterWindow(QMainWindow):
         clr = "#81C784" if ok else "#e57373"
         self._log(f"<b style='color:{clr}'>{tag}</b> за {elapsed:.1f} с")
         if ok:
-            for i in range(self._n_total):
-                self.matrix.mark(i)
-        self.btn_send.setEnabled(True); self.btn_connect.setText("Подключить")
+            self.matrix.mark_range(0, self._n_total)
+        self.btn_connect.setText("Подключить")
 
     def closeEvent(self, event):
         """При закрытии окна останавливаем воркер передачи."""
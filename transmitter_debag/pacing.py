@@ -0,0 +1,121 @@
+"""Темп передачи по эфиру E22: расписание с абсолютными дедлайнами по монотонным часам.
+
+Каждый кадр занимает эфир на nbytes × 8 / air_rate секунд, после чего идёт
+межпакетная пауза (как INTER_PACKET_DELAY_MS в прошивке). Время начала кадра i
+считается от старта передачи: t0 + Σ(airtime + gap), а не «sleep после sendall»,
+поэтому задержки сокета и планировщика ОС не накапливаются. Полное время файла
+совпадает с оценкой ТЗ §8.1: N × (256 Б / air_rate + gap).
+"""
+
+import time
+from typing import Callable, Optional
+
+# Скорости в эфире E22 (бит/с): E22_AIRRATE_2K4 … E22_AIRRATE_62K5 в config.h прошивки
+E22_AIR_RATES = (2400, 4800, 9600, 19200, 38400, 62500)
+DEFAULT_AIR_RATE = 9600
+DEFAULT_GAP_MS = 50      # INTER_PACKET_DELAY_MS прошивки
+
+# Отставание, после которого расписание переносится на «сейчас» вместо пачки кадров подряд
+MAX_LAG_S = 1.0
+# Максимальный кусок сна — чтобы stop() срабатывал быстро даже на 2.4 кбит/с
+_SLEEP_SLICE = 0.1
+
+
+def airtime_s(nbytes: int, air_rate: int) -> float:
+    """Время в эфире для nbytes при скорости air_rate бит/с (0 — эфир не моделируется)."""
+    return nbytes * 8 / air_rate if air_rate > 0 else 0.0
+
+
+def estimate_duration(n_packets: int, pkt_size: int, air_rate: int, gap_ms: float,
+                      extra_bytes: int = 0) -> float:
+    """Оценка времени передачи файла по формуле §8.1; extra_bytes — накладные (TELEM)."""
+    return n_packets * (airtime_s(pkt_size, air_rate) + gap_ms / 1000.0) \
+        + airtime_s(extra_bytes, air_rate)
+
+
+class AirRatePacer:
+    """Расписание кадров в эфире.
+
+    wait(nbytes) блокирует до дедлайна очередного кадра и резервирует под него
+    airtime + gap; charge(nbytes) добавляет эфирное время без паузы (TELEM).
+    Если отправитель отстал больше чем на MAX_LAG_S, расписание сдвигается
+    (счётчик slips), иначе догоняет без пауз — средний темп сохраняется.
+    """
+
+    def __init__(self, air_rate: int = DEFAULT_AIR_RATE, gap_ms: float = DEFAULT_GAP_MS,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.air_rate = max(0, int(air_rate))
+        self.gap_s = max(0.0, gap_ms) / 1000.0
+        self._clock = clock
+        self._sleep = sleep
+        self._t0: Optional[float] = None
+        self._next = 0.0
+        self.frames = 0
+        self.slips = 0
+        self.max_late = 0.0   # наибольшее опоздание кадра относительно дедлайна, с
+        self.last_start = 0.0  # начало последнего кадра от старта передачи, с
+
+    def start(self):
+        self._t0 = self._next = self._clock()
+
+    @property
+    def elapsed(self) -> float:
+        return 0.0 if self._t0 is None else self._clock() - self._t0
+
+    @property
+    def scheduled(self) -> float:
+        """Время от старта до конца последнего зарезервированного кадра по расписанию."""
+        return 0.0 if self._t0 is None else self._next - self._t0
+
+    def until_next(self) -> float:
+        """Сколько осталось до дедлайна следующего кадра, с (≤ 0 — отправлять сразу)."""
+        return 0.0 if self._t0 is None else self._next - self._clock()
+
+    def wait(self, nbytes: int, cancelled: Optional[Callable[[], bool]] = None) -> bool:
+        """Дождаться дедлайна кадра; False, если ожидание прервано cancelled()."""
+        if self._t0 is None:
+            self.start()
+        now = self._sleep_until_next(cancelled)
+        if now is None:
+            return False
+        late = now - self._next
+        if late > MAX_LAG_S:
+            self.slips += 1
+            self._next = now
+        elif late > self.max_late:
+            self.max_late = late
+        self.last_start = max(self._next, now) - self._t0
+        self._next += airtime_s(nbytes, self.air_rate) + self.gap_s
+        self.frames += 1
+        return True
+
+    def pause(self, seconds: float, cancelled: Optional[Callable[[], bool]] = None) -> bool:
+        """Тишина в эфире после последнего кадра (HAL_Delay между файлами в прошивке)."""
+        if self._t0 is None:
+            self.start()
+        self._next += max(0.0, seconds)
+        now = self._sleep_until_next(cancelled)
+        if now is None:
+            return False
+        if now - self._next > MAX_LAG_S:
+            self.slips += 1
+            self._next = now
+        return True
+
+    def _sleep_until_next(self, cancelled) -> Optional[float]:
+        """Спать до self._next; текущее время или None, если ожидание прервано."""
+        while True:
+            now = self._clock()
+            left = self._next - now
+            if left <= 0:
+                return now
+            if cancelled is not None and cancelled():
+                return None
+            self._sleep(min(left, _SLEEP_SLICE))
+
+    def charge(self, nbytes: int):
+        """Добавить эфирное время кадра без межпакетной паузы (например, TELEM)."""
+        if self._t0 is None:
+            self.start()
+        self._next += airtime_s(nbytes, self.air_rate)
@@ -0,0 +1,161 @@
+"""Кэш закодированных файлов на диске: повторная передача — только запись в сокет.
+
+Файл кэша *.llw — готовый «эфирный образ»: N × 256 байт FEC-пакетов подряд в
+порядке block_id, без заголовка. Ключ — SHA-256 от содержимого файла и всех
+параметров, влияющих на байты в эфире (callsign, image_id, fec_ratio, число
+групп RS, интерливер, код), поэтому переименованный файл попадает в тот же кэш, а
+изменённый — нет. Образ открывается через mmap, пакеты отдаются как memoryview без копий.
+Размер каталога ограничен: при превышении удаляются давно не использованные
+образы (время использования — mtime, обновляется при попадании).
+"""
+
+import hashlib
+import mmap
+import os
+import threading
+from pathlib import Path
+from typing import Optional
+
+from cauchy_fec import CauchyEncoder
+from erasure_fec import (BLOCK_PAYLOAD, CODE_RS, ErasureEncoder, FECPacket, HEADER_SIZE,
+                         Interleaver, PKT_SIZE)
+
+CACHE_EXT = ".llw"
+DEFAULT_CACHE_DIR = Path.home() / "LorettLink" / "txcache"
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+class WireImage:
+    """Закодированный файл как непрерывный буфер N × 256 Б (mmap кэша или bytes)."""
+
+    def __init__(self, buf, cached: bool = False):
+        self._buf = buf
+        self.view = memoryview(buf)
+        self.cached = cached
+        self.info = FECPacket.from_bytes(bytes(self.view[:PKT_SIZE]))   # заголовок блока 0
+        if self.info is None or len(self.view) != self.info.n_total * PKT_SIZE:
+            raise ValueError("повреждённый образ пакетов")
+
+    @classmethod
+    def from_packets(cls, packets: list) -> "WireImage":
+        return cls(b"".join(p.to_bytes() for p in sorted(packets, key=lambda p: p.block_id)))
+
+    @property
+    def n_total(self) -> int:
+        return self.info.n_total
+
+    def frame(self, block_id: int) -> memoryview:
+        off = block_id * PKT_SIZE
+        return self.view[off:off + PKT_SIZE]
+
+    def data(self) -> bytes:
+        """Содержимое файла из блоков данных (копия — нужна только стратегии importance)."""
+        k = self.info.k_data
+        return b"".join(bytes(self.view[i * PKT_SIZE + HEADER_SIZE:i * PKT_SIZE + HEADER_SIZE + BLOCK_PAYLOAD])
+                        for i in range(k))[:self.info.file_size]
+
+
+def encode_wire(data: bytes, callsign: str, image_id: int, fec_ratio: float,
+                interleaver: Interleaver, cache: Optional["PacketCache"] = None,
+                num_groups: int = 0, cycle: int = 0, code: int = CODE_RS) -> WireImage:
+    """Закодировать файл в образ пакетов или взять готовый из кэша (cache=None — без кэша).
+
+    cycle > 0 — проход нарастающей чётности: те же блоки данных, новые блоки чётности.
+    code = CODE_CAUCHY16 — код Коши на весь файл (cauchy_fec.py; группы и интерливер не нужны).
+    """
+    key = None
+    if cache is not None:
+        key = PacketCache.key(data, callsign, image_id, fec_ratio, interleaver, num_groups, cycle, code)
+        img = cache.get(key)
+        if img is not None:
+            return img
+    if code != CODE_RS:
+        packets = CauchyEncoder(callsign, image_id, fec_ratio).encode_bytes(data)
+    else:
+        packets = ErasureEncoder(callsign, image_id, fec_ratio, interleaver, num_groups, cycle).encode_bytes(data)
+    return cache.put(key, packets) if key else WireImage.from_packets(packets)
+
+
+class PacketCache:
+    """Каталог образов *.llw с вытеснением давно не использованных."""
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(data: bytes, callsign: str, image_id: int, fec_ratio: float,
+            interleaver: Interleaver, num_groups: int = 0, cycle: int = 0, code: int = CODE_RS) -> str:
+        h = hashlib.sha256(data)
+        h.update(f"|{callsign.upper()}|{image_id & 0xFF}|{fec_ratio:.6f}|"
+                 f"{interleaver.id}:{interleaver.param}:{interleaver.seed}".encode())
+        if num_groups:   # без явной геометрии ключ прежний — старые записи кэша остаются в силе
+            h.update(f"|g{num_groups}".encode())
+        if cycle:
+            h.update(f"|c{cycle}".encode())
+        if code:
+            h.update(f"|k{code}".encode())
+        return h.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}{CACHE_EXT}"
+
+    def get(self, key: str) -> Optional[WireImage]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            img = WireImage(mm, cached=True)
+            os.utime(path)
+        except (OSError, ValueError):
+            # Нет файла или он испорчен (например, пустой) — кодируем заново
+            self.misses += 1
+            return None
+        self.hits += 1
+        return img
+
+    def put(self, key: str, packets: list) -> WireImage:
+        img = WireImage.from_packets(packets)
+        path = self._path(key)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            with open(tmp, "wb") as f:
+                f.write(img.view)
+            os.replace(tmp, path)
+        except OSError:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            return img   # кэш не записался — передаём из памяти
+        self.evict(keep=path)
+        return img
+
+    def size(self) -> int:
+        return sum(p.stat().st_size for p in self.directory.glob(f"*{CACHE_EXT}"))
+
+    def evict(self, keep: Optional[Path] = None):
+        """Удалять самые давно использованные образы, пока каталог больше max_bytes."""
+        with self._lock:
+            entries = []
+            for p in self.directory.glob(f"*{CACHE_EXT}"):
+                try:
+                    st = p.stat()
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, p))
+            total = sum(e[1] for e in entries)
+            for _, size, p in sorted(entries, key=lambda e: e[0]):
+                if total <= self.max_bytes:
+                    break
+                if p == keep:
+                    continue
+                try:
+                    os.remove(p)   # открытые mmap остаются действительными до закрытия
+                except OSError:
+                    continue
+                total -= size
@@ -0,0 +1,29 @@
+"""Плейлист как в прошивке: все JPEG из каталога по кругу (main() в LorettLink_tx/src/main.c).
+
+Прошивка перебирает *.JPG на SD-карте, пропускает файлы больше FILE_BUF_MAX,
+после каждого файла ждёт 1 с, после полного круга — 5 с, image_id растёт на
+каждый переданный файл. Каталог перечитывается в начале каждого круга
+(аналог sd_rewind), поэтому файлы можно подкладывать во время прогона.
+"""
+
+from pathlib import Path
+
+FILE_BUF_MAX = 65536          # FILE_BUF_MAX в config.h — больший файл прошивка не читает
+FILE_PAUSE_S = 1.0            # HAL_Delay(1000) после файла
+CYCLE_PAUSE_S = 5.0           # пауза перед повтором круга
+EMPTY_CYCLE_PAUSE_S = 1.0     # не меньше — перед повтором круга, в котором нечего было передать
+PLAYLIST_EXTS = (".jpg", ".jpeg")
+
+
+def scan_playlist(directory, max_size: int = FILE_BUF_MAX) -> tuple[list[Path], list[tuple[Path, int]]]:
+    """JPEG-файлы каталога по имени: (к передаче, [(пропущенный, размер)] — больше max_size)."""
+    files, skipped = [], []
+    for p in sorted(Path(directory).iterdir(), key=lambda p: p.name.lower()):
+        if p.suffix.lower() not in PLAYLIST_EXTS or not p.is_file():
+            continue
+        size = p.stat().st_size
+        if size > max_size:
+            skipped.append((p, size))
+        elif size > 0:
+            files.append(p)
+    return files, skipped
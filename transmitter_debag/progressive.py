@@ -0,0 +1,140 @@
+"""Прогрессивный JPEG перед кодированием: частичный приём показывает всё изображение грубо.
+
+Базовый JPEG идёт строками MCU сверху вниз: пока не принят весь файл, видна
+только верхняя полоса (а с дырой в блоках — мусор). В прогрессивном JPEG
+первым идёт скан DC всех компонент, затем низкие частоты яркости и т.д.: уже
+первые ~15 % файла — целое изображение в низком разрешении, каждый следующий
+скан его уточняет. Приёмник показывает непрерывное начало принятых блоков
+(preview.py в receiver/), так что картинка становится полезной задолго до
+восстановления файла.
+
+Перекодирование:
+  jpegtran   без потерь (коэффициенты DCT не меняются), маркеры RST каждые
+             RESTART_ROWS строк MCU, оптимизированные таблицы Хаффмана,
+             метаданные (EXIF) отброшены — эфир дороже
+  Qt         если jpegtran нет: повторное сжатие QImageWriter (с потерями, без
+             маркеров RST) — первое качество из QT_QUALITIES, при котором файл
+             вырос не больше чем на QT_MAX_GROWTH: эфир не должен дорожать
+
+to_progressive() ничего не меняет, если файл уже прогрессивный, не JPEG,
+перекодировать нечем или результат не влезает в буфер прошивки.
+"""
+
+import shutil
+import subprocess
+from typing import Optional
+
+from playlist import FILE_BUF_MAX
+
+RESTART_ROWS = 1
+QT_QUALITIES = (90, 85, 80, 75)
+QT_MAX_GROWTH = 0.05
+# Сканов в «грубой» части: DC всех компонент и низкие частоты яркости (скрипт libjpeg по умолчанию)
+COARSE_SCANS = 2
+
+_SOI = b"\xff\xd8"
+
+
+def _segments(data: bytes):
+    """Маркеры JPEG: (смещение, маркер, длина сегмента с маркером); энтропийные данные пропускаются."""
+    pos = 2
+    n = len(data)
+    while pos + 1 < n:
+        if data[pos] != 0xFF:
+            pos += 1
+            continue
+        marker = data[pos + 1]
+        if marker == 0xFF or marker == 0x00 or 0xD0 <= marker <= 0xD7:   # заполнение, байт данных, RST
+            pos += 1 if marker == 0xFF else 2
+            continue
+        if marker in (0xD8, 0xD9, 0x01):
+            yield pos, marker, 2
+            pos += 2
+            continue
+        if pos + 4 > n:
+            return
+        seg = 2 + int.from_bytes(data[pos + 2:pos + 4], "big")
+        yield pos, marker, seg
+        pos += seg
+
+
+def scan_offsets(data: bytes) -> list[int]:
+    """Смещения маркеров SOS (начал сканов); [] для не-JPEG."""
+    if data[:2] != _SOI:
+        return []
+    return [pos for pos, marker, _ in _segments(data) if marker == 0xDA]
+
+
+def is_progressive(data: bytes) -> bool:
+    """Кадр SOF2 (прогрессивный, Хаффман) до первого скана."""
+    if data[:2] != _SOI:
+        return False
+    for _, marker, _ in _segments(data):
+        if marker == 0xC2:
+            return True
+        if marker == 0xDA:
+            return False
+    return False
+
+
+def coarse_end(data: bytes, scans: int = COARSE_SCANS) -> int:
+    """Конец первых scans сканов (начало сегментов следующего); для базового JPEG — конец заголовка."""
+    sos = scan_offsets(data)
+    if not sos:
+        return 0
+    if not is_progressive(data):
+        seg = 2 + int.from_bytes(data[sos[0] + 2:sos[0] + 4], "big")
+        return min(sos[0] + seg, len(data))
+    if scans >= len(sos):
+        return len(data)
+    # Конец энтропийных данных скана scans-1 — первый маркер после него (DHT или SOS следующего)
+    last = sos[scans - 1]
+    return next((pos for pos, _, _ in _segments(data) if pos > last), len(data))
+
+
+def _jpegtran(data: bytes) -> Optional[bytes]:
+    exe = shutil.which("jpegtran")
+    if exe is None:
+        return None
+    try:
+        proc = subprocess.run([exe, "-progressive", "-optimize", "-copy", "none",
+                               "-restart", str(RESTART_ROWS)],
+                              input=data, capture_output=True, timeout=30)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    return proc.stdout if proc.returncode == 0 and proc.stdout[:2] == _SOI else None
+
+
+def _qt(data: bytes) -> Optional[bytes]:
+    try:
+        from PyQt5.QtCore import QBuffer, QByteArray, QIODevice
+        from PyQt5.QtGui import QImage, QImageWriter
+    except ImportError:
+        return None
+    img = QImage.fromData(data)
+    if img.isNull():
+        return None
+    for quality in QT_QUALITIES:
+        out = QByteArray()
+        buf = QBuffer(out)
+        buf.open(QIODevice.WriteOnly)
+        w = QImageWriter(buf, b"jpeg")
+        w.setQuality(quality)
+        w.setOptimizedWrite(True)
+        w.setProgressiveScanWrite(True)
+        if not w.write(img):
+            return None
+        if len(out) <= len(data) * (1 + QT_MAX_GROWTH):
+            return bytes(out)
+    return None
+
+
+def to_progressive(data: bytes, max_size: int = FILE_BUF_MAX) -> tuple[bytes, str]:
+    """(файл, чем перекодирован: "jpegtran" | "qt" | "" — оставлен как есть)."""
+    if data[:2] != _SOI or is_progressive(data):
+        return data, ""
+    for name, convert in (("jpegtran", _jpegtran), ("qt", _qt)):
+        out = convert(data)
+        if out is not None and is_progressive(out) and len(out) <= max_size:
+            return out, name
+    return data, ""
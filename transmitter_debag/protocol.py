@@ -1,7 +1,7 @@
 """Транспорт LorettLink — разбор потока байт на FEC- и TELEM-пакеты.
 
 В одном потоке могут идти два формата:
-  - FEC-пакеты: sync 0x55, type 0x68, фиксированно 256 байт
+  - FEC-пакеты: sync 0x55, type 0x68 (RS) или 0x69 (rateless, fountain.py), фиксированно 256 байт
   - TELEM-пакеты: sync 0xA55A (в байтах 0x5A 0xA5 little-endian), фиксированно 10 байт
 """
 
@@ -9,6 +9,7 @@ import struct
 from dataclasses import dataclass
 
 from erasure_fec import FECPacket, PKT_SIZE, SYNC_BYTE as FEC_SYNC, TYPE_FEC
+from fountain import RatelessPacket, TYPE_RATELESS
 
 # ═══════════════════════════════════════════════════════════════
 #  TELEM — телеметрия (RSSI, SNR, мощность TX)
@@ -32,6 +33,17 @@ def crc16_ccitt(data: bytes, init: int = 0xFFFF) -> int:
     return crc
 
 
+@dataclass
+class ParserStats:
+    """Счётчики парсера: принятые кадры, ошибки CRC, отброшенные байты."""
+    fec_ok: int = 0
+    telem_ok: int = 0
+    fec_crc_errors: int = 0    # sync+type найдены, CRC не сошёлся — кадр обрезан или искажён
+    telem_crc_errors: int = 0
+    bytes_skipped: int = 0     # мусор между кадрами
+    overflows: int = 0         # буфер обрезан из-за переполнения
+
+
 @dataclass
 class TelemInfo:
     """Телеметрия одного пакета: уровень сигнала, отношение сигнал/шум, мощность передатчика."""
@@ -54,13 +66,19 @@ def build_telem(rssi: int, snr: int, tx_power: int) -> bytes:
 class StreamParser:
     def __init__(self):
         self._buf = bytearray()
+        self.stats = ParserStats()
 
     def reset(self):
         """Очистить внутренний буфер."""
         self._buf.clear()
 
+    @property
+    def buffered(self) -> int:
+        """Байт в буфере, ещё не разобранных в кадры."""
+        return len(self._buf)
+
     def feed(self, data: bytes) -> list:
-        """Добавить байты в буфер; вернуть список распознанных объектов (FECPacket или TelemInfo)."""
+        """Добавить байты в буфер; вернуть список распознанных объектов (FECPacket, RatelessPacket или TelemInfo)."""
         self._buf.extend(data)
         results: list = []
 
@@ -75,24 +93,31 @@ class StreamParser:
             if telem_idx >= 0:
                 candidates.append(telem_idx)
             if not candidates:
-                self._buf.clear()
+                # 0x5A в конце — возможно, первая половина TELEM-sync, вторая придёт следующей порцией
+                keep = 1 if self._buf[-1] == TELEM_SYNC_BYTES[0] else 0
+                self.stats.bytes_skipped += len(self._buf) - keep
+                del self._buf[:len(self._buf) - keep]
                 break
 
             first = min(candidates)
             if first > 0:
+                self.stats.bytes_skipped += first
                 self._buf = self._buf[first:]
                 continue
 
-            # Проверяем FEC: 0x55 0x68 и достаточно байт
-            if self._buf[0] == FEC_SYNC and self._buf[1] == TYPE_FEC:
+            # Проверяем FEC: 0x55 0x68/0x69 и достаточно байт
+            if self._buf[0] == FEC_SYNC and self._buf[1] in (TYPE_FEC, TYPE_RATELESS):
                 if len(self._buf) < PKT_SIZE:
                     break
                 raw = bytes(self._buf[:PKT_SIZE])
-                pkt = FECPacket.from_bytes(raw)
+                cls = FECPacket if raw[1] == TYPE_FEC else RatelessPacket
+                pkt = cls.from_bytes(raw)
                 if pkt is not None:
                     results.append(pkt)
+                    self.stats.fec_ok += 1
                     self._buf = self._buf[PKT_SIZE:]
                 else:
+                    self.stats.fec_crc_errors += 1
                     self._buf = self._buf[1:]
                 continue
 
@@ -106,14 +131,19 @@ class StreamParser:
                 if crc16_ccitt(body) == expected:
                     _, _, _, rssi, snr, txp, _ = struct.unpack("<HBBhbBH", raw)
                     results.append(TelemInfo(rssi, snr, txp))
+                    self.stats.telem_ok += 1
                     self._buf = self._buf[TELEM_LEN:]
                 else:
+                    self.stats.telem_crc_errors += 1
                     self._buf = self._buf[2:]
                 continue
 
+            self.stats.bytes_skipped += 1
             self._buf = self._buf[1:]
 
         # Ограничение размера буфера, чтобы не раздувать память при мусоре
         if len(self._buf) > 0x10000:
+            self.stats.overflows += 1
+            self.stats.bytes_skipped += len(self._buf) - 4096
             self._buf = self._buf[-4096:]
         return results
@@ -0,0 +1,191 @@
+"""Порядок отправки FEC-блоков — чтобы замирание в эфире не выбивало блоки одной группы RS.
+
+Прошивка шлёт блоки строго по порядку: K блоков данных, затем чётность группа
+за группой. Замирание на несколько секунд выбивает подряд идущие блоки: при
+нескольких группах это m_g блоков чётности одной группы, а для JPEG — ещё и
+сплошной участок изображения. Приёмнику порядок безразличен (блок опознаётся
+по block_id), поэтому стратегия — чисто передающая сторона:
+
+  sequential   как в прошивке
+  roundrobin   по кругу по группам RS: i-й член группы 0, группы 1, … (данные, затем чётность)
+  interleave   чётность равномерно вперемешку с данными (тоже по кругу по группам)
+  random       псевдослучайная перестановка с seed
+  importance   блоки с заголовком JPEG (до конца SOS) первыми, остальное — roundrobin
+  progressive  грубые сканы прогрессивного JPEG (progressive.py) подряд без чётности,
+               затем остальные данные по порядку файла, чётность — вперемешку (interleave)
+
+Стратегия возвращает перестановку индексов блоков (block_id); одна и та же
+перестановка используется передатчиком и бенчмарком bench/bench_schedule.py.
+У кода Коши (cauchy_fec.py) m_per_group = 0: для порядка он — одна группа
+со всеми N−K блоками чётности (parity_groups()).
+"""
+
+import random
+from typing import Optional
+
+from erasure_fec import BLOCK_PAYLOAD, FTYPE_JPEG, INTERLEAVERS, Interleaver, make_interleaver
+from progressive import coarse_end
+
+
+def group_members(k: int, m_g: int, num_groups: int,
+                  interleaver: Optional[Interleaver] = None) -> list[list[int]]:
+    """block_id по группам RS: данные группы по таблице интерливера, затем m_g блоков чётности."""
+    ng = max(1, num_groups)
+    groups = (interleaver or Interleaver()).groups(k, ng)
+    return [list(groups[g]) + list(range(k + g * m_g, k + (g + 1) * m_g))
+            for g in range(ng)]
+
+
+def parity_groups(k: int, n: int, m_g: int, num_groups: int) -> tuple[int, int]:
+    """(m_g, групп) для порядка отправки; код Коши (m_g = 0 при N > K) — одна группа с N−K чётности."""
+    if m_g == 0 and n > k:
+        return n - k, 1
+    return m_g, max(1, num_groups)
+
+
+def parse_interleaver(spec: str) -> Interleaver:
+    """"modulo", "block:8", "random:1234" → объект интерливера."""
+    name, _, arg = spec.partition(":")
+    for il_id, cls in INTERLEAVERS.items():
+        if cls.name == name:
+            value = int(arg or 0)
+            return make_interleaver(il_id, param=value, seed=value)
+    raise ValueError(f"неизвестный интерливер {name!r} (есть: {', '.join(c.name for c in INTERLEAVERS.values())})")
+
+
+def jpeg_header_end(data: bytes) -> int:
+    """Смещение конца заголовка JPEG (после сегмента SOS); 0, если это не JPEG."""
+    if data[:2] != b"\xff\xd8":
+        return 0
+    pos = 2
+    while pos + 4 <= len(data):
+        if data[pos] != 0xFF:
+            return pos
+        marker = data[pos + 1]
+        if marker == 0xFF:          # заполняющие байты
+            pos += 1
+            continue
+        if 0xD0 <= marker <= 0xD9 or marker == 0x01:   # маркеры без длины
+            pos += 2
+            continue
+        seg_len = int.from_bytes(data[pos + 2:pos + 4], "big")
+        pos += 2 + seg_len
+        if marker == 0xDA:          # SOS — дальше энтропийные данные
+            return min(pos, len(data))
+    return min(pos, len(data))
+
+
+class Scheduler:
+    """Базовая стратегия: блоки по порядку block_id (как в прошивке)."""
+
+    name = "sequential"
+    needs_data = False   # order() использует содержимое файла
+
+    def __init__(self, seed: Optional[int] = None):
+        self.seed = seed
+
+    def order(self, k: int, n: int, m_g: int, num_groups: int, data: bytes = b"",
+              interleaver: Optional[Interleaver] = None) -> list[int]:
+        """Перестановка block_id 0..n-1; data — начало файла (для importance)."""
+        m_g, num_groups = parity_groups(k, n, m_g, num_groups)
+        return self._order(k, n, m_g, num_groups, data, interleaver)
+
+    def _order(self, k, n, m_g, num_groups, data=b"", interleaver=None) -> list[int]:
+        return list(range(n))
+
+    def schedule(self, packets: list) -> list:
+        """Пакеты кодера (по порядку block_id) в порядке отправки."""
+        if not packets:
+            return packets
+        p0 = packets[0]
+        data = b""
+        if p0.file_type == FTYPE_JPEG:
+            data = b"".join(p.payload for p in packets[:p0.k_data])[:p0.file_size]
+        by_id = {p.block_id: p for p in packets}
+        return [by_id[b] for b in self.order(p0.k_data, p0.n_total, p0.m_per_group,
+                                             p0.num_groups, data, p0.interleaver_obj) if b in by_id]
+
+
+class RoundRobin(Scheduler):
+    name = "roundrobin"
+
+    def _order(self, k, n, m_g, num_groups, data=b"", interleaver=None):
+        groups = group_members(k, m_g, num_groups, interleaver)
+        out = []
+        for r in range(max(map(len, groups))):
+            out.extend(g[r] for g in groups if r < len(g))
+        return out
+
+
+class InterleaveParity(Scheduler):
+    """Чётность равномерно между данными: после каждых ≈K/M блоков данных — один блок чётности."""
+
+    name = "interleave"
+
+    def _order(self, k, n, m_g, num_groups, data=b"", interleaver=None):
+        groups = group_members(k, m_g, num_groups, interleaver)
+        data_ids = list(range(k))
+        parity_ids = []
+        for r in range(m_g):
+            parity_ids.extend(g[len(g) - m_g + r] for g in groups)
+        out = []
+        m = len(parity_ids)
+        for j, bid in enumerate(data_ids):
+            out.append(bid)
+            # Брезенхем: к блоку j+1 должно уйти ⌊(j+1)·M/K⌋ блоков чётности
+            while len(out) - (j + 1) < (j + 1) * m // k:
+                out.append(parity_ids[len(out) - (j + 1)])
+        out.extend(parity_ids[len(out) - k:])
+        return out
+
+
+class RandomOrder(Scheduler):
+    name = "random"
+
+    def _order(self, k, n, m_g, num_groups, data=b"", interleaver=None):
+        out = list(range(n))
+        random.Random(self.seed).shuffle(out)
+        return out
+
+
+class ImportanceFirst(RoundRobin):
+    """Без заголовка JPEG принятые данные не декодируются и не показываются — он идёт первым."""
+
+    name = "importance"
+    needs_data = True
+
+    def _order(self, k, n, m_g, num_groups, data=b"", interleaver=None):
+        head = -(-jpeg_header_end(data) // BLOCK_PAYLOAD) if data else 0
+        head = min(head, k)
+        first = list(range(head))
+        return first + [b for b in super()._order(k, n, m_g, num_groups, data, interleaver) if b >= head]
+
+
+class CoarseScansFirst(InterleaveParity):
+    """Приёмник показывает непрерывное начало файла: грубые сканы — первыми и без пауз на чётность.
+
+    Дальше данные тоже идут по порядку файла (каждый принятый скан уточняет
+    картинку), а чётность распределена между ними, как в interleave. Для
+    базового JPEG грубая часть — заголовок.
+    """
+
+    name = "progressive"
+    needs_data = True
+
+    def _order(self, k, n, m_g, num_groups, data=b"", interleaver=None):
+        head = min(-(-coarse_end(data) // BLOCK_PAYLOAD), k) if data else 0
+        return list(range(head)) + [b for b in super()._order(k, n, m_g, num_groups, data, interleaver)
+                                    if b >= head]
+
+
+SCHEDULERS: dict[str, type[Scheduler]] = {
+    s.name: s for s in (Scheduler, RoundRobin, InterleaveParity, RandomOrder, ImportanceFirst,
+                        CoarseScansFirst)
+}
+
+
+def make_scheduler(name: str, seed: Optional[int] = None) -> Scheduler:
+    try:
+        return SCHEDULERS[name](seed)
+    except KeyError:
+        raise ValueError(f"неизвестная стратегия: {name!r} (есть: {', '.join(SCHEDULERS)})") from None
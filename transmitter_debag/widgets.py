@@ -1,6 +1,8 @@
 """Пользовательские виджеты для приёмника и передатчика LorettLink."""
 
 import math
+import time
+from typing import Callable, Optional
 
 from PyQt5.QtWidgets import QWidget
 from PyQt5.QtCore import Qt
@@ -24,6 +26,9 @@ class ChunkMatrixWidget(QWidget):
     Цвета фона зависят от текущей темы (QPalette).
     """
 
+    # Профилирование: вызывается с длительностью paintEvent, с (None — без замера)
+    on_paint: Optional[Callable[[float], None]] = None
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self._total = 0
@@ -54,6 +59,15 @@ class ChunkMatrixWidget(QWidget):
             self._states[idx] = STATE_SENT
             self.update()
 
+    def mark_range(self, start: int, stop: int, state: int = STATE_OK):
+        """Отметить диапазон [start, stop) одним перерисовыванием; STATE_SENT не затирает другие состояния."""
+        if state == STATE_SENT:
+            for i in range(start, stop):
+                self._states.setdefault(i, STATE_SENT)
+        else:
+            self._states.update(dict.fromkeys(range(start, stop), state))
+        self.update()
+
     def clear_all(self):
         """Сброс: обнулить количество блоков и состояния."""
         self._total = 0
@@ -66,6 +80,14 @@ class ChunkMatrixWidget(QWidget):
         return self.palette().color(QPalette.Window).lightness() < 128
 
     def paintEvent(self, _event):
+        if self.on_paint is None:
+            self._paint()
+            return
+        t0 = time.perf_counter()
+        self._paint()
+        self.on_paint(time.perf_counter() - t0)
+
+    def _paint(self):
         p = QPainter(self)
         p.setRenderHint(QPainter.Antialiasing)
 